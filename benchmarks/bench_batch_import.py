@@ -0,0 +1,103 @@
+"""
+Importação de histórico: N POST unitários x um POST em lote.
+
+Invoca em processo post_vaccine N vezes e post_vaccines_batch uma vez com os
+mesmos N registros, contra o DynamoDB de local_services (HTTP local, sem
+rede). A diferença medida é só a do Lambda + SDK; em produção cada POST
+unitário ainda paga o API Gateway e o round trip do cliente.
+
+--unprocessed devolve essa fração de cada BatchWriteItem como
+UnprocessedItems na primeira tentativa, para exercitar o backoff.
+
+Uso:
+    python benchmarks/bench_batch_import.py [--records 200] [--unprocessed 0.2]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from events import HANDLER_ENV, LAMBDA_PATH, LambdaContext, api_event, use_local_paths
+from local_services import LocalServices
+
+
+def vaccine_records(count: int) -> list:
+    return [
+        {
+            "name": f"V{n % 10 + 1}",
+            "appliedAt": f"20{15 + n % 9:02d}-{n % 12 + 1:02d}-10",
+            "nextDose": f"20{16 + n % 9:02d}-{n % 12 + 1:02d}-10",
+        }
+        for n in range(count)
+    ]
+
+
+def flaky_batch_write(rate: float):
+    seen = set()
+
+    def handler(request):
+        unprocessed = {}
+        for table, writes in request["RequestItems"].items():
+            retry = []
+            for write in writes:
+                sk = write["PutRequest"]["Item"]["SK"]["S"]
+                if sk not in seen and random.random() < rate:
+                    seen.add(sk)
+                    retry.append(write)
+            if retry:
+                unprocessed[table] = retry
+        return {"UnprocessedItems": unprocessed}
+
+    return handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=200)
+    parser.add_argument("--unprocessed", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with LocalServices(aws_handlers={
+        "DynamoDB_20120810.BatchWriteItem": flaky_batch_write(args.unprocessed),
+    }) as services:
+        os.environ.update({**HANDLER_ENV, **services.env()})
+        use_local_paths()
+        sys.path.insert(0, os.path.join(LAMBDA_PATH, "health"))
+
+        import post_vaccine
+        import post_vaccines_batch
+
+        records = vaccine_records(args.records)
+        base = {"userId": "user-1", "petId": "pet-1"}
+
+        # aquece clientes e imports dos dois caminhos
+        post_vaccine.lambda_handler(api_event(body={**base, **records[0]}), LambdaContext())
+        post_vaccines_batch.lambda_handler(api_event(body={**base, "records": records[:1]}), LambdaContext())
+        services.calls.clear()
+
+        started = time.perf_counter()
+        for record in records:
+            result = post_vaccine.lambda_handler(api_event(body={**base, **record}), LambdaContext())
+            assert result["statusCode"] == 201, result
+        single_ms = (time.perf_counter() - started) * 1000
+        single_calls = sum(services.calls.values())
+        services.calls.clear()
+
+        started = time.perf_counter()
+        result = post_vaccines_batch.lambda_handler(
+            api_event(body={**base, "records": records}), LambdaContext()
+        )
+        batch_ms = (time.perf_counter() - started) * 1000
+        batch_calls = sum(services.calls.values())
+        assert result["statusCode"] in (201, 207), result
+
+    print(f"{args.records} vacinas | unprocessed na 1ª tentativa: {args.unprocessed:.0%}")
+    print(f"{'caminho':<24}{'invocações':>12}{'chamadas AWS':>14}{'ms total':>10}{'ms/registro':>13}")
+    print(f"{'POST unitário':<24}{args.records:>12}{single_calls:>14}{single_ms:>10.0f}{single_ms / args.records:>13.2f}")
+    print(f"{'POST em lote':<24}{1:>12}{batch_calls:>14}{batch_ms:>10.0f}{batch_ms / args.records:>13.2f}")
+    print(f"status do lote: {result['statusCode']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Harness de cold start dos handlers.
+
+Para cada handler, sobe N processos Python novos (como um container Lambda
+novo) e mede:
+  - import:   tempo de import do módulo do handler (python -X importtime)
+  - 1ª invoc: latência da primeira invocação (clientes, SDKs preguiçosos)
+  - 2ª invoc: latência da invocação seguinte, já quente
+e lista os pacotes que mais pesam no import.
+
+DynamoDB, Cognito e Stripe são servidos por benchmarks/local_services.py,
+então a medida inclui o SDK e o HTTP local, mas não a rede.
+Os processos rodam com -B: como no Lambda, o código do projeto é compilado
+a cada cold start.
+
+Uso:
+    python benchmarks/bench_cold_start.py [--runs 10] [--only stripe_webhook]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from events import (
+    HANDLER_ENV,
+    LAMBDA_PATH,
+    LAYER_PATH,
+    api_event,
+    stripe_webhook_event,
+)
+from local_services import LocalServices, ServiceError
+
+CLAIMS = {"sub": "user-1", "email": "tutor@petvida.local", "name": "Tutor"}
+
+# (nome, diretório, módulo, função, evento)
+SCENARIOS = [
+    ("add_pet", "pets", "add_pet", "lambda_handler",
+     api_event(body={"userId": "user-1", "name": "Rex", "species": "DOG"})),
+    ("get_pet", "pets", "get_pet", "lambda_handler",
+     api_event(query={"userId": "user-1"})),
+    ("get_single_pet", "pets", "get_single_pet", "lambda_handler",
+     api_event(query={"userId": "user-1"}, path={"petId": "pet-1"})),
+    ("get_pet_dashboard", "pets", "get_pet_dashboard", "lambda_handler",
+     api_event(query={"userId": "user-1"}, path={"petId": "pet-1"})),
+    ("get_upload_url", "pets", "get_upload_url", "lambda_handler",
+     api_event(body={"userId": "user-1", "petId": "pet-1", "contentType": "image/jpeg"})),
+    ("post_vaccine", "health", "post_vaccine", "lambda_handler",
+     api_event(body={"userId": "user-1", "petId": "pet-1", "name": "V10", "appliedAt": "2024-01-10"})),
+    ("list_vaccines", "health", "list_vaccines", "lambda_handler",
+     api_event(query={"userId": "user-1", "petId": "pet-1"})),
+    ("post_care", "health", "post_care", "lambda_handler",
+     api_event(body={"userId": "user-1", "petId": "pet-1", "type": "BANHO", "performedAt": "2024-01-10"})),
+    ("get_care", "health", "get_care", "lambda_handler",
+     api_event(query={"userId": "user-1", "petId": "pet-1"})),
+    ("get_config", "config", "get_config", "lambda_handler",
+     api_event(claims=CLAIMS)),
+    ("save_config", "config", "save_config", "lambda_handler",
+     api_event(body={"remindersEnabled": True, "advanceDays": "3"}, claims=CLAIMS)),
+    ("login_user", "auth", "login_user", "handler",
+     api_event(body={"email": "tutor@petvida.local", "password": "secret"})),
+    ("refresh_token", "auth", "refresh_token", "handler",
+     api_event(body={"refreshToken": "refresh-token"})),
+    ("set_password", "auth", "set_password", "handler",
+     api_event(body={"email": "tutor@petvida.local", "password": "secret"})),
+    ("register_user", "auth", "register_user", "handler",
+     api_event(body={"name": "Tutor", "email": "tutor@petvida.local"})),
+    ("stripe_webhook", "auth", "stripe_webhook", "handler",
+     stripe_webhook_event({
+         "id": "evt_local_new", "type": "invoice.paid", "livemode": False,
+         "created": 1700000000, "data": {"object": {"id": "in_local"}},
+     })),
+    ("stripe_webhook:duplicate", "auth", "stripe_webhook", "handler",
+     stripe_webhook_event({
+         "id": "evt_local_dup", "type": "invoice.paid", "livemode": False,
+         "created": 1700000000, "data": {"object": {"id": "in_local"}},
+     })),
+]
+
+CHILD = r"""
+import json, os, sys, time
+sys.path[:0] = [os.environ["BENCH_LAYER"], os.environ["BENCH_DIR"]]
+
+class Context:
+    aws_request_id = "bench"
+    function_name = "bench"
+
+t0 = time.perf_counter()
+module = __import__(os.environ["BENCH_MODULE"])
+t1 = time.perf_counter()
+
+handler = getattr(module, os.environ["BENCH_FUNC"])
+event = json.loads(os.environ["BENCH_EVENT"])
+
+first = handler(event, Context())
+t2 = time.perf_counter()
+handler(event, Context())
+t3 = time.perf_counter()
+
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_ms": (t2 - t1) * 1000,
+    "second_ms": (t3 - t2) * 1000,
+    "status": first.get("statusCode"),
+}))
+"""
+
+
+def duplicate_put(request):
+    # o webhook grava o evento com attribute_not_exists(PK)
+    if "evt_local_dup" in json.dumps(request):
+        raise ServiceError(
+            "com.amazonaws.dynamodb.v20120810#ConditionalCheckFailedException",
+            "The conditional request failed",
+        )
+    return {}
+
+
+def update_item(request):
+    # save_config pede ReturnValues=ALL_NEW e lê a version gravada
+    if request.get("ReturnValues") == "ALL_NEW":
+        return {"Attributes": {**request["Key"], "version": {"N": "1"}}}
+    return {}
+
+
+def top_level_imports(stderr: str) -> list:
+    # "import time: self [us] | cumulative | imported package"
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nível 0 = import direto do processo
+            entries.append((name.strip(), int(cumulative) / 1000))
+    return entries
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, int(round(pct / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+def run_scenario(scenario, services, runs):
+    name, directory, module, func, event = scenario
+
+    env = {
+        **os.environ,
+        **HANDLER_ENV,
+        **services.env(),
+        "BENCH_LAYER": LAYER_PATH,
+        "BENCH_DIR": os.path.join(LAMBDA_PATH, directory),
+        "BENCH_MODULE": module,
+        "BENCH_FUNC": func,
+        "BENCH_EVENT": json.dumps(event),
+    }
+
+    samples, heaviest = [], {}
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-B", "-X", "importtime", "-c", CHILD],
+            env=env, capture_output=True, text=True, check=False,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{name} falhou:\n{proc.stderr[-2000:]}")
+
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        for package, ms in top_level_imports(proc.stderr):
+            heaviest[package] = max(heaviest.get(package, 0), ms)
+
+    return samples, sorted(heaviest.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--only", help="roda só os cenários que contêm este texto")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.only or args.only in s[0]]
+
+    header = f"{'handler':<26}{'status':>7}{'import p50':>12}{'import p99':>12}{'1ª p50':>10}{'1ª p99':>10}{'2ª p50':>10}  maiores imports (ms)"
+    print(f"{args.runs} cold starts por handler")
+    print(header)
+    print("-" * len(header))
+
+    with LocalServices(aws_handlers={
+        "DynamoDB_20120810.PutItem": duplicate_put,
+        "DynamoDB_20120810.UpdateItem": update_item,
+    }) as services:
+        for scenario in scenarios:
+            samples, heaviest = run_scenario(scenario, services, args.runs)
+
+            imports = [s["import_ms"] for s in samples]
+            firsts = [s["first_ms"] for s in samples]
+            seconds = [s["second_ms"] for s in samples]
+            top = ", ".join(f"{pkg} {ms:.0f}" for pkg, ms in heaviest[:3])
+
+            print(
+                f"{scenario[0]:<26}{samples[0]['status']:>7}"
+                f"{percentile(imports, 50):>12.1f}{percentile(imports, 99):>12.1f}"
+                f"{percentile(firsts, 50):>10.1f}{percentile(firsts, 99):>10.1f}"
+                f"{percentile(seconds, 50):>10.1f}  {top}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+resource.Table x client de baixo nível nas leituras grandes da HealthRecords.
+
+Mede:
+  - criação: boto3.resource("dynamodb").Table x boto3.client("dynamodb")
+    numa sessão nova (o que o cold start paga)
+  - query de uma página (--page itens) por quatro caminhos, com a resposta
+    entregue pelo botocore Stubber: sem HTTP nem parse do JSON (iguais nos
+    quatro e dominados pelo stand-in local), sobra o que muda entre eles,
+    a chamada do client e a conversão de tipos:
+      resource.Table.query        (camada de resource do boto3)
+      client + TypeDeserializer   (o aws.deserialize antigo)
+      client + aws.deserialize    (despacho direto por tipo)
+      aws.FastTable.query         (o que aws.table() devolve agora)
+  - só a desserialização da mesma página, sem HTTP
+
+Os quatro caminhos devolvem os mesmos itens (conferido antes de medir).
+A página vem da query real no DynamoDB de local_dynamodb (GSI2 de um pet).
+
+Uso:
+    python benchmarks/bench_dynamodb_clients.py [--page 1000] [--repeat 30]
+"""
+import argparse
+import copy
+import gc
+import os
+import statistics
+import time
+from datetime import datetime
+
+from bench_handlers import health_records
+from events import HANDLER_ENV, use_local_paths
+from local_dynamodb import HEALTH_INDEXES, LocalDynamoDB
+from local_services import LocalServices
+
+USER_ID = "user-1"
+PET_ID = "pet-1"
+
+
+def timed(fn, repeat: int) -> list:
+    fn()  # aquece
+    gc.collect()  # lixo do caminho anterior não entra na conta deste
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page", type=int, default=1000, help="itens por página (Limit)")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    table_name = HANDLER_ENV["HEALTH_RECORDS_TABLE"]
+    dynamodb = LocalDynamoDB(indexes={table_name: HEALTH_INDEXES})
+
+    with LocalServices(aws_handlers=dynamodb.handlers()) as services:
+        os.environ.update({**HANDLER_ENV, **services.env()})
+        use_local_paths()
+
+        import boto3
+        from boto3.dynamodb.conditions import Key
+        from boto3.dynamodb.types import TypeDeserializer
+        from botocore.stub import Stubber
+        from petvida_runtime import aws
+        from petvida_runtime.health_keys import PET_INDEX, pet_index_pk
+
+        records = health_records(USER_ID, PET_ID, args.page * 2, datetime(2024, 1, 1, 10, 0, 0))
+        dynamodb.load(table_name, (aws.serialize(record) for record in records))
+
+        # =========================
+        # Criação (sessão nova a cada vez, como num cold start)
+        # =========================
+        creation = {
+            "boto3.resource(...).Table": timed(
+                lambda: boto3.session.Session().resource("dynamodb").Table(table_name), 10),
+            "boto3.client(...)": timed(lambda: boto3.session.Session().client("dynamodb"), 10),
+        }
+
+        # =========================
+        # Query de uma página
+        # =========================
+        pk = pet_index_pk(USER_ID, PET_ID, "VACCINE")
+        resource_table = boto3.resource("dynamodb", config=aws.config("dynamodb")).Table(table_name)
+        client = aws.client("dynamodb")
+        fast_table = aws.table(table_name)
+        type_deserializer = TypeDeserializer()
+
+        low_level = {
+            "TableName": table_name, "IndexName": PET_INDEX, "Limit": args.page,
+            "KeyConditionExpression": "GSI2PK = :pk", "ExpressionAttributeValues": {":pk": {"S": pk}},
+        }
+        high_level = {"IndexName": PET_INDEX, "Limit": args.page, "KeyConditionExpression": Key("GSI2PK").eq(pk)}
+
+        # caminho -> (client que faz a chamada, função)
+        paths = {
+            "resource.Table.query": (resource_table.meta.client, lambda: resource_table.query(**high_level)["Items"]),
+            "client + TypeDeserializer": (client, lambda: [
+                {k: type_deserializer.deserialize(v) for k, v in item.items()}
+                for item in client.query(**low_level)["Items"]
+            ]),
+            "client + aws.deserialize": (client, lambda: [
+                aws.deserialize(item) for item in client.query(**low_level)["Items"]
+            ]),
+            "aws.FastTable.query": (client, lambda: fast_table.query(**high_level)["Items"]),
+        }
+
+        # resposta real do stand-in, no formato que o botocore entrega
+        page = dynamodb.query({**low_level, "ReturnConsumedCapacity": "TOTAL"})
+        stubbers = {id(c): Stubber(c) for c, _ in paths.values()}
+        for stubber in stubbers.values():
+            stubber.activate()
+
+        def queue(stub_client, count):
+            # o resource converte a resposta no lugar: uma cópia por chamada
+            for _ in range(count):
+                stubbers[id(stub_client)].add_response("query", copy.deepcopy(page))
+
+        pages = {}
+        for name, (stub_client, fn) in paths.items():
+            queue(stub_client, 1)
+            pages[name] = fn()
+        reference = pages["resource.Table.query"]
+        for name, items in pages.items():
+            assert items == reference, f"{name} devolveu itens diferentes"
+
+        query_results = {}
+        for name, (stub_client, fn) in paths.items():
+            queue(stub_client, args.repeat + 1)
+            query_results[name] = timed(fn, args.repeat)
+
+        for stubber in stubbers.values():
+            stubber.deactivate()
+
+        # =========================
+        # Só desserialização
+        # =========================
+        raw = page["Items"]
+        page_bytes = sum(len(repr(item)) for item in raw)
+        deserialization = {
+            "TypeDeserializer": timed(
+                lambda: [{k: type_deserializer.deserialize(v) for k, v in item.items()} for item in raw],
+                args.repeat),
+            "aws.deserialize": timed(lambda: [aws.deserialize(item) for item in raw], args.repeat),
+        }
+
+    def report(title, results):
+        print(f"\n{title}")
+        print(f"{'caminho':<32}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, samples in results.items():
+            ordered = sorted(samples)
+            p99 = ordered[max(0, round(0.99 * len(ordered)) - 1)]
+            print(f"{name:<32}{statistics.median(samples):>10.2f}{p99:>10.2f}")
+
+    print(f"página: {len(raw)} vacinas (~{page_bytes / 1024:.0f} KB no formato da API) | {args.repeat} repetições")
+    report("criação (sessão nova)", creation)
+    report("query de uma página (Stubber)", query_results)
+    report("desserialização da página", deserialization)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Suíte de carga local: cada handler HTTP invocado em processo, com eventos
+sintéticos do API Gateway (payload v2), contra os stand-ins de
+local_services (DynamoDB com estado, S3, Cognito e Stripe).
+
+Massa de dados:
+  - tutores com 1, 10 e 50 pets (user-1, user-10, user-50)
+  - --records registros de saúde (padrão 10 000) nos pets do user-50,
+    metade vacinas, metade cuidados, com os resumos PET#<id>#SUMMARY
+  - 20 registros por pet nos outros tutores
+  - um tutor só para as escritas (user-write), para não mudar o tamanho
+    das leituras no meio da rodada
+
+Para cada cenário: vazão (invocações/s em série), latência p50/p90/p99/máx e
+pico de memória alocada por invocação (tracemalloc, numa rodada separada e
+curta, porque o tracemalloc deixa tudo mais lento). Os stand-ins rodam no
+mesmo processo: o tempo inclui o lado "servidor" do HTTP local. Logs e
+métricas são formatados como no Lambda, mas descartados (--logs mostra os
+logs no stderr).
+
+Regressões: --save grava os resultados em JSON; --baseline compara p50/p99
+com um arquivo salvo antes e sai com código 1 se algum cenário piorar mais
+que --tolerance (ignorando diferenças abaixo de --noise-ms).
+
+Uso:
+    python benchmarks/bench_handlers.py [--iterations 100] [--records 10000]
+        [--only get_care,list_vaccines,get_pet] [--save base.json]
+        [--baseline base.json --tolerance 0.25]
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from events import HANDLER_ENV, LAMBDA_PATH, LambdaContext, api_event, use_local_paths
+from local_dynamodb import HEALTH_INDEXES, IDEMPOTENCY_KEY_SCHEMA, LocalDynamoDB
+from local_services import LocalCognito, LocalServices
+
+PET_COUNTS = {"user-1": 1, "user-10": 10, "user-50": 50}
+WRITE_USER = "user-write"
+PASSWORD = "s3nha-forte!"
+
+
+class NullOutput:
+    # as linhas de métricas (EMF) de cada invocação não interessam aqui
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))]
+
+
+# =========================
+# Massa de dados
+# =========================
+def pet_item(user_id: str, number: int) -> dict:
+    pet_id = f"{user_id}-pet-{number}"
+    return {
+        "PK": f"USER#{user_id}", "SK": f"PET#{pet_id}", "petId": pet_id,
+        "name": f"Pet {number}", "species": "DOG" if number % 2 else "CAT",
+        "breed": "SRD", "gender": "MALE" if number % 3 else "FEMALE",
+        "birthDate": "2020-05-01", "photoUrl": "", "notes": "",
+        "createdAt": "2024-01-01T10:00:00+00:00",
+    }
+
+
+def health_records(user_id: str, pet_id: str, count: int, started: datetime) -> list:
+    from petvida_runtime.health_records import care_item, vaccine_item
+
+    records = []
+    for n in range(count):
+        created_at = started + timedelta(seconds=n)
+        event_date = (started - timedelta(days=n % 720)).date().isoformat()
+        if n % 2:
+            records.append(care_item(user_id, pet_id, {
+                "type": f"BANHO{n % 5}", "performedAt": event_date, "periodicity": "30",
+                "notes": "Tosa higiênica e banho com shampoo neutro",
+            }, created_at=created_at))
+        else:
+            records.append(vaccine_item(user_id, pet_id, {
+                "name": f"V{n % 8 + 1}", "appliedAt": event_date,
+                "nextDose": (created_at + timedelta(days=365)).date().isoformat(),
+            }, created_at=created_at))
+    return records
+
+
+def seed(dynamodb: LocalDynamoDB, cognito: LocalCognito, records: int) -> dict:
+    from boto3.dynamodb.types import TypeSerializer
+    from petvida_runtime.health_summary import apply_records, empty_summary
+    from petvida_runtime.profiles import profile_key
+
+    serializer = TypeSerializer()
+
+    def typed(item):
+        return {k: serializer.serialize(v) for k, v in item.items()}
+
+    started = datetime(2024, 1, 1, 10, 0, 0)
+    pets, health, users = [], [], []
+    per_pet = {user_id: 20 for user_id in PET_COUNTS}
+    per_pet["user-50"] = max(1, records // PET_COUNTS["user-50"])
+
+    for user_id, count in {**PET_COUNTS, WRITE_USER: 1}.items():
+        users.append({
+            **profile_key(user_id), "email": f"{user_id}@example.com", "name": user_id,
+            "preferences": {"remindersEnabled": True, "emailNotifications": True, "advanceDays": "7"},
+            "version": 1,
+        })
+        cognito.add_user(f"{user_id}@example.com", PASSWORD, user_id, sub=user_id)
+
+        for number in range(count):
+            pet = pet_item(user_id, number)
+            pets.append(pet)
+            found = health_records(user_id, pet["petId"], per_pet.get(user_id, 0), started)
+            health.extend(found)
+            summary = apply_records(empty_summary(user_id, pet["petId"]), found)
+            summary["version"] = 1
+            health.append(summary)
+
+    dynamodb.load(HANDLER_ENV["PETS_TABLE_NAME"], map(typed, pets))
+    dynamodb.load(HANDLER_ENV["HEALTH_RECORDS_TABLE"], map(typed, health))
+    dynamodb.load(HANDLER_ENV["USERS_TABLE_NAME"], map(typed, users))
+    return {"pets": len(pets), "health": len(health), "users": len(users)}
+
+
+# =========================
+# Cenários
+# =========================
+def claims(user_id):
+    return {"sub": user_id, "email": f"{user_id}@example.com", "name": user_id}
+
+
+def scenarios(modules, services, cognito) -> list:
+    """(nome, função do handler, fábrica de evento, status esperado)"""
+    pets, health, config, auth = modules["pets"], modules["health"], modules["config"], modules["auth"]
+    big_pet = "user-50-pet-0"
+    bucket = HANDLER_ENV["BUCKET_NAME"]
+
+    def committed_photo():
+        from petvida_runtime.photos import photo_key
+
+        key = photo_key(WRITE_USER, f"{WRITE_USER}-pet-0", uuid.uuid4().hex, "image/jpeg")
+        services.s3.put(bucket, key, b"\xff\xd8jpeg", **{"Content-Type": "image/jpeg"})
+        return api_event(body={"userId": WRITE_USER, "photoKey": key}, path={"petId": f"{WRITE_USER}-pet-0"})
+
+    vaccine = {"name": "V10", "appliedAt": "2026-01-10", "nextDose": "2027-01-10"}
+    care = {"type": "BANHO", "performedAt": "2026-01-10", "periodicity": "30"}
+
+    # sessão do user-10 no LocalCognito (tokens RS256 de verdade)
+    session = cognito.admin_initiate_auth({
+        "AuthFlow": "ADMIN_USER_PASSWORD_AUTH",
+        "AuthParameters": {"USERNAME": "user-10@example.com", "PASSWORD": PASSWORD},
+    })["AuthenticationResult"]
+    bearer = {"authorization": f"Bearer {session['AccessToken']}"}
+
+    return [
+        ("get_pet[1 pet]", pets["get_pet"].lambda_handler,
+         lambda: api_event(query={"userId": "user-1"}), 200),
+        ("get_pet[10 pets]", pets["get_pet"].lambda_handler,
+         lambda: api_event(query={"userId": "user-10"}), 200),
+        ("get_pet[50 pets]", pets["get_pet"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50"}), 200),
+        ("get_pet[50 pets+resumo]", pets["get_pet"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50", "include": "health_summary"}), 200),
+        ("get_single_pet", pets["get_single_pet"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50"}, path={"petId": big_pet}), 200),
+        ("get_pet_dashboard", pets["get_pet_dashboard"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50"}, path={"petId": big_pet}), 200),
+        ("list_vaccines[pet]", health["list_vaccines"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50", "petId": big_pet}), 200),
+        ("list_vaccines[pet limit=20]", health["list_vaccines"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50", "petId": big_pet, "limit": "20"}), 200),
+        ("list_vaccines[tutor]", health["list_vaccines"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50"}), 200),
+        ("get_care[pet]", health["get_care"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50", "petId": big_pet}), 200),
+        ("get_care[pet limit=20]", health["get_care"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50", "petId": big_pet, "limit": "20"}), 200),
+        ("get_care[tutor]", health["get_care"].lambda_handler,
+         lambda: api_event(query={"userId": "user-50"}), 200),
+        ("add_pet", pets["add_pet"].lambda_handler,
+         lambda: api_event(body={"userId": f"{WRITE_USER}-pets", "name": "Novo", "species": "DOG"}), 201),
+        ("post_vaccine", health["post_vaccine"].lambda_handler,
+         lambda: api_event(body={"userId": WRITE_USER, "petId": f"{WRITE_USER}-pet-0", **vaccine}), 201),
+        ("post_vaccine[Idempotency-Key]", health["post_vaccine"].lambda_handler,
+         lambda: api_event(body={"userId": WRITE_USER, "petId": f"{WRITE_USER}-pet-0", **vaccine},
+                           headers={"idempotency-key": str(uuid.uuid4())}), 201),
+        ("post_vaccine[replay]", health["post_vaccine"].lambda_handler,
+         lambda: api_event(body={"userId": WRITE_USER, "petId": f"{WRITE_USER}-pet-0", **vaccine},
+                           headers={"idempotency-key": "bench-replay"}), 201),
+        ("post_care", health["post_care"].lambda_handler,
+         lambda: api_event(body={"userId": WRITE_USER, "petId": f"{WRITE_USER}-pet-0", **care}), 201),
+        ("post_vaccines_batch[25]", health["post_vaccines_batch"].lambda_handler,
+         lambda: api_event(body={"userId": WRITE_USER, "petId": f"{WRITE_USER}-pet-0",
+                                 "records": [vaccine] * 25}), 201),
+        ("get_upload_url", pets["get_upload_url"].lambda_handler,
+         lambda: api_event(body={"userId": WRITE_USER, "petId": f"{WRITE_USER}-pet-0",
+                                 "contentType": "image/jpeg", "fileSize": 2_000_000}), 200),
+        ("commit_photo", pets["commit_photo"].lambda_handler, committed_photo, 200),
+        ("get_config", config["get_config"].lambda_handler,
+         lambda: api_event(claims=claims("user-10")), 200),
+        ("get_config[Bearer]", config["get_config"].lambda_handler,
+         lambda: api_event(headers=bearer), 200),
+        ("get_config[Bearer inválido]", config["get_config"].lambda_handler,
+         lambda: api_event(headers={"authorization": f"Bearer {session['AccessToken'][:-4]}AAAA"}), 401),
+        ("save_config", config["save_config"].lambda_handler,
+         lambda: api_event(body={"remindersEnabled": True, "advanceDays": "3"}, claims=claims(WRITE_USER)), 200),
+        ("login_user", auth["login_user"].handler,
+         lambda: api_event(body={"email": "user-10@example.com", "password": PASSWORD}), 200),
+        ("login_user[senha errada]", auth["login_user"].handler,
+         lambda: api_event(body={"email": "user-10@example.com", "password": "errada"}), 401),
+        ("refresh_token", auth["refresh_token"].handler,
+         lambda: api_event(body={"refreshToken": session["RefreshToken"]}), 200),
+        ("refresh_token[inválido]", auth["refresh_token"].handler,
+         lambda: api_event(body={"refreshToken": "revogado"}), 401),
+        ("set_password", auth["set_password"].handler,
+         lambda: api_event(body={"email": f"{WRITE_USER}@example.com", "password": PASSWORD}), 200),
+        ("register_user", auth["register_user"].handler,
+         lambda: api_event(body={"name": "Tutor", "email": "novo@example.com"}), 201),
+    ]
+
+
+# =========================
+# Medição
+# =========================
+def run(handler, make_event, expected, iterations, warmup, memory_iterations) -> dict:
+    context = LambdaContext()
+    statuses = {}
+
+    def invoke():
+        event = make_event()
+        started = time.perf_counter()
+        result = handler(event, context)
+        elapsed = time.perf_counter() - started
+        statuses[result["statusCode"]] = statuses.get(result["statusCode"], 0) + 1
+        return elapsed, result
+
+    for _ in range(warmup):
+        invoke()
+    statuses.clear()
+
+    samples = []
+    wall_started = time.perf_counter()
+    for _ in range(iterations):
+        elapsed, _ = invoke()
+        samples.append(elapsed * 1000)
+    wall = time.perf_counter() - wall_started
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(memory_iterations):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        invoke()
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    ordered = sorted(samples)
+    return {
+        "ops": iterations / wall,
+        "p50": percentile(ordered, 0.50),
+        "p90": percentile(ordered, 0.90),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1],
+        "peak_kib": max(peaks) / 1024 if peaks else 0.0,
+        "unexpected": sum(n for status, n in statuses.items() if status != expected),
+        "statuses": statuses,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, noise_ms: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in ("p50", "p99"):
+            limit = before[metric] * (1 + tolerance)
+            if current[metric] > limit and current[metric] - before[metric] > noise_ms:
+                regressions.append(
+                    f"{name}: {metric} {before[metric]:.2f} -> {current[metric]:.2f} ms "
+                    f"(+{(current[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--memory-iterations", type=int, default=10)
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--only", default="", help="prefixos de cenário separados por vírgula")
+    parser.add_argument("--save", help="grava os resultados (JSON)")
+    parser.add_argument("--baseline", help="compara com resultados salvos antes (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--noise-ms", type=float, default=0.5)
+    parser.add_argument("--logs", action="store_true", help="escreve os logs dos handlers no stderr")
+    args = parser.parse_args()
+
+    dynamodb = LocalDynamoDB(
+        indexes={HANDLER_ENV["HEALTH_RECORDS_TABLE"]: HEALTH_INDEXES},
+        key_schemas={HANDLER_ENV["IDEMPOTENCY_TABLE"]: IDEMPOTENCY_KEY_SCHEMA},
+    )
+    cognito = LocalCognito(client_id=HANDLER_ENV["CLIENT_ID"], user_pool_id=HANDLER_ENV["USER_POOL_ID"])
+    s3_root = tempfile.mkdtemp(prefix="petvida-bench-s3-")
+
+    with LocalServices(aws_handlers={**dynamodb.handlers(), **cognito.handlers()}, s3_root=s3_root,
+                       get_handlers=cognito.get_handlers()) as services:
+        os.environ.update({**HANDLER_ENV, **services.env(), "COGNITO_JWKS_URL": services.url + cognito.jwks_path})
+        use_local_paths()
+
+        from petvida_runtime import log
+
+        log.configure(handler=logging.StreamHandler(sys.stderr if args.logs else NullOutput()))
+
+        modules = {}
+        for group in ("pets", "health", "config", "auth"):
+            sys.path.insert(0, os.path.join(LAMBDA_PATH, group))
+            modules[group] = {
+                name[:-3]: __import__(name[:-3])
+                for name in sorted(os.listdir(os.path.join(LAMBDA_PATH, group)))
+                if name.endswith(".py") and name[:-3] not in ("stripe_events", "stripe_worker", "process_photo")
+            }
+
+        seeded = seed(dynamodb, cognito, args.records)
+        prefixes = [p for p in args.only.split(",") if p]
+        selected = [s for s in scenarios(modules, services, cognito) if not prefixes or s[0].startswith(tuple(prefixes))]
+
+        print(f"massa: {seeded['pets']} pets, {seeded['health']} itens de saúde, {seeded['users']} tutores | "
+              f"{args.iterations} invocações por cenário")
+        print(f"{'cenário':<30}{'inv/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'máx ms':>9}{'pico KiB':>10}")
+
+        results = {}
+        stdout = sys.stdout
+        for name, handler, make_event, expected in selected:
+            sys.stdout = NullOutput()
+            try:
+                result = run(handler, make_event, expected, args.iterations, args.warmup, args.memory_iterations)
+            finally:
+                sys.stdout = stdout
+            results[name] = result
+
+            flag = f"  ⚠️ status {result['statuses']}" if result["unexpected"] else ""
+            print(f"{name:<30}{result['ops']:>9.0f}{result['p50']:>9.2f}{result['p90']:>9.2f}"
+                  f"{result['p99']:>9.2f}{result['max']:>9.2f}{result['peak_kib']:>10.0f}{flag}")
+
+    # ru_maxrss: KiB no Linux
+    print(f"\npico de memória do processo (RSS): {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    print(f"chamadas aos stand-ins: {sum(services.calls.values())}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({name: {k: v for k, v in r.items() if k != "statuses"} for name, r in results.items()},
+                      f, indent=2)
+        print(f"resultados gravados em {args.save}")
+
+    failed = [name for name, r in results.items() if r["unexpected"]]
+    if failed:
+        print(f"\n❌ status inesperado em: {', '.join(failed)}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.noise_ms)
+        if regressions:
+            print(f"\n❌ regressões (tolerância {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+        else:
+            print(f"\n✅ sem regressões em relação a {args.baseline}")
+        if regressions:
+            sys.exit(1)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Custo dos logs por invocação: login_user antigo x petvida_runtime.log.
+
+Simula só os logs de uma invocação de login, sem Cognito:
+  - atual          -> formatter de texto do runtime do Lambda, 4 linhas,
+                      uma delas com json.dumps(event) (inclui a senha)
+  - estruturado    -> JsonFormatter, 2 linhas com campos, sem o evento
+  - amostrado      -> estruturado com LOG_SAMPLE_RATES="INFO=0.1"
+
+Os logs vão para um destino que só conta bytes: o tempo medido é CPU de
+formatação + logging, e os bytes são o que o CloudWatch Logs ingeriria.
+
+Uso:
+    python benchmarks/bench_logging.py [--invocations 20000]
+"""
+import argparse
+import json
+import logging
+import time
+import uuid
+
+from events import api_event, use_local_paths
+
+use_local_paths()
+
+from petvida_runtime import log  # noqa: E402
+
+LAMBDA_TEXT_FORMAT = "[%(levelname)s]\t%(asctime)s.%(msecs)03dZ\t%(aws_request_id)s\t%(message)s\n"
+
+
+class ByteCounter:
+    def __init__(self):
+        self.bytes = 0
+        self.lines = 0
+
+    def write(self, text):
+        self.bytes += len(text.encode("utf-8"))
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+class RequestIdFilter(logging.Filter):
+    # o runtime do Lambda injeta aws_request_id em todo LogRecord
+    request_id = None
+
+    def filter(self, record):
+        record.aws_request_id = self.request_id
+        return True
+
+
+def make_logger(name, formatter, sink, request_filter, terminator):
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    handler = logging.StreamHandler(sink)
+    handler.terminator = terminator
+    handler.setFormatter(formatter)
+    handler.addFilter(request_filter)
+    logger.addHandler(handler)
+    return logger
+
+
+def login_event() -> dict:
+    event = api_event(
+        body={"email": "tutor@example.com", "password": "s3nha-forte!"},
+        headers={
+            "accept": "application/json, text/plain, */*",
+            "accept-encoding": "gzip, deflate, br",
+            "accept-language": "pt-BR,pt;q=0.9,en;q=0.8",
+            "origin": "https://app.petvida.com.br",
+            "referer": "https://app.petvida.com.br/login",
+            "user-agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15",
+            "x-forwarded-for": "177.12.34.56",
+            "x-forwarded-port": "443",
+            "x-forwarded-proto": "https",
+        },
+    )
+    event["rawPath"] = "/api/auth/login"
+    event["requestContext"].update({
+        "accountId": "000000000000", "apiId": "abc123", "domainName": "api.petvida.com.br",
+        "stage": "$default", "time": "18/Oct/2026:12:00:00 +0000", "timeEpoch": 1792324800000,
+        "http": {"method": "POST", "path": "/api/auth/login", "protocol": "HTTP/1.1",
+                 "sourceIp": "177.12.34.56", "userAgent": "Mozilla/5.0"},
+    })
+    return event
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invocations", type=int, default=20000)
+    args = parser.parse_args()
+
+    event = login_event()
+    email = "tutor@example.com"
+    request_filter = RequestIdFilter()
+
+    text_format = logging.Formatter(LAMBDA_TEXT_FORMAT, "%Y-%m-%dT%H:%M:%S")
+    text_format.converter = time.gmtime
+
+    def current(logger):
+        logger.info("🚀 Login Lambda invoked")
+        logger.info(f"Event: {json.dumps(event)}")
+        logger.info(f"🔐 Authenticating user: {email}")
+        logger.info("✅ Login successful")
+
+    def structured(logger):
+        logger.info("🔐 Authenticating user", email=email)
+        logger.info("✅ Login successful")
+
+    scenarios = [
+        # o formatter de texto do runtime já termina a linha
+        ("atual (texto + evento)", text_format, "", None, current, False),
+        ("estruturado", log.JsonFormatter(), "\n", None, structured, True),
+        ("estruturado INFO=0.1", log.JsonFormatter(), "\n", {logging.INFO: 0.1}, structured, True),
+    ]
+
+    request_ids = [str(uuid.uuid4()) for _ in range(args.invocations)]
+    results = []
+
+    for name, formatter, terminator, rates, invoke, wrap in scenarios:
+        sink = ByteCounter()
+        base = make_logger(f"bench.{len(results)}", formatter, sink, request_filter, terminator)
+        logger = log.StructuredLogger(base.name) if wrap else base
+
+        log.SAMPLE_RATES.clear()
+        log.SAMPLE_RATES.update(rates or {})
+
+        started = time.perf_counter()
+        for request_id in request_ids:
+            request_filter.request_id = request_id
+            log.set_request_id(request_id)
+            invoke(logger)
+        elapsed = time.perf_counter() - started
+
+        results.append((name, elapsed / args.invocations * 1e6, sink.bytes / args.invocations,
+                        sink.lines / args.invocations))
+
+    log.SAMPLE_RATES.clear()
+
+    print(f"{args.invocations} invocações simuladas (login_user)")
+    print(f"{'cenário':<26}{'µs/invocação':>14}{'bytes/invocação':>17}{'linhas':>8}")
+    for name, micros, size, lines in results:
+        print(f"{name:<26}{micros:>14.1f}{size:>17.0f}{lines:>8.2f}")
+
+    # o evento do formato atual leva a senha; campos sensíveis saem mascarados
+    record = logging.makeLogRecord({"msg": "login", "levelno": logging.INFO, "levelname": "INFO"})
+    record.fields = {"body": json.loads(event["body"]), "idToken": "eyJ..."}
+    print(f"\nredação: {json.loads(log.JsonFormatter().format(record))['fields']}")
+
+
+if __name__ == "__main__":
+    main()
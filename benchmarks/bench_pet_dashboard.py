@@ -0,0 +1,124 @@
+"""
+Tela do pet: três handlers em sequência x get_pet_dashboard.
+
+Hoje o front chama get_single_pet, list_vaccines e get_care; o dashboard faz
+as mesmas leituras, mais o resumo de saúde, em paralelo numa invocação só.
+O stand-in do DynamoDB responde com --latency-ms de atraso por chamada, para simular a latência
+real da AWS (o HTTP local sozinho é rápido demais para mostrar a diferença).
+Não inclui o API Gateway, que o caminho atual paga três vezes.
+
+Uso:
+    python benchmarks/bench_pet_dashboard.py [--latency-ms 15] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from events import HANDLER_ENV, LAMBDA_PATH, LambdaContext, api_event, use_local_paths
+from local_services import LocalServices
+
+PET = {
+    "PK": {"S": "USER#user-1"}, "SK": {"S": "PET#pet-1"},
+    "petId": {"S": "pet-1"}, "name": {"S": "Rex"}, "species": {"S": "DOG"},
+    "gender": {"S": "MALE"}, "createdAt": {"S": "2024-01-01T10:00:00+00:00"},
+}
+
+
+def health_items(record_type: str, count: int) -> list:
+    items = []
+    for n in range(count):
+        event_date = f"2024-{12 - n % 12:02d}-10"
+        item = {
+            "PK": {"S": "USER#user-1"},
+            "SK": {"S": f"PET#pet-1#{record_type}#2024-01-01T10:00:{n:02d}"},
+            "type": {"S": record_type},
+            "recordId": {"S": f"rec-{record_type}-{n}"},
+            "nextDueDate": {"S": f"2025-{n % 12 + 1:02d}-10"},
+            "createdAt": {"S": "2024-01-01T10:00:00"},
+        }
+        if record_type == "VACCINE":
+            item.update(name={"S": f"V{n % 4 + 1}"}, appliedAt={"S": event_date})
+        else:
+            item.update(careType={"S": f"BANHO{n % 3}"}, performedAt={"S": event_date},
+                        periodicity={"S": "30"})
+        items.append(item)
+    return items
+
+
+def delayed(latency_s, handler):
+    def wrapped(request):
+        time.sleep(latency_s)
+        return handler(request)
+    return wrapped
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=15)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--records", type=int, default=10)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    items = {"VACCINE": health_items("VACCINE", args.records), "CARE": health_items("CARE", args.records)}
+
+    def query(request):
+        # GSI2PK = USER#<u>#PET#<p>#<TYPE> (nome do placeholder varia)
+        pk = next(iter(request["ExpressionAttributeValues"].values()))["S"]
+        record_type = pk.rsplit("#", 1)[1]
+        found = items.get(record_type, [])
+        return {"Items": found, "Count": len(found), "ScannedCount": len(found)}
+
+    def get_item(request):
+        # só o pet; o resumo de saúde fica ausente (dashboard usa as listas)
+        return {"Item": PET} if request["TableName"] == HANDLER_ENV["PETS_TABLE_NAME"] else {}
+
+    with LocalServices(aws_handlers={
+        "DynamoDB_20120810.GetItem": delayed(latency, get_item),
+        "DynamoDB_20120810.Query": delayed(latency, query),
+    }) as services:
+        os.environ.update({**HANDLER_ENV, **services.env()})
+        use_local_paths()
+        sys.path[:0] = [os.path.join(LAMBDA_PATH, "pets"), os.path.join(LAMBDA_PATH, "health")]
+
+        import get_care
+        import get_pet_dashboard
+        import get_single_pet
+        import list_vaccines
+
+        query_args = {"userId": "user-1", "petId": "pet-1"}
+
+        def sequential():
+            for module, event in (
+                (get_single_pet, api_event(query={"userId": "user-1"}, path={"petId": "pet-1"})),
+                (list_vaccines, api_event(query=query_args)),
+                (get_care, api_event(query=query_args)),
+            ):
+                assert module.lambda_handler(event, LambdaContext())["statusCode"] == 200
+
+        def dashboard():
+            event = api_event(query={"userId": "user-1"}, path={"petId": "pet-1"})
+            assert get_pet_dashboard.lambda_handler(event, LambdaContext())["statusCode"] == 200
+
+        results = {}
+        for name, fn in (("3 handlers em sequência", sequential), ("dashboard (paralelo)", dashboard)):
+            fn()  # aquece clientes
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                fn()
+                samples.append((time.perf_counter() - started) * 1000)
+            results[name] = samples
+
+    print(f"latência por chamada ao DynamoDB: {args.latency_ms:.0f} ms | {args.repeat} repetições")
+    print(f"{'caminho':<28}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, samples in results.items():
+        ordered = sorted(samples)
+        p99 = ordered[max(0, round(0.99 * len(ordered)) - 1)]
+        print(f"{name:<28}{statistics.median(samples):>10.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Micro-benchmark: petvida_runtime.dumps x json.dumps em históricos de saúde.
+
+Compara, sobre N itens no formato que o boto3 devolve (Decimal, set):
+  - json.dumps(default=hook)   -> o contorno comum, com isinstance em cadeia
+  - json.dumps(convertido)     -> converter os itens antes e serializar
+  - petvida_runtime.dumps      -> encoder em cache + despacho por tipo
+
+Uso:
+    python benchmarks/bench_serialization.py [--items 10000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from decimal import Decimal
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "layers", "petvida_runtime", "python")
+)
+
+from petvida_runtime.serialization import dumps  # noqa: E402
+
+
+def health_history(count: int) -> list:
+    items = []
+    for n in range(count):
+        is_care = n % 2 == 0
+        item = {
+            "PK": "USER#4f1c2d3e-0000-4000-8000-000000000001",
+            "SK": f"PET#b7e5#{'CARE' if is_care else 'VACCINE'}#2024-01-01T10:00:{n:06d}",
+            "type": "CARE" if is_care else "VACCINE",
+            "recordId": f"8683a9c1-0e5d-4569-80f5-{n:012d}",
+            "createdAt": "2024-01-01T10:00:00.000000",
+            "nextDueDate": "2024-02-01",
+            "weightKg": Decimal("12.75"),
+            "doseNumber": Decimal(n % 4 + 1),
+            "tags": {"vet", "rotina"},
+        }
+        if is_care:
+            item.update(careType="BANHO", performedAt="2024-01-01", periodicity=Decimal(30))
+        else:
+            item.update(name="V10", appliedAt="2024-01-01")
+        items.append(item)
+    return items
+
+
+def naive_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(type(value).__name__)
+
+
+def convert(value):
+    if isinstance(value, dict):
+        return {k: convert(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [convert(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+CANDIDATES = {
+    "json.dumps(default=hook)": lambda items: json.dumps(items, default=naive_default),
+    "json.dumps(convertido)": lambda items: json.dumps(convert(items)),
+    "petvida_runtime.dumps": dumps,
+}
+
+
+def peak_kib(fn, items) -> float:
+    tracemalloc.start()
+    fn(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = health_history(args.items)
+
+    # mesma saída lógica em todos os candidatos
+    reference = json.loads(CANDIDATES["json.dumps(default=hook)"](items))
+    for name, fn in CANDIDATES.items():
+        assert json.loads(fn(items)) == reference, name
+
+    print(f"{args.items} itens | melhor de {args.repeat} execuções")
+    print(f"{'candidato':<28}{'ms/op':>10}{'itens/s':>12}{'pico KiB':>12}{'bytes':>12}")
+
+    for name, fn in CANDIDATES.items():
+        best = min(timeit.repeat(lambda: fn(items), number=1, repeat=args.repeat))
+        print(
+            f"{name:<28}{best * 1000:>10.1f}{args.items / best:>12,.0f}"
+            f"{peak_kib(fn, items):>12,.0f}{len(fn(items).encode('utf-8')):>12,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Custo de armazenamento da tabela stripe-events: formato antigo x compacto.
+
+  - antigo:   evento inteiro como mapa aninhado em `payload`
+  - compacto: campos de consulta no topo + payload zlib em `payload_z`
+              (lambda/auth/stripe_events.event_item)
+
+Para cada evento do corpus (benchmarks/fixtures/stripe + invoices sintéticas
+com muitas linhas) calcula o tamanho do item pelas regras de cobrança do
+DynamoDB, as WCU de um PutItem e o tempo de compressão/leitura.
+
+Uso:
+    python benchmarks/bench_stripe_event_storage.py [--invoice-lines 50 500 2000]
+"""
+import argparse
+import copy
+import glob
+import json
+import math
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+from events import LAMBDA_PATH, ROOT
+
+sys.path.insert(0, os.path.join(LAMBDA_PATH, "auth"))
+
+from stripe_events import STATUS_RECEIVED, event_item, iso_from_epoch, load_event  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "stripe")
+ITEM_LIMIT = 400 * 1024
+
+
+# =========================
+# Tamanho do item (regras do DynamoDB)
+# =========================
+def value_size(value) -> int:
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (int, float, Decimal)):
+        digits = len(str(abs(value)).replace(".", "").lstrip("0")) or 1
+        return min(21, math.ceil(digits / 2) + 1)
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode("utf-8")) + value_size(v) + 1 for k, v in value.items())
+    if isinstance(value, list):
+        return 3 + sum(value_size(v) + 1 for v in value)
+    raise TypeError(type(value).__name__)
+
+
+def item_size(item: dict) -> int:
+    return sum(len(k.encode("utf-8")) + value_size(v) for k, v in item.items())
+
+
+def wcu(size: int) -> int:
+    return math.ceil(size / 1024)
+
+
+# =========================
+# Formatos
+# =========================
+def legacy_item(stripe_event: dict) -> dict:
+    # o que o webhook gravava antes (mapa aninhado, números como Decimal)
+    return {
+        "PK": f"EVENT#{stripe_event['id']}",
+        "SK": f"CREATED#{iso_from_epoch(stripe_event['created'])}",
+        "event_id": stripe_event["id"],
+        "type": stripe_event["type"],
+        "livemode": stripe_event["livemode"],
+        "created_epoch": stripe_event["created"],
+        "created_at": iso_from_epoch(stripe_event["created"]),
+        "received_epoch": stripe_event["created"],
+        "received_at": iso_from_epoch(stripe_event["created"]),
+        "payload": json.loads(json.dumps(stripe_event), parse_float=Decimal),
+    }
+
+
+# =========================
+# Corpus
+# =========================
+def large_invoice(base: dict, lines: int) -> dict:
+    event = copy.deepcopy(base)
+    event["id"] = f"{base['id']}_{lines}lines"
+    invoice = event["data"]["object"]
+    invoice["lines"] = {
+        "object": "list",
+        "has_more": False,
+        "total_count": lines,
+        "data": [
+            {
+                "id": f"il_1PwA00LkdIwHu7ix{n:08d}",
+                "object": "line_item",
+                "amount": 1990,
+                "currency": "brl",
+                "description": f"1 × Plano PetVida (pet {n}) (at R$ 19,90 / month)",
+                "period": {"start": 1725451200, "end": 1728043200},
+                "price": {"id": "price_1PvQwzLkdIwHu7ixMensal", "unit_amount": 1990},
+                "proration": False,
+                "quantity": 1,
+                "metadata": {"petId": f"b7e5c0de-0000-4000-8000-{n:012d}"},
+            }
+            for n in range(lines)
+        ],
+    }
+    return event
+
+
+def corpus(invoice_lines) -> list:
+    events = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            events.append((os.path.basename(path)[:-5], json.load(f)))
+
+    invoice = dict(events)["invoice.paid"]
+    for lines in invoice_lines:
+        events.append((f"invoice.paid ({lines} linhas)", large_invoice(invoice, lines)))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invoice-lines", type=int, nargs="*", default=[50, 500, 2000])
+    args = parser.parse_args()
+
+    print(f"{'evento':<42}{'antigo B':>10}{'WCU':>5}{'compacto B':>12}{'WCU':>5}"
+          f"{'redução':>9}{'zlib µs':>9}{'leitura µs':>12}")
+
+    totals = {"legacy": 0, "compact": 0, "legacy_wcu": 0, "compact_wcu": 0}
+
+    for name, stripe_event in corpus(args.invoice_lines):
+        payload = json.dumps(stripe_event)
+
+        legacy = item_size(legacy_item(stripe_event))
+        item = event_item(stripe_event, payload, STATUS_RECEIVED)
+        compact = item_size(item)
+
+        assert load_event(item) == stripe_event
+
+        compress_us = min(timeit.repeat(
+            lambda: event_item(stripe_event, payload, STATUS_RECEIVED), number=20, repeat=3)) / 20 * 1e6
+        read_us = min(timeit.repeat(lambda: load_event(item), number=20, repeat=3)) / 20 * 1e6
+
+        over = " (> 400 KB)" if legacy > ITEM_LIMIT else ""
+        print(
+            f"{name:<42}{legacy:>10,}{wcu(legacy):>5}{compact:>12,}{wcu(compact):>5}"
+            f"{1 - compact / legacy:>9.0%}{compress_us:>9.0f}{read_us:>12.0f}{over}"
+        )
+
+        totals["legacy"] += legacy
+        totals["compact"] += compact
+        totals["legacy_wcu"] += wcu(legacy)
+        totals["compact_wcu"] += wcu(compact)
+
+    print()
+    print(
+        f"total: {totals['legacy']:,} B / {totals['legacy_wcu']} WCU (antigo) -> "
+        f"{totals['compact']:,} B / {totals['compact_wcu']} WCU (compacto)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Eventos sintéticos de API Gateway HTTP API (payload v2) e ambiente dos
+handlers, usados pelos benchmarks para invocar os handlers em processo.
+"""
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import uuid
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LAYER_PATH = os.path.join(ROOT, "layers", "petvida_runtime", "python")
+LAMBDA_PATH = os.path.join(ROOT, "lambda")
+
+STRIPE_WEBHOOK_SECRET = "whsec_local"
+
+# Variáveis de ambiente que os handlers leem no import (valores locais)
+HANDLER_ENV = {
+    "HEALTH_RECORDS_TABLE": "HealthRecords-local",
+    "PETS_TABLE_NAME": "Pets-local",
+    "USERS_TABLE_NAME": "Users-local",
+    "USERS_TABLE": "Users-local",
+    "STRIPE_EVENTS_TABLE": "stripe-events-local",
+    "STRIPE_EVENTS_QUEUE_URL": "https://sqs.sa-east-1.amazonaws.com/000000000000/StripeEvents-local",
+    "CURSOR_SECRET": "cursor-local",
+    "REMINDERS_TABLE": "RemindersQueue-local",
+    "IDEMPOTENCY_TABLE": "Idempotency-local",
+    "REMINDERS_DISPATCH_QUEUE_URL": "https://sqs.sa-east-1.amazonaws.com/000000000000/RemindersDispatch-local",
+    "USER_POOL_ID": "sa-east-1_local",
+    "CLIENT_ID": "local-client",
+    "BUCKET_NAME": "petvida-images-local",
+    "CLOUDFRONT_URL": "https://images.local",
+    "STRIPE_SECRET_KEY": "sk_test_local",
+    "STRIPE_PRICE_ID": "price_local",
+    "STRIPE_WEBHOOK_SECRET": STRIPE_WEBHOOK_SECRET,
+    "FRONTEND_URL": "https://app.local",
+}
+
+
+def use_local_paths():
+    if LAYER_PATH not in sys.path:
+        sys.path.insert(0, LAYER_PATH)
+
+
+class LambdaContext:
+    function_name = "local"
+    memory_limit_in_mb = 128
+
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+
+    def get_remaining_time_in_millis(self):
+        return 10_000
+
+
+def api_event(body=None, query=None, path=None, claims=None, headers=None, raw_body=None):
+    event = {
+        "version": "2.0",
+        "headers": {"content-type": "application/json", **(headers or {})},
+        "requestContext": {
+            "requestId": str(uuid.uuid4()),
+            "http": {"method": "POST" if body is not None or raw_body else "GET"},
+        },
+        "isBase64Encoded": False,
+    }
+    if body is not None:
+        event["body"] = json.dumps(body)
+    if raw_body is not None:
+        event["body"] = raw_body
+    if query:
+        event["queryStringParameters"] = query
+    if path:
+        event["pathParameters"] = path
+    if claims:
+        event["requestContext"]["authorizer"] = {"jwt": {"claims": claims}}
+    return event
+
+
+def stripe_webhook_event(stripe_event: dict, secret: str = STRIPE_WEBHOOK_SECRET) -> dict:
+    payload = json.dumps(stripe_event)
+    timestamp = int(time.time())
+    signature = hmac.new(
+        secret.encode("utf-8"), f"{timestamp}.{payload}".encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    return api_event(raw_body=payload, headers={"stripe-signature": f"t={timestamp},v1={signature}"})
@@ -0,0 +1,1026 @@
+"""
+DynamoDB em memória para os benchmarks, servido por local_services.
+
+Guarda os itens no formato da API ({"S": ...}) e implementa o que os
+handlers usam: GetItem, PutItem, UpdateItem, DeleteItem, Query, Scan,
+BatchGetItem, BatchWriteItem, TransactWriteItems e TransactGetItems, com
+ConditionExpression, UpdateExpression (SET/REMOVE/ADD/DELETE),
+ProjectionExpression, FilterExpression, paginação (Limit, limite de 1 MB,
+LastEvaluatedKey) e GSIs esparsos. Devolve ConsumedCapacity calculada pelo
+tamanho dos itens, como a AWS cobra (4 KB por RCU, 1 KB por WCU).
+
+Não simula throttling, latência nem consistência eventual.
+
+Uso:
+    dynamodb = LocalDynamoDB(indexes={"HealthRecords-local": HEALTH_INDEXES})
+    LocalServices(aws_handlers=dynamodb.handlers())
+"""
+import base64
+import hashlib
+import json
+import math
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal
+from operator import itemgetter
+
+from local_services import ServiceError
+
+PAGE_BYTES = 1024 * 1024
+MAX_ITEM_BYTES = 400 * 1024
+
+# tabela de saúde (lib/dynamo-stack.ts)
+HEALTH_INDEXES = {"GSI1": ("GSI1PK", "GSI1SK"), "GSI2": ("GSI2PK", "GSI2SK")}
+IDEMPOTENCY_KEY_SCHEMA = ("PK", None)
+
+
+def conditional_failed(item=None, return_old=False):
+    extra = {"Item": item} if return_old and item else {}
+    return ServiceError("ConditionalCheckFailedException", "The conditional request failed", extra=extra)
+
+
+def validation(message):
+    return ServiceError("ValidationException", message)
+
+
+# =========================
+# Valores
+# =========================
+def _type_value(value):
+    (kind, raw), = value.items()
+    return kind, raw
+
+
+def sort_value(value):
+    """Valor comparável de uma chave (S, N ou B)."""
+    kind, raw = _type_value(value)
+    if kind == "N":
+        return Decimal(raw)
+    if kind == "B":
+        return base64.b64decode(raw)
+    return raw
+
+
+def _canonical(value):
+    kind, raw = _type_value(value)
+    if kind == "N":
+        return kind, Decimal(raw)
+    if kind == "NS":
+        return kind, frozenset(Decimal(n) for n in raw)
+    if kind in ("SS", "BS"):
+        return kind, frozenset(raw)
+    if kind == "M":
+        return kind, tuple(sorted((k, _canonical(v)) for k, v in raw.items()))
+    if kind == "L":
+        return kind, tuple(_canonical(v) for v in raw)
+    return kind, raw
+
+
+def _number(value):
+    kind, raw = _type_value(value)
+    if kind != "N":
+        raise validation("An operand in the update expression has an incorrect data type")
+    return Decimal(raw)
+
+
+def _format_number(number: Decimal) -> str:
+    text = format(number, "f")
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+def _value_size(value) -> int:
+    kind, raw = _type_value(value)
+    if kind == "S":
+        return len(raw.encode("utf-8"))
+    if kind == "N":
+        return len(raw) // 2 + 1
+    if kind == "B":
+        return len(raw) * 3 // 4
+    if kind in ("BOOL", "NULL"):
+        return 1
+    if kind == "M":
+        return 3 + sum(len(k.encode("utf-8")) + _value_size(v) for k, v in raw.items())
+    if kind == "L":
+        return 3 + sum(_value_size(v) + 1 for v in raw)
+    return sum(_value_size({kind[0]: v}) for v in raw)  # SS/NS/BS
+
+
+def item_size(item) -> int:
+    if not item:
+        return 0
+    return sum(len(name.encode("utf-8")) + _value_size(value) for name, value in item.items())
+
+
+def _read_units(size: int, consistent: bool) -> float:
+    units = max(1, math.ceil(size / 4096))
+    return float(units) if consistent else units / 2
+
+
+def _write_units(size: int) -> float:
+    return float(max(1, math.ceil(size / 1024)))
+
+
+# =========================
+# Expressões
+# =========================
+_TOKEN = re.compile(r"\s*(#[\w-]+|:[\w-]+|[A-Za-z_][\w-]*|\d+|<>|<=|>=|[=<>(),.\[\]+-])")
+_KEYWORDS = {"AND", "OR", "NOT", "BETWEEN", "IN", "SET", "REMOVE", "ADD", "DELETE"}
+_CONDITION_FUNCTIONS = {"attribute_exists", "attribute_not_exists", "attribute_type", "begins_with", "contains"}
+_UPDATE_SECTIONS = {"SET", "REMOVE", "ADD", "DELETE"}
+
+
+class _Parser:
+    def __init__(self, text, names, values):
+        self.tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = _TOKEN.match(text, position)
+            if not match:
+                raise validation(f"Invalid expression: {text[position:position + 20]!r}")
+            self.tokens.append(match.group(1))
+            position = match.end()
+            while position < len(text) and text[position].isspace():
+                position += 1
+        self.position = 0
+        self.names = names or {}
+        self.values = values or {}
+        self.used_names = set()
+        self.used_values = set()
+
+    # --- tokens
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        if token is None:
+            raise validation("Invalid expression: unexpected end")
+        self.position += 1
+        return token
+
+    def expect(self, token):
+        found = self.take()
+        if found.upper() != token:
+            raise validation(f"Invalid expression: expected {token}, found {found}")
+
+    def keyword(self, *words):
+        token = self.peek()
+        return token is not None and token.upper() in words
+
+    def done(self):
+        return self.position >= len(self.tokens)
+
+    # --- operandos
+    def path(self):
+        segments = [self._name(self.take())]
+        while self.peek() in (".", "["):
+            if self.take() == ".":
+                segments.append(self._name(self.take()))
+            else:
+                segments.append(int(self.take()))
+                self.expect("]")
+        return ("path", segments)
+
+    def _name(self, token):
+        if token.startswith("#"):
+            if token not in self.names:
+                raise validation(f"An expression attribute name used in the document path is not defined: {token}")
+            self.used_names.add(token)
+            return self.names[token]
+        if token.upper() in _KEYWORDS or not re.match(r"^[A-Za-z_]", token):
+            raise validation(f"Invalid attribute name: {token}")
+        return token
+
+    def operand(self):
+        token = self.peek()
+        if token is None:
+            raise validation("Invalid expression: unexpected end")
+        if token.startswith(":"):
+            self.take()
+            if token not in self.values:
+                raise validation(f"An expression attribute value used in expression is not defined: {token}")
+            self.used_values.add(token)
+            return ("value", self.values[token])
+        if token == "size" and self.peek(1) == "(":
+            self.take()
+            self.take()
+            path = self.path()
+            self.expect(")")
+            return ("size", path)
+        return self.path()
+
+    # --- condições
+    def condition(self):
+        node = self._and()
+        while self.keyword("OR"):
+            self.take()
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self.keyword("AND"):
+            self.take()
+            node = ("and", node, self._not())
+        return node
+
+    def _not(self):
+        if self.keyword("NOT"):
+            self.take()
+            return ("not", self._not())
+        return self._primary()
+
+    def _primary(self):
+        token = self.peek()
+        if token == "(":
+            self.take()
+            node = self.condition()
+            self.expect(")")
+            return node
+
+        if token in _CONDITION_FUNCTIONS and self.peek(1) == "(":
+            self.take()
+            self.take()
+            args = [self.operand()]
+            while self.peek() == ",":
+                self.take()
+                args.append(self.operand())
+            self.expect(")")
+            return ("function", token, args)
+
+        left = self.operand()
+        if self.keyword("BETWEEN"):
+            self.take()
+            low = self.operand()
+            self.expect("AND")
+            return ("between", left, low, self.operand())
+        if self.keyword("IN"):
+            self.take()
+            self.expect("(")
+            options = [self.operand()]
+            while self.peek() == ",":
+                self.take()
+                options.append(self.operand())
+            self.expect(")")
+            return ("in", left, options)
+
+        comparator = self.take()
+        if comparator not in ("=", "<>", "<", "<=", ">", ">="):
+            raise validation(f"Invalid expression: unexpected {comparator}")
+        return ("compare", comparator, left, self.operand())
+
+    # --- update
+    def update(self):
+        actions = []
+        while not self.done():
+            section = self.take().upper()
+            if section not in _UPDATE_SECTIONS:
+                raise validation(f"Invalid UpdateExpression: unexpected {section}")
+            while True:
+                path = self.path()
+                if section == "SET":
+                    self.expect("=")
+                    actions.append(("SET", path, self._set_value()))
+                elif section == "REMOVE":
+                    actions.append(("REMOVE", path, None))
+                else:
+                    actions.append((section, path, self.operand()))
+                if self.peek() != ",":
+                    break
+                self.take()
+        return actions
+
+    def _set_value(self):
+        left = self._set_operand()
+        if self.peek() in ("+", "-"):
+            operator = self.take()
+            return ("arithmetic", operator, left, self._set_operand())
+        return left
+
+    def _set_operand(self):
+        token = self.peek()
+        if token in ("if_not_exists", "list_append") and self.peek(1) == "(":
+            self.take()
+            self.take()
+            first = self.operand() if token == "if_not_exists" else self._set_operand()
+            self.expect(",")
+            second = self._set_operand()
+            self.expect(")")
+            return (token, first, second)
+        return self.operand()
+
+
+def parse_condition(text, names, values):
+    parser = _Parser(text, names, values)
+    node = parser.condition()
+    if not parser.done():
+        raise validation(f"Invalid expression: unexpected {parser.peek()}")
+    return node
+
+
+def parse_projection(text, names):
+    parser = _Parser(text, names, {})
+    paths = [parser.path()[1]]
+    while not parser.done():
+        parser.expect(",")
+        paths.append(parser.path()[1])
+    return paths
+
+
+def _get(item, segments):
+    value = {"M": item}
+    for segment in segments:
+        kind, raw = _type_value(value)
+        if isinstance(segment, int):
+            if kind != "L" or segment >= len(raw):
+                return None
+        elif kind != "M" or segment not in raw:
+            return None
+        value = raw[segment]
+    return value
+
+
+def _set(item, segments, new_value):
+    container = item
+    for segment in segments[:-1]:
+        child = container[segment] if isinstance(container, list) else container.get(segment)
+        if child is None:
+            raise validation("The document path provided in the update expression is invalid for update")
+        kind, container = _type_value(child)
+    last = segments[-1]
+    if isinstance(last, int):
+        if last >= len(container):
+            container.append(new_value)
+        else:
+            container[last] = new_value
+    else:
+        container[last] = new_value
+
+
+def _remove(item, segments):
+    container = item
+    for segment in segments[:-1]:
+        child = container[segment] if isinstance(container, list) else container.get(segment)
+        if child is None:
+            return
+        _, container = _type_value(child)
+    last = segments[-1]
+    if isinstance(last, int):
+        if last < len(container):
+            container.pop(last)
+    else:
+        container.pop(last, None)
+
+
+def _operand(item, node):
+    kind = node[0]
+    if kind == "value":
+        return node[1]
+    if kind == "path":
+        return _get(item, node[1])
+    if kind == "size":
+        value = _get(item, node[1][1])
+        if value is None:
+            return None
+        value_kind, raw = _type_value(value)
+        size = len(raw.encode("utf-8")) if value_kind == "S" else len(raw)
+        return {"N": str(size)}
+    raise validation(f"Invalid operand: {kind}")
+
+
+def _compare(operator, left, right) -> bool:
+    if left is None or right is None:
+        return operator == "<>" and (left is None) != (right is None)
+
+    left_kind, _ = _type_value(left)
+    right_kind, _ = _type_value(right)
+
+    if operator in ("=", "<>"):
+        equal = _canonical(left) == _canonical(right)
+        return equal if operator == "=" else not equal
+
+    if left_kind != right_kind or left_kind not in ("S", "N", "B"):
+        return False
+
+    a, b = sort_value(left), sort_value(right)
+    return {"<": a < b, "<=": a <= b, ">": a > b, ">=": a >= b}[operator]
+
+
+def evaluate(node, item) -> bool:
+    kind = node[0]
+    if kind == "and":
+        return evaluate(node[1], item) and evaluate(node[2], item)
+    if kind == "or":
+        return evaluate(node[1], item) or evaluate(node[2], item)
+    if kind == "not":
+        return not evaluate(node[1], item)
+    if kind == "compare":
+        return _compare(node[1], _operand(item, node[2]), _operand(item, node[3]))
+    if kind == "between":
+        value = _operand(item, node[1])
+        return _compare(">=", value, _operand(item, node[2])) and _compare("<=", value, _operand(item, node[3]))
+    if kind == "in":
+        value = _operand(item, node[1])
+        return any(_compare("=", value, _operand(item, option)) for option in node[2])
+
+    name, args = node[1], node[2]
+    first = _operand(item, args[0])
+    if name == "attribute_exists":
+        return first is not None
+    if name == "attribute_not_exists":
+        return first is None
+    if first is None:
+        return False
+    second = _operand(item, args[1])
+    first_kind, first_raw = _type_value(first)
+    if name == "attribute_type":
+        return first_kind == second["S"]
+    if name == "begins_with":
+        second_kind, second_raw = _type_value(second)
+        return first_kind == second_kind and first_kind in ("S", "B") and first_raw.startswith(second_raw)
+    # contains
+    if first_kind == "S":
+        return "S" in second and second["S"] in first_raw
+    if first_kind in ("SS", "NS", "BS"):
+        _, members = _canonical(first)
+        return _canonical({first_kind[0]: next(iter(second.values()))})[1] in members
+    if first_kind == "L":
+        return any(_canonical(v) == _canonical(second) for v in first_raw)
+    return False
+
+
+def apply_update(item, actions):
+    """Aplica as ações em `item` (cópia) e devolve os nomes de topo alterados."""
+    changed = set()
+    for action, (_, segments), value in actions:
+        changed.add(segments[0])
+        if action == "REMOVE":
+            _remove(item, segments)
+            continue
+
+        if action == "SET":
+            _set(item, segments, _set_result(item, value))
+            continue
+
+        current = _get(item, segments)
+        value = _operand(item, value)
+        value_kind, raw = _type_value(value)
+
+        if action == "ADD":
+            if value_kind == "N":
+                base = _number(current) if current is not None else Decimal(0)
+                _set(item, segments, {"N": _format_number(base + Decimal(raw))})
+            elif value_kind in ("SS", "NS", "BS"):
+                members = list(current[value_kind]) if current else []
+                members += [m for m in raw if m not in members]
+                _set(item, segments, {value_kind: members})
+            else:
+                raise validation("Incorrect operand type for operator or function; operator: ADD")
+        else:  # DELETE
+            if current is None:
+                continue
+            members = [m for m in current[value_kind] if m not in raw]
+            if members:
+                _set(item, segments, {value_kind: members})
+            else:
+                _remove(item, segments)
+    return changed
+
+
+def _set_result(item, node):
+    kind = node[0]
+    if kind == "arithmetic":
+        left = _set_result(item, node[2])
+        right = _set_result(item, node[3])
+        if left is None or right is None:
+            raise validation("The provided expression refers to an attribute that does not exist in the item")
+        result = _number(left) + _number(right) if node[1] == "+" else _number(left) - _number(right)
+        return {"N": _format_number(result)}
+    if kind == "if_not_exists":
+        current = _operand(item, node[1])
+        return current if current is not None else _set_result(item, node[2])
+    if kind == "list_append":
+        first, second = _set_result(item, node[1]), _set_result(item, node[2])
+        return {"L": list((first or {"L": []})["L"]) + list((second or {"L": []})["L"])}
+    value = _operand(item, node)
+    if value is None:
+        raise validation("The provided expression refers to an attribute that does not exist in the item")
+    return json.loads(json.dumps(value))  # cópia: o item não compartilha listas/maps
+
+
+def project(item, paths):
+    if paths is None:
+        return item
+    projected = {}
+    for segments in paths:
+        value = _get(item, segments)
+        if value is None:
+            continue
+        if len(segments) > 1:
+            raise validation("ProjectionExpression com caminho aninhado não é suportada pelo stand-in")
+        projected[segments[0]] = value
+    return projected
+
+
+# =========================
+# Tabelas
+# =========================
+class _Partition:
+    """Chaves de ordenação em lista ordenada (bisect) + itens por chave."""
+
+    __slots__ = ("keys", "items")
+
+    def __init__(self):
+        self.keys = []
+        self.items = {}
+
+    def add(self, key, item):
+        if key not in self.items:
+            insort(self.keys, key)
+        self.items[key] = item
+
+    def discard(self, key):
+        if self.items.pop(key, None) is not None:
+            del self.keys[bisect_left(self.keys, key)]
+
+
+class LocalTable:
+    def __init__(self, name, indexes=None, key_schema=("PK", "SK")):
+        """key_schema: (hash, range); range None para tabelas só com partition key."""
+        self.name = name
+        self.hash_key, self.range_key = key_schema
+        self.indexes = dict(indexes or {})
+        self.partitions = {}
+        self.index_partitions = {index: {} for index in self.indexes}
+        self.count = 0
+
+    def key_of(self, item):
+        try:
+            range_value = sort_value(item[self.range_key]) if self.range_key else ""
+            return sort_value(item[self.hash_key]), range_value
+        except KeyError:
+            raise validation("One of the required keys was not given a value")
+
+    def get(self, key):
+        hash_value, range_value = self.key_of(key)
+        partition = self.partitions.get(hash_value)
+        return partition.items.get((range_value,)) if partition else None
+
+    def put(self, item):
+        if item_size(item) > MAX_ITEM_BYTES:
+            raise validation("Item size has exceeded the maximum allowed size")
+        old = self.delete(item)
+        hash_value, range_value = self.key_of(item)
+        self.partitions.setdefault(hash_value, _Partition()).add((range_value,), item)
+
+        for index, (index_hash, index_range) in self.indexes.items():
+            if index_hash in item and index_range in item:  # esparso
+                self.index_partitions[index].setdefault(sort_value(item[index_hash]), _Partition()).add(
+                    (sort_value(item[index_range]), hash_value, range_value), item,
+                )
+        self.count += 1
+        return old
+
+    def delete(self, key):
+        hash_value, range_value = self.key_of(key)
+        partition = self.partitions.get(hash_value)
+        old = partition.items.get((range_value,)) if partition else None
+        if old is None:
+            return None
+
+        partition.discard((range_value,))
+        for index, (index_hash, index_range) in self.indexes.items():
+            if index_hash in old and index_range in old:
+                self.index_partitions[index][sort_value(old[index_hash])].discard(
+                    (sort_value(old[index_range]), hash_value, range_value),
+                )
+        self.count -= 1
+        return old
+
+    def key_attributes(self, item, index=None):
+        names = [name for name in (self.hash_key, self.range_key) if name]
+        if index:
+            names += list(self.indexes[index])
+        return {name: item[name] for name in names}
+
+    def start_position(self, index, start_key):
+        if index:
+            _, index_range = self.indexes[index]
+            hash_value, range_value = self.key_of(start_key)
+            return (sort_value(start_key[index_range]), hash_value, range_value)
+        return (self.key_of(start_key)[1],)
+
+
+def _key_condition(node, hash_key, range_key):
+    """KeyConditionExpression -> (valor da partição, condição da chave de ordenação)."""
+    parts = []
+
+    def flatten(n):
+        if n[0] == "and":
+            flatten(n[1])
+            flatten(n[2])
+        else:
+            parts.append(n)
+
+    flatten(node)
+    hash_value, range_condition = None, None
+    for part in parts:
+        if part[0] == "compare" and part[1] == "=" and part[2] == ("path", [hash_key]):
+            hash_value = sort_value(part[3][1])
+        elif range_condition is None:
+            range_condition = part
+        else:
+            raise validation("Invalid KeyConditionExpression: too many conditions")
+
+    if hash_value is None:
+        raise validation(f"Query condition missed key schema element: {hash_key}")
+    if range_condition is not None:
+        target = range_condition[2] if range_condition[0] == "compare" else (
+            range_condition[1] if range_condition[0] == "between" else range_condition[2][0]
+        )
+        if target != ("path", [range_key]):
+            raise validation(f"Query key condition not supported: {range_condition}")
+    return hash_value, range_condition
+
+
+def _range_slice(keys, condition):
+    """Faixa [início, fim) de `keys` que atende a condição da chave de ordenação."""
+    if condition is None:
+        return 0, len(keys)
+
+    first = itemgetter(0)
+    kind = condition[0]
+    if kind == "between":
+        low, high = sort_value(condition[2][1]), sort_value(condition[3][1])
+        return bisect_left(keys, low, key=first), bisect_right(keys, high, key=first)
+
+    if kind == "function":  # begins_with
+        prefix = sort_value(condition[2][1][1])
+        start = bisect_left(keys, prefix, key=first)
+        end = start
+        while end < len(keys) and keys[end][0].startswith(prefix):
+            end += 1
+        return start, end
+
+    operator, value = condition[1], sort_value(condition[3][1])
+    if operator == "=":
+        return bisect_left(keys, value, key=first), bisect_right(keys, value, key=first)
+    if operator == "<":
+        return 0, bisect_left(keys, value, key=first)
+    if operator == "<=":
+        return 0, bisect_right(keys, value, key=first)
+    if operator == ">":
+        return bisect_right(keys, value, key=first), len(keys)
+    if operator == ">=":
+        return bisect_left(keys, value, key=first), len(keys)
+    raise validation(f"Unsupported operator on key condition: {operator}")
+
+
+class LocalDynamoDB:
+    def __init__(self, indexes=None, key_schemas=None):
+        """
+        `indexes`: {tabela: {índice: (hash, range)}}; `key_schemas`: {tabela:
+        (hash, range)}, padrão (PK, SK). Tabelas são criadas no primeiro uso.
+        """
+        self.index_config = dict(indexes or {})
+        self.key_schemas = dict(key_schemas or {})
+        self.tables = {}
+        self.transaction_tokens = {}
+        self._lock = threading.RLock()
+
+    def table(self, name) -> LocalTable:
+        if name not in self.tables:
+            self.tables[name] = LocalTable(
+                name, self.index_config.get(name), self.key_schemas.get(name, ("PK", "SK")),
+            )
+        return self.tables[name]
+
+    def load(self, table_name, items):
+        """Carga direta (fora da API), para montar o cenário do benchmark."""
+        table = self.table(table_name)
+        with self._lock:
+            for item in items:
+                table.put(item)
+
+    def handlers(self) -> dict:
+        operations = {
+            "GetItem": self.get_item,
+            "PutItem": self.put_item,
+            "UpdateItem": self.update_item,
+            "DeleteItem": self.delete_item,
+            "Query": self.query,
+            "Scan": self.scan,
+            "BatchGetItem": self.batch_get_item,
+            "BatchWriteItem": self.batch_write_item,
+            "TransactWriteItems": self.transact_write_items,
+            "TransactGetItems": self.transact_get_items,
+        }
+
+        def locked(fn):
+            def wrapper(request):
+                with self._lock:
+                    return fn(request)
+            return wrapper
+
+        return {f"DynamoDB_20120810.{name}": locked(fn) for name, fn in operations.items()}
+
+    # =========================
+    # Auxiliares
+    # =========================
+    @staticmethod
+    def _capacity(request, table_name, units):
+        if request.get("ReturnConsumedCapacity", "NONE") == "NONE":
+            return {}
+        return {"ConsumedCapacity": {"TableName": table_name, "CapacityUnits": units}}
+
+    @staticmethod
+    def _capacity_list(request, units_by_table):
+        if request.get("ReturnConsumedCapacity", "NONE") == "NONE":
+            return {}
+        return {"ConsumedCapacity": [
+            {"TableName": name, "CapacityUnits": units} for name, units in units_by_table.items()
+        ]}
+
+    @staticmethod
+    def _check(request, current):
+        expression = request.get("ConditionExpression")
+        if not expression:
+            return
+        node = parse_condition(
+            expression, request.get("ExpressionAttributeNames"), request.get("ExpressionAttributeValues"),
+        )
+        if not evaluate(node, current or {}):
+            raise conditional_failed(current, request.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD")
+
+    @staticmethod
+    def _projection(request):
+        expression = request.get("ProjectionExpression")
+        if expression:
+            return parse_projection(expression, request.get("ExpressionAttributeNames"))
+        if request.get("AttributesToGet"):
+            return [[name] for name in request["AttributesToGet"]]
+        return None
+
+    # =========================
+    # Item
+    # =========================
+    def get_item(self, request):
+        table = self.table(request["TableName"])
+        item = table.get(request["Key"])
+        result = {"Item": project(item, self._projection(request))} if item else {}
+        units = _read_units(item_size(item), request.get("ConsistentRead", False))
+        return {**result, **self._capacity(request, table.name, units)}
+
+    def _put(self, request):
+        table = self.table(request["TableName"])
+        item = request["Item"]
+        current = table.get(item)
+        self._check(request, current)
+        table.put(item)
+        return table, current, _write_units(max(item_size(item), item_size(current)))
+
+    def put_item(self, request):
+        table, old, units = self._put(request)
+        result = {"Attributes": old} if request.get("ReturnValues") == "ALL_OLD" and old else {}
+        return {**result, **self._capacity(request, table.name, units)}
+
+    def _update(self, request):
+        table = self.table(request["TableName"])
+        key = request["Key"]
+        current = table.get(key)
+        self._check(request, current)
+
+        new = json.loads(json.dumps(current)) if current else dict(key)
+        changed = set()
+        if request.get("UpdateExpression"):
+            actions = _Parser(
+                request["UpdateExpression"],
+                request.get("ExpressionAttributeNames"),
+                request.get("ExpressionAttributeValues"),
+            ).update()
+            changed = apply_update(new, actions)
+            if changed & {table.hash_key, table.range_key}:
+                raise validation("Cannot update attribute PK. This attribute is part of the key")
+
+        table.put(new)
+        return table, current, new, changed, _write_units(max(item_size(new), item_size(current)))
+
+    def update_item(self, request):
+        table, old, new, changed, units = self._update(request)
+        mode = request.get("ReturnValues", "NONE")
+        attributes = {
+            "ALL_OLD": old,
+            "ALL_NEW": new,
+            "UPDATED_OLD": {k: v for k, v in (old or {}).items() if k in changed},
+            "UPDATED_NEW": {k: v for k, v in new.items() if k in changed},
+        }.get(mode)
+        result = {"Attributes": attributes} if attributes else {}
+        return {**result, **self._capacity(request, table.name, units)}
+
+    def _delete(self, request):
+        table = self.table(request["TableName"])
+        current = table.get(request["Key"])
+        self._check(request, current)
+        if current is not None:
+            table.delete(request["Key"])
+        return table, current, _write_units(item_size(current))
+
+    def delete_item(self, request):
+        table, old, units = self._delete(request)
+        result = {"Attributes": old} if request.get("ReturnValues") == "ALL_OLD" and old else {}
+        return {**result, **self._capacity(request, table.name, units)}
+
+    # =========================
+    # Query / Scan
+    # =========================
+    def query(self, request):
+        table = self.table(request["TableName"])
+        index = request.get("IndexName")
+        if index and index not in table.indexes:
+            raise validation(f"The table does not have the specified index: {index}")
+
+        names = request.get("ExpressionAttributeNames")
+        values = request.get("ExpressionAttributeValues")
+        hash_key, range_key = table.indexes[index] if index else (table.hash_key, table.range_key)
+        hash_value, range_condition = _key_condition(
+            parse_condition(request["KeyConditionExpression"], names, values), hash_key, range_key,
+        )
+
+        partitions = table.index_partitions[index] if index else table.partitions
+        partition = partitions.get(hash_value) or _Partition()
+        start, end = _range_slice(partition.keys, range_condition)
+        forward = request.get("ScanIndexForward", True)
+
+        if request.get("ExclusiveStartKey"):
+            position = table.start_position(index, request["ExclusiveStartKey"])
+            if forward:
+                start = max(start, bisect_right(partition.keys, position))
+            else:
+                end = min(end, bisect_left(partition.keys, position))
+
+        keys = partition.keys[start:end]
+        if not forward:
+            keys = keys[::-1]
+
+        return self._page(request, table, index, (partition.items[k] for k in keys))
+
+    def scan(self, request):
+        table = self.table(request["TableName"])
+        index = request.get("IndexName")
+        partitions = table.index_partitions[index] if index else table.partitions
+
+        segment, total = request.get("Segment", 0), request.get("TotalSegments", 1)
+        hash_values = sorted(
+            (h for h in partitions if int(hashlib.md5(str(h).encode()).hexdigest(), 16) % total == segment),
+            key=str,
+        )
+
+        first, position = 0, None
+        if request.get("ExclusiveStartKey"):
+            start_key = request["ExclusiveStartKey"]
+            hash_name = table.indexes[index][0] if index else table.hash_key
+            first = hash_values.index(sort_value(start_key[hash_name]))
+            position = table.start_position(index, start_key)
+
+        def items():
+            for number in range(first, len(hash_values)):
+                partition = partitions[hash_values[number]]
+                keys = partition.keys
+                if number == first and position is not None:
+                    keys = keys[bisect_right(keys, position):]
+                for key in keys:
+                    yield partition.items[key]
+
+        return self._page(request, table, index, items())
+
+    def _page(self, request, table, index, candidates):
+        limit = request.get("Limit")
+        select = request.get("Select", "ALL_ATTRIBUTES")
+        consistent = request.get("ConsistentRead", False)
+        names = request.get("ExpressionAttributeNames")
+        values = request.get("ExpressionAttributeValues")
+        condition = (
+            parse_condition(request["FilterExpression"], names, values)
+            if request.get("FilterExpression") else None
+        )
+        projection = self._projection(request)
+
+        found, scanned, size, last = [], 0, 0, None
+        for item in candidates:
+            if (limit is not None and scanned >= limit) or size >= PAGE_BYTES:
+                break
+            scanned += 1
+            size += item_size(item)
+            last = item
+            if condition is None or evaluate(condition, item):
+                found.append(item)
+        else:
+            last = None  # acabou a partição: sem próxima página
+
+        result = {"Count": len(found), "ScannedCount": scanned}
+        if select != "COUNT":
+            result["Items"] = [project(item, projection) for item in found]
+        if last is not None:
+            result["LastEvaluatedKey"] = table.key_attributes(last, index)
+        return {**result, **self._capacity(request, table.name, _read_units(size, consistent))}
+
+    # =========================
+    # Lotes e transações
+    # =========================
+    def batch_get_item(self, request):
+        responses, units = {}, {}
+        for table_name, spec in request["RequestItems"].items():
+            table = self.table(table_name)
+            projection = self._projection(spec)
+            found = responses.setdefault(table_name, [])
+            for key in spec["Keys"]:
+                item = table.get(key)
+                units[table_name] = units.get(table_name, 0) + _read_units(
+                    item_size(item), spec.get("ConsistentRead", False),
+                )
+                if item:
+                    found.append(project(item, projection))
+        return {"Responses": responses, "UnprocessedKeys": {}, **self._capacity_list(request, units)}
+
+    def batch_write_item(self, request):
+        units = {}
+        for table_name, writes in request["RequestItems"].items():
+            if len(writes) > 25:
+                raise validation("Too many items requested for the BatchWriteItem call")
+            table = self.table(table_name)
+            for write in writes:
+                if "PutRequest" in write:
+                    item = write["PutRequest"]["Item"]
+                    old = table.put(item)
+                    size = max(item_size(item), item_size(old))
+                else:
+                    size = item_size(table.delete(write["DeleteRequest"]["Key"]))
+                units[table_name] = units.get(table_name, 0) + _write_units(size)
+        return {"UnprocessedItems": {}, **self._capacity_list(request, units)}
+
+    def transact_write_items(self, request):
+        items = request["TransactItems"]
+        if len(items) > 100:
+            raise validation("Member must have length less than or equal to 100")
+
+        token = request.get("ClientRequestToken")
+        fingerprint = hashlib.sha256(json.dumps(items, sort_keys=True).encode()).hexdigest()
+        if token in self.transaction_tokens:
+            if self.transaction_tokens[token] != fingerprint:
+                raise ServiceError("IdempotentParameterMismatchException", "Token reused with different parameters")
+            return {}  # repetição idempotente: já aplicada
+
+        # valida tudo antes de escrever qualquer coisa (tudo ou nada)
+        reasons, failed = [], False
+        for entry in items:
+            (operation, spec), = entry.items()
+            table = self.table(spec["TableName"])
+            current = table.get(spec["Item"] if operation == "Put" else spec["Key"])
+            try:
+                self._check(spec, current)
+                reasons.append({"Code": "None"})
+            except ServiceError:
+                failed = True
+                reason = {"Code": "ConditionalCheckFailed", "Message": "The conditional request failed"}
+                if spec.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD" and current:
+                    reason["Item"] = current
+                reasons.append(reason)
+
+        if failed:
+            codes = ", ".join(r["Code"] for r in reasons)
+            raise ServiceError(
+                "TransactionCanceledException",
+                f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]",
+                extra={"CancellationReasons": reasons},
+            )
+
+        units = {}
+        for entry in items:
+            (operation, spec), = entry.items()
+            spec = {k: v for k, v in spec.items() if k != "ConditionExpression"}
+            if operation == "Put":
+                table, _, written = self._put(spec)
+            elif operation == "Update":
+                table, _, _, _, written = self._update(spec)
+            elif operation == "Delete":
+                table, _, written = self._delete(spec)
+            else:  # ConditionCheck
+                table, written = self.table(spec["TableName"]), 1.0
+            units[table.name] = units.get(table.name, 0) + 2 * written
+
+        if token:
+            self.transaction_tokens[token] = fingerprint
+        return self._capacity_list(request, units)
+
+    def transact_get_items(self, request):
+        responses, units = [], {}
+        for entry in request["TransactItems"]:
+            spec = entry["Get"]
+            table = self.table(spec["TableName"])
+            item = table.get(spec["Key"])
+            units[table.name] = units.get(table.name, 0) + 2 * _read_units(item_size(item), True)
+            responses.append({"Item": project(item, self._projection(spec))} if item else {})
+        return {"Responses": responses, **self._capacity_list(request, units)}
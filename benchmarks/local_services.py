@@ -0,0 +1,551 @@
+"""
+Stand-in local (HTTP) para DynamoDB, Cognito, SQS, S3 e a API do Stripe.
+
+Os handlers rodam sem alteração: o boto3 é apontado para cá com
+AWS_ENDPOINT_URL e o Stripe com STRIPE_API_BASE (ver petvida_runtime.stripe_sdk).
+Assim o benchmark mede o caminho real do SDK (criação de cliente,
+serialização, HTTP), só que sem rede nem conta AWS.
+
+As respostas vêm de `aws_handlers` (por X-Amz-Target, ex.
+"DynamoDB_20120810.Query") e `stripe_handlers` (por path, ex.
+"/v1/customers"). Sem handler, a resposta padrão é vazia/sucesso.
+
+O S3 (GET/PUT/HEAD path-style, /<bucket>/<key>) grava os objetos em
+arquivos sob `s3_root`, para inspecionar o resultado no disco. GETs em
+`get_handlers` (por path, ex. o JWKS do LocalCognito) respondem JSON antes
+do S3.
+
+Com estado: LocalCognito (aqui), LocalQueue (aqui) e LocalDynamoDB
+(local_dynamodb.py) expõem `handlers()`/métodos para `aws_handlers`.
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+class ServiceError(Exception):
+    """Levantada por um handler para devolver um erro no formato da AWS."""
+
+    def __init__(self, code: str, message: str = "", status: int = 400, extra=None):
+        super().__init__(message or code)
+        self.code = code
+        self.message = message or code
+        self.status = status
+        self.extra = extra or {}
+
+
+DEFAULT_AWS_RESPONSES = {
+    "DynamoDB_20120810.Query": {"Items": [], "Count": 0, "ScannedCount": 0},
+    "DynamoDB_20120810.GetItem": {},
+    "DynamoDB_20120810.PutItem": {},
+    "DynamoDB_20120810.UpdateItem": {},
+    "DynamoDB_20120810.DeleteItem": {},
+    "DynamoDB_20120810.BatchWriteItem": {"UnprocessedItems": {}},
+    "DynamoDB_20120810.BatchGetItem": {"Responses": {}, "UnprocessedKeys": {}},
+    "DynamoDB_20120810.TransactWriteItems": {},
+    "AWSCognitoIdentityProviderService.AdminInitiateAuth": {
+        "AuthenticationResult": {
+            "IdToken": "id-token",
+            "AccessToken": "access-token",
+            "RefreshToken": "refresh-token",
+            "ExpiresIn": 3600,
+            "TokenType": "Bearer",
+        }
+    },
+    "AWSCognitoIdentityProviderService.AdminSetUserPassword": {},
+    "AWSCognitoIdentityProviderService.AdminCreateUser": {
+        "User": {"Username": "00000000-0000-4000-8000-000000000001"}
+    },
+    "AmazonSQS.SendMessage": {"MessageId": "00000000-0000-4000-8000-000000000002"},
+}
+
+DEFAULT_STRIPE_RESPONSES = {
+    "/v1/customers": {"id": "cus_local", "object": "customer"},
+    "/v1/checkout/sessions": {
+        "id": "cs_test_local",
+        "object": "checkout.session",
+        "url": "https://checkout.stripe.com/c/pay/cs_test_local",
+    },
+}
+
+
+class LocalServices:
+    def __init__(self, aws_handlers=None, stripe_handlers=None, s3_root=None, get_handlers=None):
+        self.aws_handlers = dict(aws_handlers or {})
+        self.stripe_handlers = dict(stripe_handlers or {})
+        self.get_handlers = dict(get_handlers or {})
+        self.s3 = LocalS3(s3_root) if s3_root else None
+        self.calls = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    # =========================
+    # Ciclo de vida
+    # =========================
+    def start(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length)
+                target = self.headers.get("X-Amz-Target")
+
+                if target:
+                    status, body, content_type = services._aws(target, raw)
+                else:
+                    status, body, content_type = services._stripe(self.path, raw)
+
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _s3(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+
+                services._count(f"S3.{method}")
+                if services.s3 is None:
+                    status, headers, payload = 501, {}, b""
+                else:
+                    status, headers, payload = services.s3.handle(method, self.path, self.headers, raw)
+
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if method != "HEAD":
+                    self.wfile.write(payload)
+
+            def do_GET(self):
+                handler = services.get_handlers.get(urlsplit(self.path).path)
+                if handler is None:
+                    self._s3("GET")
+                    return
+
+                services._count(f"GET {self.path}")
+                payload = json.dumps(handler()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_PUT(self):
+                self._s3("PUT")
+
+            def do_HEAD(self):
+                self._s3("HEAD")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict:
+        """Variáveis de ambiente que apontam boto3 e Stripe para este servidor."""
+        return {
+            "AWS_ENDPOINT_URL": self.url,
+            "AWS_ACCESS_KEY_ID": "local",
+            "AWS_SECRET_ACCESS_KEY": "local",
+            "AWS_DEFAULT_REGION": "sa-east-1",
+            "STRIPE_API_BASE": self.url,
+        }
+
+    # =========================
+    # Despacho
+    # =========================
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _aws(self, target, raw):
+        self._count(target)
+        content_type = (
+            "application/x-amz-json-1.0"
+            if target.startswith(("DynamoDB", "AmazonSQS"))
+            else "application/x-amz-json-1.1"
+        )
+        request = json.loads(raw or b"{}")
+
+        try:
+            handler = self.aws_handlers.get(target)
+            if handler is not None:
+                return 200, handler(request), content_type
+            return 200, DEFAULT_AWS_RESPONSES.get(target, {}), content_type
+        except ServiceError as e:
+            return e.status, {"__type": e.code, "message": e.message, **e.extra}, content_type
+
+    def _stripe(self, path, raw):
+        self._count(path)
+        request = {k: v[0] for k, v in parse_qs(raw.decode("utf-8")).items()}
+
+        handler = self.stripe_handlers.get(path)
+        if handler is not None:
+            return 200, handler(request), "application/json"
+
+        if path in DEFAULT_STRIPE_RESPONSES:
+            return 200, DEFAULT_STRIPE_RESPONSES[path], "application/json"
+
+        return 404, {"error": {"message": f"no stub for {path}"}}, "application/json"
+
+
+class LocalS3:
+    """
+    S3 mínimo sobre o sistema de arquivos: <root>/<bucket>/<key>. Content-Type
+    e Cache-Control de cada objeto ficam em memória (`metadata`).
+    """
+
+    STORED_HEADERS = ("Content-Type", "Cache-Control")
+
+    def __init__(self, root: str):
+        self.root = root
+        self.metadata = {}
+
+    def path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def put(self, bucket: str, key: str, body: bytes, **headers):
+        path = self.path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+        self.metadata[(bucket, key)] = headers
+
+    def get(self, bucket: str, key: str):
+        """(bytes, headers) ou None."""
+        try:
+            with open(self.path(bucket, key), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        return body, self.metadata.get((bucket, key), {})
+
+    def handle(self, method, raw_path, headers, raw):
+        bucket, _, key = unquote(urlsplit(raw_path).path).lstrip("/").partition("/")
+
+        if method == "PUT":
+            self.put(bucket, key, raw, **{
+                name: headers[name] for name in self.STORED_HEADERS if headers.get(name)
+            })
+            return 200, {"ETag": f'"{hashlib.md5(raw).hexdigest()}"'}, b""
+
+        found = self.get(bucket, key)
+        if found is None:
+            error = (
+                "<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+                f"<Error><Code>NoSuchKey</Code><Message>{key}</Message></Error>"
+            ).encode("utf-8")
+            return 404, {"Content-Type": "application/xml"}, error
+
+        body, stored = found
+        return 200, {
+            "Content-Type": "binary/octet-stream",
+            **stored,
+            "ETag": f'"{hashlib.md5(body).hexdigest()}"',
+        }, body
+
+
+class LocalQueue:
+    """
+    Stand-in do SQS + event source mapping do Lambda.
+
+    `send_message` serve como handler de "AmazonSQS.SendMessage"; `drain`
+    entrega as mensagens ao worker em lotes no formato do evento SQS. O que o
+    worker devolve em batchItemFailures volta para a fila e, depois de
+    `max_receive_count` entregas, vai para `dlq`.
+    """
+
+    def __init__(self, max_receive_count: int = 5):
+        self.max_receive_count = max_receive_count
+        self.messages = []
+        self.dlq = []
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def send_message(self, request: dict) -> dict:
+        with self._lock:
+            self._sequence += 1
+            message_id = f"00000000-0000-4000-8000-{self._sequence:012d}"
+            self.messages.append({
+                "messageId": message_id,
+                "body": request["MessageBody"],
+                "attributes": request.get("MessageAttributes", {}),
+                "receive_count": 0,
+            })
+        return {"MessageId": message_id}
+
+    def _record(self, message: dict) -> dict:
+        return {
+            "messageId": message["messageId"],
+            "receiptHandle": f"rh-{message['messageId']}-{message['receive_count']}",
+            "body": message["body"],
+            "attributes": {"ApproximateReceiveCount": str(message["receive_count"])},
+            "messageAttributes": {
+                name: {"stringValue": attr["StringValue"], "dataType": attr["DataType"]}
+                for name, attr in message["attributes"].items()
+            },
+            "eventSource": "aws:sqs",
+        }
+
+    def drain(self, handler, context=None, batch_size: int = 10) -> dict:
+        stats = {"batches": 0, "delivered": 0, "failed": 0}
+
+        while self.messages:
+            batch, self.messages = self.messages[:batch_size], self.messages[batch_size:]
+            for message in batch:
+                message["receive_count"] += 1
+
+            result = handler({"Records": [self._record(m) for m in batch]}, context) or {}
+            failed = {f["itemIdentifier"] for f in result.get("batchItemFailures", [])}
+
+            stats["batches"] += 1
+            stats["delivered"] += len(batch)
+            stats["failed"] += len(failed)
+
+            for message in batch:
+                if message["messageId"] not in failed:
+                    continue
+                if message["receive_count"] >= self.max_receive_count:
+                    self.dlq.append(message)
+                else:
+                    self.messages.append(message)
+
+        return stats
+
+
+def _b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _probable_prime(bits: int) -> int:
+    """Primo de `bits` bits (Miller-Rabin, 40 rodadas): só para o stand-in."""
+    small = (3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+
+    while True:
+        candidate = int.from_bytes(os.urandom(bits // 8), "big") | (1 << (bits - 1)) | 1
+        if any(candidate % p == 0 for p in small):
+            continue
+
+        d, r = candidate - 1, 0
+        while d % 2 == 0:
+            d, r = d // 2, r + 1
+
+        for _ in range(40):
+            x = pow(2 + int.from_bytes(os.urandom(bits // 8), "big") % (candidate - 3), d, candidate)
+            if x in (1, candidate - 1):
+                continue
+            for _ in range(r - 1):
+                x = pow(x, 2, candidate)
+                if x == candidate - 1:
+                    break
+            else:
+                break
+        else:
+            return candidate
+
+
+class LocalCognito:
+    """
+    User pool em memória: AdminCreateUser, AdminSetUserPassword,
+    AdminInitiateAuth (ADMIN_USER_PASSWORD_AUTH e REFRESH_TOKEN_AUTH) e
+    AdminGetUser. Os tokens são JWTs RS256 como os do Cognito (iss do user
+    pool, token_use, aud/client_id), assinados com uma chave RSA gerada no
+    primeiro uso; `get_handlers()` serve o JWKS em JWKS_PATH (use
+    COGNITO_JWKS_URL=<url do LocalServices><JWKS_PATH> nos handlers).
+    """
+
+    PREFIX = "AWSCognitoIdentityProviderService."
+    KEY_BITS = 2048
+    DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")  # SHA-256
+
+    def __init__(self, client_id: str = "local-client", user_pool_id: str = "sa-east-1_local",
+                 region: str = "sa-east-1"):
+        self.client_id = client_id
+        self.user_pool_id = user_pool_id
+        self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+        self.kid = f"{user_pool_id}-key"
+        self.users = {}
+        self.refresh_tokens = {}  # token -> username
+        self._key = None
+        self._lock = threading.Lock()
+
+    @property
+    def jwks_path(self) -> str:
+        return f"/{self.user_pool_id}/.well-known/jwks.json"
+
+    def add_user(self, email: str, password: str = None, name: str = None, sub: str = None) -> str:
+        """Usuário direto no pool (fora da API), para montar o cenário."""
+        sub = sub or str(uuid.uuid5(uuid.NAMESPACE_URL, email))
+        self.users[email] = {
+            "sub": sub,
+            "password": password,
+            "status": "CONFIRMED" if password else "FORCE_CHANGE_PASSWORD",
+            "attributes": {"email": email, "email_verified": "true", "name": name or email, "sub": sub},
+        }
+        return sub
+
+    def handlers(self) -> dict:
+        return {
+            f"{self.PREFIX}AdminCreateUser": self.admin_create_user,
+            f"{self.PREFIX}AdminSetUserPassword": self.admin_set_user_password,
+            f"{self.PREFIX}AdminInitiateAuth": self.admin_initiate_auth,
+            f"{self.PREFIX}AdminGetUser": self.admin_get_user,
+        }
+
+    def get_handlers(self) -> dict:
+        return {self.jwks_path: self.jwks}
+
+    def _user(self, username: str) -> dict:
+        user = self.users.get(username)
+        if user is None:
+            raise ServiceError("UserNotFoundException", "User does not exist.")
+        return user
+
+    # =========================
+    # Chave e tokens
+    # =========================
+    def _rsa_key(self) -> tuple:
+        """(n, e, p, q, dp, dq, qinv), gerada uma vez (~1 s em Python puro)."""
+        with self._lock:
+            if self._key is None:
+                e = 65537
+                while True:
+                    p, q = _probable_prime(self.KEY_BITS // 2), _probable_prime(self.KEY_BITS // 2)
+                    phi = (p - 1) * (q - 1)
+                    if p != q and phi % e:
+                        break
+                d = pow(e, -1, phi)
+                self._key = (p * q, e, p, q, d % (p - 1), d % (q - 1), pow(q, -1, p))
+            return self._key
+
+    def jwks(self) -> dict:
+        n, e = self._rsa_key()[:2]
+        return {"keys": [{
+            "kid": self.kid, "kty": "RSA", "alg": "RS256", "use": "sig",
+            "n": _b64url(n.to_bytes((n.bit_length() + 7) // 8, "big")),
+            "e": _b64url(e.to_bytes(3, "big")),
+        }]}
+
+    def sign(self, claims: dict, kid: str = None) -> str:
+        n, _, p, q, dp, dq, qinv = self._rsa_key()
+        size = (n.bit_length() + 7) // 8
+        header = {"kid": kid or self.kid, "alg": "RS256"}
+        signing_input = ".".join(_b64url(json.dumps(part).encode("utf-8")) for part in (header, claims))
+
+        digest_info = self.DIGEST_INFO + hashlib.sha256(signing_input.encode("ascii")).digest()
+        padded = b"\x00\x01" + b"\xff" * (size - 3 - len(digest_info)) + b"\x00" + digest_info
+        # CRT: ~4x mais rápido que pow(m, d, n), o stand-in pesa menos na medição
+        m = int.from_bytes(padded, "big")
+        m1, m2 = pow(m, dp, p), pow(m, dq, q)
+        signature = (m2 + (qinv * (m1 - m2) % p) * q).to_bytes(size, "big")
+        return f"{signing_input}.{_b64url(signature)}"
+
+    def _token(self, user: dict, token_use: str, expires_in: int = 3600) -> str:
+        now = int(time.time())
+        claims = {
+            "sub": user["sub"], "iss": self.issuer, "token_use": token_use,
+            "iat": now, "auth_time": now, "exp": now + expires_in,
+        }
+        if token_use == "id":
+            claims.update(aud=self.client_id, email=user["attributes"]["email"],
+                          name=user["attributes"]["name"])
+        else:
+            claims.update(client_id=self.client_id, scope="aws.cognito.signin.user.admin",
+                          username=user["sub"])
+        return self.sign(claims)
+
+    def admin_create_user(self, request):
+        username = request["Username"]
+        attributes = {a["Name"]: a["Value"] for a in request.get("UserAttributes", [])}
+        with self._lock:
+            if username in self.users:
+                raise ServiceError("UsernameExistsException", "An account with the given email already exists.")
+            self.add_user(username, name=attributes.get("name"))
+            self.users[username]["attributes"].update(attributes)
+        user = self.users[username]
+        return {"User": {
+            "Username": user["sub"],
+            "Attributes": [{"Name": k, "Value": v} for k, v in user["attributes"].items()],
+            "Enabled": True,
+            "UserStatus": user["status"],
+        }}
+
+    def admin_set_user_password(self, request):
+        user = self._user(request["Username"])
+        user["password"] = request["Password"]
+        if request.get("Permanent"):
+            user["status"] = "CONFIRMED"
+        return {}
+
+    def admin_initiate_auth(self, request):
+        parameters = request.get("AuthParameters", {})
+
+        if request.get("AuthFlow") == "REFRESH_TOKEN_AUTH":
+            username = self.refresh_tokens.get(parameters.get("REFRESH_TOKEN"))
+            if username is None:
+                raise ServiceError("NotAuthorizedException", "Invalid Refresh Token")
+            user = self.users[username]
+            # como no Cognito: sem refresh token novo
+            return {"AuthenticationResult": {
+                "IdToken": self._token(user, "id"),
+                "AccessToken": self._token(user, "access"),
+                "ExpiresIn": 3600,
+                "TokenType": "Bearer",
+            }}
+
+        username = parameters.get("USERNAME")
+        user = self.users.get(username)
+        if user is None or user["password"] is None or user["password"] != parameters.get("PASSWORD"):
+            raise ServiceError("NotAuthorizedException", "Incorrect username or password.")
+
+        refresh_token = _b64url(os.urandom(32))
+        self.refresh_tokens[refresh_token] = username
+        return {"AuthenticationResult": {
+            "IdToken": self._token(user, "id"),
+            "AccessToken": self._token(user, "access"),
+            "RefreshToken": refresh_token,
+            "ExpiresIn": 3600,
+            "TokenType": "Bearer",
+        }}
+
+    def admin_get_user(self, request):
+        user = self._user(request["Username"])
+        return {
+            "Username": user["sub"],
+            "UserAttributes": [{"Name": k, "Value": v} for k, v in user["attributes"].items()],
+            "Enabled": True,
+            "UserStatus": user["status"],
+        }
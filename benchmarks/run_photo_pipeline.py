@@ -0,0 +1,108 @@
+"""
+Roda o processador de fotos (lambda/pets/process_photo.py) contra o S3 de
+local_services, gravando em disco.
+
+Envia cada imagem para uma key versionada (users/user-1/pets/<nome>/<id>.jpg),
+como faria o navegador com a URL assinada, entrega o evento ObjectCreated ao
+handler e compara o tamanho do original com o dos derivados. Sem imagens na linha de comando,
+gera uma foto sintética de 4000x3000 com EXIF (orientação e GPS) para
+conferir que os derivados saem girados e sem EXIF.
+
+Requer Pillow instalado localmente (no Lambda ele vem da layer).
+
+Uso:
+    python benchmarks/run_photo_pipeline.py [fotos...] [--out /tmp/petvida-s3]
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from PIL import Image
+
+from events import HANDLER_ENV, LAMBDA_PATH, LambdaContext, use_local_paths
+from local_services import LocalServices
+
+ORIENTATION = 0x0112
+GPS_INFO = 0x8825
+
+
+def synthetic_photo() -> bytes:
+    # gradiente + ruído: comprime como uma foto, não como uma cor sólida
+    image = Image.linear_gradient("L").resize((4000, 3000)).convert("RGB")
+    noise = Image.effect_noise((4000, 3000), 40).convert("RGB")
+    image = Image.blend(image, noise, 0.3)
+
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6  # girada 90°: o derivado deve sair 3000x4000 -> retrato
+    exif[GPS_INFO] = {1: "S", 2: (23.0, 33.0, 1.0)}
+
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=92, exif=exif)
+    return out.getvalue()
+
+
+def s3_event(bucket: str, key: str, size: int) -> dict:
+    return {
+        "Records": [{
+            "eventSource": "aws:s3",
+            "eventName": "ObjectCreated:Put",
+            "s3": {"bucket": {"name": bucket}, "object": {"key": key, "size": size}},
+        }]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("photos", nargs="*")
+    parser.add_argument("--out", default=None, help="diretório do S3 local (padrão: temporário)")
+    args = parser.parse_args()
+
+    root = args.out or tempfile.mkdtemp(prefix="petvida-s3-")
+    sources = [(os.path.basename(p), open(p, "rb").read()) for p in args.photos] or [
+        ("synthetic.jpg", synthetic_photo())
+    ]
+
+    with LocalServices(s3_root=root) as services:
+        os.environ.update({**HANDLER_ENV, **services.env()})
+        use_local_paths()
+        sys.path.insert(0, os.path.join(LAMBDA_PATH, "pets"))
+
+        import process_photo
+        from petvida_runtime import aws
+        from petvida_runtime.photos import CACHE_CONTROL, FORMATS, SIZES, derived_key, photo_key
+
+        bucket = HANDLER_ENV["BUCKET_NAME"]
+        s3 = aws.client("s3")
+
+        for name, body in sources:
+            key = photo_key("user-1", os.path.splitext(name)[0], uuid.uuid4().hex, "image/jpeg")
+            s3.put_object(Bucket=bucket, Key=key, Body=body, ContentType="image/jpeg",
+                          CacheControl=CACHE_CONTROL)
+
+            started = time.perf_counter()
+            process_photo.lambda_handler(s3_event(bucket, key, len(body)), LambdaContext())
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            print(f"\n{key} | original {len(body) / 1024:.0f} KB | {elapsed_ms:.0f} ms")
+            print(f"{'derivado':<16}{'KB':>8}{'dimensões':>14}  {'EXIF':<6}Cache-Control")
+            for size in SIZES:
+                for fmt in FORMATS:
+                    derived = derived_key(key, size, fmt)
+                    data, headers = services.s3.get(bucket, derived)
+                    with Image.open(io.BytesIO(data)) as image:
+                        dims = f"{image.width}x{image.height}"
+                        has_exif = "sim" if image.getexif() else "não"
+                    print(
+                        f"{size + '.' + FORMATS[fmt]:<16}{len(data) / 1024:>8.1f}{dims:>14}  "
+                        f"{has_exif:<6}{headers.get('Cache-Control')}"
+                    )
+
+    print(f"\nobjetos em {root}")
+
+
+if __name__ == "__main__":
+    main()
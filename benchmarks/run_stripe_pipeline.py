@@ -0,0 +1,151 @@
+"""
+Reproduz localmente o pipeline do Stripe: webhook -> fila -> worker.
+
+Cada fixture de benchmarks/fixtures/stripe é assinada e enviada ao webhook
+(e reenviada antes e depois do worker, como o Stripe faz). As mensagens
+ficam num LocalQueue e o stripe_worker as consome em lotes, com reentrega e
+DLQ. DynamoDB e Cognito
+são servidos por local_services; a tabela stripe-events guarda estado para
+que duplicados e status sejam reais.
+
+Uso:
+    python benchmarks/run_stripe_pipeline.py [--fail-cognito 2] [--batch-size 10]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from events import HANDLER_ENV, LAMBDA_PATH, LambdaContext, ROOT, stripe_webhook_event, use_local_paths
+from local_services import LocalQueue, LocalServices, ServiceError
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "stripe")
+
+
+class EventsTable:
+    """Estado mínimo da tabela stripe-events: put condicional, status e leitura dele."""
+
+    def __init__(self):
+        self.items = {}
+
+    def put_item(self, request):
+        item = request["Item"]
+        key = item["PK"]["S"]
+
+        if "ConditionExpression" in request and key in self.items:
+            extra = {}
+            if request.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD":
+                extra["Item"] = self.items[key]
+            raise ServiceError(
+                "com.amazonaws.dynamodb.v20120810#ConditionalCheckFailedException",
+                "The conditional request failed",
+                extra=extra,
+            )
+
+        self.items[key] = item
+        return {}
+
+    def get_item(self, request):
+        item = self.items.get(request["Key"]["PK"]["S"])
+        return {"Item": {"status": item["status"]}} if item and "status" in item else {}
+
+    def update_item(self, request):
+        key = request["Key"]["PK"]["S"]
+        status = request["ExpressionAttributeValues"][":status"]
+        self.items.setdefault(key, dict(request["Key"]))["status"] = status
+        return {}
+
+
+class FlakyCognito:
+    """AdminCreateUser com as primeiras `failures` chamadas em throttling."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+
+    def admin_create_user(self, request):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ServiceError("TooManyRequestsException", "Rate exceeded")
+        return {"User": {"Username": "00000000-0000-4000-8000-000000000001"}}
+
+
+def load_fixtures() -> list:
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            fixtures.append((os.path.basename(path), json.load(f)))
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fail-cognito", type=int, default=0,
+                        help="quantas chamadas AdminCreateUser falham antes de funcionar")
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    queue = LocalQueue(max_receive_count=5)
+    events_table = EventsTable()
+    cognito = FlakyCognito(args.fail_cognito)
+
+    services = LocalServices(aws_handlers={
+        "AmazonSQS.SendMessage": queue.send_message,
+        "DynamoDB_20120810.PutItem": lambda r: (
+            events_table.put_item(r) if r["TableName"] == HANDLER_ENV["STRIPE_EVENTS_TABLE"] else {}
+        ),
+        "DynamoDB_20120810.GetItem": events_table.get_item,
+        "DynamoDB_20120810.UpdateItem": events_table.update_item,
+        "AWSCognitoIdentityProviderService.AdminCreateUser": cognito.admin_create_user,
+    })
+
+    with services:
+        os.environ.update({**HANDLER_ENV, **services.env()})
+        use_local_paths()
+        sys.path.insert(0, os.path.join(LAMBDA_PATH, "auth"))
+
+        import stripe_webhook
+        import stripe_worker
+
+        fixtures = load_fixtures()
+
+        def deliver(label):
+            for name, fixture in fixtures:
+                started = time.perf_counter()
+                result = stripe_webhook.handler(stripe_webhook_event(fixture), LambdaContext())
+                elapsed = (time.perf_counter() - started) * 1000
+                print(f"{name:<46}{label:<16}{result['statusCode']:>6}{elapsed:>8.1f}  {result['body']}")
+
+        # =========================
+        # Webhook (caminho rápido)
+        # =========================
+        # a reentrega antes do worker reenfileira (ainda RECEIVED); depois
+        # dele, é descartada como duplicada
+        print(f"{'fixture':<46}{'entrega':<16}{'status':>6}{'ms':>8}  body")
+        deliver("1ª")
+        deliver("antes do worker")
+        enqueued = len(queue.messages)
+
+        # =========================
+        # Worker (fila)
+        # =========================
+        stats = queue.drain(stripe_worker.handler, LambdaContext(), batch_size=args.batch_size)
+        deliver("após o worker")
+
+        print()
+        print(f"enfileiradas: {enqueued} | lotes: {stats['batches']} | "
+              f"entregas: {stats['delivered']} | falhas: {stats['failed']} | DLQ: {len(queue.dlq)}")
+
+        print()
+        print(f"{'evento':<40}status")
+        for key, item in sorted(events_table.items.items()):
+            status = item["status"]["S"] if isinstance(item["status"], dict) else item["status"]
+            print(f"{key:<40}{status}")
+
+        for message in queue.dlq:
+            print(f"DLQ: {json.loads(message['body'])['id']} após {message['receive_count']} entregas")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ import { ApiHealthStack } from '../lib/api-health-stack';
 import { ApiAuthStack } from '../lib/api-auth-stack';
 import * as dotenv from 'dotenv';
 import { ApiConfigUserPetVidaStack } from '../lib/api-configUserPetVida-stack';
+import { RemindersStack } from '../lib/reminders-stack';
 
 dotenv.config();
 
@@ -58,7 +59,9 @@ new ApiConfigUserPetVidaStack(app, `${stage}-ApiConfigUserPetVidaStack`, {
   envName: stage,
   usersTable: dynamoStack.usersTable,
   httpApi: httpApiStack.httpApi,  
-  cognitoAuthorizer: apiAuthStack.cognitoAuthorizer
+  cognitoAuthorizer: apiAuthStack.cognitoAuthorizer,
+  userPoolId: apiAuthStack.userPoolId,
+  userPoolClientId: apiAuthStack.userPoolClientId
 });
 
 
@@ -66,6 +69,8 @@ new ApiPetStack(app, `${stage}-ApiPetStack`, {
   env: { account, region },
   envName: stage,
   petsTable: dynamoStack.petsTable,
+  healthTable: dynamoStack.healthRecordsTable,
+  idempotencyTable: dynamoStack.idempotencyTable,
   httpApi: httpApiStack.httpApi,
   bucketFoto: siteStack.bucketFoto,
   distributionFoto: siteStack.distributionFoto,
@@ -77,6 +82,18 @@ new ApiHealthStack(app, `${stage}-ApiHealthStack`, {
   env: { account, region },
   envName: stage,
   healthTable: dynamoStack.healthRecordsTable,
+  usersTable: dynamoStack.usersTable,
+  remindersQueueTable: dynamoStack.remindersQueueTable,
+  idempotencyTable: dynamoStack.idempotencyTable,
   httpApi: httpApiStack.httpApi,
   cognitoAuthorizer: apiAuthStack.cognitoAuthorizer  
+});
+
+
+new RemindersStack(app, `${stage}-RemindersStack`, {
+  env: { account, region },
+  envName: stage,
+  usersTable: dynamoStack.usersTable,
+  healthTable: dynamoStack.healthRecordsTable,
+  remindersQueueTable: dynamoStack.remindersQueueTable,
 });
\ No newline at end of file
@@ -1,33 +1,29 @@
-import json
 import os
-import logging
 
-import boto3
 from botocore.exceptions import ClientError
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+from petvida_runtime import api_handler, aws, get_logger, json_body, response
 
-cognito = boto3.client("cognito-idp")
+logger = get_logger()
 
 USER_POOL_ID = os.environ["USER_POOL_ID"]
 CLIENT_ID = os.environ["CLIENT_ID"]
 
 
+@api_handler(error_message="Erro inesperado")
 def handler(event, context):
-    logger.info("🚀 Login Lambda invoked")
-    logger.info(f"Event: {json.dumps(event)}")
+    body = json_body(event)
+    email = body.get("email")
+    password = body.get("password")
 
-    try:
-        body = json.loads(event.get("body", "{}"))
-        email = body.get("email")
-        password = body.get("password")
+    if not email or not password:
+        return response(400, {"message": "E-mail e senha obrigatórios"})
 
-        if not email or not password:
-            return response(400, {"message": "E-mail e senha obrigatórios"})
+    logger.info("🔐 Authenticating user", email=email)
 
-        logger.info(f"🔐 Authenticating user: {email}")
+    cognito = aws.client("cognito-idp")
 
+    try:
         auth_response = cognito.admin_initiate_auth(
             UserPoolId=USER_POOL_ID,
             ClientId=CLIENT_ID,
@@ -38,43 +34,28 @@ def handler(event, context):
             },
         )
 
-        tokens = auth_response["AuthenticationResult"]
-
-        logger.info("✅ Login successful")
-
-        return response(
-            200,
-            {
-                "idToken": tokens["IdToken"],
-                "accessToken": tokens["AccessToken"],
-                "refreshToken": tokens["RefreshToken"],
-                "expiresIn": tokens["ExpiresIn"],
-                "tokenType": tokens["TokenType"],
-            },
-        )
-
     except cognito.exceptions.NotAuthorizedException:
-        logger.warning("❌ Invalid credentials")
+        logger.warning("❌ Invalid credentials", email=email)
         return response(401, {"message": "Usuário ou senha inválidos"})
 
     except ClientError as e:
-        logger.error("🔥 AWS ClientError", exc_info=True)
+        logger.exception("🔥 AWS ClientError")
         return response(
             500,
             {"message": "Erro ao autenticar", "error": e.response["Error"]["Message"]},
         )
 
-    except Exception as e:
-        logger.error("🔥 Unexpected error", exc_info=True)
-        return response(500, {"message": "Erro inesperado", "error": str(e)})
+    tokens = auth_response["AuthenticationResult"]
 
+    logger.info("✅ Login successful")
 
-def response(status_code, body):
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",  # DEV
+    return response(
+        200,
+        {
+            "idToken": tokens["IdToken"],
+            "accessToken": tokens["AccessToken"],
+            "refreshToken": tokens["RefreshToken"],
+            "expiresIn": tokens["ExpiresIn"],
+            "tokenType": tokens["TokenType"],
         },
-        "body": json.dumps(body),
-    }
+    )
@@ -0,0 +1,60 @@
+import os
+
+from botocore.exceptions import ClientError
+
+from petvida_runtime import api_handler, aws, get_logger, json_body, response
+
+logger = get_logger()
+
+USER_POOL_ID = os.environ["USER_POOL_ID"]
+CLIENT_ID = os.environ["CLIENT_ID"]
+
+
+@api_handler(error_message="Erro inesperado")
+def handler(event, context):
+    body = json_body(event)
+    refresh_token = body.get("refreshToken")
+
+    if not refresh_token:
+        return response(400, {"message": "refreshToken obrigatório"})
+
+    logger.info("🔄 Refreshing tokens")
+
+    cognito = aws.client("cognito-idp")
+
+    try:
+        auth_response = cognito.admin_initiate_auth(
+            UserPoolId=USER_POOL_ID,
+            ClientId=CLIENT_ID,
+            AuthFlow="REFRESH_TOKEN_AUTH",
+            AuthParameters={
+                "REFRESH_TOKEN": refresh_token,
+            },
+        )
+
+    except cognito.exceptions.NotAuthorizedException:
+        # expirado, revogado (logout global) ou de outro client
+        logger.warning("❌ Invalid refresh token")
+        return response(401, {"message": "Sessão expirada, faça login novamente"})
+
+    except ClientError as e:
+        logger.exception("🔥 AWS ClientError")
+        return response(
+            500,
+            {"message": "Erro ao renovar a sessão", "error": e.response["Error"]["Message"]},
+        )
+
+    tokens = auth_response["AuthenticationResult"]
+
+    logger.info("✅ Tokens refreshed")
+
+    # o Cognito não devolve um refresh token novo: o cliente mantém o atual
+    return response(
+        200,
+        {
+            "idToken": tokens["IdToken"],
+            "accessToken": tokens["AccessToken"],
+            "expiresIn": tokens["ExpiresIn"],
+            "tokenType": tokens["TokenType"],
+        },
+    )
@@ -1,56 +1,49 @@
-import json
 import os
-import stripe
-import logging
-from datetime import datetime
+
+from petvida_runtime import api_handler, get_logger, json_body, phase, response
+from petvida_runtime.stripe_sdk import get_stripe
 
 
 # Logger
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger = get_logger()
 
 
 
-#Stripe   
-STRIPE_SECRET_KEY = os.environ["STRIPE_SECRET_KEY"]
+#Stripe (SDK carregado no primeiro uso, ver get_stripe)
 STRIPE_PRICE_ID = os.environ["STRIPE_PRICE_ID"]
 FRONTEND_URL = os.environ["FRONTEND_URL"]
 
-stripe.api_key = STRIPE_SECRET_KEY
-
 
 
+@api_handler(error_message="Erro inesperado")
 def handler(event, context):
-    logger.info("🚀 Lambda invoked")
-    logger.info(f"Event received: {json.dumps(event)}")
+    body = json_body(event)
+    name = body.get("name")
+    email = body.get("email")
 
-    try:
-        body = json.loads(event.get("body", "{}"))
-        name = body.get("name")
-        email = body.get("email")
-        
-        logger.info(f"📥 Payload parsed | name={name} | email={email}")
+    if not name or not email:
+        logger.warning("❌ Missing required fields")
+        return response(400, {"message": "Dados inválidos"})
 
-        if not name or not email:
-            logger.warning("❌ Missing required fields")
-            return response(400, {"message": "Dados inválidos"})
+    # =========================
+    # 1️⃣ Criar Customer no Stripe
+    # =========================
+    logger.info("💳 Creating Stripe customer", email=email)
 
-        # =========================
-        # 1️⃣ Criar Customer no Stripe
-        # =========================
-        logger.info("💳 Creating Stripe customer")
+    with phase("stripe"):
+        stripe = get_stripe()
 
         customer = stripe.Customer.create(
             email=email,
             name=name,
-            
         )
 
-        # =========================
-        # 2️⃣ Criar Checkout Session (Subscription + Trial)
-        # =========================
-        logger.info("🧾 Creating Stripe Checkout Session")
+    # =========================
+    # 2️⃣ Criar Checkout Session (Subscription + Trial)
+    # =========================
+    logger.info("🧾 Creating Stripe Checkout Session", customerId=customer.id)
 
+    with phase("stripe"):
         session = stripe.checkout.Session.create(
             mode="subscription",
             customer=customer.id,
@@ -70,29 +63,8 @@ def handler(event, context):
                 "name": name
             },
         )
-    
-        return response(201, {
-            "message": "Usuário criado",
-            "checkoutUrl": session.url
-        }
-)
-
-
-    except Exception as e:
-        logger.error("🔥 Unexpected error", exc_info=True)
-        return response(
-            500,
-            {"message": "Erro inesperado", "error": str(e)},
-        )
-
 
-def response(status_code, body):
-    logger.info(f"📤 Responding with status {status_code}")
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",  # DEV
-        },
-        "body": json.dumps(body),
-    }
+    return response(201, {
+        "message": "Usuário criado",
+        "checkoutUrl": session.url
+    })
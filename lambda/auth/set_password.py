@@ -1,54 +1,36 @@
-import json
 import os
-import boto3
-import logging
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+from petvida_runtime import api_handler, aws, get_logger, json_body, response
 
-cognito = boto3.client("cognito-idp")
+logger = get_logger()
 
 USER_POOL_ID = os.environ["USER_POOL_ID"]
 
+
+@api_handler(error_message="Erro interno")
 def handler(event, context):
-    try:
-        body = json.loads(event.get("body", "{}"))
+    body = json_body(event)
 
-        email = body.get("email")
-        password = body.get("password")
-        
+    email = body.get("email")
+    password = body.get("password")
 
-        if not email or not password:
-            return response(400, "Dados obrigatórios ausentes")
+    if not email or not password:
+        return response(400, {"message": "Dados obrigatórios ausentes"})
 
-        
-        logger.info(f"🔐 Definindo senha para {email}")
+    logger.info("🔐 Definindo senha", email=email)
 
+    cognito = aws.client("cognito-idp")
+
+    try:
         cognito.admin_set_user_password(
             UserPoolId=USER_POOL_ID,
             Username=email,
             Password=password,
             Permanent=True,
         )
+    except cognito.exceptions.UserNotFoundException:
+        return response(404, {"message": "Usuário não encontrado"})
 
-        logger.info("✅ Senha definida com sucesso")
-
-        return response(200, "Senha definida com sucesso")
+    logger.info("✅ Senha definida com sucesso")
 
-    except cognito.exceptions.UserNotFoundException:
-        return response(404, "Usuário não encontrado")
-
-    except Exception as e:
-        logger.exception("🔥 Erro ao definir senha")
-        return response(500, "Erro interno")
-
-
-def response(status, message):
-    return {
-        "statusCode": status,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-        },
-        "body": json.dumps({ "message": message }),
-    }
+    return response(200, {"message": "Senha definida com sucesso"})
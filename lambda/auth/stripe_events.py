@@ -0,0 +1,94 @@
+import json
+import zlib
+from datetime import datetime, timezone
+
+# =========================
+# Tabela stripe-events
+# =========================
+# Compartilhado pelo webhook (grava o evento e enfileira) e pelo worker
+# (processa e marca o resultado).
+#
+# status: RECEIVED -> PROCESSED | FAILED
+#
+# Formato do item: os campos usados em filtros/consultas ficam no topo e o
+# payload original vai comprimido (zlib) em `payload_z`. O antigo `payload`
+# (mapa aninhado) custava várias WCU por evento e chegava perto do limite de
+# 400 KB em invoices grandes. Para ler, use load_event(item).
+
+STATUS_RECEIVED = "RECEIVED"
+STATUS_PROCESSED = "PROCESSED"
+STATUS_FAILED = "FAILED"
+
+PAYLOAD_FIELD = "payload_z"
+LEGACY_PAYLOAD_FIELD = "payload"
+
+COMPRESSION_LEVEL = 6
+
+
+def iso_from_epoch(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+def event_key(stripe_event: dict) -> dict:
+    return {
+        "PK": f"EVENT#{stripe_event['id']}",
+        "SK": f"CREATED#{iso_from_epoch(stripe_event['created'])}",
+    }
+
+
+def compress_payload(payload: str) -> bytes:
+    return zlib.compress(payload.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def event_item(stripe_event: dict, payload: str, status: str) -> dict:
+    """
+    Item compacto de um evento. `payload` é o corpo original (já verificado),
+    guardado como veio do Stripe.
+    """
+    obj = stripe_event.get("data", {}).get("object") or {}
+    now = datetime.now(timezone.utc)
+
+    item = {
+        **event_key(stripe_event),
+
+        "event_id": stripe_event["id"],
+        "type": stripe_event["type"],
+        "livemode": stripe_event["livemode"],
+        "status": status,
+
+        "created_epoch": stripe_event["created"],
+        "created_at": iso_from_epoch(stripe_event["created"]),
+        "received_epoch": int(now.timestamp()),
+        "received_at": now.isoformat(),
+
+        PAYLOAD_FIELD: compress_payload(payload),
+    }
+
+    if obj.get("id"):
+        item["object_id"] = obj["id"]
+        item["object_type"] = obj.get("object")
+
+    customer = obj["id"] if obj.get("object") == "customer" else obj.get("customer")
+    if isinstance(customer, str):
+        item["customer_id"] = customer
+
+    return item
+
+
+def load_event(item: dict) -> dict:
+    """
+    Reidrata o evento Stripe de um item da tabela, no formato novo
+    (payload_z) ou no antigo (payload como mapa).
+    """
+    compressed = item.get(PAYLOAD_FIELD)
+    if compressed is not None:
+        # boto3 devolve Binary; bytes() serve para os dois
+        return json.loads(zlib.decompress(bytes(compressed)))
+
+    return item[LEGACY_PAYLOAD_FIELD]
+
+
+def get_event(table, key: dict):
+    """Busca e reidrata um evento pela chave (ver event_key). None se não existir."""
+    item = table.get_item(Key=key).get("Item")
+    return load_event(item) if item else None
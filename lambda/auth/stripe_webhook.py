@@ -1,14 +1,13 @@
 import os
-import json
-import time
 import base64
 import logging
-from datetime import datetime, timezone
 
-import boto3
-import stripe
 from botocore.exceptions import ClientError
 
+from petvida_runtime import api_handler, aws, phase, response
+from petvida_runtime.stripe_sdk import SignatureVerificationError, construct_event
+from stripe_events import STATUS_RECEIVED, event_item
+
 # =========================
 # LOGGING
 # =========================
@@ -18,78 +17,29 @@ logger.setLevel(logging.INFO)
 # =========================
 # ENV VARS
 # =========================
-STRIPE_SECRET_KEY = os.environ["STRIPE_SECRET_KEY"]
 STRIPE_WEBHOOK_SECRET = os.environ["STRIPE_WEBHOOK_SECRET"]
 EVENTS_TABLE = os.environ["STRIPE_EVENTS_TABLE"]
-USER_TABLE = os.environ["USERS_TABLE"]
-USER_POOL_ID = os.environ["USER_POOL_ID"]
-
-stripe.api_key = STRIPE_SECRET_KEY
+EVENTS_QUEUE_URL = os.environ["STRIPE_EVENTS_QUEUE_URL"]
 
 # =========================
-# AWS CLIENTS
-# =========================
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(EVENTS_TABLE)
-userTable = dynamodb.Table(USER_TABLE)
-
-cognito = boto3.client("cognito-idp")
-
+# FILA - PROCESSAMENTO ASSÍNCRONO
 # =========================
-# COGNITO - CREATE USER
-# =========================
-def create_cognito_user(email: str, name: str) -> str:
-    try:
-        logger.info(f"👤 Creating Cognito user | email={email}")
-
-        response = cognito.admin_create_user(
-            UserPoolId=USER_POOL_ID,
-            Username=email,  # email como username
-            UserAttributes=[
-                {"Name": "email", "Value": email},
-                {"Name": "email_verified", "Value": "true"},
-                {"Name": "name", "Value": name},
-            ],
-            MessageAction="SUPPRESS",
-        )
-
-        user_sub = response["User"]["Username"]
-        logger.info(f"✅ Cognito user created | user_id={user_sub}")
-
-        return user_sub
-
-    except cognito.exceptions.UsernameExistsException:
-        logger.warning(f"⚠️ Usuário já existe no Cognito | email={email}")
-        return email  # idempotência
-
-    except ClientError:
-        logger.exception("❌ Erro ao criar usuário no Cognito")
-        raise
-
-# =========================
-# DYNAMODB - CREATE USER
-# =========================
-def save_user_dynamodb(user_id: str, name: str, email: str):
-    logger.info("💾 Saving user in DynamoDB")
-
-    userTable.put_item(
-        Item={
-            "PK": f"USER#{user_id}",
-            "SK": "PROFILE",
-
-            "id": user_id,
-            "name": name,
-            "email": email,
-
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "entity": "USER",
+# O webhook só valida, deduplica, grava e enfileira. Cognito e Users ficam
+# com o stripe_worker, então o Stripe recebe o 200 sem esperar por eles.
+def enqueue_event(payload: str, event_id: str, event_type: str):
+    aws.client("sqs").send_message(
+        QueueUrl=EVENTS_QUEUE_URL,
+        MessageBody=payload,
+        MessageAttributes={
+            "event_id": {"DataType": "String", "StringValue": event_id},
+            "type": {"DataType": "String", "StringValue": event_type},
         },
-        ConditionExpression="attribute_not_exists(PK)",
     )
 
 # =========================
 # HANDLER
 # =========================
+@api_handler()
 def handler(event, context):
     logger.info("🔔 Stripe webhook recebido")
 
@@ -114,15 +64,17 @@ def handler(event, context):
     # VALIDAR EVENTO STRIPE
     # =========================
     try:
-        stripe_event = stripe.Webhook.construct_event(
-            payload=payload,
-            sig_header=sig_header,
-            secret=STRIPE_WEBHOOK_SECRET,
-        )
+        # HMAC local, sem carregar o SDK do Stripe
+        with phase("stripe"):
+            stripe_event = construct_event(
+                payload=payload,
+                sig_header=sig_header,
+                secret=STRIPE_WEBHOOK_SECRET,
+            )
     except ValueError:
         logger.exception("❌ Payload inválido")
         return {"statusCode": 400, "body": "Invalid payload"}
-    except stripe.SignatureVerificationError:
+    except SignatureVerificationError:
         logger.exception("❌ Assinatura inválida")
         return {"statusCode": 400, "body": "Invalid signature"}
 
@@ -131,15 +83,6 @@ def handler(event, context):
     # =========================
     event_id = stripe_event["id"]
     event_type = stripe_event["type"]
-    livemode = stripe_event["livemode"]
-
-    created_epoch = stripe_event["created"]
-    created_at = datetime.fromtimestamp(
-        created_epoch, tz=timezone.utc
-    ).isoformat()
-
-    received_epoch = int(time.time())
-    received_at = datetime.now(timezone.utc).isoformat()
 
     logger.info(
         "📦 Evento Stripe validado",
@@ -150,78 +93,32 @@ def handler(event, context):
     # SALVAR EVENTO (IDEMPOTENTE)
     # =========================
     try:
-        table.put_item(
-            Item={
-                "PK": f"EVENT#{event_id}",
-                "SK": f"CREATED#{created_at}",
-
-                "event_id": event_id,
-                "type": event_type,
-                "livemode": livemode,
-
-                "created_epoch": created_epoch,
-                "created_at": created_at,
-                "received_epoch": received_epoch,
-                "received_at": received_at,
-
-                "payload": stripe_event,
-            },
+        aws.table(EVENTS_TABLE).put_item(
+            # campos de consulta no topo + payload original comprimido
+            Item=event_item(stripe_event, payload, STATUS_RECEIVED),
             ConditionExpression="attribute_not_exists(PK)",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
         )
     except ClientError as e:
-        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+        # Ainda RECEIVED: a entrega anterior gravou mas pode não ter
+        # enfileirado. Enfileira de novo (o worker é idempotente).
+        status = e.response.get("Item", {}).get("status", {}).get("S")
+        if status != STATUS_RECEIVED:
             logger.warning(f"🔁 Evento duplicado ignorado: {event_id}")
             return {"statusCode": 200, "body": "duplicate"}
-        raise
-
-    # =========================
-    # EVENTO: CHECKOUT COMPLETED
-    # =========================
-    if event_type == "checkout.session.completed":
-        logger.info("🧾 Checkout session completed")
-
-        session = stripe_event["data"]["object"]
-        metadata = session.get("metadata", {})
-
-        email = metadata.get("email")
-        name = metadata.get("name")
-
-        if not email or not name:
-            logger.error("❌ Metadata incompleta (email/nome)")
-            return {"statusCode": 400, "body": "Missing user metadata"}
 
-        # 1️⃣ Cognito
-        user_id = create_cognito_user(email=email, name=name)
-
-        # 2️⃣ DynamoDB
-        try:
-            save_user_dynamodb(
-                user_id=user_id,
-                name=name,
-                email=email,
-            )
-        except ClientError as e:
-            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
-                logger.warning("⚠️ Usuário já existe no DynamoDB")
-            else:
-                raise
+        logger.warning(f"🔁 Evento ainda não processado, reenfileirando: {event_id}")
 
     # =========================
-    # OUTROS EVENTOS
+    # ENFILEIRAR PARA O WORKER
     # =========================
-    elif event_type == "invoice.paid":
-        logger.info("💰 Invoice paga")
-
-    elif event_type == "invoice.payment_failed":
-        logger.warning("⚠️ Falha no pagamento")
-
-    elif event_type == "customer.subscription.deleted":
-        logger.info("🛑 Subscription cancelada")
+    # Se falhar, o 500 faz o Stripe reenviar e o evento (RECEIVED) é
+    # enfileirado na próxima entrega.
+    enqueue_event(payload, event_id, event_type)
 
-    else:
-        logger.info(f"ℹ️ Evento não tratado: {event_type}")
+    logger.info(f"📨 Evento enfileirado: {event_id}")
 
-    return {
-        "statusCode": 200,
-        "body": json.dumps({"status": "ok"}),
-    }
+    return response(200, {"status": "queued"})
@@ -0,0 +1,181 @@
+import os
+import json
+import logging
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+from petvida_runtime import aws, event_handler, users
+from stripe_events import STATUS_FAILED, STATUS_PROCESSED, event_key
+
+# =========================
+# LOGGING
+# =========================
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# =========================
+# ENV VARS
+# =========================
+EVENTS_TABLE = os.environ["STRIPE_EVENTS_TABLE"]
+USER_TABLE = os.environ["USERS_TABLE"]
+USER_POOL_ID = os.environ["USER_POOL_ID"]
+
+
+class MissingMetadata(Exception):
+    pass
+
+# =========================
+# COGNITO - CREATE USER
+# =========================
+def create_cognito_user(email: str, name: str) -> str:
+    try:
+        logger.info(f"👤 Creating Cognito user | email={email}")
+
+        user_sub, created = users.create_cognito_user(USER_POOL_ID, email, name)
+
+        if created:
+            logger.info(f"✅ Cognito user created | user_id={user_sub}")
+        else:
+            logger.warning(f"⚠️ Usuário já existe no Cognito | user_id={user_sub}")
+
+        return user_sub
+
+    except ClientError:
+        logger.exception("❌ Erro ao criar usuário no Cognito")
+        raise
+
+# =========================
+# DYNAMODB - CREATE USER
+# =========================
+def save_user_dynamodb(user_id: str, name: str, email: str):
+    logger.info("💾 Saving user in DynamoDB")
+
+    if not users.save_profile(USER_TABLE, user_id, name, email):
+        logger.warning("⚠️ Usuário já existe no DynamoDB")
+
+# =========================
+# EVENTOS
+# =========================
+# Cada função precisa ser idempotente: o SQS entrega pelo menos uma vez e o
+# webhook pode reenfileirar um evento ainda não processado.
+def on_checkout_completed(stripe_event: dict):
+    logger.info("🧾 Checkout session completed")
+
+    session = stripe_event["data"]["object"]
+    metadata = session.get("metadata") or {}
+
+    email = metadata.get("email")
+    name = metadata.get("name")
+
+    if not email or not name:
+        raise MissingMetadata("Metadata incompleta (email/nome)")
+
+    user_id = create_cognito_user(email=email, name=name)
+    save_user_dynamodb(user_id=user_id, name=name, email=email)
+
+
+def on_invoice_paid(stripe_event: dict):
+    logger.info("💰 Invoice paga")
+
+
+def on_invoice_payment_failed(stripe_event: dict):
+    logger.warning("⚠️ Falha no pagamento")
+
+
+def on_subscription_deleted(stripe_event: dict):
+    logger.info("🛑 Subscription cancelada")
+
+
+EVENT_HANDLERS = {
+    "checkout.session.completed": on_checkout_completed,
+    "invoice.paid": on_invoice_paid,
+    "invoice.payment_failed": on_invoice_payment_failed,
+    "customer.subscription.deleted": on_subscription_deleted,
+}
+
+# =========================
+# STATUS DO EVENTO
+# =========================
+def mark_event(stripe_event: dict, status: str, error: str = None):
+    now = datetime.now(timezone.utc).isoformat()
+
+    update = "SET #status = :status, processed_at = :now"
+    values = {":status": status, ":now": now}
+
+    if error:
+        update += ", last_error = :error"
+        values[":error"] = error
+
+    aws.table(EVENTS_TABLE).update_item(
+        Key=event_key(stripe_event),
+        UpdateExpression=update,
+        ExpressionAttributeNames={"#status": "status"},
+        ExpressionAttributeValues=values,
+    )
+
+
+def already_done(stripe_event: dict) -> bool:
+    # o SQS entrega pelo menos uma vez e o webhook reenfileira eventos ainda
+    # RECEIVED: a mesma mensagem pode chegar depois de processada
+    item = aws.table(EVENTS_TABLE).get_item(
+        Key=event_key(stripe_event),
+        ProjectionExpression="#status",
+        ExpressionAttributeNames={"#status": "status"},
+        ConsistentRead=True,
+    ).get("Item")
+    return bool(item) and item.get("status") in (STATUS_PROCESSED, STATUS_FAILED)
+
+
+def process_record(record: dict):
+    stripe_event = json.loads(record["body"])
+    event_type = stripe_event["type"]
+
+    if already_done(stripe_event):
+        logger.info(f"🔁 Evento já processado, ignorado: {stripe_event['id']}")
+        return
+
+    logger.info(
+        "📦 Processando evento Stripe",
+        extra={"event_id": stripe_event["id"], "type": event_type},
+    )
+
+    handler_fn = EVENT_HANDLERS.get(event_type)
+    if handler_fn is None:
+        logger.info(f"ℹ️ Evento não tratado: {event_type}")
+    else:
+        try:
+            handler_fn(stripe_event)
+        except MissingMetadata as e:
+            # não adianta tentar de novo: registra e descarta
+            logger.error(f"❌ {e} | event_id={stripe_event['id']}")
+            mark_event(stripe_event, STATUS_FAILED, str(e))
+            return
+
+    mark_event(stripe_event, STATUS_PROCESSED)
+
+# =========================
+# HANDLER (SQS)
+# =========================
+# Lote do SQS com ReportBatchItemFailures: só as mensagens que falharam
+# voltam para a fila; depois de maxReceiveCount vão para a DLQ.
+@event_handler()
+def handler(event, context):
+    records = event.get("Records", [])
+    failures = []
+
+    logger.info(f"📥 Lote recebido | mensagens={len(records)}")
+
+    for record in records:
+        try:
+            process_record(record)
+        except Exception:
+            logger.exception(
+                f"🔥 Falha ao processar mensagem | message_id={record['messageId']}"
+            )
+            failures.append({"itemIdentifier": record["messageId"]})
+
+    if failures:
+        logger.warning(f"⚠️ Mensagens com falha: {len(failures)}/{len(records)}")
+
+    return {"batchItemFailures": failures}
@@ -1,56 +1,50 @@
-import json
 import os
-import boto3
 
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(os.environ["USERS_TABLE_NAME"])
+from petvida_runtime import BadRequest, api_handler, query_params, response
+from petvida_runtime.profiles import get_profile
+from petvida_runtime.tokens import request_claims
 
-def lambda_handler(event, context):
+TABLE_NAME = os.environ["USERS_TABLE_NAME"]
+
+DEFAULT_PREFERENCES = {
+    "remindersEnabled": False,
+    "emailNotifications": False,
+    "advanceDays": "7"
+}
+
+
+def min_version(event):
+    # opcional: a version devolvida pelo save_config
+    value = query_params(event).get("minVersion")
+    if value is None:
+        return None
     try:
-        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
-        user_id = claims["sub"]
-
-        pk = f"USER#{user_id}"
-        sk = "PROFILE"
-
-        response = table.get_item(
-            Key={
-                "PK": pk,
-                "SK": sk
-            }
-        )
-
-        if "Item" not in response:
-            return {
-                "statusCode": 200,
-                "body": json.dumps({
-                    "name": claims.get("name"),
-                    "email": claims.get("email"),
-                    "preferences": {
-                        "remindersEnabled": False,
-                        "emailNotifications": False,
-                        "advanceDays": "7"
-                    }
-                })
-            }
-
-        item = response["Item"]
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps({
-                "name": item.get("name"),
-                "email": item.get("email"),
-                "preferences": item.get("preferences", {
-                    "remindersEnabled": False,
-                    "emailNotifications": False,
-                    "advanceDays": "7"
-                })
-            })
-        }
-
-    except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"message": str(e)})
-        }
+        return int(value)
+    except ValueError:
+        raise BadRequest("minVersion deve ser um número inteiro")
+
+
+@api_handler()
+def lambda_handler(event, context):
+    # authorizer da rota ou, sem ele, o Bearer verificado aqui (JWKS em cache)
+    claims = request_claims(event)
+    user_id = claims["sub"]
+
+    # cache do container (TTL): ver petvida_runtime.profiles. Com minVersion,
+    # um item em cache mais antigo que ela é relido do DynamoDB
+    item = get_profile(TABLE_NAME, user_id, min_version=min_version(event))
+
+    if item is None:
+        return response(200, {
+            "name": claims.get("name"),
+            "email": claims.get("email"),
+            "preferences": DEFAULT_PREFERENCES,
+            "version": 0
+        })
+
+    return response(200, {
+        "name": item.get("name"),
+        "email": item.get("email"),
+        "preferences": item.get("preferences", DEFAULT_PREFERENCES),
+        "version": int(item.get("version", 0))
+    })
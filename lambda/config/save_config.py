@@ -1,47 +1,74 @@
-import json
 import os
-import boto3
 from datetime import datetime
 
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(os.environ["USERS_TABLE_NAME"])
+from botocore.exceptions import ClientError
 
-def lambda_handler(event, context):
+from petvida_runtime import BadRequest, api_handler, aws, json_body, jwt_claims, response
+from petvida_runtime.profiles import profile_key
+
+TABLE_NAME = os.environ["USERS_TABLE_NAME"]
+
+
+def expected_version(body: dict):
+    # opcional: a version devolvida pelo get_config
+    if body.get("version") is None:
+        return None
     try:
-        claims = event["requestContext"]["authorizer"]["jwt"]["claims"]
-        user_id = claims["sub"]
+        return int(body["version"])
+    except (TypeError, ValueError):
+        raise BadRequest("version deve ser um número inteiro")
 
-        body = json.loads(event["body"])
 
-        pk = f"USER#{user_id}"
-        sk = "PROFILE"
+@api_handler()
+def lambda_handler(event, context):
+    claims = jwt_claims(event)
+    user_id = claims["sub"]
 
-        table.update_item(
-            Key={
-                "PK": pk,
-                "SK": sk
-            },
+    body = json_body(event)
+    expected = expected_version(body)
+
+    # version cresce a cada gravação; com `version` no body a gravação só
+    # acontece se ninguém alterou as preferências depois da leitura
+    condition = {}
+    values = {
+        ":prefs": {
+            "remindersEnabled": body.get("remindersEnabled", False),
+            "emailNotifications": body.get("emailNotifications", False),
+            "advanceDays": body.get("advanceDays", "7"),
+        },
+        ":updatedAt": datetime.utcnow().isoformat(),
+        ":one": 1,
+    }
+
+    if expected == 0:
+        condition["ConditionExpression"] = "attribute_not_exists(version)"
+    elif expected is not None:
+        condition["ConditionExpression"] = "version = :expected"
+        values[":expected"] = expected
+
+    try:
+        result = aws.table(TABLE_NAME).update_item(
+            Key=profile_key(user_id),
             UpdateExpression="""
                 SET preferences = :prefs,
                     updated_at = :updatedAt
+                ADD version :one
             """,
-            ExpressionAttributeValues={
-                ":prefs": {
-                    "remindersEnabled": body.get("remindersEnabled", False),
-                    "emailNotifications": body.get("emailNotifications", False),
-                    "advanceDays": body.get("advanceDays", "7"),
-                },
-                ":updatedAt": datetime.utcnow().isoformat()
-            }
+            ExpressionAttributeValues=values,
+            ReturnValues="ALL_NEW",
+            **condition
         )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps({"message": "Configurações atualizadas com sucesso"})
-        }
+        return response(409, {
+            "message": "Configurações alteradas em outro dispositivo, recarregue e tente de novo"
+        })
 
-    except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"message": str(e)})
-        }
+    # get_config é outra função, com cache próprio (TTL): o cliente manda
+    # esta version como ?minVersion= para não receber a versão anterior
+    return response(200, {
+        "message": "Configurações atualizadas com sucesso",
+        "version": int(result["Attributes"]["version"])
+    })
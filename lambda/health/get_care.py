@@ -1,58 +1,71 @@
-import json
 import os
-import boto3
-from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.conditions import Key
+
+from petvida_runtime import api_handler, aws, query_params, response
+from petvida_runtime.health_keys import (
+    OWNER_INDEX,
+    OWNER_INDEX_KEYS,
+    owner_index_pk,
+    pet_records_query,
+    reads_by_pet,
+)
+from petvida_runtime.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    first_page,
+    parse_limit,
+    query_all,
+)
 
-dynamodb = boto3.resource("dynamodb")
 TABLE_NAME = os.environ["HEALTH_RECORDS_TABLE"]
-table = dynamodb.Table(TABLE_NAME)
 
 
+@api_handler()
 def lambda_handler(event, context):
-    try:
-        params = event.get("queryStringParameters") or {}
-
-        user_id = params.get("userId")
-        pet_id = params.get("petId")  # opcional
+    table = aws.table(TABLE_NAME)
+    params = query_params(event)
 
-        if not user_id:
-            return response(400, {"message": "userId é obrigatório"})
+    user_id = params.get("userId")
+    pet_id = params.get("petId")  # opcional
 
-        key_condition = Key("PK").eq(f"USER#{user_id}")
+    if not user_id:
+        return response(400, {"message": "userId é obrigatório"})
 
-        result = table.query(
-            KeyConditionExpression=key_condition,
-            FilterExpression=Attr("type").eq("CARE")
-        )
+    pk = f"USER#{user_id}"
+    cursor_scope = f"{pk}#PET#{pet_id or '*'}#CARE"
+    if pet_id and reads_by_pet():
+        cursor_scope += "#BYPET"  # chaves do cursor mudam com o layout
 
-        items = result.get("Items", [])
+    # partição do pet (ou GSI2) / GSI1: só os cuidados pedidos, já por performedAt (desc)
+    if pet_id:
+        query, key_attrs = pet_records_query(user_id, pet_id, "CARE")
+        query["ScanIndexForward"] = False
+    else:
+        key_attrs = OWNER_INDEX_KEYS
+        query = {
+            "IndexName": OWNER_INDEX,
+            "KeyConditionExpression":
+                Key("GSI1PK").eq(owner_index_pk(user_id, "CARE")),
+            "ScanIndexForward": False,
+        }
 
-        # filtra por pet, se informado
-        if pet_id:
-            items = [
-                item for item in items
-                if item["SK"].startswith(f"PET#{pet_id}#")
-            ]
+    # sem limit/cursor: histórico completo (compatível com o front atual)
+    if "limit" not in params and "cursor" not in params:
+        return response(200, query_all(table, **query))
 
-        # ordena por data do cuidado (desc)
-        items.sort(
-            key=lambda x: x.get("performedAt", ""),
-            reverse=True
-        )
-
-        return response(200, items)
-
-    except Exception as e:
-        print("ERROR:", str(e))
-        return response(500, {"message": "Internal server error"})
+    try:
+        limit = parse_limit(params.get("limit"))
+        start_key = None
+        if params.get("cursor"):
+            start_key = decode_cursor(params["cursor"], scope=cursor_scope)
+    except (ValueError, InvalidCursor) as e:
+        return response(400, {"message": str(e)})
 
+    # paginado: mais recentes primeiro
+    items, next_key = first_page(table, limit, start_key, key_attrs, **query)
 
-def response(status_code, body):
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-        },
-        "body": json.dumps(body),
-    }
+    return response(200, {
+        "items": items,
+        "nextCursor": encode_cursor(next_key, scope=cursor_scope) if next_key else None
+    })
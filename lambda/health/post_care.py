@@ -1,71 +1,35 @@
-import json
 import os
-import boto3
-from datetime import datetime, timedelta
-from uuid import uuid4
 
-dynamodb = boto3.resource("dynamodb")
+from petvida_runtime import api_handler, idempotency, json_body, response
+from petvida_runtime.health_records import care_item
+from petvida_runtime.health_summary import write_with_summary
+from petvida_runtime.reminders import schedule_reminder
+
 TABLE_NAME = os.environ["HEALTH_RECORDS_TABLE"]
-table = dynamodb.Table(TABLE_NAME)
+REMINDERS_TABLE = os.environ["REMINDERS_TABLE"]
+USERS_TABLE = os.environ["USERS_TABLE_NAME"]
 
 
+@api_handler()
+@idempotency.idempotent()
 def lambda_handler(event, context):
-    try:
-        body = json.loads(event.get("body") or "{}")
-
-        user_id = body.get("userId")
-        pet_id = body.get("petId")
-        care_type = body.get("type")
-        performed_at = body.get("performedAt")
-        periodicity = body.get("periodicity", "30")
-        notes = body.get("notes")
-
-        if not user_id or not pet_id or not care_type or not performed_at:
-            return response(400, {
-                "message": "userId, petId, type e performedAt são obrigatórios"
-            })
-
-        now_iso = datetime.utcnow().isoformat()
-
-        # calcula próxima data
-        next_due_date = (
-            datetime.fromisoformat(performed_at) +
-            timedelta(days=int(periodicity))
-        ).date().isoformat()
-
-        item = {
-            "PK": f"USER#{user_id}",
-            "SK": f"PET#{pet_id}#CARE#{now_iso}",
-            "type": "CARE",
-            "recordId": str(uuid4()),
-            "careType": care_type,
-            "performedAt": performed_at,
-            "periodicity": periodicity,
-            "nextDueDate": next_due_date,
-            "createdAt": now_iso,
-        }
+    body = json_body(event)
 
-        if notes:
-            item["notes"] = notes
+    user_id = body.get("userId")
+    pet_id = body.get("petId")
 
-        table.put_item(Item=item)
+    # valida e calcula nextDueDate (BadRequest -> 400)
+    item = care_item(user_id, pet_id, body)
 
-        return response(201, {
-            "message": "Cuidado registrado com sucesso",
-            "record": item
-        })
+    result = response(201, {
+        "message": "Cuidado registrado com sucesso",
+        "record": item
+    })
 
-    except Exception as e:
-        print("ERROR:", str(e))
-        return response(500, {"message": "Internal server error"})
+    # registro + resumo do pet (+ resposta da Idempotency-Key) na mesma transação
+    write_with_summary(TABLE_NAME, user_id, pet_id, [item], extra_items=idempotency.completion(context, result))
 
+    # lembrete na data de vencimento - advanceDays do usuário
+    schedule_reminder(REMINDERS_TABLE, USERS_TABLE, user_id, pet_id, item)
 
-def response(status_code, body):
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-        },
-        "body": json.dumps(body),
-    }
+    return result
@@ -0,0 +1,17 @@
+import os
+
+from petvida_runtime import api_handler, json_body
+from petvida_runtime.health_records import vaccine_item, import_batch
+
+TABLE_NAME = os.environ["HEALTH_RECORDS_TABLE"]
+REMINDERS_TABLE = os.environ["REMINDERS_TABLE"]
+USERS_TABLE = os.environ["USERS_TABLE_NAME"]
+
+
+@api_handler()
+def lambda_handler(event, context):
+    # valida, grava, atualiza os resumos e agenda os lembretes (201/207/400)
+    return import_batch(
+        TABLE_NAME, REMINDERS_TABLE, USERS_TABLE,
+        json_body(event), vaccine_item, "Vacinas importadas",
+    )
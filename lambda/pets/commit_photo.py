@@ -0,0 +1,66 @@
+import os
+import re
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+from petvida_runtime import api_handler, aws, json_body, path_params, response
+from petvida_runtime.photos import EXTENSIONS, derived_urls, photo_prefix
+
+TABLE_NAME = os.environ["PETS_TABLE_NAME"]
+BUCKET = os.environ["BUCKET_NAME"]
+CLOUDFRONT_URL = os.environ["CLOUDFRONT_URL"]
+
+# <uploadId>.<ext> gerados por get_upload_url
+UPLOAD_NAME = re.compile(r"^[0-9a-f]{32}\.(%s)$" % "|".join(EXTENSIONS.values()))
+
+
+# =========================
+# Troca da foto do pet
+# =========================
+# Depois do upload na URL assinada, o front confirma aqui a photoKey. A key
+# nova é gravada no pet; a anterior continua no bucket (e no cache) até ser
+# removida, então quem ainda tem a URL antiga não vê imagem quebrada.
+@api_handler()
+def lambda_handler(event, context):
+    pet_id = path_params(event).get("petId")
+    body = json_body(event)
+
+    user_id = body.get("userId")
+    photo_key = body.get("photoKey") or ""
+
+    if not pet_id or not user_id or not photo_key:
+        return response(400, {"message": "petId (path), userId e photoKey são obrigatórios"})
+
+    prefix = photo_prefix(user_id, pet_id)
+    if not photo_key.startswith(prefix) or not UPLOAD_NAME.match(photo_key[len(prefix):]):
+        return response(400, {"message": "photoKey inválida para este pet"})
+
+    try:
+        aws.client("s3").head_object(Bucket=BUCKET, Key=photo_key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return response(400, {"message": "Upload da foto não encontrado"})
+        raise
+
+    photo_url = f"{CLOUDFRONT_URL}/{photo_key}"
+
+    try:
+        aws.table(TABLE_NAME).update_item(
+            Key={"PK": f"USER#{user_id}", "SK": f"PET#{pet_id}"},
+            UpdateExpression="SET photoUrl = :url, updatedAt = :now",
+            ConditionExpression="attribute_exists(PK)",
+            ExpressionAttributeValues={
+                ":url": photo_url,
+                ":now": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return response(404, {"message": "Pet not found"})
+        raise
+
+    return response(200, {
+        "photo": photo_url,
+        "photos": derived_urls(photo_url),
+    })
@@ -1,61 +1,143 @@
-import json
 import os
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 from boto3.dynamodb.conditions import Key
 
-dynamodb = boto3.resource("dynamodb")
+from petvida_runtime import api_handler, aws, phase, query_params, response
+from petvida_runtime.health_keys import pet_records_query, summary_key
+from petvida_runtime.health_summary import summarize, summarize_item
+from petvida_runtime.pets import normalize_pet
+
 TABLE_NAME = os.environ["PETS_TABLE_NAME"]
-table = dynamodb.Table(TABLE_NAME)
+HEALTH_TABLE = os.environ["HEALTH_RECORDS_TABLE"]
 
+# consultas simultâneas no modo include=health_summary (2 por pet)
+SUMMARY_WORKERS = 8
 
+# só o necessário para o resumo
+SUMMARY_PROJECTION = "#type, #name, careType, recordId, nextDueDate"
 
 
-def normalize_pet(item: dict) -> dict:
-    return {
-        "id": item.get("petId") or item.get("id"),
-        "name": item.get("name"),
-        "species": item.get("species", "").lower(),  # DOG -> dog
-        "breed": item.get("breed"),
-        "sex": item.get("sex", "").lower(),          # MALE -> male
-        "birthDate": item.get("birthDate"),
-        "photo": item.get("photoUrl"),
-        "notes": item.get("notes"),
-        "createdAt": item.get("createdAt"),
-    }
+# =========================
+# RESUMO DE SAÚDE (include=health_summary)
+# =========================
+# Lê os resumos (SUMMARY) de todos os pets com BatchGetItem (até 100 por
+# chamada). Pets ainda sem resumo (antes do rebuild) caem nas consultas por
+# pet (partição do pet ou GSI2, conforme HEALTH_LAYOUT), em paralelo com no
+# máximo SUMMARY_WORKERS ao mesmo tempo.
+BATCH_GET_LIMIT = 100
 
+INCLUDES = ("health_summary",)
 
-def lambda_handler(event, context):
-    try:
-        params = event.get("queryStringParameters") or {}
-        user_id = params.get("userId")
 
-        if not user_id:
-            return response(400, {"message": "userId is required"})
+def summaries_from_items(user_id, pet_ids) -> dict:
+    dynamodb = aws.client("dynamodb")
+    summaries = {}
+
+    for start in range(0, len(pet_ids), BATCH_GET_LIMIT):
+        request = {
+            HEALTH_TABLE: {
+                "Keys": [
+                    aws.serialize(summary_key(user_id, pet_id))
+                    for pet_id in pet_ids[start:start + BATCH_GET_LIMIT]
+                ],
+            }
+        }
+
+        while request:
+            result = dynamodb.batch_get_item(RequestItems=request)
+            for item in result.get("Responses", {}).get(HEALTH_TABLE, []):
+                item = aws.deserialize(item)
+                summaries[item["petId"]] = summarize_item(item)
+            request = result.get("UnprocessedKeys")
 
-        result = table.query(
-            KeyConditionExpression=
-                Key("PK").eq(f"USER#{user_id}") &
-                Key("SK").begins_with("PET#"),
-            ScanIndexForward=False
-        )
+    return summaries
 
-        items = result.get("Items", [])
 
-        pets = [normalize_pet(item) for item in items]
+def fetch_records(dynamodb, user_id, pet_id, record_type):
+    records = []
+    query, _ = pet_records_query(user_id, pet_id, record_type)
+    kwargs = {
+        **query,
+        "TableName": HEALTH_TABLE,
+        "ExpressionAttributeValues": aws.serialize(query["ExpressionAttributeValues"]),
+        "ExpressionAttributeNames": {"#type": "type", "#name": "name"},
+        "ProjectionExpression": SUMMARY_PROJECTION,
+        "ScanIndexForward": False,
+    }
+
+    while True:
+        result = dynamodb.query(**kwargs)
+        records.extend(aws.deserialize(item) for item in result.get("Items", []))
+
+        if "LastEvaluatedKey" not in result:
+            return records
+        kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
 
-        return response(200, pets)
 
-    except Exception as e:
-        print("ERROR:", str(e))
-        return response(500, {"message": "Internal server error"})
+def summaries_from_records(user_id, pet_ids) -> dict:
+    if not pet_ids:
+        return {}
 
+    dynamodb = aws.client("dynamodb")  # client de baixo nível: thread-safe
+    tasks = [(pet_id, record_type) for pet_id in pet_ids for record_type in ("VACCINE", "CARE")]
+
+    # Latency.dynamodb: tempo de relógio das consultas em paralelo
+    with phase("dynamodb"), ThreadPoolExecutor(max_workers=min(SUMMARY_WORKERS, len(tasks))) as pool:
+        results = pool.map(lambda task: fetch_records(dynamodb, user_id, *task), tasks)
+
+        records = {pet_id: [] for pet_id in pet_ids}
+        for (pet_id, _), found in zip(tasks, results):
+            records[pet_id].extend(found)
 
-def response(status_code, body):
     return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-        },
-        "body": json.dumps(body),
+        pet_id: {
+            **summarize(found),
+            "vaccineCount": sum(1 for r in found if r["type"] == "VACCINE"),
+            "careCount": sum(1 for r in found if r["type"] == "CARE"),
+        }
+        for pet_id, found in records.items()
     }
+
+
+def health_summaries(user_id, pet_ids) -> dict:
+    if not pet_ids:
+        return {}
+
+    summaries = summaries_from_items(user_id, pet_ids)
+    summaries.update(
+        summaries_from_records(user_id, [p for p in pet_ids if p not in summaries])
+    )
+    return summaries
+
+
+@api_handler()
+def lambda_handler(event, context):
+    params = query_params(event)
+    user_id = params.get("userId")
+
+    if not user_id:
+        return response(400, {"message": "userId is required"})
+
+    include = [name.strip() for name in (params.get("include") or "").split(",") if name.strip()]
+    unknown = [name for name in include if name not in INCLUDES]
+    if unknown:
+        return response(400, {"message": f"include inválido: {', '.join(unknown)} (use {', '.join(INCLUDES)})"})
+
+    result = aws.table(TABLE_NAME).query(
+        KeyConditionExpression=
+            Key("PK").eq(f"USER#{user_id}") &
+            Key("SK").begins_with("PET#"),
+        ScanIndexForward=False
+    )
+
+    items = result.get("Items", [])
+
+    pets = [normalize_pet(item) for item in items]
+
+    # opt-in: a resposta padrão continua igual
+    if "health_summary" in include:
+        summaries = health_summaries(user_id, [pet["id"] for pet in pets if pet["id"]])
+        for pet in pets:
+            pet["healthSummary"] = summaries.get(pet["id"], summarize_item({}))
+
+    return response(200, pets)
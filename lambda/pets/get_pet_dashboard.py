@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from petvida_runtime import api_handler, aws, path_params, phase, query_params, response
+from petvida_runtime.health_keys import pet_records_query, summary_key
+from petvida_runtime.health_summary import next_due, summary_records
+from petvida_runtime.pets import normalize_pet
+
+PETS_TABLE = os.environ["PETS_TABLE_NAME"]
+HEALTH_TABLE = os.environ["HEALTH_RECORDS_TABLE"]
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# =========================
+# Leituras em paralelo
+# =========================
+# Pet, resumo de saúde, últimas vacinas e últimos cuidados são lidos ao mesmo
+# tempo: a latência da tela do pet passa a ser a da leitura mais lenta, não a
+# soma de quatro requisições. Usa o client de baixo nível, que é thread-safe
+# (os resources do boto3 não são).
+#
+# nextDue vem do item SUMMARY, que tem o último registro de cada vacina e
+# cuidado; as listas trazem só os `limit` mais recentes e deixariam de fora
+# vencimentos de registros mais antigos. Pet ainda sem resumo (antes do
+# rebuild_health_summaries) usa as listas.
+
+
+def get_item(dynamodb, table_name, key):
+    result = dynamodb.get_item(TableName=table_name, Key=aws.serialize(key))
+    item = result.get("Item")
+    return aws.deserialize(item) if item else None
+
+
+def fetch_pet(dynamodb, user_id, pet_id):
+    return get_item(dynamodb, PETS_TABLE, {"PK": f"USER#{user_id}", "SK": f"PET#{pet_id}"})
+
+
+def fetch_summary(dynamodb, user_id, pet_id):
+    return get_item(dynamodb, HEALTH_TABLE, summary_key(user_id, pet_id))
+
+
+def fetch_latest(dynamodb, user_id, pet_id, record_type, limit):
+    # partição do pet / GSI2 já ordenam pela data do evento: mais recentes primeiro
+    query, _ = pet_records_query(user_id, pet_id, record_type)
+    query.update(
+        TableName=HEALTH_TABLE,
+        ExpressionAttributeValues=aws.serialize(query["ExpressionAttributeValues"]),
+        ScanIndexForward=False,
+        Limit=limit,
+    )
+    result = dynamodb.query(**query)
+    return [aws.deserialize(item) for item in result.get("Items", [])]
+
+
+@api_handler()
+def lambda_handler(event, context):
+    pet_id = path_params(event).get("petId")
+    params = query_params(event)
+    user_id = params.get("userId")
+
+    if not pet_id or not user_id:
+        return response(400, {
+            "message": "petId (path) and userId (query) are required"
+        })
+
+    try:
+        limit = min(int(params.get("limit") or DEFAULT_LIMIT), MAX_LIMIT)
+    except ValueError:
+        return response(400, {"message": "limit deve ser um número inteiro"})
+
+    if limit < 1:
+        return response(400, {"message": "limit deve ser maior que zero"})
+
+    dynamodb = aws.client("dynamodb")  # criado antes das threads
+
+    # Latency.dynamodb: tempo de relógio das quatro leituras juntas
+    with phase("dynamodb"), ThreadPoolExecutor(max_workers=4) as pool:
+        pet_future = pool.submit(fetch_pet, dynamodb, user_id, pet_id)
+        summary_future = pool.submit(fetch_summary, dynamodb, user_id, pet_id)
+        vaccines_future = pool.submit(fetch_latest, dynamodb, user_id, pet_id, "VACCINE", limit)
+        care_future = pool.submit(fetch_latest, dynamodb, user_id, pet_id, "CARE", limit)
+
+        pet = pet_future.result()
+        summary = summary_future.result()
+        vaccines = vaccines_future.result()
+        care = care_future.result()
+
+    if not pet:
+        return response(404, {"message": "Pet not found"})
+
+    return response(200, {
+        "pet": normalize_pet(pet),
+        "vaccines": vaccines,
+        "care": care,
+        # vacinas e cuidados juntos; cada lista já vem do mais recente
+        "nextDue": next_due(summary_records(summary) if summary else vaccines + care),
+    })
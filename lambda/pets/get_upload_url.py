@@ -1,19 +1,17 @@
-import json
+import base64
 import os
-import boto3
-import logging
-import traceback
+import re
+import uuid
+from collections import OrderedDict
+from time import time
 
-# =========================
-# Logger configuration
-# =========================
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+from petvida_runtime import api_handler, aws, get_logger, json_body, response
+from petvida_runtime.photos import CACHE_CONTROL, EXTENSIONS, photo_key
 
 # =========================
-# AWS clients
+# Logger configuration
 # =========================
-s3 = boto3.client("s3")
+logger = get_logger()
 
 # =========================
 # Environment variables
@@ -24,130 +22,186 @@ CLOUDFRONT_URL = os.environ["CLOUDFRONT_URL"]
 # =========================
 # Constants
 # =========================
-ALLOWED_TYPES = ["image/jpeg", "image/png"]
+ALLOWED_TYPES = list(EXTENSIONS)
 MAX_SIZE_MB = 5
+MAX_SIZE_BYTES = MAX_SIZE_MB * 1024 * 1024
 
+EXPIRES_IN = 300
+MAX_BATCH_UPLOADS = 50
 
-def lambda_handler(event, context):
-    request_id = context.aws_request_id
+# PUT: URL assinada simples (o S3 não limita o tamanho)
+# POST: formulário assinado com content-length-range = MAX_SIZE_MB
+UPLOAD_METHODS = ("PUT", "POST")
 
-    logger.info({
-        "message": "Lambda execution started",
-        "requestId": request_id
-    })
+# contentSha256 (opcional): a mesma foto enviada de novo cai na mesma key.
+# O checksum vai assinado no upload (x-amz-checksum-sha256): o S3 recusa um
+# arquivo cujo SHA-256 não bate, então a key nunca recebe outro conteúdo.
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
 
-    try:
-        logger.info({
-            "message": "Incoming event received",
-            "requestId": request_id,
-            "eventKeys": list(event.keys())
-        })
-
-        body_raw = event.get("body", "{}")
-        logger.info({
-            "message": "Raw body received",
-            "requestId": request_id,
-            "body": body_raw
-        })
-
-        body = json.loads(body_raw)
-
-        user_id = body.get("userId")
-        pet_id = body.get("petId")
-        content_type = body.get("contentType")
-
-        logger.info({
-            "message": "Parsed request body",
-            "requestId": request_id,
-            "userId": user_id,
-            "petId": pet_id,
-            "contentType": content_type
-        })
-
-        # =========================
-        # Validations
-        # =========================
-        if not user_id or not pet_id or not content_type:
-            logger.warning({
-                "message": "Missing required fields",
-                "requestId": request_id
-            })
-            return response(400, "Campos obrigatórios ausentes")
-
-        if content_type not in ALLOWED_TYPES:
-            logger.warning({
-                "message": "Invalid content type",
-                "requestId": request_id,
-                "contentType": content_type
-            })
-            return response(400, "Tipo de arquivo não permitido")
-
-        # =========================
-        # Build S3 key
-        # =========================
-        key = f"users/{user_id}/pets/{pet_id}.jpg"
-
-        logger.info({
-            "message": "Generating presigned URL",
-            "requestId": request_id,
-            "bucket": BUCKET,
-            "key": key,
-            "expiresInSeconds": 300
-        })
-
-        # =========================
-        # Generate presigned URL
-        # =========================
-        upload_url = s3.generate_presigned_url(
-            "put_object",
-            Params={
-                "Bucket": BUCKET,
-                "Key": key,
-                "ContentType": content_type,
-            },
-            ExpiresIn=300
+# =========================
+# Cache de assinaturas
+# =========================
+# A mesma (key, contentType, método, checksum) pedida de novo dentro de
+# CACHE_SECONDS reaproveita a assinatura: a URL devolvida ainda vale pelo
+# menos EXPIRES_IN - CACHE_SECONDS segundos. Como a key leva um uuid, só
+# acontece com contentSha256. Por container, limitado a CACHE_MAX_ENTRIES.
+CACHE_SECONDS = 60
+CACHE_MAX_ENTRIES = 1024
+
+_signatures = OrderedDict()  # (key, contentType, método, checksum) -> (assinada_em, upload)
+
+
+def checksum_sha256(content_sha256: str):
+    # hexadecimal do cliente -> base64, o formato do S3
+    if not content_sha256:
+        return None
+    return base64.b64encode(bytes.fromhex(content_sha256)).decode("ascii")
+
+
+def sign(key: str, content_type: str, method: str, checksum: str = None) -> dict:
+    cache_key = (key, content_type, method, checksum)
+    cached = _signatures.get(cache_key)
+    now = time()
+
+    if cached and now - cached[0] < CACHE_SECONDS:
+        return cached[1]
+
+    s3 = aws.client("s3")
+
+    headers = {"Content-Type": content_type, "Cache-Control": CACHE_CONTROL}
+    if checksum:
+        headers["x-amz-checksum-sha256"] = checksum
+
+    if method == "POST":
+        post = s3.generate_presigned_post(
+            Bucket=BUCKET,
+            Key=key,
+            Fields=headers,
+            Conditions=[
+                *({name: value} for name, value in headers.items()),
+                ["content-length-range", 1, MAX_SIZE_BYTES],
+            ],
+            ExpiresIn=EXPIRES_IN,
         )
+        upload = {"uploadUrl": post["url"], "fields": post["fields"]}
+    else:
+        params = {
+            "Bucket": BUCKET,
+            "Key": key,
+            "ContentType": content_type,
+            "CacheControl": CACHE_CONTROL,
+        }
+        if checksum:
+            params["ChecksumSHA256"] = checksum
+
+        upload = {
+            "uploadUrl": s3.generate_presigned_url(
+                "put_object",
+                Params=params,
+                ExpiresIn=EXPIRES_IN
+            ),
+            # assinados: o PUT precisa enviar exatamente estes headers
+            "headers": headers,
+        }
+
+    _signatures[cache_key] = (now, upload)
+    _signatures.move_to_end(cache_key)
+    while len(_signatures) > CACHE_MAX_ENTRIES:
+        _signatures.popitem(last=False)
+
+    return upload
+
+
+def validate(upload: dict):
+    if not upload.get("petId") or not upload.get("contentType"):
+        return "Campos obrigatórios ausentes"
+    if upload["contentType"] not in ALLOWED_TYPES:
+        return "Tipo de arquivo não permitido"
+    if upload.get("contentSha256") and not SHA256_HEX.match(upload["contentSha256"]):
+        return "contentSha256 deve ser o SHA-256 em hexadecimal"
+    return None
+
+
+def presign(user_id, upload: dict, method) -> dict:
+    upload_id = (upload.get("contentSha256") or "")[:32] or uuid.uuid4().hex
+    key = photo_key(user_id, upload["petId"], upload_id, upload["contentType"])
+
+    # photoKey vai para POST /api/pets/{petId}/photo depois do upload
+    checksum = checksum_sha256(upload.get("contentSha256"))
+    result = {
+        **sign(key, upload["contentType"], method, checksum),
+        "photoKey": key,
+        "photoUrl": f"{CLOUDFRONT_URL}/{key}",
+    }
+    if method == "POST":
+        result["maxSizeBytes"] = MAX_SIZE_BYTES
+    return result
+
+
+def batch_presign(user_id, uploads, method):
+    """{"uploads": [{"petId", "contentType", "contentSha256"?}, ...]} -> uma URL por item."""
+    if not isinstance(uploads, list) or not uploads:
+        return response(400, "uploads deve ser uma lista não vazia")
+
+    if len(uploads) > MAX_BATCH_UPLOADS:
+        return response(400, f"máximo de {MAX_BATCH_UPLOADS} uploads por chamada")
+
+    errors = []
+    for index, upload in enumerate(uploads):
+        if not isinstance(upload, dict):
+            errors.append({"index": index, "message": "upload deve ser um objeto"})
+            continue
+        message = validate(upload)
+        if message:
+            errors.append({"index": index, "message": message})
+
+    if errors:
+        return response(400, {"message": "Uploads inválidos", "errors": errors})
+
+    return response(200, {
+        "uploads": [
+            {
+                "index": index,
+                "petId": upload["petId"],
+                **presign(user_id, upload, method),
+            }
+            for index, upload in enumerate(uploads)
+        ]
+    })
 
-        photo_url = f"{CLOUDFRONT_URL}/{key}"
-
-        logger.info({
-            "message": "Presigned URL generated successfully",
-            "requestId": request_id,
-            "photoUrl": photo_url
-        })
-
-        logger.info({
-            "message": "Lambda execution finished successfully",
-            "requestId": request_id
-        })
-
-        return response(200, {
-            "uploadUrl": upload_url,
-            "photoUrl": photo_url
-        })
 
-    except Exception as e:
-        logger.error({
-            "message": "Unhandled exception",
-            "requestId": request_id,
-            "error": str(e),
-            "stackTrace": traceback.format_exc()
-        })
+@api_handler(error_message="Erro interno ao gerar URL de upload")
+def lambda_handler(event, context):
+    body = json_body(event)
+
+    user_id = body.get("userId")
+    method = (body.get("method") or "PUT").upper()
+
+    # =========================
+    # Validations
+    # =========================
+    if not user_id:
+        return response(400, "Campos obrigatórios ausentes")
+
+    if method not in UPLOAD_METHODS:
+        return response(400, "method deve ser PUT ou POST")
+
+    if "uploads" in body:
+        result = batch_presign(user_id, body["uploads"], method)
+        logger.info(
+            "Presigned URLs generated",
+            count=len(body["uploads"]) if result["statusCode"] == 200 else 0,
+            statusCode=result["statusCode"],
+        )
+        return result
 
-        return response(500, "Erro interno ao gerar URL de upload")
+    message = validate(body)
+    if message:
+        logger.warning(message, contentType=body.get("contentType"))
+        return response(400, message)
 
+    result = presign(user_id, body, method)
 
-def response(status, body):
-    logger.info({
-        "message": "Sending response",
-        "statusCode": status
-    })
+    logger.info("Presigned URL generated", photoKey=result["photoKey"], method=method)
 
-    return {
-        "statusCode": status,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-        },
-        "body": json.dumps(body),
-    }
+    return response(200, result)
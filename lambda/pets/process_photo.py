@@ -0,0 +1,119 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_plus
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from petvida_runtime import aws, event_handler, phase
+from petvida_runtime.photos import CACHE_CONTROL, DERIVED_PREFIX, FORMATS, SIZES, derived_key
+
+# =========================
+# Logger configuration
+# =========================
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# =========================
+# Constants
+# =========================
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+# fotos de celular passam de 12 MP; acima disso é suspeito
+Image.MAX_IMAGE_PIXELS = 60_000_000
+
+
+# =========================
+# Imagem
+# =========================
+def render(source: bytes) -> dict:
+    """Original -> {(tamanho, formato): bytes}, sem EXIF."""
+    largest = max(SIZES.values())
+
+    with Image.open(io.BytesIO(source)) as original:
+        # JPEG: decodifica já reduzido (escala do DCT), bem mais rápido
+        original.draft("RGB", (largest, largest))
+
+        # aplica a orientação do EXIF antes de descartá-lo
+        image = ImageOps.exif_transpose(original)
+        icc_profile = original.info.get("icc_profile")
+
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+    rendered = {}
+
+    # do maior para o menor: cada tamanho parte do anterior
+    for size, pixels in sorted(SIZES.items(), key=lambda s: -s[1]):
+        image = image.copy()
+        image.thumbnail((pixels, pixels), Image.LANCZOS)
+
+        for fmt in FORMATS:
+            out = io.BytesIO()
+            # sem exif=...: o arquivo salvo não leva EXIF (GPS, câmera)
+            image.save(out, icc_profile=icc_profile, **SAVE_OPTIONS[fmt])
+            rendered[(size, fmt)] = out.getvalue()
+
+    return rendered
+
+
+# =========================
+# S3
+# =========================
+def process(s3, bucket: str, key: str) -> int:
+    source = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+    try:
+        with phase("render"):
+            rendered = render(source)
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        # não adianta tentar de novo
+        logger.warning(f"⚠️ Arquivo não é uma imagem válida | key={key}")
+        return 0
+
+    def put(item):
+        (size, fmt), body = item
+        s3.put_object(
+            Bucket=bucket,
+            Key=derived_key(key, size, fmt),
+            Body=body,
+            ContentType=CONTENT_TYPES[fmt],
+            CacheControl=CACHE_CONTROL,  # key derivada de uma key versionada
+        )
+
+    # Latency.s3: tempo de relógio dos uploads em paralelo
+    with phase("s3"), ThreadPoolExecutor(max_workers=len(rendered)) as pool:
+        list(pool.map(put, rendered.items()))
+
+    logger.info(
+        f"🖼️ Derivados gerados | key={key} original={len(source)}B "
+        f"thumb.webp={len(rendered[('thumb', 'webp')])}B"
+    )
+    return len(rendered)
+
+
+@event_handler()
+def lambda_handler(event, context):
+    s3 = aws.client("s3")  # criado antes das threads
+    written = 0
+
+    for record in event.get("Records", []):
+        bucket = record["s3"]["bucket"]["name"]
+        key = unquote_plus(record["s3"]["object"]["key"])
+
+        # os próprios derivados também disparam ObjectCreated
+        if key.startswith(DERIVED_PREFIX):
+            continue
+
+        written += process(s3, bucket, key)
+
+    return {"derived": written}
@@ -0,0 +1,167 @@
+import os
+import logging
+from datetime import datetime, timezone
+
+from petvida_runtime import aws, dumps, event_handler
+from petvida_runtime.health_keys import summary_key
+from petvida_runtime.pagination import iter_pages
+from petvida_runtime.reminders import day_partitions, is_current, sweep_dates
+
+# =========================
+# LOGGING
+# =========================
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# =========================
+# ENV VARS
+# =========================
+REMINDERS_TABLE = os.environ["REMINDERS_TABLE"]
+USERS_TABLE = os.environ["USERS_TABLE_NAME"]
+HEALTH_TABLE = os.environ["HEALTH_RECORDS_TABLE"]
+DISPATCH_QUEUE_URL = os.environ["REMINDERS_DISPATCH_QUEUE_URL"]
+
+PAGE_SIZE = 100
+SQS_BATCH = 10          # limite do SendMessageBatch
+BATCH_GET_LIMIT = 100   # limite do BatchGetItem
+
+
+def batch_get(table_name: str, keys: list, **projection):
+    """Itens de `keys` em lotes de 100, reenviando os UnprocessedKeys."""
+    for start in range(0, len(keys), BATCH_GET_LIMIT):
+        request = {table_name: {"Keys": keys[start:start + BATCH_GET_LIMIT], **projection}}
+
+        while request:
+            result = aws.resource("dynamodb").batch_get_item(RequestItems=request)
+            yield from result.get("Responses", {}).get(table_name, [])
+            request = result.get("UnprocessedKeys")
+
+# =========================
+# PREFERÊNCIAS (BatchGetItem)
+# =========================
+# remindersEnabled é conferido na hora do envio, não na gravação: quem
+# desligou os lembretes depois de cadastrar a vacina não recebe.
+def load_profiles(user_ids, cache: dict):
+    missing = [u for u in user_ids if u not in cache]
+
+    keys = [{"PK": f"USER#{u}", "SK": "PROFILE"} for u in missing]
+    for item in batch_get(USERS_TABLE, keys,
+                          ProjectionExpression="PK, email, #name, preferences",
+                          ExpressionAttributeNames={"#name": "name"}):
+        cache[item["PK"].removeprefix("USER#")] = item
+
+    for user_id in missing:
+        cache.setdefault(user_id, {})
+
+# =========================
+# RESUMOS DOS PETS (BatchGetItem)
+# =========================
+# O SUMMARY diz qual é o último registro de cada vacina/cuidado: o lembrete
+# de um registro que já foi substituído por um mais novo não é enviado.
+def load_summaries(pets, cache: dict):
+    keys = {}
+    for user_id, pet_id in pets:
+        if (user_id, pet_id) not in cache:
+            key = summary_key(user_id, pet_id)
+            keys[(key["PK"], key["SK"])] = (user_id, pet_id)
+
+    for item in batch_get(HEALTH_TABLE, [{"PK": pk, "SK": sk} for pk, sk in keys],
+                          ProjectionExpression="PK, SK, vaccines, care"):
+        cache[keys[(item["PK"], item["SK"])]] = item
+
+    for pet in keys.values():
+        cache.setdefault(pet, None)
+
+# =========================
+# ENVIO (SendMessageBatch)
+# =========================
+def dispatch(batch: list) -> list:
+    """Envia até 10 lembretes; devolve os que o SQS recusou."""
+    entries = [
+        {"Id": str(index), "MessageBody": dumps(message)}
+        for index, message in enumerate(batch)
+    ]
+    result = aws.client("sqs").send_message_batch(
+        QueueUrl=DISPATCH_QUEUE_URL,
+        Entries=entries,
+    )
+    return [batch[int(failed["Id"])] for failed in result.get("Failed", [])]
+
+
+def send_all(messages: list) -> list:
+    """Envia em lotes de 10, com uma nova tentativa para as falhas parciais."""
+    failed = []
+    for start in range(0, len(messages), SQS_BATCH):
+        rejected = dispatch(messages[start:start + SQS_BATCH])
+        if rejected:
+            rejected = dispatch(rejected)
+        failed.extend(rejected)
+    return failed
+
+# =========================
+# HANDLER (agendado, 1x por dia)
+# =========================
+@event_handler()
+def lambda_handler(event, context):
+    # {"date": "YYYY-MM-DD"} reprocessa só um dia específico; o sweep diário
+    # lê hoje e os dias anteriores ainda pendentes (ver reminders.sweep_dates)
+    if (event or {}).get("date"):
+        dates = [event["date"]]
+    else:
+        dates = sweep_dates(datetime.now(timezone.utc).date())
+
+    table = aws.table(REMINDERS_TABLE)
+    profiles, summaries = {}, {}
+    stats = {"due": 0, "sent": 0, "skipped": 0, "superseded": 0, "failed": 0}
+
+    logger.info(f"⏰ Sweep de lembretes | datas={dates[0]}..{dates[-1]}")
+
+    for pk in (pk for remind_on in dates for pk in day_partitions(remind_on)):
+        pages = iter_pages(
+            table,
+            PAGE_SIZE,
+            KeyConditionExpression="PK = :pk",
+            ExpressionAttributeValues={":pk": pk},
+        )
+
+        for items, _ in pages:
+            stats["due"] += len(items)
+            load_profiles(sorted({item["userId"] for item in items}), profiles)
+            load_summaries(sorted({(item["userId"], item["petId"]) for item in items}), summaries)
+
+            messages, done = [], []
+            for item in items:
+                profile = profiles[item["userId"]]
+                if not profile.get("preferences", {}).get("remindersEnabled"):
+                    stats["skipped"] += 1
+                    done.append(item)
+                    continue
+
+                if not is_current(item, summaries[(item["userId"], item["petId"])]):
+                    stats["superseded"] += 1
+                    done.append(item)
+                    continue
+
+                messages.append({
+                    **{k: v for k, v in item.items() if k not in ("PK", "SK", "expiresAt")},
+                    "recordId": item["SK"],
+                    "email": profile.get("email"),
+                    "name": profile.get("name"),
+                })
+
+            failed = {m["recordId"] for m in send_all(messages)}
+            stats["sent"] += len(messages) - len(failed)
+            stats["failed"] += len(failed)
+
+            sent = {m["recordId"] for m in messages} - failed
+            done.extend(item for item in items if item["SK"] in sent)
+
+            # enviados/ignorados/substituídos saem da fila; falhas ficam para
+            # o sweep do dia seguinte
+            with table.batch_writer() as batch:
+                for item in done:
+                    batch.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+
+    logger.info(f"✅ Sweep concluído | {stats}")
+
+    return stats
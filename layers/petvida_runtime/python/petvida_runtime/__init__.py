@@ -0,0 +1,20 @@
+from .handler import api_handler, event_handler
+from .http import BadRequest, Unauthorized, json_body, jwt_claims, path_params, query_params, response
+from .log import get_logger
+from .serialization import dumps
+from .timing import phase
+
+__all__ = [
+    "BadRequest",
+    "Unauthorized",
+    "api_handler",
+    "dumps",
+    "event_handler",
+    "get_logger",
+    "json_body",
+    "jwt_claims",
+    "path_params",
+    "phase",
+    "query_params",
+    "response",
+]
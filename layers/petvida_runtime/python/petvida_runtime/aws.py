@@ -0,0 +1,303 @@
+import os
+from decimal import Decimal
+from time import perf_counter
+
+from . import metrics
+from .timing import record
+
+# =========================
+# Clientes AWS preguiçosos
+# =========================
+# Criados no primeiro uso e reaproveitados enquanto o container viver. Assim
+# uma invocação que falha na validação não paga o import do boto3, e cada
+# chamada à AWS entra nos tempos da invocação com o nome do serviço.
+#
+# No DynamoDB, toda operação pede ReturnConsumedCapacity e a capacidade
+# consumida + itens lidos/escritos entram nas métricas da invocação.
+# DYNAMODB_CONSUMED_CAPACITY=NONE desliga (INDEXES detalha por índice).
+#
+# Todos os clientes usam a mesma configuração: retries adaptativos (backoff
+# + limite de taxa do lado do cliente quando há throttling), keep-alive TCP
+# para as conexões que sobrevivem entre invocações, pool do tamanho das
+# leituras em paralelo e timeouts curtos (um Lambda de API tem 29 s no
+# total; esperar 60 s por um socket travado não ajuda ninguém).
+
+CONSUMED_CAPACITY = os.environ.get("DYNAMODB_CONSUMED_CAPACITY", "TOTAL")
+
+CONNECT_TIMEOUT_SECONDS = float(os.environ.get("AWS_CONNECT_TIMEOUT_SECONDS", "1"))
+READ_TIMEOUT_SECONDS = {"dynamodb": 2.0, "sqs": 3.0}  # demais serviços: DEFAULT_READ_TIMEOUT_SECONDS
+DEFAULT_READ_TIMEOUT_SECONDS = float(os.environ.get("AWS_READ_TIMEOUT_SECONDS", "5"))
+MAX_ATTEMPTS = int(os.environ.get("AWS_MAX_ATTEMPTS", "3"))
+MAX_POOL_CONNECTIONS = 16  # >= threads das leituras em paralelo (get_pet, dashboard, fotos)
+
+_WRITE_OPERATIONS = {
+    "PutItem", "UpdateItem", "DeleteItem", "BatchWriteItem", "TransactWriteItems",
+}
+
+_clients = {}
+_resources = {}
+_tables = {}
+
+
+def _start_timer(model, context, **kwargs):
+    context["petvida_call"] = (model.service_model.service_name, perf_counter())
+
+
+def _stop_timer(context, **kwargs):
+    call = context.pop("petvida_call", None)
+    if call is not None:
+        service, started = call
+        record(service, (perf_counter() - started) * 1000)
+
+
+def _request_capacity(params, model, **kwargs):
+    if CONSUMED_CAPACITY == "NONE":
+        return
+    if "ReturnConsumedCapacity" in model.input_shape.members:
+        params.setdefault("ReturnConsumedCapacity", CONSUMED_CAPACITY)
+
+
+def _count_writes(params, model, **kwargs):
+    name = model.name
+    if name == "BatchWriteItem":
+        count = sum(len(requests) for requests in params.get("RequestItems", {}).values())
+    elif name == "TransactWriteItems":
+        count = len(params.get("TransactItems", []))
+    elif name in _WRITE_OPERATIONS:
+        count = 1
+    else:
+        return
+    metrics.increment("DynamoDBItemsWritten", count)
+
+
+def _record_capacity(http_response, parsed, model, **kwargs):
+    if http_response.status_code >= 300:
+        return
+
+    consumed = parsed.get("ConsumedCapacity")
+    if consumed:
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        units = sum(entry.get("CapacityUnits", 0) for entry in consumed)
+        metric = (
+            "DynamoDBWriteCapacityUnits" if model.name in _WRITE_OPERATIONS
+            else "DynamoDBReadCapacityUnits"
+        )
+        metrics.add(metric, units, "Count")
+
+    if "Count" in parsed:  # Query / Scan
+        metrics.increment("DynamoDBItemsRead", parsed["Count"])
+    elif model.name == "GetItem":
+        metrics.increment("DynamoDBItemsRead", 1 if "Item" in parsed else 0)
+    elif "Responses" in parsed:  # BatchGetItem / TransactGetItems
+        responses = parsed["Responses"]
+        if isinstance(responses, dict):
+            read = sum(len(items) for items in responses.values())
+        else:
+            read = sum(1 for entry in responses if "Item" in entry)
+        metrics.increment("DynamoDBItemsRead", read)
+
+
+def _instrument(botocore_client):
+    events = botocore_client.meta.events
+    # register_first: roda antes de qualquer handler que responda a chamada
+    events.register_first("before-call.*.*", _start_timer)
+    events.register_first("after-call.*.*", _stop_timer)
+    events.register_first("after-call-error.*.*", _stop_timer)
+
+    if botocore_client.meta.service_model.service_name == "dynamodb":
+        events.register("before-parameter-build.dynamodb.*", _request_capacity)
+        events.register("before-parameter-build.dynamodb.*", _count_writes)
+        events.register("after-call.dynamodb.*", _record_capacity)
+
+
+def config(service: str):
+    from botocore.config import Config
+
+    return Config(
+        connect_timeout=CONNECT_TIMEOUT_SECONDS,
+        read_timeout=READ_TIMEOUT_SECONDS.get(service, DEFAULT_READ_TIMEOUT_SECONDS),
+        retries={"mode": "adaptive", "max_attempts": MAX_ATTEMPTS},
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+    )
+
+
+def client(service: str):
+    if service not in _clients:
+        import boto3
+
+        _clients[service] = boto3.client(service, config=config(service))
+        _instrument(_clients[service])
+    return _clients[service]
+
+
+def resource(service: str):
+    if service not in _resources:
+        import boto3
+
+        _resources[service] = boto3.resource(service, config=config(service))
+        _instrument(_resources[service].meta.client)
+    return _resources[service]
+
+
+def table(name: str):
+    if name not in _tables:
+        _tables[name] = FastTable(name)
+    return _tables[name]
+
+
+# =========================
+# DynamoDB sem a camada de resource
+# =========================
+# O resource do boto3 converte tipos percorrendo o modelo de cada operação
+# (entrada e saída), e construí-lo custa um segundo client. FastTable fala
+# com o client de baixo nível: serializa Key/Item/valores com o
+# TypeSerializer e desserializa a resposta com `deserialize`, um despacho
+# direto por tipo. Mesmos argumentos e mesmos tipos de retorno do
+# resource.Table (Decimal, set, Binary), incluindo Key()/Attr() do
+# boto3.dynamodb.conditions.
+
+_serializer = None
+_binary = None
+
+_CONDITION_FIELDS = (
+    ("KeyConditionExpression", True),
+    ("FilterExpression", False),
+    ("ConditionExpression", False),
+)
+_KEY_FIELDS = ("Key", "Item", "ExclusiveStartKey")
+_RESULT_FIELDS = ("Item", "Attributes", "LastEvaluatedKey")
+
+
+def serialize(item: dict) -> dict:
+    """dict comum -> formato do client de baixo nível ({"S": ...})."""
+    global _serializer
+
+    if _serializer is None:
+        from boto3.dynamodb.types import TypeSerializer
+
+        _serializer = TypeSerializer()
+
+    return {k: _serializer.serialize(v) for k, v in item.items()}
+
+
+def _value(attribute: dict):
+    for kind, raw in attribute.items():
+        if kind == "S":
+            return raw
+        if kind == "N":
+            return Decimal(raw)
+        if kind == "M":
+            return {k: _value(v) for k, v in raw.items()}
+        if kind == "L":
+            return [_value(v) for v in raw]
+        if kind == "BOOL":
+            return raw
+        if kind == "NULL":
+            return None
+        if kind == "SS":
+            return set(raw)
+        if kind == "NS":
+            return set(map(Decimal, raw))
+        return _binary_value(kind, raw)
+
+
+def _binary_value(kind, raw):
+    global _binary
+
+    if _binary is None:
+        from boto3.dynamodb.types import Binary
+
+        _binary = Binary
+
+    if kind == "B":
+        return _binary(raw)
+    if kind == "BS":
+        return set(map(_binary, raw))
+    raise TypeError(f"Tipo do DynamoDB desconhecido: {kind}")
+
+
+def deserialize(item: dict) -> dict:
+    """Item no formato do client de baixo nível ({"S": ...}) -> dict comum."""
+    return {k: _value(v) for k, v in item.items()}
+
+
+def _request(table_name: str, params: dict) -> dict:
+    params = dict(params, TableName=table_name)
+    names = dict(params.pop("ExpressionAttributeNames", None) or {})
+    values = dict(params.pop("ExpressionAttributeValues", None) or {})
+
+    builder = None
+    for field, is_key_condition in _CONDITION_FIELDS:
+        condition = params.get(field)
+        if condition is None or isinstance(condition, str):
+            continue
+        if builder is None:
+            from boto3.dynamodb.conditions import ConditionExpressionBuilder
+
+            builder = ConditionExpressionBuilder()
+        built = builder.build_expression(condition, is_key_condition=is_key_condition)
+        params[field] = built.condition_expression
+        names.update(built.attribute_name_placeholders)
+        values.update(built.attribute_value_placeholders)
+
+    if names:
+        params["ExpressionAttributeNames"] = names
+    if values:
+        params["ExpressionAttributeValues"] = serialize(values)
+    for field in _KEY_FIELDS:
+        if field in params:
+            params[field] = serialize(params[field])
+    return params
+
+
+def _result(result: dict) -> dict:
+    for field in _RESULT_FIELDS:
+        if field in result:
+            result[field] = deserialize(result[field])
+    if "Items" in result:
+        result["Items"] = [deserialize(item) for item in result["Items"]]
+    return result
+
+
+class FastTable:
+    """
+    get_item/put_item/update_item/delete_item/query/scan do resource.Table
+    sobre o client de baixo nível. O resto (batch_writer, meta.client, que
+    aceita tipos Python) vai para o resource.Table, criado só se usado.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.table_name = name
+        self._resource_table = None
+
+    def _call(self, operation: str, params: dict) -> dict:
+        method = getattr(client("dynamodb"), operation)
+        return _result(method(**_request(self.name, params)))
+
+    def get_item(self, **params):
+        return self._call("get_item", params)
+
+    def put_item(self, **params):
+        return self._call("put_item", params)
+
+    def update_item(self, **params):
+        return self._call("update_item", params)
+
+    def delete_item(self, **params):
+        return self._call("delete_item", params)
+
+    def query(self, **params):
+        return self._call("query", params)
+
+    def scan(self, **params):
+        return self._call("scan", params)
+
+    def __getattr__(self, attribute):
+        if attribute.startswith("_"):
+            raise AttributeError(attribute)
+        if self._resource_table is None:
+            self._resource_table = resource("dynamodb").Table(self.name)
+        return getattr(self._resource_table, attribute)
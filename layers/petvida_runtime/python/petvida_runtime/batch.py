@@ -0,0 +1,54 @@
+import logging
+import random
+import time
+
+from . import aws
+
+logger = logging.getLogger()
+
+# =========================
+# BatchWriteItem com backoff
+# =========================
+# O batch_writer do boto3 reenvia UnprocessedItems na hora, sem espera, e não
+# diz quais itens falharam. Aqui cada lote de 25 é reenviado com backoff
+# exponencial (full jitter) e os itens que sobram depois de MAX_ATTEMPTS são
+# devolvidos, para o chamador responder por registro.
+
+BATCH_WRITE_LIMIT = 25
+MAX_ATTEMPTS = 6
+BASE_DELAY = 0.05
+MAX_DELAY = 2.0
+
+
+def _backoff(attempt: int):
+    time.sleep(random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt)))
+
+
+def _write_chunk(table_name: str, items: list) -> list:
+    from botocore.exceptions import ClientError
+
+    request = {table_name: [{"PutRequest": {"Item": aws.serialize(item)}} for item in items]}
+
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            result = aws.client("dynamodb").batch_write_item(RequestItems=request)
+        except ClientError:
+            logger.exception(f"❌ BatchWriteItem falhou | itens={len(items)}")
+            break
+
+        request = result.get("UnprocessedItems") or {}
+        if not request:
+            return []
+
+        if attempt < MAX_ATTEMPTS - 1:
+            _backoff(attempt)
+
+    return [aws.deserialize(put["PutRequest"]["Item"]) for put in request.get(table_name, [])]
+
+
+def batch_put(table_name: str, items: list) -> list:
+    """Grava `items` em lotes de 25; devolve os itens que não foram gravados."""
+    failed = []
+    for start in range(0, len(items), BATCH_WRITE_LIMIT):
+        failed.extend(_write_chunk(table_name, items[start:start + BATCH_WRITE_LIMIT]))
+    return failed
@@ -0,0 +1,103 @@
+import functools
+import logging
+from time import perf_counter
+
+from . import log, metrics, timing
+from .http import BadRequest, Unauthorized, response
+
+logger = logging.getLogger()
+
+# primeira invocação do container (import + init pagos nesta)
+_cold_start = True
+
+
+def _begin(context):
+    global _cold_start
+
+    timing.reset()
+    metrics.reset()
+    request_id = getattr(context, "aws_request_id", None)
+    log.set_request_id(request_id)
+
+    metrics.increment("ColdStart", 1 if _cold_start else 0)
+    metrics.set_property("coldStart", _cold_start)
+    metrics.set_property("requestId", request_id)
+    _cold_start = False
+
+    return perf_counter()
+
+
+def _end(started) -> float:
+    """Tempos por fase + total viram métricas; devolve o total em ms."""
+    total_ms = (perf_counter() - started) * 1000
+
+    for name, elapsed_ms in timing.phases().items():
+        metrics.add(f"Latency.{name}", round(elapsed_ms, 3), "Milliseconds")
+    metrics.add("Latency.total", round(total_ms, 3), "Milliseconds")
+
+    return total_ms
+
+
+def api_handler(error_message="Internal server error"):
+    """
+    Decorator dos handlers HTTP: zera os tempos da invocação, marca os logs
+    com o requestId, converte BadRequest em 400, Unauthorized em 401,
+    qualquer outra exceção em 500 com `error_message`, devolve os tempos por
+    fase no header Server-Timing e escreve as métricas da invocação (por
+    rota).
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(event, context):
+            started = _begin(context)
+            route = (event or {}).get("routeKey")
+            if route:
+                metrics.set_dimension("Route", route)
+
+            try:
+                result = fn(event, context)
+            except BadRequest as e:
+                result = response(400, {"message": str(e)})
+            except Unauthorized as e:
+                result = response(401, {"message": str(e)})
+            except Exception:
+                logger.exception("🔥 Unexpected error")
+                result = response(500, {"message": error_message})
+
+            status = result.get("statusCode", 200)
+            metrics.increment("Errors.4xx", 1 if 400 <= status < 500 else 0)
+            metrics.increment("Errors.5xx", 1 if status >= 500 else 0)
+
+            headers = result.setdefault("headers", {})
+            headers["Server-Timing"] = timing.server_timing(_end(started))
+            metrics.flush()
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def event_handler():
+    """
+    Decorator dos handlers sem HTTP (SQS, S3, agendados): mesmos tempos e
+    métricas do api_handler, mas exceções sobem para o Lambda (retry/DLQ).
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(event, context):
+            started = _begin(context)
+            try:
+                return fn(event, context)
+            except Exception:
+                metrics.increment("Errors")
+                raise
+            finally:
+                _end(started)
+                metrics.flush()
+
+        return wrapper
+
+    return decorator
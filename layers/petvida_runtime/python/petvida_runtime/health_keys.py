@@ -0,0 +1,185 @@
+import os
+
+# =========================
+# Chaves dos registros de saúde
+# =========================
+# Layout por usuário (legado):
+#   PK: USER#<userId>
+#   SK: PET#<petId>#<TYPE>#<createdAt>   (resumo: PET#<petId>#SUMMARY)
+#
+# Layout por pet:
+#   PK: PET#<petId>#USER#<userId>
+#   SK: <TYPE>#<data do evento>#<recordId>   (resumo: SUMMARY)
+# Cada pet tem a própria partição: uma conta com muitos pets (ou uma
+# clínica) deixa de concentrar todas as leituras e escritas numa chave só, e
+# "registros de um tipo do pet, do mais recente" é uma query na tabela, sem
+# índice. O userId fica na chave porque o petId pode vir do front (add_pet):
+# dois tutores com o mesmo petId não dividem a partição.
+#
+# GSI1 (esparso, só registros de vacina/cuidado) - índice do dono:
+#   GSI1PK: USER#<userId>#<TYPE>
+#   GSI1SK: <data do evento>#<recordId>
+# Lista os registros de um tipo do usuário já ordenados pela data do evento
+# (appliedAt para vacinas, performedAt para cuidados), nos dois layouts.
+#
+# GSI2 (esparso, só layout por usuário):
+#   GSI2PK: USER#<userId>#PET#<petId>#<TYPE>
+#   GSI2SK: <data do evento>#<recordId>
+# Mesma ordenação, restrita a um pet: "últimos N cuidados" vira uma única
+# query com ScanIndexForward=False e Limit=N.
+#
+# =========================
+# Migração (HEALTH_LAYOUT)
+# =========================
+#   user: grava e lê no layout por usuário (padrão)
+#   dual: grava nos dois layouts e lê no por usuário. A cópia por pet não tem
+#         GSI1: cada registro aparece uma vez só no índice do dono
+#   pet:  grava e lê no layout por pet
+# Sem downtime: deploy com dual, scripts/migrate_health_partitions.py
+# --phase copy, deploy com pet, --phase finalize (passa o GSI1 para a cópia
+# por pet e apaga o item legado, na mesma transação).
+
+LAYOUTS = ("user", "dual", "pet")
+
+LAYOUT = os.environ.get("HEALTH_LAYOUT", "user")
+if LAYOUT not in LAYOUTS:
+    raise ValueError(f"HEALTH_LAYOUT inválido: {LAYOUT} (use {', '.join(LAYOUTS)})")
+
+OWNER_INDEX = "GSI1"
+OWNER_INDEX_KEYS = ("PK", "SK", "GSI1PK", "GSI1SK")
+
+PET_INDEX = "GSI2"
+PET_INDEX_KEYS = ("PK", "SK", "GSI2PK", "GSI2SK")
+
+SUMMARY_SK = "SUMMARY"
+
+EVENT_DATE_FIELD = {
+    "VACCINE": "appliedAt",
+    "CARE": "performedAt",
+}
+
+_LEGACY_KEYS = ("PK", "SK", "GSI1PK", "GSI1SK", "GSI2PK", "GSI2SK")
+
+
+def reads_by_pet(layout: str = None) -> bool:
+    return (layout or LAYOUT) == "pet"
+
+
+def dual_write(layout: str = None) -> bool:
+    return (layout or LAYOUT) == "dual"
+
+
+def owner_index_pk(user_id: str, record_type: str) -> str:
+    return f"USER#{user_id}#{record_type}"
+
+
+def pet_index_pk(user_id: str, pet_id: str, record_type: str) -> str:
+    return f"USER#{user_id}#PET#{pet_id}#{record_type}"
+
+
+def pet_pk(user_id: str, pet_id: str) -> str:
+    return f"PET#{pet_id}#USER#{user_id}"
+
+
+def is_pet_keyed(item: dict) -> bool:
+    return item["PK"].startswith("PET#")
+
+
+def pet_id_from_sk(sk: str) -> str:
+    # PET#<petId>#<TYPE>#<createdAt> (layout por usuário)
+    return sk.split("#", 2)[1]
+
+
+def owner_and_pet(item: dict) -> tuple:
+    """(userId, petId) de um item de qualquer layout, inclusive os antigos sem os campos."""
+    if "userId" in item and "petId" in item:
+        return item["userId"], item["petId"]
+    if is_pet_keyed(item):
+        _, pet_id, _, user_id = item["PK"].split("#", 3)
+        return user_id, pet_id
+    return item["PK"].split("#", 1)[1], pet_id_from_sk(item["SK"])
+
+
+def _sort_key(item: dict) -> str:
+    record_type = item["type"]
+    event_date = item.get(EVENT_DATE_FIELD[record_type]) or item["createdAt"]
+    return f"{event_date}#{item['recordId']}"
+
+
+def index_keys(user_id: str, pet_id: str, item: dict) -> dict:
+    sort_key = _sort_key(item)
+    return {
+        "GSI1PK": owner_index_pk(user_id, item["type"]),
+        "GSI1SK": sort_key,
+        "GSI2PK": pet_index_pk(user_id, pet_id, item["type"]),
+        "GSI2SK": sort_key,
+    }
+
+
+def record_keys(user_id: str, pet_id: str, item: dict, layout: str = None) -> dict:
+    """Chaves (tabela + índices) de um registro novo no layout de gravação principal."""
+    if not reads_by_pet(layout):
+        return {
+            "PK": f"USER#{user_id}",
+            "SK": f"PET#{pet_id}#{item['type']}#{item['createdAt']}",
+            **index_keys(user_id, pet_id, item),
+        }
+
+    return {
+        "PK": pet_pk(user_id, pet_id),
+        "SK": f"{item['type']}#{_sort_key(item)}",
+        "GSI1PK": owner_index_pk(user_id, item["type"]),
+        "GSI1SK": _sort_key(item),
+    }
+
+
+def pet_keyed_copy(item: dict, owner_index: bool = False) -> dict:
+    """
+    Cópia por pet de um item do layout por usuário (registro ou resumo).
+    Sem owner_index a cópia fica fora do GSI1, onde o item legado continua.
+    """
+    user_id, pet_id = owner_and_pet(item)
+    copy = {k: v for k, v in item.items() if k not in _LEGACY_KEYS}
+    copy.update(userId=user_id, petId=pet_id, PK=pet_pk(user_id, pet_id))
+
+    if item["type"] == SUMMARY_SK:
+        copy["SK"] = SUMMARY_SK
+        return copy
+
+    copy["SK"] = f"{item['type']}#{_sort_key(item)}"
+    if owner_index:
+        copy["GSI1PK"] = owner_index_pk(user_id, item["type"])
+        copy["GSI1SK"] = _sort_key(item)
+    return copy
+
+
+def stored_items(items: list, layout: str = None) -> list:
+    """O que gravar para `items`: no modo dual, também as cópias por pet."""
+    if not dual_write(layout):
+        return list(items)
+    return [*items, *(pet_keyed_copy(item) for item in items)]
+
+
+def summary_key(user_id: str, pet_id: str, layout: str = None) -> dict:
+    if reads_by_pet(layout):
+        return {"PK": pet_pk(user_id, pet_id), "SK": SUMMARY_SK}
+    return {"PK": f"USER#{user_id}", "SK": f"PET#{pet_id}#{SUMMARY_SK}"}
+
+
+def pet_records_query(user_id: str, pet_id: str, record_type: str, layout: str = None) -> tuple:
+    """
+    (kwargs, atributos da chave) da query dos registros de um tipo de um pet,
+    na ordem da data do evento. Valores em tipos Python: o client de baixo
+    nível precisa de aws.serialize em ExpressionAttributeValues.
+    """
+    if reads_by_pet(layout):
+        return {
+            "KeyConditionExpression": "PK = :pk AND begins_with(SK, :type)",
+            "ExpressionAttributeValues": {":pk": pet_pk(user_id, pet_id), ":type": f"{record_type}#"},
+        }, ("PK", "SK")
+
+    return {
+        "IndexName": PET_INDEX,
+        "KeyConditionExpression": "GSI2PK = :pk",
+        "ExpressionAttributeValues": {":pk": pet_index_pk(user_id, pet_id, record_type)},
+    }, PET_INDEX_KEYS
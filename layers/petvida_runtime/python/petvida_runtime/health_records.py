@@ -0,0 +1,196 @@
+import logging
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from .batch import batch_put
+from .health_keys import dual_write, is_pet_keyed, record_keys, stored_items
+from .health_summary import write_with_summary
+from .http import BadRequest, response
+from .reminders import schedule_reminders
+
+logger = logging.getLogger()
+
+# =========================
+# Registros de saúde (vacina / cuidado)
+# =========================
+# Validação e montagem do item, compartilhadas pelos POST unitários e pelos
+# endpoints em lote (import_batch). Dados inválidos levantam BadRequest com a
+# mesma mensagem que o POST unitário sempre devolveu.
+
+
+def vaccine_item(user_id, pet_id, body: dict, created_at: datetime = None) -> dict:
+    name = body.get("name")
+    applied_at = body.get("appliedAt")
+    next_dose = body.get("nextDose")
+
+    if not user_id or not pet_id or not name or not applied_at:
+        raise BadRequest("petId, name e appliedAt são obrigatórios")
+
+    now_iso = (created_at or datetime.utcnow()).isoformat()
+
+    item = {
+        "type": "VACCINE",
+        "userId": user_id,
+        "petId": pet_id,
+        "recordId": str(uuid4()),
+        "name": name,
+        "appliedAt": applied_at,
+        "createdAt": now_iso,
+    }
+
+    if next_dose:
+        item["nextDueDate"] = next_dose
+
+    # PK/SK/GSIs do layout de gravação (health_keys.LAYOUT)
+    return {**record_keys(user_id, pet_id, item), **item}
+
+
+def care_item(user_id, pet_id, body: dict, created_at: datetime = None) -> dict:
+    care_type = body.get("type")
+    performed_at = body.get("performedAt")
+    periodicity = body.get("periodicity", "30")
+    notes = body.get("notes")
+
+    if not user_id or not pet_id or not care_type or not performed_at:
+        raise BadRequest("userId, petId, type e performedAt são obrigatórios")
+
+    now_iso = (created_at or datetime.utcnow()).isoformat()
+
+    # calcula próxima data
+    try:
+        next_due_date = (
+            datetime.fromisoformat(performed_at) +
+            timedelta(days=int(periodicity))
+        ).date().isoformat()
+    except (TypeError, ValueError):
+        raise BadRequest("performedAt ou periodicity inválidos")
+
+    item = {
+        "type": "CARE",
+        "userId": user_id,
+        "petId": pet_id,
+        "recordId": str(uuid4()),
+        "careType": care_type,
+        "performedAt": performed_at,
+        "periodicity": periodicity,
+        "nextDueDate": next_due_date,
+        "createdAt": now_iso,
+    }
+
+    if notes:
+        item["notes"] = notes
+
+    # PK/SK/GSIs do layout de gravação (health_keys.LAYOUT)
+    return {**record_keys(user_id, pet_id, item), **item}
+
+
+# =========================
+# Importação em lote
+# =========================
+MAX_BATCH_RECORDS = 500
+
+
+def build_batch(user_id, default_pet_id, records, build) -> tuple:
+    """
+    Valida todos os registros antes de gravar qualquer um. Devolve
+    (itens, erros); erros é uma lista de {"index", "message"}.
+
+    Cada registro recebe um createdAt distinto (+1 µs por posição), para que
+    registros do mesmo pet no lote não colidam no SK.
+    """
+    if not isinstance(records, list) or not records:
+        raise BadRequest("records deve ser uma lista não vazia")
+
+    if len(records) > MAX_BATCH_RECORDS:
+        raise BadRequest(f"máximo de {MAX_BATCH_RECORDS} registros por lote")
+
+    now = datetime.utcnow()
+    items, errors = [], []
+
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append({"index": index, "message": "registro deve ser um objeto"})
+            continue
+
+        pet_id = record.get("petId") or default_pet_id
+        try:
+            items.append(build(user_id, pet_id, record, now + timedelta(microseconds=index)))
+        except BadRequest as e:
+            errors.append({"index": index, "message": str(e)})
+
+    return items, errors
+
+
+def put_records(table_name: str, items: list) -> set:
+    """
+    Grava `items` com batch_put (no modo dual, com as cópias por pet no mesmo
+    BatchWriteItem). Devolve os recordIds não gravados no layout lido pelos
+    handlers; cópia por pet que falhar só é logada, --phase copy de
+    scripts/migrate_health_partitions.py completa depois.
+    """
+    failed = batch_put(table_name, stored_items(items))
+
+    if dual_write():
+        copies = [item["recordId"] for item in failed if is_pet_keyed(item)]
+        if copies:
+            logger.warning(f"⚠️ Cópias por pet não gravadas | recordIds={copies}")
+        failed = [item for item in failed if not is_pet_keyed(item)]
+
+    return {item["recordId"] for item in failed}
+
+
+def import_batch(table_name: str, reminders_table_name: str, users_table_name: str,
+                 body: dict, build, message: str) -> dict:
+    """
+    Fluxo dos endpoints em lote (post_vaccines_batch, post_care_batch), com
+    `build` (vaccine_item/care_item) montando cada item: valida tudo antes de
+    gravar, grava com put_records, atualiza o resumo de cada pet e agenda os
+    lembretes. Resposta 201 com `message`, 207 se algum registro falhou, 400
+    se algum é inválido.
+    """
+    user_id = body.get("userId")
+
+    # 🔒 valida tudo antes de gravar qualquer registro
+    items, errors = build_batch(user_id, body.get("petId"), body.get("records"), build)
+
+    if errors:
+        return response(400, {"message": "Registros inválidos", "errors": errors})
+
+    # BatchWriteItem em lotes de 25, com backoff nos UnprocessedItems
+    failed = put_records(table_name, items)
+
+    results = [
+        {
+            "index": index,
+            "recordId": item["recordId"],
+            "status": "failed" if item["recordId"] in failed else "created",
+        }
+        for index, item in enumerate(items)
+    ]
+
+    created = [item for item in items if item["recordId"] not in failed]
+
+    # resumo de cada pet com os registros gravados (version condicional).
+    # Não é atômico com o BatchWriteItem: se falhar, rebuild_health_summaries
+    # recalcula a partir dos registros.
+    by_pet = {}
+    for item in created:
+        by_pet.setdefault(item["petId"], []).append(item)
+
+    for pet_id, pet_items in by_pet.items():
+        try:
+            write_with_summary(table_name, user_id, pet_id, pet_items, put_records=False)
+        except Exception:
+            logger.exception(f"⚠️ Resumo não atualizado | petId={pet_id}")
+
+    schedule_reminders(
+        reminders_table_name, users_table_name, user_id,
+        [(item["petId"], item) for item in created],
+    )
+
+    return response(207 if failed else 201, {
+        "message": message if not failed else "Importação parcial",
+        "created": len(created),
+        "failed": len(failed),
+        "results": results,
+    })
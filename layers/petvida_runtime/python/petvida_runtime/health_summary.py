@@ -0,0 +1,238 @@
+import hashlib
+from datetime import datetime, timezone
+
+from . import aws
+from .health_keys import EVENT_DATE_FIELD, SUMMARY_SK, dual_write, pet_keyed_copy, stored_items, summary_key
+
+# =========================
+# Resumo de saúde de um pet
+# =========================
+# "Próximos vencimentos": para cada vacina (name) / cuidado (careType), vale o
+# nextDueDate do registro mais recente. Os registros devem vir do mais
+# recente para o mais antigo (GSI2 com ScanIndexForward=False).
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def next_due(records: list, today: str = None) -> list:
+    today = today or _today()
+    seen, due = set(), []
+
+    for record in records:
+        title = record.get("name") or record.get("careType")
+        key = (record["type"], title)
+        if key in seen or not record.get("nextDueDate"):
+            continue
+        seen.add(key)
+
+        due.append({
+            "type": record["type"],
+            "title": title,
+            "recordId": record.get("recordId"),
+            "nextDueDate": record["nextDueDate"],
+            "overdue": record["nextDueDate"] < today,
+        })
+
+    return sorted(due, key=lambda d: d["nextDueDate"])
+
+
+def summarize(records: list, today: str = None) -> dict:
+    """{"nextDue": próximo vencimento ainda não vencido, "overdueCount": n}"""
+    due = next_due(records, today)
+    upcoming = [d for d in due if not d["overdue"]]
+
+    return {
+        "nextDue": upcoming[0] if upcoming else None,
+        "overdueCount": len(due) - len(upcoming),
+    }
+
+
+# =========================
+# Item SUMMARY (materializado na escrita)
+# =========================
+#   layout por usuário: PK USER#<userId>, SK PET#<petId>#SUMMARY
+#   layout por pet:     PK PET#<petId>#USER#<userId>, SK SUMMARY
+#   (health_keys.summary_key, conforme HEALTH_LAYOUT)
+#   vaccines: {<name>: {recordId, eventDate, createdAt, nextDueDate}}
+#   care:     {<careType>: {...}}
+#   vaccineCount, careCount, nextDueDate (o menor), version
+#
+# post_vaccine/post_care gravam o registro e o resumo na mesma
+# TransactWriteItems, com condição na version (concorrência otimista) e
+# ClientRequestToken derivado do recordId + version: a retentativa do SDK da
+# mesma transação não conta o registro duas vezes. Para ler o status de um
+# pet basta um GetItem (ou BatchGetItem para vários). No modo dual as cópias
+# por pet (registros e resumo) entram na mesma transação.
+
+SUMMARY_TYPE = SUMMARY_SK
+SUMMARY_GROUPS = {"VACCINE": ("vaccines", "vaccineCount"), "CARE": ("care", "careCount")}
+MAX_ATTEMPTS = 5
+
+
+class SummaryConflict(Exception):
+    pass
+
+
+def empty_summary(user_id: str, pet_id: str) -> dict:
+    return {
+        **summary_key(user_id, pet_id),
+        "type": SUMMARY_TYPE,
+        "userId": user_id,
+        "petId": pet_id,
+        "vaccines": {},
+        "care": {},
+        "vaccineCount": 0,
+        "careCount": 0,
+        "version": 0,
+    }
+
+
+def apply_records(summary: dict, records: list) -> dict:
+    """Novo resumo com `records` (vacinas/cuidados recém-gravados) incluídos."""
+    summary = {
+        **summary,
+        "vaccines": dict(summary.get("vaccines") or {}),
+        "care": dict(summary.get("care") or {}),
+    }
+
+    for record in records:
+        group, counter = SUMMARY_GROUPS[record["type"]]
+        title = record.get("name") or record.get("careType")
+        event_date = record.get(EVENT_DATE_FIELD[record["type"]]) or record["createdAt"]
+
+        entry = {
+            "recordId": record["recordId"],
+            "eventDate": event_date,
+            "createdAt": record["createdAt"],
+        }
+        if record.get("nextDueDate"):
+            entry["nextDueDate"] = record["nextDueDate"]
+
+        current = summary[group].get(title)
+        if current is None or (event_date, record["createdAt"]) >= (current["eventDate"], current["createdAt"]):
+            summary[group][title] = entry
+
+        summary[counter] = summary.get(counter, 0) + 1
+
+    due_dates = [
+        entry["nextDueDate"]
+        for group in ("vaccines", "care")
+        for entry in summary[group].values()
+        if entry.get("nextDueDate")
+    ]
+    if due_dates:
+        summary["nextDueDate"] = min(due_dates)
+    else:
+        summary.pop("nextDueDate", None)
+
+    return summary
+
+
+def summary_records(summary: dict) -> list:
+    """O último registro de cada vacina/cuidado, no formato aceito por summarize."""
+    records = []
+    for record_type, (group, _) in SUMMARY_GROUPS.items():
+        title_field = "name" if record_type == "VACCINE" else "careType"
+        for title, entry in (summary.get(group) or {}).items():
+            records.append({"type": record_type, title_field: title, **entry})
+    return records
+
+
+def summarize_item(summary: dict, today: str = None) -> dict:
+    return {
+        **summarize(summary_records(summary), today),
+        "vaccineCount": int(summary.get("vaccineCount", 0)),
+        "careCount": int(summary.get("careCount", 0)),
+    }
+
+
+def _request_token(record_ids: list, expected_version, attempt: int) -> str:
+    # até 36 caracteres; muda a cada tentativa nossa (o item do resumo muda),
+    # mas é o mesmo nas retentativas automáticas do SDK
+    raw = f"{','.join(record_ids)}#{expected_version}#{attempt}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:36]
+
+
+def write_with_summary(table_name: str, user_id: str, pet_id: str, records: list,
+                       put_records: bool = True, extra_items: list = ()) -> dict:
+    """
+    Atualiza o resumo do pet com `records`. Com put_records=True (até 99
+    registros; 49 no modo dual) os registros e o resumo vão na mesma
+    TransactWriteItems; com False os registros já foram gravados e só o
+    resumo é atualizado. `extra_items` entram na mesma transação (ex.:
+    idempotency.completion). Conflito de version relê o resumo e tenta de novo.
+    """
+    from botocore.exceptions import ClientError
+
+    table = aws.table(table_name)
+    key = summary_key(user_id, pet_id)
+
+    for attempt in range(MAX_ATTEMPTS):
+        current = table.get_item(Key=key, ConsistentRead=True).get("Item")
+        expected = current["version"] if current else None
+
+        summary = apply_records(current or empty_summary(user_id, pet_id), records)
+        summary["userId"] = user_id  # resumos antigos não têm
+        summary["version"] = (expected or 0) + 1
+        summary["updatedAt"] = datetime.now(timezone.utc).isoformat()
+
+        if expected is None:
+            condition = {"ConditionExpression": "attribute_not_exists(PK)"}
+        else:
+            condition = {
+                "ConditionExpression": "#version = :expected",
+                "ExpressionAttributeNames": {"#version": "version"},
+                "ExpressionAttributeValues": {":expected": expected},
+            }
+
+        try:
+            if not put_records and not dual_write() and not extra_items:
+                table.put_item(Item=summary, **condition)
+                return summary
+
+            # client de baixo nível: itens e valores no formato {"S": ...}
+            summary_put = {"TableName": table_name, "Item": aws.serialize(summary), **condition}
+            if "ExpressionAttributeValues" in condition:
+                summary_put["ExpressionAttributeValues"] = aws.serialize(condition["ExpressionAttributeValues"])
+
+            transact_items = [
+                {"Put": {
+                    "TableName": table_name,
+                    "Item": aws.serialize(record),
+                    "ConditionExpression": "attribute_not_exists(PK)",
+                }}
+                for record in (stored_items(records) if put_records else [])
+            ]
+            summary_index = len(transact_items)
+            transact_items.append({"Put": summary_put})
+
+            if dual_write():
+                # a version vale no resumo legado; a cópia só acompanha
+                transact_items.append({"Put": {
+                    "TableName": table_name,
+                    "Item": aws.serialize(pet_keyed_copy(summary)),
+                }})
+            transact_items.extend(extra_items)
+
+            aws.client("dynamodb").transact_write_items(
+                TransactItems=transact_items,
+                ClientRequestToken=_request_token([r["recordId"] for r in records], expected, attempt),
+            )
+            return summary
+
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+
+            if code == "ConditionalCheckFailedException":
+                continue  # resumo mudou entre a leitura e a escrita
+
+            if code == "TransactionCanceledException":
+                reasons = e.response.get("CancellationReasons") or []
+                summary_reason = reasons[summary_index].get("Code") if len(reasons) > summary_index else None
+                if summary_reason in ("ConditionalCheckFailed", "TransactionConflict"):
+                    continue
+            raise
+
+    raise SummaryConflict(f"resumo do pet {pet_id} em conflito após {MAX_ATTEMPTS} tentativas")
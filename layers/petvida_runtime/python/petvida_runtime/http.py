@@ -0,0 +1,59 @@
+import base64
+import json
+
+from .serialization import dumps
+from .timing import phase
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",  # DEV
+}
+
+
+class BadRequest(Exception):
+    """Erro de validação do request; vira um 400 com a mensagem."""
+
+
+class Unauthorized(Exception):
+    """Requisição sem credencial válida; vira um 401 com a mensagem."""
+
+
+def json_body(event) -> dict:
+    raw = event.get("body") or "{}"
+
+    with phase("parse"):
+        if event.get("isBase64Encoded"):
+            raw = base64.b64decode(raw).decode("utf-8")
+
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            raise BadRequest("JSON inválido")
+
+    if not isinstance(body, dict):
+        raise BadRequest("JSON inválido")
+
+    return body
+
+
+def query_params(event) -> dict:
+    return event.get("queryStringParameters") or {}
+
+
+def path_params(event) -> dict:
+    return event.get("pathParameters") or {}
+
+
+def jwt_claims(event) -> dict:
+    return event["requestContext"]["authorizer"]["jwt"]["claims"]
+
+
+def response(status_code, body, headers=None):
+    with phase("serialize"):
+        payload = dumps(body)
+
+    return {
+        "statusCode": status_code,
+        "headers": {**DEFAULT_HEADERS, **headers} if headers else dict(DEFAULT_HEADERS),
+        "body": payload,
+    }
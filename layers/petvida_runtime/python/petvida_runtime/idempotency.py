@@ -0,0 +1,216 @@
+import functools
+import hashlib
+import os
+import time
+import uuid
+
+from . import aws, metrics
+from .http import DEFAULT_HEADERS, BadRequest, response
+
+# =========================
+# Idempotency-Key
+# =========================
+# Os POST que criam registros aceitam o header Idempotency-Key. A primeira
+# requisição com a chave a reserva (PutItem condicional) e, ao terminar,
+# grava a resposta no mesmo item; a repetição (retry do cliente depois de um
+# timeout) devolve a resposta gravada sem escrever de novo.
+#
+# Tabela Idempotency:
+#   PK: <routeKey>#<sub>#<chave>
+#   status: IN_PROGRESS | COMPLETED
+#   fingerprint: sha256 do body (mesma chave com outro body -> 422)
+#   token: requestId da invocação dona da reserva
+#   response: {statusCode, body}
+#   expiresAt: TTL
+#
+# A reserva vence em IN_PROGRESS_SECONDS (acima do timeout das lambdas): se a
+# invocação morrer no meio, a chave volta a valer depois disso. Handlers que
+# gravam numa TransactWriteItems incluem completion(context, result) na
+# transação: registro e resposta gravados juntos, ou nenhum dos dois.
+#
+# A reserva da invocação viaja no próprio context do Lambda (um objeto novo
+# por invocação), não num global do módulo: nada passa de uma invocação para
+# a seguinte no mesmo container.
+
+TABLE_NAME = os.environ.get("IDEMPOTENCY_TABLE")
+HEADER = "idempotency-key"
+
+RESPONSE_TTL_SECONDS = 24 * 3600
+IN_PROGRESS_SECONDS = 60
+MAX_KEY_LENGTH = 255
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
+# atributo do context com a reserva da invocação (completion)
+CONTEXT_ATTRIBUTE = "idempotency_claim"
+
+
+def _header(event, name: str):
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _subject(event) -> str:
+    authorizer = (event.get("requestContext") or {}).get("authorizer") or {}
+    return ((authorizer.get("jwt") or {}).get("claims") or {}).get("sub", "")
+
+
+def _new_claim(event, context, key: str) -> dict:
+    body = (event.get("body") or "").encode("utf-8")
+    return {
+        "PK": f"{event.get('routeKey', '')}#{_subject(event)}#{key}",
+        "fingerprint": hashlib.sha256(body).hexdigest(),
+        "token": getattr(context, "aws_request_id", None) or str(uuid.uuid4()),
+    }
+
+
+def _owned(claim: dict) -> dict:
+    return {
+        "ConditionExpression": "#token = :token AND #status = :in_progress",
+        "ExpressionAttributeNames": {"#token": "token", "#status": "status"},
+        "ExpressionAttributeValues": {":token": claim["token"], ":in_progress": IN_PROGRESS},
+    }
+
+
+def _completion_update(claim: dict, result: dict) -> dict:
+    owned = _owned(claim)
+    return {
+        "Key": {"PK": claim["PK"]},
+        "UpdateExpression": "SET #status = :completed, #response = :response, expiresAt = :expires",
+        "ConditionExpression": owned["ConditionExpression"],
+        "ExpressionAttributeNames": {**owned["ExpressionAttributeNames"], "#response": "response"},
+        "ExpressionAttributeValues": {
+            **owned["ExpressionAttributeValues"],
+            ":completed": COMPLETED,
+            ":response": {"statusCode": result["statusCode"], "body": result.get("body") or ""},
+            ":expires": int(time.time()) + RESPONSE_TTL_SECONDS,
+        },
+    }
+
+
+def _ignore_lost_claim(call, **params):
+    from botocore.exceptions import ClientError
+
+    try:
+        call(**params)
+    except ClientError as e:
+        # já concluída na transação do handler, ou a reserva venceu
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+
+def _reserve(claim: dict):
+    """None se a reserva é desta invocação; senão a resposta a devolver."""
+    from botocore.exceptions import ClientError
+
+    table = aws.table(TABLE_NAME)
+
+    for _ in range(2):
+        now = int(time.time())
+        try:
+            table.put_item(
+                Item={
+                    "PK": claim["PK"],
+                    "fingerprint": claim["fingerprint"],
+                    "token": claim["token"],
+                    "status": IN_PROGRESS,
+                    "expiresAt": now + IN_PROGRESS_SECONDS,
+                },
+                # o TTL do DynamoDB apaga com atraso: vencido conta como livre
+                ConditionExpression="attribute_not_exists(PK) OR expiresAt < :now",
+                ExpressionAttributeValues={":now": now},
+            )
+            return None
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+        existing = table.get_item(Key={"PK": claim["PK"]}, ConsistentRead=True).get("Item")
+        if existing is None:
+            continue  # liberada entre o put e o get
+
+        if existing["fingerprint"] != claim["fingerprint"]:
+            return response(422, {"message": "Idempotency-Key já usada com outro conteúdo"})
+
+        if existing["status"] == COMPLETED:
+            metrics.increment("IdempotentReplays")
+            stored = existing["response"]
+            return {
+                "statusCode": int(stored["statusCode"]),
+                "headers": {**DEFAULT_HEADERS, "Idempotent-Replayed": "true"},
+                "body": stored["body"],
+            }
+
+        break
+
+    return response(
+        409, {"message": "Requisição com esta Idempotency-Key ainda em andamento"},
+        headers={"Retry-After": "1"},
+    )
+
+
+def completion(context, result: dict) -> list:
+    """
+    Itens de TransactWriteItems que gravam `result` como a resposta da
+    Idempotency-Key desta invocação ([] sem chave): o handler os inclui na
+    transação que cria o registro e só devolve `result` se ela foi gravada
+    (falha vira exceção, que libera a chave).
+    """
+    claim = getattr(context, CONTEXT_ATTRIBUTE, None)
+    if claim is None:
+        return []
+
+    claim["in_transaction"] = True
+    update = _completion_update(claim, result)
+    return [{"Update": {
+        **update,
+        "TableName": TABLE_NAME,
+        "Key": aws.serialize(update["Key"]),
+        "ExpressionAttributeValues": aws.serialize(update["ExpressionAttributeValues"]),
+    }}]
+
+
+def idempotent():
+    """
+    Decorator (abaixo do api_handler) dos POST que criam registros. Sem o
+    header Idempotency-Key (ou sem IDEMPOTENCY_TABLE) não muda nada.
+    Respostas 5xx e exceções liberam a chave para o retry.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(event, context):
+            key = _header(event, HEADER)
+            if not key or not TABLE_NAME:
+                return fn(event, context)
+
+            if len(key) > MAX_KEY_LENGTH:
+                raise BadRequest(f"Idempotency-Key deve ter até {MAX_KEY_LENGTH} caracteres")
+
+            claim = _new_claim(event, context, key)
+            replay = _reserve(claim)
+            if replay is not None:
+                return replay
+
+            table = aws.table(TABLE_NAME)
+            setattr(context, CONTEXT_ATTRIBUTE, claim)
+            try:
+                result = fn(event, context)
+            except Exception:
+                _ignore_lost_claim(table.delete_item, Key={"PK": claim["PK"]}, **_owned(claim))
+                raise
+            finally:
+                setattr(context, CONTEXT_ATTRIBUTE, None)
+
+            if result.get("statusCode", 200) >= 500:
+                _ignore_lost_claim(table.delete_item, Key={"PK": claim["PK"]}, **_owned(claim))
+            elif not claim.get("in_transaction"):
+                _ignore_lost_claim(table.update_item, **_completion_update(claim, result))
+            return result
+
+        return wrapper
+
+    return decorator
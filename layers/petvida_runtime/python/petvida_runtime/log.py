@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import random
+import sys
+import traceback
+import zlib
+from datetime import datetime, timezone
+
+# =========================
+# Logs estruturados
+# =========================
+# Uma linha JSON por log, sempre com as mesmas chaves:
+#   {"timestamp", "level", "requestId", "function", "logger", "message",
+#    "fields", "error"}
+# configure() instala o formatter e o filtro de amostragem nos handlers do
+# logger raiz, então os logging.getLogger() que já existem nos handlers
+# também saem nesse formato.
+#
+# - Mensagem preguiçosa: log.info("Lote | itens=%s", n) só formata a string
+#   se a linha for escrita.
+# - Amostragem por nível (LOG_SAMPLE_RATES="DEBUG=0,INFO=0.1"): decidida por
+#   requestId, então uma invocação amostrada sai inteira. WARNING e acima
+#   saem sempre, a não ser que configurado.
+# - Campos com nome de segredo (password, token, secret, authorization...)
+#   saem como "***", em qualquer nível de dict/lista.
+
+REDACTED = "***"
+SENSITIVE_KEYS = ("password", "token", "secret", "authorization", "cookie")
+
+# atributos que todo LogRecord tem; o resto veio de extra=...
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {
+    "message", "asctime", "fields", "aws_request_id", "petvida_sampled",
+}
+
+FUNCTION_NAME = os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
+
+_request_id = None
+
+
+def _parse_rates(raw: str) -> dict:
+    rates = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        level = logging.getLevelName(name.strip().upper())
+        if isinstance(level, int):
+            rates[level] = max(0.0, min(1.0, float(value)))
+    return rates
+
+
+SAMPLE_RATES = _parse_rates(os.environ.get("LOG_SAMPLE_RATES", ""))
+
+
+def _is_sensitive(key) -> bool:
+    lowered = str(key).lower()
+    return any(word in lowered for word in SENSITIVE_KEYS)
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if _is_sensitive(k) else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+def set_request_id(request_id):
+    global _request_id
+    _request_id = request_id
+
+
+def sampled(level: int, request_id=None) -> bool:
+    rate = SAMPLE_RATES.get(level, 1.0)
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+
+    request_id = request_id or _request_id
+    if request_id is None:
+        return random.random() < rate
+    # mesmo requestId + nível -> mesma decisão
+    return zlib.crc32(f"{request_id}:{level}".encode("utf-8")) / 0xFFFFFFFF < rate
+
+
+class SamplingFilter(logging.Filter):
+    def filter(self, record):
+        if getattr(record, "petvida_sampled", False):
+            return True  # já decidido em StructuredLogger
+        return sampled(record.levelno, getattr(record, "aws_request_id", None))
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        fields = getattr(record, "fields", None)
+        if fields is None:
+            # logging.getLogger() comum: campos vêm de extra=...
+            fields = {
+                key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS
+            }
+
+        message = record.msg
+        if isinstance(message, dict) and not record.args:
+            # logger.info({...}) antigo: o dict vira campos
+            fields = {**message, **fields}
+            message = fields.pop("message", "")
+        else:
+            message = record.getMessage()
+
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "requestId": _request_id or getattr(record, "aws_request_id", None),
+            "function": FUNCTION_NAME,
+            "logger": record.name,
+            "message": message,
+            "fields": redact(fields),
+            "error": None,
+        }
+
+        if record.exc_info:
+            entry["error"] = "".join(traceback.format_exception(*record.exc_info))
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure(level=None, handler=None):
+    """
+    No Lambda o runtime já instalou um handler no logger raiz; fora dele
+    (benchmarks, scripts) só há handler se for passado aqui.
+    """
+    root = logging.getLogger()
+    root.setLevel(level or os.environ.get("LOG_LEVEL", "INFO"))
+
+    if handler is not None:
+        root.addHandler(handler)
+
+    # "Found credentials..." e afins a cada cold start
+    logging.getLogger("botocore").setLevel(logging.WARNING)
+
+    for handler in root.handlers:
+        handler.setFormatter(JsonFormatter())
+        if not any(isinstance(f, SamplingFilter) for f in handler.filters):
+            handler.addFilter(SamplingFilter())
+
+
+class StructuredLogger:
+    """
+    logging.Logger com campos nomeados:
+        log.info("Lote recebido | mensagens=%s", n, queue="stripe")
+    Descarta a linha antes de montar o LogRecord quando o nível está
+    desligado ou fora da amostra, e não procura arquivo/linha de quem chamou
+    (findCaller), que o JSON não usa.
+    """
+
+    def __init__(self, name=None):
+        self._logger = logging.getLogger(name)
+
+    def _log(self, level, message, args, fields, exc_info=None):
+        logger = self._logger
+        if not logger.isEnabledFor(level) or not sampled(level):
+            return
+
+        if exc_info:
+            exc_info = sys.exc_info()
+
+        record = logger.makeRecord(logger.name, level, "", 0, message, args, exc_info)
+        record.fields = fields
+        record.petvida_sampled = True
+        logger.handle(record)
+
+    def debug(self, message, *args, **fields):
+        self._log(logging.DEBUG, message, args, fields)
+
+    def info(self, message, *args, **fields):
+        self._log(logging.INFO, message, args, fields)
+
+    def warning(self, message, *args, **fields):
+        self._log(logging.WARNING, message, args, fields)
+
+    def error(self, message, *args, **fields):
+        self._log(logging.ERROR, message, args, fields)
+
+    def exception(self, message, *args, **fields):
+        self._log(logging.ERROR, message, args, fields, exc_info=True)
+
+
+def get_logger(name=None) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+configure()
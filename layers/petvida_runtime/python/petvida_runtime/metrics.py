@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import time
+
+# =========================
+# Métricas (CloudWatch Embedded Metric Format)
+# =========================
+# Valores acumulados durante a invocação e escritos como uma linha JSON no
+# stdout ao final; o CloudWatch Logs extrai as métricas sem chamada de API
+# (PutMetricData custaria um round trip por invocação).
+#
+# Dimensões: FunctionName sempre; Route (ex. "GET /api/pets") nos handlers
+# HTTP. Propriedades (requestId, coldStart) vão na mesma linha, sem virar
+# métrica, para filtrar no Logs Insights.
+
+NAMESPACE = "PetVida"
+FUNCTION_NAME = os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")
+
+_values = {}      # nome -> [valor, unidade]
+_dimensions = {}
+_properties = {}
+_lock = threading.Lock()  # leituras em paralelo (dashboard, get_pet) somam aqui
+
+
+def add(name: str, value: float, unit: str = "Count"):
+    with _lock:
+        entry = _values.get(name)
+        if entry is None:
+            _values[name] = [value, unit]
+        else:
+            entry[0] += value
+
+
+def increment(name: str, value: int = 1):
+    add(name, value, "Count")
+
+
+def set_dimension(name: str, value: str):
+    _dimensions[name] = value
+
+
+def set_property(name: str, value):
+    _properties[name] = value
+
+
+def counters() -> dict:
+    return {name: value for name, (value, _) in _values.items()}
+
+
+def reset():
+    _values.clear()
+    _dimensions.clear()
+    _properties.clear()
+
+
+def flush():
+    """Escreve as métricas da invocação (se houver) e zera."""
+    if not _values:
+        reset()
+        return
+
+    dimension_sets = [["FunctionName"]]
+    if _dimensions:
+        dimension_sets.append(sorted(_dimensions))
+
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": dimension_sets,
+                "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in _values.items()],
+            }],
+        },
+        "FunctionName": FUNCTION_NAME,
+        **_dimensions,
+        **_properties,
+        **{name: value for name, (value, _) in _values.items()},
+    }
+    reset()
+
+    print(json.dumps(record, separators=(",", ":"), default=str), flush=True)
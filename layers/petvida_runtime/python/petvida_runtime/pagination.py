@@ -0,0 +1,143 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+from decimal import Decimal
+
+# =========================
+# Paginação por cursor
+# =========================
+# O cursor é o ExclusiveStartKey do DynamoDB serializado e assinado (HMAC),
+# com um "scope" (ex.: PK do usuário) para que não possa ser reaproveitado
+# em outra consulta nem adulterado pelo cliente.
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _secret() -> bytes:
+    # vazia assinaria cursores que qualquer um consegue forjar
+    secret = os.environ.get("CURSOR_SECRET")
+    if not secret:
+        raise RuntimeError("CURSOR_SECRET não configurado")
+    return secret.encode("utf-8")
+
+
+def _sign(scope: str, payload: str) -> str:
+    digest = hmac.new(
+        _secret(), f"{scope}|{payload}".encode("utf-8"), hashlib.sha256
+    ).digest()
+    return _b64encode(digest[:16])
+
+
+def _plain(value):
+    # Chaves do DynamoDB só contêm string, número ou binário
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def encode_cursor(key: dict, scope: str) -> str:
+    payload = _b64encode(
+        json.dumps({k: _plain(v) for k, v in key.items()}, separators=(",", ":"))
+        .encode("utf-8")
+    )
+    return f"{payload}.{_sign(scope, payload)}"
+
+
+def decode_cursor(token: str, scope: str) -> dict:
+    try:
+        payload, signature = token.split(".", 1)
+    except ValueError:
+        raise InvalidCursor("cursor malformado")
+
+    if not hmac.compare_digest(signature, _sign(scope, payload)):
+        raise InvalidCursor("assinatura do cursor inválida")
+
+    try:
+        return json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidCursor("cursor malformado")
+
+
+def parse_limit(raw) -> int:
+    if raw in (None, ""):
+        return DEFAULT_LIMIT
+
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("limit deve ser um número inteiro")
+
+    if limit < 1:
+        raise ValueError("limit deve ser maior que zero")
+
+    return min(limit, MAX_LIMIT)
+
+
+def iter_pages(table, page_size, start_key=None, key_attrs=("PK", "SK"), **query_kwargs):
+    """
+    Gera páginas de até `page_size` itens de um table.query, seguindo o
+    LastEvaluatedKey. Cada página é (items, next_key); next_key é a chave do
+    último item entregue, ou None quando não há mais itens.
+
+    Cada chamada ao DynamoDB lê no máximo `page_size` itens, então a memória
+    usada fica limitada mesmo com FilterExpression.
+    """
+    buffer = []
+    exclusive_start = start_key
+
+    while True:
+        kwargs = dict(query_kwargs, Limit=page_size)
+        if exclusive_start:
+            kwargs["ExclusiveStartKey"] = exclusive_start
+
+        result = table.query(**kwargs)
+        items = result.get("Items", [])
+        exclusive_start = result.get("LastEvaluatedKey")
+
+        for index, item in enumerate(items):
+            buffer.append(item)
+
+            if len(buffer) == page_size:
+                has_more = exclusive_start is not None or index < len(items) - 1
+                next_key = {k: item[k] for k in key_attrs} if has_more else None
+                yield buffer, next_key
+                buffer = []
+
+        if not exclusive_start:
+            break
+
+    if buffer:
+        yield buffer, None
+
+
+def first_page(table, page_size, start_key=None, key_attrs=("PK", "SK"), **query_kwargs):
+    for page in iter_pages(table, page_size, start_key, key_attrs, **query_kwargs):
+        return page
+    return [], None
+
+
+def query_all(table, **query_kwargs):
+    items = []
+    while True:
+        result = table.query(**query_kwargs)
+        items.extend(result.get("Items", []))
+
+        last_key = result.get("LastEvaluatedKey")
+        if not last_key:
+            return items
+        query_kwargs["ExclusiveStartKey"] = last_key
@@ -0,0 +1,23 @@
+from .photos import derived_urls
+
+# =========================
+# Pet na resposta da API
+# =========================
+# Mesmo formato em get_pet, get_single_pet e get_pet_dashboard. O add_pet
+# grava o sexo em `gender`; a API devolve em `sex`.
+
+
+def normalize_pet(item: dict) -> dict:
+    return {
+        "id": item.get("petId") or item.get("id"),
+        "name": item.get("name"),
+        "species": item.get("species", "").lower(),  # DOG -> dog
+        "breed": item.get("breed"),
+        "sex": item.get("gender", "").lower(),       # MALE -> male
+        "birthDate": item.get("birthDate"),
+        "photo": item.get("photoUrl"),
+        # thumb/card/full em WebP e JPEG (lambda/pets/process_photo.py)
+        "photos": derived_urls(item.get("photoUrl")),
+        "notes": item.get("notes"),
+        "createdAt": item.get("createdAt"),
+    }
@@ -0,0 +1,75 @@
+import posixpath
+from urllib.parse import urlsplit
+
+# =========================
+# Originais
+# =========================
+# Cada upload ganha uma key nova:
+#   users/<u>/pets/<p>/<uploadId>.<ext>
+# uploadId é o início do SHA-256 do arquivo (quando o cliente informa; vai
+# assinado no upload e o S3 confere) ou um uuid. Como uma key nunca recebe
+# outro conteúdo, originais e derivados são servidos com cache imutável de um
+# ano; trocar a foto é trocar o photoUrl do pet (lambda/pets/commit_photo.py).
+
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+}
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def photo_prefix(user_id: str, pet_id: str) -> str:
+    return f"users/{user_id}/pets/{pet_id}/"
+
+
+def photo_key(user_id: str, pet_id: str, upload_id: str, content_type: str) -> str:
+    return f"{photo_prefix(user_id, pet_id)}{upload_id}.{EXTENSIONS[content_type]}"
+
+
+# =========================
+# Derivados das fotos dos pets
+# =========================
+# O processador (lambda/pets/process_photo.py) gera, a partir do original,
+# versões redimensionadas em:
+#   derived/<key sem extensão>/<tamanho>.<formato>
+# O nome é determinístico: quem tem a URL do original sabe montar a dos
+# derivados sem consultar nada.
+
+DERIVED_PREFIX = "derived/"
+
+# tamanho -> maior lado em pixels (nunca amplia)
+SIZES = {
+    "thumb": 160,
+    "card": 480,
+    "full": 1280,
+}
+
+# formato -> extensão
+FORMATS = {
+    "webp": "webp",
+    "jpeg": "jpg",
+}
+
+
+def derived_key(source_key: str, size: str, fmt: str) -> str:
+    stem, _ = posixpath.splitext(source_key)
+    return f"{DERIVED_PREFIX}{stem}/{size}.{FORMATS[fmt]}"
+
+
+def derived_urls(photo_url: str):
+    """
+    {"thumb": {"webp": url, "jpeg": url}, "card": ..., "full": ...} a partir
+    da URL do original no CloudFront, ou None sem foto.
+    """
+    if not photo_url:
+        return None
+
+    parts = urlsplit(photo_url)
+    base = f"{parts.scheme}://{parts.netloc}"
+    source_key = parts.path.lstrip("/")
+
+    return {
+        size: {fmt: f"{base}/{derived_key(source_key, size, fmt)}" for fmt in FORMATS}
+        for size in SIZES
+    }
@@ -0,0 +1,78 @@
+import os
+from collections import OrderedDict
+from time import monotonic
+
+from . import aws, metrics
+
+# =========================
+# Cache do perfil (USER#<sub> / PROFILE)
+# =========================
+# LRU com TTL, por container: invocações seguidas do mesmo usuário num
+# container quente não voltam ao DynamoDB. Cada container tem a sua cópia,
+# então uma alteração feita em outro container aparece aqui em no máximo
+# PROFILE_CACHE_TTL_SECONDS. Isso vale também para o save_config: ele é outra
+# função, e a gravação não passa pelo cache de nenhum container do
+# get_config. Quem precisa ler o que acabou de gravar passa a `version`
+# devolvida pelo save_config como min_version (?minVersion= no get_config):
+# item em cache mais antigo é relido com leitura consistente. Uma versão mais
+# antiga nunca substitui uma mais nova no cache.
+
+CACHE_TTL_SECONDS = float(os.environ.get("PROFILE_CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.environ.get("PROFILE_CACHE_MAX_ENTRIES", "512"))
+
+_cache = OrderedDict()  # (tabela, userId) -> (expira_em, item ou None)
+
+
+def profile_key(user_id: str) -> dict:
+    return {"PK": f"USER#{user_id}", "SK": "PROFILE"}
+
+
+def _version(item) -> int:
+    return int((item or {}).get("version", 0))
+
+
+def remember(table_name: str, user_id: str, item):
+    """Guarda o item lido/gravado (None = usuário sem perfil)."""
+    key = (table_name, user_id)
+    cached = _cache.get(key)
+
+    if cached and cached[1] is not None and _version(cached[1]) > _version(item):
+        return
+
+    _cache[key] = (monotonic() + CACHE_TTL_SECONDS, item)
+    _cache.move_to_end(key)
+
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def invalidate(table_name: str, user_id: str):
+    _cache.pop((table_name, user_id), None)
+
+
+def get_profile(table_name: str, user_id: str, min_version: int = None):
+    """
+    Item PROFILE do usuário, ou None se não existir. Com `min_version`, um
+    item em cache com version menor não serve: relê com ConsistentRead.
+    """
+    key = (table_name, user_id)
+    cached = _cache.get(key)
+    fresh = min_version is None or _version(cached and cached[1]) >= min_version
+
+    if cached and cached[0] > monotonic() and fresh:
+        _cache.move_to_end(key)
+        metrics.increment("ProfileCacheHit")
+        return cached[1]
+
+    metrics.increment("ProfileCacheMiss")
+    item = aws.table(table_name).get_item(
+        Key=profile_key(user_id),
+        ConsistentRead=min_version is not None,
+    ).get("Item")
+    invalidate(table_name, user_id)  # expirado: a versão lida agora vale
+    remember(table_name, user_id, item)
+    return item
+
+
+def user_preferences(table_name: str, user_id: str) -> dict:
+    return (get_profile(table_name, user_id) or {}).get("preferences") or {}
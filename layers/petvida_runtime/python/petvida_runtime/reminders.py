@@ -0,0 +1,166 @@
+import logging
+import zlib
+from datetime import date, datetime, timedelta, timezone
+
+from . import aws
+from .batch import batch_put
+from .profiles import user_preferences  # cache por container
+
+logger = logging.getLogger()
+
+# =========================
+# Fila de lembretes (tabela RemindersQueue)
+# =========================
+#   PK: REMINDER#<data do lembrete>#<shard>
+#   SK: <recordId>
+#   expiresAt: TTL
+#
+# A data do lembrete é nextDueDate - advanceDays do usuário. Cada dia é
+# dividido em SHARD_COUNT partições (shard = crc32(recordId)), para que os
+# lembretes de um dia cheio não caiam numa única partição quente. O sweeper
+# diário lê só as SHARD_COUNT partições de cada dia: o trabalho é
+# proporcional aos lembretes pendentes, não ao total de registros de saúde.
+#
+# O sweeper roda uma vez por dia e também lê os CATCHUP_DAYS dias
+# anteriores (sweep_dates). Assim não se perde um lembrete gravado para hoje
+# depois do sweep de hoje, nem um cujo envio falhou: os dois ficam na
+# partição do dia e saem no sweep seguinte.
+#
+# Um registro mais novo da mesma vacina/cuidado não apaga o lembrete do
+# anterior (ele está na partição de outra data). O sweeper confere o item
+# SUMMARY do pet (is_current) e descarta o lembrete de um registro que não é
+# mais o último do seu título.
+
+SHARD_COUNT = 10
+DEFAULT_ADVANCE_DAYS = 7
+RETENTION_DAYS = 30
+CATCHUP_DAYS = 7  # < RETENTION_DAYS: o TTL não pode apagar antes do sweep
+
+
+def shard_for(record_id: str) -> int:
+    return zlib.crc32(record_id.encode("utf-8")) % SHARD_COUNT
+
+
+def reminder_pk(remind_on: str, shard: int) -> str:
+    return f"REMINDER#{remind_on}#{shard}"
+
+
+def day_partitions(remind_on: str) -> list:
+    return [reminder_pk(remind_on, shard) for shard in range(SHARD_COUNT)]
+
+
+def sweep_dates(today: date) -> list:
+    """Dias que o sweep de `today` lê: os CATCHUP_DAYS anteriores e hoje."""
+    return [(today - timedelta(days=n)).isoformat() for n in range(CATCHUP_DAYS, -1, -1)]
+
+
+def is_current(reminder: dict, summary) -> bool:
+    """
+    False se o SUMMARY do pet mostra outro registro como o último do título
+    do lembrete (dose/cuidado já registrado de novo). Sem resumo, envia.
+    """
+    if not summary:
+        return True
+
+    group = "vaccines" if reminder["recordType"] == "VACCINE" else "care"
+    latest = (summary.get(group) or {}).get(reminder["title"])
+    return latest is None or latest.get("recordId") == reminder["SK"]
+
+
+def advance_days(preferences: dict) -> int:
+    # save_config guarda advanceDays como veio do front (string)
+    try:
+        return max(0, int(preferences.get("advanceDays", DEFAULT_ADVANCE_DAYS)))
+    except (TypeError, ValueError):
+        return DEFAULT_ADVANCE_DAYS
+
+
+def remind_date(next_due_date: str, days_before: int, today: date = None):
+    """
+    Data do lembrete, ou None se o vencimento já passou. Lembretes que
+    cairiam no passado (vencimento mais perto que advanceDays) vão para hoje;
+    se o sweep de hoje já rodou, o do dia seguinte os pega (sweep_dates).
+    """
+    today = today or datetime.now(timezone.utc).date()
+    due = date.fromisoformat(next_due_date[:10])
+
+    if due < today:
+        return None
+
+    return max(due - timedelta(days=days_before), today).isoformat()
+
+
+def reminder_item(user_id: str, pet_id: str, record: dict, remind_on: str) -> dict:
+    expires = datetime.fromisoformat(remind_on).replace(tzinfo=timezone.utc)
+    expires += timedelta(days=RETENTION_DAYS)
+
+    return {
+        "PK": reminder_pk(remind_on, shard_for(record["recordId"])),
+        "SK": record["recordId"],
+        "userId": user_id,
+        "petId": pet_id,
+        "recordType": record["type"],
+        "title": record.get("name") or record.get("careType"),
+        "nextDueDate": record["nextDueDate"],
+        "remindOn": remind_on,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "expiresAt": int(expires.timestamp()),
+    }
+
+
+def schedule_reminder(reminders_table_name: str, users_table_name: str,
+                      user_id: str, pet_id: str, record: dict):
+    """
+    Enfileira o lembrete de um registro com nextDueDate. O registro já foi
+    gravado: uma falha aqui é logada e não derruba a requisição.
+    Devolve o item gravado, ou None.
+    """
+    if not record.get("nextDueDate"):
+        return None
+
+    try:
+        preferences = user_preferences(users_table_name, user_id)
+        remind_on = remind_date(record["nextDueDate"], advance_days(preferences))
+        if remind_on is None:
+            return None
+
+        item = reminder_item(user_id, pet_id, record, remind_on)
+        aws.table(reminders_table_name).put_item(Item=item)
+        return item
+
+    except Exception:
+        logger.exception(f"⚠️ Falha ao agendar lembrete | recordId={record['recordId']}")
+        return None
+
+
+def schedule_reminders(reminders_table_name: str, users_table_name: str,
+                       user_id: str, records: list) -> int:
+    """
+    Versão em lote de schedule_reminder: lê as preferências uma vez e grava
+    com BatchWriteItem. `records` são pares (pet_id, record). Devolve quantos
+    lembretes foram gravados.
+    """
+    due = [(pet_id, record) for pet_id, record in records if record.get("nextDueDate")]
+    if not due:
+        return 0
+
+    try:
+        days_before = advance_days(user_preferences(users_table_name, user_id))
+
+        items = []
+        for pet_id, record in due:
+            try:
+                remind_on = remind_date(record["nextDueDate"], days_before)
+            except ValueError:
+                continue
+            if remind_on is not None:
+                items.append(reminder_item(user_id, pet_id, record, remind_on))
+
+        failed = batch_put(reminders_table_name, items)
+        if failed:
+            logger.warning(f"⚠️ Lembretes não gravados: {len(failed)}")
+        return len(items) - len(failed)
+
+    except Exception:
+        logger.exception(f"⚠️ Falha ao agendar lembretes | userId={user_id}")
+        return 0
@@ -0,0 +1,63 @@
+import base64
+import json
+from decimal import Decimal
+
+# =========================
+# JSON para itens do DynamoDB
+# =========================
+# O boto3 devolve número como Decimal, set como set e binário como Binary.
+# Em vez de converter os itens antes (uma cópia de cada dict/lista), o
+# encoder em C do json percorre os itens originais e só chama _default nos
+# valores que ele não conhece. _default despacha pelo tipo exato, sem cadeia
+# de isinstance.
+
+
+def _decimal(value: Decimal):
+    # str() é o caminho mais barato para saber se o Decimal é inteiro
+    text = str(value)
+    if "." in text or "E" in text:
+        return float(value)
+    return int(text)
+
+
+def _binary(value):
+    # boto3.dynamodb.types.Binary
+    return base64.b64encode(value.value).decode("ascii")
+
+
+def _bytes(value):
+    return base64.b64encode(value).decode("ascii")
+
+
+_CONVERTERS = {
+    Decimal: _decimal,
+    set: sorted,
+    frozenset: sorted,
+    bytes: _bytes,
+    bytearray: _bytes,
+}
+
+
+def _default(value):
+    converter = _CONVERTERS.get(type(value))
+    if converter is not None:
+        return converter(value)
+
+    if type(value).__name__ == "Binary" and hasattr(value, "value"):
+        # registra o tipo para as próximas chamadas sem importar o boto3 aqui
+        _CONVERTERS[type(value)] = _binary
+        return _binary(value)
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# um encoder só por container: json.dumps com kwargs cria um novo a cada chamada
+_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    separators=(",", ":"),
+    default=_default,
+)
+
+
+def dumps(value) -> str:
+    return _encoder.encode(value)
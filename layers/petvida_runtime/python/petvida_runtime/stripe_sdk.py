@@ -0,0 +1,78 @@
+import hmac
+import json
+import os
+import time
+from hashlib import sha256
+
+# =========================
+# Stripe preguiçoso
+# =========================
+# O SDK do Stripe custa ~100 ms de import. Ele só é carregado quando um
+# handler realmente chama a API, e fica em cache no container.
+#
+# A verificação de assinatura do webhook não precisa do SDK: é um HMAC-SHA256
+# (mesmo algoritmo de stripe.WebhookSignature.verify_header), então o webhook
+# não paga esse import.
+
+DEFAULT_TOLERANCE = 300
+
+_stripe = None
+
+
+class SignatureVerificationError(Exception):
+    pass
+
+
+def get_stripe():
+    global _stripe
+
+    if _stripe is None:
+        import stripe
+
+        stripe.api_key = os.environ["STRIPE_SECRET_KEY"]
+
+        # stripe-mock ou outro stand-in local
+        if os.environ.get("STRIPE_API_BASE"):
+            stripe.api_base = os.environ["STRIPE_API_BASE"]
+
+        _stripe = stripe
+
+    return _stripe
+
+
+def _timestamp_and_signatures(header: str):
+    items = [part.split("=", 1) for part in header.split(",")]
+    timestamp = int(next(value for key, value in items if key == "t"))
+    signatures = [value for key, value in items if key == "v1"]
+    return timestamp, signatures
+
+
+def verify_signature(payload: str, header: str, secret: str, tolerance=DEFAULT_TOLERANCE):
+    try:
+        timestamp, signatures = _timestamp_and_signatures(header)
+    except (StopIteration, ValueError):
+        raise SignatureVerificationError("Unable to extract timestamp and signatures from header")
+
+    if not signatures:
+        raise SignatureVerificationError("No signatures found with expected scheme v1")
+
+    expected = hmac.new(
+        secret.encode("utf-8"),
+        msg=f"{timestamp}.{payload}".encode("utf-8"),
+        digestmod=sha256,
+    ).hexdigest().encode("ascii")
+
+    if not any(hmac.compare_digest(expected, s.encode("utf-8")) for s in signatures):
+        raise SignatureVerificationError("No signatures found matching the expected signature for payload")
+
+    if tolerance and timestamp < time.time() - tolerance:
+        raise SignatureVerificationError(f"Timestamp outside the tolerance zone ({timestamp})")
+
+
+def construct_event(payload: str, sig_header: str, secret: str, tolerance=DEFAULT_TOLERANCE) -> dict:
+    """
+    Equivalente a stripe.Webhook.construct_event, devolvendo um dict comum.
+    Levanta SignatureVerificationError ou ValueError (payload inválido).
+    """
+    verify_signature(payload, sig_header, secret, tolerance)
+    return json.loads(payload)
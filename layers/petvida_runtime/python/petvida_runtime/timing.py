@@ -0,0 +1,55 @@
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+# =========================
+# Tempos por fase da invocação
+# =========================
+# Um container Lambda atende uma invocação por vez, então um dict por
+# invocação basta. Fases repetidas (ex.: duas queries) são somadas.
+#
+# Leituras em paralelo (get_pet, get_pet_dashboard, process_photo) gravam
+# de várias threads ao mesmo tempo, daí o lock. Somar a latência de chamadas
+# simultâneas passaria do tempo total da invocação: o que vem de outra
+# thread vai para "<fase>.calls" (soma por chamada, métrica à parte), e quem
+# abre o pool mede o bloco inteiro (tempo de relógio) com phase("<fase>").
+
+_phases = {}
+_lock = threading.Lock()
+_owner = threading.get_ident()  # thread da invocação
+
+
+def reset():
+    global _owner
+
+    with _lock:
+        _phases.clear()
+        _owner = threading.get_ident()
+
+
+def record(name: str, elapsed_ms: float):
+    if threading.get_ident() != _owner:
+        name = f"{name}.calls"
+
+    with _lock:
+        _phases[name] = _phases.get(name, 0.0) + elapsed_ms
+
+
+def phases() -> dict:
+    with _lock:
+        return dict(_phases)
+
+
+@contextmanager
+def phase(name: str):
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (perf_counter() - started) * 1000)
+
+
+def server_timing(total_ms: float) -> str:
+    entries = [f"{name};dur={ms:.1f}" for name, ms in phases().items()]
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
@@ -0,0 +1,191 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import urllib.request
+
+from . import metrics
+from .http import Unauthorized
+from .timing import phase
+
+# =========================
+# Verificação local dos tokens do Cognito
+# =========================
+# RS256 verificado em Python puro (PKCS#1 v1.5: pow(assinatura, e, n) contra
+# o DigestInfo do SHA-256), sem cryptography/jose no layer. As chaves públicas
+# do user pool (JWKS) são buscadas uma vez por container e ficam em cache por
+# JWKS_CACHE_SECONDS; um `kid` desconhecido (rotação de chave) força uma nova
+# busca, no máximo uma a cada JWKS_MIN_REFRESH_SECONDS.
+#
+# Confere assinatura, exp, iss, token_use e o client: `aud` no id token,
+# `client_id` no access token (o access token do Cognito não tem aud).
+#
+# COGNITO_JWKS_URL troca só o endereço das chaves (stand-in local); o iss
+# esperado continua sendo o do user pool.
+
+REGION = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION", "")
+USER_POOL_ID = os.environ.get("USER_POOL_ID", "")
+CLIENT_ID = os.environ.get("CLIENT_ID", "")
+
+ISSUER = f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}"
+JWKS_URL = os.environ.get("COGNITO_JWKS_URL") or f"{ISSUER}/.well-known/jwks.json"
+
+JWKS_CACHE_SECONDS = float(os.environ.get("JWKS_CACHE_SECONDS", "3600"))
+JWKS_MIN_REFRESH_SECONDS = 60
+JWKS_TIMEOUT_SECONDS = 2
+LEEWAY_SECONDS = 5  # diferença de relógio tolerada no exp/iat
+
+# DER do DigestInfo de SHA-256 (RFC 8017, 9.2)
+_SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+
+_keys = {}  # kid -> (n, e)
+_expires_at = 0.0
+_fetched_at = 0.0
+_lock = threading.Lock()
+
+
+class InvalidToken(Unauthorized):
+    """Token ausente, malformado, expirado ou de outro user pool/client."""
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _to_int(segment: str) -> int:
+    return int.from_bytes(_b64decode(segment), "big")
+
+
+def _fetch_jwks() -> dict:
+    with phase("jwks"):
+        with urllib.request.urlopen(JWKS_URL, timeout=JWKS_TIMEOUT_SECONDS) as resp:
+            document = json.loads(resp.read())
+
+    metrics.increment("JwksFetch")
+    return {
+        key["kid"]: (_to_int(key["n"]), _to_int(key["e"]))
+        for key in document.get("keys", [])
+        if key.get("kty") == "RSA" and key.get("alg", "RS256") == "RS256"
+    }
+
+
+def _public_key(kid: str):
+    global _keys, _expires_at, _fetched_at
+
+    key = _keys.get(kid)
+    if key is not None and time.monotonic() < _expires_at:
+        return key
+
+    with _lock:
+        now = time.monotonic()
+        stale = now >= _expires_at
+        # kid desconhecido com cache válido: só busca de novo depois do
+        # intervalo mínimo (um token forjado não vira uma busca por request)
+        unknown = kid not in _keys and now - _fetched_at >= JWKS_MIN_REFRESH_SECONDS
+        if stale or unknown:
+            try:
+                _keys = _fetch_jwks()
+                _expires_at = now + JWKS_CACHE_SECONDS
+            except Exception:
+                # Cognito fora do ar: as chaves antigas continuam valendo
+                if not _keys:
+                    raise
+                _expires_at = now + JWKS_MIN_REFRESH_SECONDS
+            _fetched_at = now
+
+        return _keys.get(kid)
+
+
+def _rs256_valid(signing_input: bytes, signature: bytes, n: int, e: int) -> bool:
+    size = (n.bit_length() + 7) // 8
+    if len(signature) != size:
+        return False
+
+    value = int.from_bytes(signature, "big")
+    if value >= n:
+        return False
+
+    digest_info = _SHA256_DIGEST_INFO + hashlib.sha256(signing_input).digest()
+    expected = b"\x00\x01" + b"\xff" * (size - 3 - len(digest_info)) + b"\x00" + digest_info
+    return hmac.compare_digest(pow(value, e, n).to_bytes(size, "big"), expected)
+
+
+def _timestamp(claims: dict, name: str):
+    # segundos desde a época; ausente conta como 0 (exp ausente = expirado)
+    value = claims.get(name, 0)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise InvalidToken(f"{name} inválido")
+    return value
+
+
+def verify(token: str, token_use: str = None) -> dict:
+    """
+    Claims de um id/access token do user pool, ou InvalidToken.
+    `token_use` ("id" ou "access") restringe o tipo aceito.
+    """
+    try:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        header = json.loads(_b64decode(header_segment))
+        claims = json.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except ValueError:
+        raise InvalidToken("Token malformado")
+
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise InvalidToken("Token malformado")
+    if header.get("alg") != "RS256":
+        raise InvalidToken("Algoritmo não suportado")
+
+    key = _public_key(header.get("kid"))
+    if key is None:
+        raise InvalidToken("Chave do token desconhecida")
+
+    signing_input = f"{header_segment}.{payload_segment}".encode("ascii")
+    if not _rs256_valid(signing_input, signature, *key):
+        raise InvalidToken("Assinatura inválida")
+
+    now = time.time()
+    if _timestamp(claims, "exp") + LEEWAY_SECONDS < now:
+        raise InvalidToken("Token expirado")
+    if _timestamp(claims, "iat") - LEEWAY_SECONDS > now:
+        raise InvalidToken("Token emitido no futuro")
+    if claims.get("iss") != ISSUER:
+        raise InvalidToken("Emissor inválido")
+
+    use = claims.get("token_use")
+    if use not in ("id", "access") or (token_use and use != token_use):
+        raise InvalidToken("Tipo de token inválido")
+
+    audience = claims.get("aud") if use == "id" else claims.get("client_id")
+    if audience != CLIENT_ID:
+        raise InvalidToken("Token de outro client")
+
+    return claims
+
+
+def bearer_token(event):
+    for name, value in (event.get("headers") or {}).items():
+        if name.lower() == "authorization":
+            scheme, _, token = value.partition(" ")
+            return token.strip() if scheme.lower() == "bearer" else None
+    return None
+
+
+def request_claims(event) -> dict:
+    """
+    Claims do usuário da requisição: as do authorizer JWT do API Gateway,
+    quando a rota tem um (já verificadas lá); senão verifica aqui o
+    `Authorization: Bearer <token>`.
+    """
+    authorizer = (event.get("requestContext") or {}).get("authorizer") or {}
+    claims = (authorizer.get("jwt") or {}).get("claims")
+    if claims:
+        return claims
+
+    token = bearer_token(event)
+    if not token:
+        raise InvalidToken("Token ausente")
+    return verify(token)
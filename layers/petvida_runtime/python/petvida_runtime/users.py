@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+from . import aws
+from .profiles import profile_key
+
+# =========================
+# Criação de usuários (Cognito + tabela Users)
+# =========================
+# Usada pelo stripe_worker (um usuário por checkout) e pelo
+# scripts/provision_users.py (em lote). O e-mail é o username no Cognito e o
+# sub é o id do usuário em todo o resto (PK USER#<sub>). As duas etapas podem
+# ser repetidas: e-mail já cadastrado devolve o sub do usuário existente, e o
+# perfil só é criado se ainda não existir (preferências gravadas pelo
+# save_config não são sobrescritas).
+
+
+def cognito_attributes(email: str, name: str) -> list:
+    return [
+        {"Name": "email", "Value": email},
+        {"Name": "email_verified", "Value": "true"},
+        {"Name": "name", "Value": name},
+    ]
+
+
+def _call(operation, **kwargs):
+    return operation(**kwargs)
+
+
+def create_cognito_user(user_pool_id: str, email: str, name: str, cognito=None, call=_call) -> tuple:
+    """
+    (sub, criado): cria o usuário sem enviar o convite por e-mail (a senha é
+    definida no set_password). Se o e-mail já existe, devolve o sub dele.
+    `call(operação, **parâmetros)` faz cada chamada ao Cognito (o
+    provision_users passa as duas pelo token bucket).
+    """
+    cognito = cognito or aws.client("cognito-idp")
+
+    try:
+        response = call(
+            cognito.admin_create_user,
+            UserPoolId=user_pool_id,
+            Username=email,
+            UserAttributes=cognito_attributes(email, name),
+            MessageAction="SUPPRESS",
+        )
+        return response["User"]["Username"], True
+
+    except cognito.exceptions.UsernameExistsException:
+        # e-mail como alias: o Username do usuário é o sub
+        existing = call(cognito.admin_get_user, UserPoolId=user_pool_id, Username=email)
+        return existing["Username"], False
+
+
+def profile_item(user_id: str, name: str, email: str, created_at: str = None) -> dict:
+    return {
+        **profile_key(user_id),
+
+        "id": user_id,
+        "name": name,
+        "email": email,
+
+        "created_at": created_at or datetime.now(timezone.utc).isoformat(),
+        "entity": "USER",
+    }
+
+
+def save_profile(table_name: str, user_id: str, name: str, email: str) -> bool:
+    """Cria o perfil USER#<sub>/PROFILE; False se ele já existia."""
+    from botocore.exceptions import ClientError
+
+    try:
+        aws.table(table_name).put_item(
+            Item=profile_item(user_id, name, email),
+            ConditionExpression="attribute_not_exists(PK)",
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
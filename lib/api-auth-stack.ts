@@ -10,6 +10,9 @@ import { Duration } from 'aws-cdk-lib';
 import * as logs from 'aws-cdk-lib/aws-logs';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as apigwv2_authorizers from 'aws-cdk-lib/aws-apigatewayv2-authorizers';
+import * as sqs from 'aws-cdk-lib/aws-sqs';
+import { SqsEventSource } from 'aws-cdk-lib/aws-lambda-event-sources';
+import { handlerCode, runtimeLayer } from './lambda-runtime';
 
 
 
@@ -23,12 +26,17 @@ interface ApiAuthStackProps extends cdk.StackProps {
 export class ApiAuthStack extends cdk.Stack {
 
   public readonly cognitoAuthorizer: apigwv2_authorizers.HttpJwtAuthorizer;
+  // handlers que verificam o token sozinhos (petvida_runtime.tokens)
+  public readonly userPoolId: string;
+  public readonly userPoolClientId: string;
   constructor(scope: Construct, id: string, props: ApiAuthStackProps) {
     super(scope, id, props);
 
     const { usersTable, stripeEventsTable, httpApi } = props;
     const { envName } = props;
 
+    const petvidaRuntime = runtimeLayer(this, envName);
+
     const userPool = new cognito.UserPool(this, `UserPool-${envName}`, {
         userPoolName: `PetApp-Users-${envName}`,
         selfSignUpEnabled: true,
@@ -104,6 +112,9 @@ export class ApiAuthStack extends cdk.Stack {
         
     });
 
+    this.userPoolId = userPool.userPoolId;
+    this.userPoolClientId = userPoolClient.userPoolClientId;
+
     this.cognitoAuthorizer = new apigwv2_authorizers.HttpJwtAuthorizer(
         `CognitoAuthorizer-${envName}`,
         `https://cognito-idp.${cdk.Stack.of(this).region}.amazonaws.com/${userPool.userPoolId}`,
@@ -128,10 +139,10 @@ export class ApiAuthStack extends cdk.Stack {
         functionName: `RegisterUser-${envName}`,
         runtime: lambda.Runtime.PYTHON_3_13,
         handler: 'register_user.handler',
-        code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/auth')),
+        code: handlerCode('auth', 'register_user.py'),
         timeout: Duration.seconds(20),
         logRetention: logs.RetentionDays.ONE_WEEK,
-        layers: [stripeLayer],
+        layers: [stripeLayer, petvidaRuntime],
         environment: {            
             STRIPE_SECRET_KEY: process.env.STRIPE_SECRET_KEY!,
             STRIPE_PRICE_ID: process.env.STRIPE_PRICE_ID!,
@@ -170,9 +181,10 @@ export class ApiAuthStack extends cdk.Stack {
         functionName: `LoginUser-${envName}`,
         runtime: lambda.Runtime.PYTHON_3_13,
         handler: 'login_user.handler',
-        code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/auth')),
+        code: handlerCode('auth', 'login_user.py'),
         timeout: Duration.seconds(10),
         logRetention: logs.RetentionDays.ONE_WEEK,
+        layers: [petvidaRuntime],
         environment: {
             USER_POOL_ID: userPool.userPoolId,
             CLIENT_ID: userPoolClient.userPoolClientId,
@@ -196,53 +208,130 @@ export class ApiAuthStack extends cdk.Stack {
     });
 
 
+    /*
+    * Refresh Token Lambda
+    * Renova id/access token com o refresh token do login (REFRESH_TOKEN_AUTH),
+    * sem pedir a senha de novo.
+    */
+    const refreshTokenLambda = new lambda.Function(this, `RefreshToken-${envName}`, {
+        description: `Refresh tokens - ${new Date().toISOString()}`,
+        functionName: `RefreshToken-${envName}`,
+        runtime: lambda.Runtime.PYTHON_3_13,
+        handler: 'refresh_token.handler',
+        code: handlerCode('auth', 'refresh_token.py'),
+        timeout: Duration.seconds(10),
+        logRetention: logs.RetentionDays.ONE_WEEK,
+        layers: [petvidaRuntime],
+        environment: {
+            USER_POOL_ID: userPool.userPoolId,
+            CLIENT_ID: userPoolClient.userPoolClientId,
+        },
+    });
 
+    refreshTokenLambda.addToRolePolicy(
+        new iam.PolicyStatement({
+            actions: ['cognito-idp:AdminInitiateAuth'],
+            resources: [userPool.userPoolArn],
+        })
+    );
+
+    httpApi.addRoutes({
+        path: '/api/auth/refresh',
+        methods: [apigwv2.HttpMethod.POST],
+        integration: new integrations.HttpLambdaIntegration(
+            `RefreshTokenIntegration-${envName}`,
+            refreshTokenLambda
+        ),
+    });
+
+
+
+
+    /*
+    * Stripe Webhook
+    * O webhook só valida, grava o evento e enfileira; o worker consome a
+    * fila em lotes (Cognito + Users). Falhas voltam para a fila e, depois
+    * de 5 tentativas, vão para a DLQ.
+    */
+    const stripeEventsDlq = new sqs.Queue(this, `StripeEventsDLQ-${envName}`, {
+        queueName: `StripeEvents-DLQ-${envName}`,
+        retentionPeriod: Duration.days(14),
+    });
+
+    const stripeEventsQueue = new sqs.Queue(this, `StripeEventsQueue-${envName}`, {
+        queueName: `StripeEvents-${envName}`,
+        visibilityTimeout: Duration.seconds(180), // 6x o timeout do worker
+        deadLetterQueue: {
+            queue: stripeEventsDlq,
+            maxReceiveCount: 5,
+        },
+    });
 
     const stripeWebhookLambda = new lambda.Function(this, `StripeWebhook-${envName}`, {
         description: `Criado em - ${new Date().toISOString()}`,
         functionName: `StripeWebhook-${envName}`,
         runtime: lambda.Runtime.PYTHON_3_13,
         handler: 'stripe_webhook.handler',
-        code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/auth')),
+        code: handlerCode('auth', 'stripe_webhook.py', 'stripe_events.py'),
         timeout: Duration.seconds(15),
         logRetention: logs.RetentionDays.ONE_WEEK,
-        layers: [stripeLayer],
+        layers: [petvidaRuntime], // assinatura verificada sem o SDK do Stripe
         environment: {
-            STRIPE_SECRET_KEY: process.env.STRIPE_SECRET_KEY!,
             STRIPE_WEBHOOK_SECRET: process.env.STRIPE_WEBHOOK_SECRET!,
             STRIPE_EVENTS_TABLE: stripeEventsTable.tableName,
+            STRIPE_EVENTS_QUEUE_URL: stripeEventsQueue.queueUrl,
+        },
+    });
+
+    stripeEventsTable.grantWriteData(stripeWebhookLambda);
+    stripeEventsQueue.grantSendMessages(stripeWebhookLambda);
 
+    httpApi.addRoutes({
+        path: '/api/stripe/webhook',
+        methods: [apigwv2.HttpMethod.POST],
+        integration: new integrations.HttpLambdaIntegration(
+            `StripeWebhookIntegration-${envName}`,
+            stripeWebhookLambda
+        ),
+    });
+
+
+    const stripeWorkerLambda = new lambda.Function(this, `StripeWorker-${envName}`, {
+        description: `Criado em - ${new Date().toISOString()}`,
+        functionName: `StripeWorker-${envName}`,
+        runtime: lambda.Runtime.PYTHON_3_13,
+        handler: 'stripe_worker.handler',
+        code: handlerCode('auth', 'stripe_worker.py', 'stripe_events.py'),
+        timeout: Duration.seconds(30),
+        logRetention: logs.RetentionDays.ONE_WEEK,
+        layers: [petvidaRuntime],
+        environment: {
+            STRIPE_EVENTS_TABLE: stripeEventsTable.tableName,
             USER_POOL_ID: userPool.userPoolId,
-            CLIENT_ID: userPoolClient.userPoolClientId,
             USERS_TABLE: usersTable.tableName,
         },
     });
 
+    stripeWorkerLambda.addEventSource(new SqsEventSource(stripeEventsQueue, {
+        batchSize: 10,
+        maxBatchingWindow: Duration.seconds(2),
+        reportBatchItemFailures: true,
+    }));
 
-    usersTable.grantWriteData(stripeWebhookLambda);
+    usersTable.grantWriteData(stripeWorkerLambda);
+    stripeEventsTable.grantReadWriteData(stripeWorkerLambda); // status antes de processar (entrega repetida)
 
-    stripeWebhookLambda.addToRolePolicy(
+    stripeWorkerLambda.addToRolePolicy(
         new iam.PolicyStatement({
             effect: iam.Effect.ALLOW,
             actions: [
             'cognito-idp:AdminCreateUser',
-            'cognito-idp:AdminSetUserPassword',
+            'cognito-idp:AdminGetUser', // e-mail já cadastrado: busca o sub
             ],
             resources: [userPool.userPoolArn],
         })
     );
 
-    stripeEventsTable.grantWriteData(stripeWebhookLambda);
-
-    httpApi.addRoutes({
-        path: '/api/stripe/webhook',
-        methods: [apigwv2.HttpMethod.POST],
-        integration: new integrations.HttpLambdaIntegration(
-            `StripeWebhookIntegration-${envName}`,
-            stripeWebhookLambda
-        ),
-    });
-
 
 
 
@@ -254,9 +343,10 @@ export class ApiAuthStack extends cdk.Stack {
         functionName: `SetPassword-${envName}`,
         runtime: lambda.Runtime.PYTHON_3_13,
         handler: 'set_password.handler',
-        code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/auth')),
+        code: handlerCode('auth', 'set_password.py'),
         timeout: Duration.seconds(10),
         logRetention: logs.RetentionDays.ONE_WEEK,
+        layers: [petvidaRuntime],
         environment: {
             USER_POOL_ID: userPool.userPoolId,
         },
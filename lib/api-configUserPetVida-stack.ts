@@ -8,6 +8,7 @@ import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
 import { Duration } from 'aws-cdk-lib';
 import * as logs from 'aws-cdk-lib/aws-logs';
 import * as apigwv2_authorizers from 'aws-cdk-lib/aws-apigatewayv2-authorizers';
+import { handlerCode, runtimeLayer } from './lambda-runtime';
 
 
 interface ApiConfigUserPetVidaStackProps extends cdk.StackProps {
@@ -15,6 +16,8 @@ interface ApiConfigUserPetVidaStackProps extends cdk.StackProps {
   usersTable: dynamodb.Table;
   httpApi: apigwv2.HttpApi;  
   cognitoAuthorizer: apigwv2_authorizers.HttpJwtAuthorizer;
+  userPoolId: string;
+  userPoolClientId: string;
   
 
 }
@@ -24,9 +27,11 @@ export class ApiConfigUserPetVidaStack extends cdk.Stack {
     constructor(scope: Construct, id: string, props: ApiConfigUserPetVidaStackProps) {
         super(scope, id, props);
   
-        const { usersTable, httpApi, cognitoAuthorizer } = props;
+        const { usersTable, httpApi, cognitoAuthorizer, userPoolId, userPoolClientId } = props;
         const { envName } = props;
 
+        const petvidaRuntime = runtimeLayer(this, envName);
+
    
 
 
@@ -38,13 +43,19 @@ export class ApiConfigUserPetVidaStack extends cdk.Stack {
             functionName: `get-config-${envName}`,
             runtime: lambda.Runtime.PYTHON_3_13,
             handler: 'get_config.lambda_handler',
-            code: lambda.Code.fromAsset(
-                path.join(__dirname, '../lambda/config')
-            ),
+            code: handlerCode('config', 'get_config.py'),
             timeout: Duration.seconds(10),
             logRetention: logs.RetentionDays.ONE_WEEK,
+            layers: [petvidaRuntime],
             environment: {
                 USERS_TABLE_NAME: usersTable.tableName,
+                // perfil em cache no container; outro container vê a
+                // alteração do save-config em no máximo esse tempo
+                PROFILE_CACHE_TTL_SECONDS: '60',
+                // sem as claims do authorizer, o Bearer é verificado no
+                // handler contra o JWKS do user pool (em cache no container)
+                USER_POOL_ID: userPoolId,
+                CLIENT_ID: userPoolClientId,
             },
         });
 
@@ -68,11 +79,10 @@ export class ApiConfigUserPetVidaStack extends cdk.Stack {
             functionName: `save-config-${envName}`,
             runtime: lambda.Runtime.PYTHON_3_13,
             handler: 'save_config.lambda_handler',
-            code: lambda.Code.fromAsset(
-                path.join(__dirname, '../lambda/config')
-            ),
+            code: handlerCode('config', 'save_config.py'),
             timeout: Duration.seconds(10),
             logRetention: logs.RetentionDays.ONE_WEEK,
+            layers: [petvidaRuntime],
             environment: {
                 USERS_TABLE_NAME: usersTable.tableName,
             },
@@ -8,11 +8,15 @@ import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
 import { Duration } from 'aws-cdk-lib';
 import * as logs from 'aws-cdk-lib/aws-logs';
 import * as apigwv2_authorizers from 'aws-cdk-lib/aws-apigatewayv2-authorizers';
+import { handlerCode, healthLayout, requiredEnv, runtimeLayer } from './lambda-runtime';
 
 
 interface ApiHealthStackProps extends cdk.StackProps {
   envName: string;
   healthTable: dynamodb.Table;
+  usersTable: dynamodb.Table;
+  remindersQueueTable: dynamodb.Table;
+  idempotencyTable: dynamodb.Table;
   httpApi: apigwv2.HttpApi;  
   cognitoAuthorizer: apigwv2_authorizers.HttpJwtAuthorizer;
 
@@ -22,9 +26,11 @@ export class ApiHealthStack extends cdk.Stack {
   constructor(scope: Construct, id: string, props: ApiHealthStackProps) {
     super(scope, id, props);
 
-    const { healthTable, httpApi, cognitoAuthorizer } = props;
+    const { healthTable, usersTable, remindersQueueTable, idempotencyTable, httpApi, cognitoAuthorizer } = props;
     const { envName } = props;
 
+    const petvidaRuntime = runtimeLayer(this, envName);
+
     /**
      * POST Vaccine Lambda
      */
@@ -33,17 +39,23 @@ export class ApiHealthStack extends cdk.Stack {
       functionName: `PostVaccine-${envName}`,
       runtime: lambda.Runtime.PYTHON_3_13,
       handler: 'post_vaccine.lambda_handler',
-      code: lambda.Code.fromAsset(
-        path.join(__dirname, '../lambda/health')
-      ),
+      code: handlerCode('health', 'post_vaccine.py'),
       timeout: Duration.seconds(10),
       logRetention: logs.RetentionDays.ONE_WEEK,
+      layers: [petvidaRuntime],
       environment: {
         HEALTH_RECORDS_TABLE: healthTable.tableName,
+        HEALTH_LAYOUT: healthLayout(),
+        REMINDERS_TABLE: remindersQueueTable.tableName,
+        USERS_TABLE_NAME: usersTable.tableName,
+        IDEMPOTENCY_TABLE: idempotencyTable.tableName,
       },
     });
 
-    healthTable.grantWriteData(postVaccineLambda);
+    healthTable.grantReadWriteData(postVaccineLambda); // lê o SUMMARY do pet
+    usersTable.grantReadData(postVaccineLambda); // advanceDays
+    remindersQueueTable.grantWriteData(postVaccineLambda); // lembrete do nextDueDate
+    idempotencyTable.grantReadWriteData(postVaccineLambda); // header Idempotency-Key
 
 
     httpApi.addRoutes({
@@ -66,13 +78,14 @@ export class ApiHealthStack extends cdk.Stack {
       functionName: `ListVaccines-${envName}`,
       runtime: lambda.Runtime.PYTHON_3_13,
       handler: 'list_vaccines.lambda_handler',
-      code: lambda.Code.fromAsset(
-        path.join(__dirname, '../lambda/health')
-      ),
+      code: handlerCode('health', 'list_vaccines.py'),
       timeout: Duration.seconds(10),
       logRetention: logs.RetentionDays.ONE_WEEK,
+      layers: [petvidaRuntime],
       environment: {
         HEALTH_RECORDS_TABLE: healthTable.tableName,
+        HEALTH_LAYOUT: healthLayout(),
+        CURSOR_SECRET: requiredEnv('CURSOR_SECRET'),
       },
     });
 
@@ -98,17 +111,23 @@ export class ApiHealthStack extends cdk.Stack {
       functionName: `PostCare-${envName}`,
       runtime: lambda.Runtime.PYTHON_3_13,
       handler: 'post_care.lambda_handler',
-      code: lambda.Code.fromAsset(
-        path.join(__dirname, '../lambda/health')
-      ),
+      code: handlerCode('health', 'post_care.py'),
       timeout: Duration.seconds(10),
       logRetention: logs.RetentionDays.ONE_WEEK,
+      layers: [petvidaRuntime],
       environment: {
         HEALTH_RECORDS_TABLE: healthTable.tableName,
+        HEALTH_LAYOUT: healthLayout(),
+        REMINDERS_TABLE: remindersQueueTable.tableName,
+        USERS_TABLE_NAME: usersTable.tableName,
+        IDEMPOTENCY_TABLE: idempotencyTable.tableName,
       },
     });
 
-    healthTable.grantWriteData(postCareLambda);
+    healthTable.grantReadWriteData(postCareLambda); // lê o SUMMARY do pet
+    usersTable.grantReadData(postCareLambda); // advanceDays
+    remindersQueueTable.grantWriteData(postCareLambda); // lembrete do nextDueDate
+    idempotencyTable.grantReadWriteData(postCareLambda); // header Idempotency-Key
 
     httpApi.addRoutes({
       path: '/api/care',
@@ -130,13 +149,14 @@ export class ApiHealthStack extends cdk.Stack {
       functionName: `GetCare-${envName}`,
       runtime: lambda.Runtime.PYTHON_3_13,
       handler: 'get_care.lambda_handler',
-      code: lambda.Code.fromAsset(
-        path.join(__dirname, '../lambda/health')
-      ),
+      code: handlerCode('health', 'get_care.py'),
       timeout: Duration.seconds(10),
       logRetention: logs.RetentionDays.ONE_WEEK,
+      layers: [petvidaRuntime],
       environment: {
         HEALTH_RECORDS_TABLE: healthTable.tableName,
+        HEALTH_LAYOUT: healthLayout(),
+        CURSOR_SECRET: requiredEnv('CURSOR_SECRET'),
       },
     });
 
@@ -156,5 +176,50 @@ export class ApiHealthStack extends cdk.Stack {
 
 
 
+    /**
+     * POST em lote (importação do histórico / carteirinha)
+     * Até 500 registros por chamada, gravados com BatchWriteItem.
+     */
+    const batchRoutes = [
+      { id: 'PostVaccinesBatch', file: 'post_vaccines_batch', path: '/api/vaccines/batch' },
+      { id: 'PostCareBatch', file: 'post_care_batch', path: '/api/care/batch' },
+    ];
+
+    for (const route of batchRoutes) {
+      const batchLambda = new lambda.Function(this, `${route.id}-${envName}`, {
+        description: `Criado em ${new Date().toISOString()}`,
+        functionName: `${route.id}-${envName}`,
+        runtime: lambda.Runtime.PYTHON_3_13,
+        handler: `${route.file}.lambda_handler`,
+        code: handlerCode('health', `${route.file}.py`),
+        timeout: Duration.seconds(30),
+        memorySize: 512,
+        logRetention: logs.RetentionDays.ONE_WEEK,
+        layers: [petvidaRuntime],
+        environment: {
+          HEALTH_RECORDS_TABLE: healthTable.tableName,
+          HEALTH_LAYOUT: healthLayout(),
+          REMINDERS_TABLE: remindersQueueTable.tableName,
+          USERS_TABLE_NAME: usersTable.tableName,
+        },
+      });
+
+      healthTable.grantReadWriteData(batchLambda); // lê o SUMMARY do pet
+      usersTable.grantReadData(batchLambda); // advanceDays
+      remindersQueueTable.grantWriteData(batchLambda); // lembretes do nextDueDate
+
+      httpApi.addRoutes({
+        path: route.path,
+        methods: [apigwv2.HttpMethod.POST],
+        integration: new integrations.HttpLambdaIntegration(
+          `${route.id}Integration-${envName}`,
+          batchLambda
+        ),
+        authorizer: cognitoAuthorizer,
+      });
+    }
+
+
+
   } // fim do construtor    
 }// fim da classe
\ No newline at end of file
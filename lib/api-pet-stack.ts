@@ -10,11 +10,14 @@ import * as s3 from 'aws-cdk-lib/aws-s3';
 import * as cloudfront from 'aws-cdk-lib/aws-cloudfront';
 import * as logs from 'aws-cdk-lib/aws-logs';
 import * as apigwv2_authorizers from 'aws-cdk-lib/aws-apigatewayv2-authorizers';
+import { handlerCode, healthLayout, runtimeLayer } from './lambda-runtime';
 
 
 interface ApiPetStackProps extends cdk.StackProps {
   envName: string;
   petsTable: dynamodb.Table;
+  healthTable: dynamodb.Table;
+  idempotencyTable: dynamodb.Table;
   httpApi: apigwv2.HttpApi;
   
   bucketFoto: s3.Bucket;
@@ -27,9 +30,11 @@ export class ApiPetStack extends cdk.Stack {
   constructor(scope: Construct, id: string, props: ApiPetStackProps) {
     super(scope, id, props);
 
-    const { petsTable, httpApi, bucketFoto, distributionFoto, cognitoAuthorizer } = props;
+    const { petsTable, healthTable, idempotencyTable, httpApi, bucketFoto, distributionFoto, cognitoAuthorizer } = props;
     const { envName } = props;
 
+    const petvidaRuntime = runtimeLayer(this, envName);
+
     /**
      * Lambda - Add Pet
      */
@@ -38,18 +43,19 @@ export class ApiPetStack extends cdk.Stack {
       functionName: `add-pet-${envName}`,
       runtime: lambda.Runtime.PYTHON_3_13,
       handler: 'add_pet.lambda_handler',
-      code: lambda.Code.fromAsset(
-        path.join(__dirname, '../lambda/pets')
-      ),
+      code: handlerCode('pets', 'add_pet.py'),
       memorySize: 128,
       timeout: cdk.Duration.seconds(10),
       logRetention: logs.RetentionDays.ONE_WEEK, // ✅ 7 dias
+      layers: [petvidaRuntime],
       environment: {
         PETS_TABLE_NAME: petsTable.tableName,
+        IDEMPOTENCY_TABLE: idempotencyTable.tableName,
       },
     });
 
     petsTable.grantWriteData(addPetLambda);
+    idempotencyTable.grantReadWriteData(addPetLambda); // header Idempotency-Key
 
     /**
      * Route: POST /api/pets
@@ -72,9 +78,10 @@ export class ApiPetStack extends cdk.Stack {
         functionName: `pet-photo-upload-url-${envName}`,
         runtime: lambda.Runtime.PYTHON_3_13,
         handler: 'get_upload_url.lambda_handler',
-        code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/pets')),
+        code: handlerCode('pets', 'get_upload_url.py'),
         timeout: Duration.seconds(10),
         logRetention: logs.RetentionDays.ONE_WEEK, // ✅ 7 dias
+        layers: [petvidaRuntime],
         environment: {
             BUCKET_NAME: bucketFoto.bucketName,
             CLOUDFRONT_URL: `https://${distributionFoto.domainName}`,
@@ -93,6 +100,39 @@ export class ApiPetStack extends cdk.Stack {
         authorizer: cognitoAuthorizer,
     });
 
+    /*
+    * Commit Pet Photo Lambda
+    * Grava no pet a photoKey versionada depois do upload na URL assinada.
+    */
+    const commitPhotoLambda = new lambda.Function(this, `PetPhotoCommit-${envName}`, {
+        description: `Atualizado em at ${new Date().toISOString()}`,
+        functionName: `pet-photo-commit-${envName}`,
+        runtime: lambda.Runtime.PYTHON_3_13,
+        handler: 'commit_photo.lambda_handler',
+        code: handlerCode('pets', 'commit_photo.py'),
+        timeout: Duration.seconds(10),
+        logRetention: logs.RetentionDays.ONE_WEEK,
+        layers: [petvidaRuntime],
+        environment: {
+            PETS_TABLE_NAME: petsTable.tableName,
+            BUCKET_NAME: bucketFoto.bucketName,
+            CLOUDFRONT_URL: `https://${distributionFoto.domainName}`,
+        },
+    });
+
+    petsTable.grantWriteData(commitPhotoLambda);
+    bucketFoto.grantRead(commitPhotoLambda, 'users/*'); // HeadObject (404 com List)
+
+    httpApi.addRoutes({
+        path: '/api/pets/{petId}/photo',
+        methods: [apigwv2.HttpMethod.POST],
+        integration: new integrations.HttpLambdaIntegration(
+            `PetPhotoCommitIntegration-${envName}`,
+            commitPhotoLambda
+        ),
+        authorizer: cognitoAuthorizer,
+    });
+
 
 
 
@@ -104,15 +144,19 @@ export class ApiPetStack extends cdk.Stack {
         functionName: `GetPet-${envName}`,
         runtime: lambda.Runtime.PYTHON_3_13,
         handler: 'get_pet.lambda_handler',
-        code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/pets')),
+        code: handlerCode('pets', 'get_pet.py'),
         timeout: Duration.seconds(10),
         logRetention: logs.RetentionDays.ONE_WEEK, // ✅ 7 dias
+        layers: [petvidaRuntime],
         environment: {
             PETS_TABLE_NAME: petsTable.tableName,
+            HEALTH_RECORDS_TABLE: healthTable.tableName, // include=health_summary
+            HEALTH_LAYOUT: healthLayout(),
         },
     });
 
     petsTable.grantReadData(getPetlLambda);
+    healthTable.grantReadData(getPetlLambda);
     
 
     httpApi.addRoutes({
@@ -135,9 +179,10 @@ export class ApiPetStack extends cdk.Stack {
       functionName: `GetSinglePet-${envName}`,
       runtime: lambda.Runtime.PYTHON_3_13,
       handler: 'get_single_pet.lambda_handler',
-      code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/pets')),
+      code: handlerCode('pets', 'get_single_pet.py'),
       timeout: Duration.seconds(10),
       logRetention: logs.RetentionDays.ONE_WEEK,
+      layers: [petvidaRuntime],
       environment: {
         PETS_TABLE_NAME: petsTable.tableName,
       },
@@ -158,5 +203,42 @@ export class ApiPetStack extends cdk.Stack {
 
 
 
+    /*
+    * Pet Dashboard Lambda
+    * Pet + últimas vacinas + últimos cuidados numa chamada só (leituras em
+    * paralelo), no lugar de get_single_pet + list_vaccines + get_care.
+    */
+    const petDashboardLambda = new lambda.Function(this, `GetPetDashboard-${envName}`, {
+      description: `Atualizado em at  - ${new Date().toISOString()}`,
+      functionName: `GetPetDashboard-${envName}`,
+      runtime: lambda.Runtime.PYTHON_3_13,
+      handler: 'get_pet_dashboard.lambda_handler',
+      code: handlerCode('pets', 'get_pet_dashboard.py'),
+      timeout: Duration.seconds(10),
+      logRetention: logs.RetentionDays.ONE_WEEK,
+      layers: [petvidaRuntime],
+      environment: {
+        PETS_TABLE_NAME: petsTable.tableName,
+        HEALTH_RECORDS_TABLE: healthTable.tableName,
+        HEALTH_LAYOUT: healthLayout(),
+      },
+    });
+
+    petsTable.grantReadData(petDashboardLambda);
+    healthTable.grantReadData(petDashboardLambda);
+
+    httpApi.addRoutes({
+      path: '/api/pets/{petId}/dashboard',
+      methods: [apigwv2.HttpMethod.GET],
+      integration: new integrations.HttpLambdaIntegration(
+        `GetPetDashboardIntegration-${envName}`,
+        petDashboardLambda
+      ),
+      authorizer: cognitoAuthorizer,
+    });
+
+
+
+
   }// end Contrutctor
 }
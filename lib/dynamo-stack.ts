@@ -15,6 +15,8 @@ export class DynamoStack extends cdk.Stack {
   public readonly healthRecordsTable: dynamodb.Table;
   public readonly usersTable: dynamodb.Table;
   public readonly stripeEventsTable: dynamodb.Table;
+  public readonly remindersQueueTable: dynamodb.Table;
+  public readonly idempotencyTable: dynamodb.Table;
 
   constructor(scope: Construct, id: string, props: DynamoStackProps) {
     super(scope, id, props);
@@ -62,9 +64,11 @@ export class DynamoStack extends cdk.Stack {
 
     /**
      * 3️⃣ HEALTH RECORDS
-     * Vacinas e cuidados recorrentes
-     * PK: PET#<petId>
-     * SK: RECORD#<timestamp>
+     * Vacinas, cuidados recorrentes e o resumo de cada pet
+     * PK: PET#<petId>#USER#<userId>
+     * SK: <VACCINE|CARE>#<data do evento>#<recordId> | SUMMARY
+     * Legado (PK USER#<userId>, SK PET#<petId>#...) até a migração:
+     * HEALTH_LAYOUT user -> dual -> pet + scripts/migrate_health_partitions.py
      */
     this.healthRecordsTable = new dynamodb.Table(this, `HealthRecordsTable-${envName}`, {
       tableName: `HealthRecords-${envName}`,
@@ -80,14 +84,60 @@ export class DynamoStack extends cdk.Stack {
       removalPolicy: cdk.RemovalPolicy.DESTROY,
     });
 
+    /**
+     * GSI1 (esparso) - índice do dono: registros do usuário por tipo, ordenados pela data do evento
+     * GSI1PK: USER#<userId>#<VACCINE|CARE>
+     * GSI1SK: <appliedAt|performedAt>#<recordId>
+     * Backfill de registros antigos: scripts/backfill_health_indexes.py
+     */
+    this.healthRecordsTable.addGlobalSecondaryIndex({
+      indexName: 'GSI1',
+      partitionKey: {
+        name: 'GSI1PK',
+        type: dynamodb.AttributeType.STRING,
+      },
+      sortKey: {
+        name: 'GSI1SK',
+        type: dynamodb.AttributeType.STRING,
+      },
+      projectionType: dynamodb.ProjectionType.ALL,
+    });
+
+    /**
+     * GSI2 (esparso) - registros de um pet por tipo, ordenados pela data do evento
+     * GSI2PK: USER#<userId>#PET#<petId>#<VACCINE|CARE>
+     * GSI2SK: <appliedAt|performedAt>#<recordId>
+     * Só no layout legado: no por pet a própria tabela já responde essa query.
+     *
+     * O DynamoDB cria um GSI por atualização da tabela: numa tabela que ainda
+     * não tem nenhum dos dois, o primeiro deploy vai com -c healthGsi2=false
+     * (só o GSI1) e o seguinte cria o GSI2. Ver README, "Índices da HealthRecords".
+     */
+    const withGsi2 = String(this.node.tryGetContext('healthGsi2') ?? 'true') !== 'false';
+
+    if (withGsi2) {
+      this.healthRecordsTable.addGlobalSecondaryIndex({
+        indexName: 'GSI2',
+        partitionKey: {
+          name: 'GSI2PK',
+          type: dynamodb.AttributeType.STRING,
+        },
+        sortKey: {
+          name: 'GSI2SK',
+          type: dynamodb.AttributeType.STRING,
+        },
+        projectionType: dynamodb.ProjectionType.ALL,
+      });
+    }
+
     /**
      * 4️⃣ REMINDERS QUEUE
      * Fila de lembretes (email hoje, WhatsApp amanhã)
-     * PK: REMINDER#<date>
+     * PK: REMINDER#<date>#<shard>  (shard 0-9, evita partição quente)
      * SK: <recordId>
      * TTL: expiresAt
      */
-    const remindersQueueTable = new dynamodb.Table(this, `RemindersQueueTable-${envName}`, {
+    this.remindersQueueTable = new dynamodb.Table(this, `RemindersQueueTable-${envName}`, {
       tableName: `RemindersQueue-${envName}`,
       partitionKey: {
         name: 'PK',
@@ -106,6 +156,13 @@ export class DynamoStack extends cdk.Stack {
 
 
 
+    /**
+     * 5️⃣ STRIPE EVENTS
+     * Eventos recebidos pelo webhook (idempotência + status do worker)
+     * PK: EVENT#<eventId>
+     * SK: CREATED#<created>
+     * Campos de consulta no topo; payload original comprimido em payload_z
+     */
     this.stripeEventsTable = new dynamodb.Table(this, `StripeEvents-${envName}`, {
       tableName: `stripe-events-${envName}`,
       partitionKey: {
@@ -122,6 +179,25 @@ export class DynamoStack extends cdk.Stack {
 
 
 
+    /**
+     * 6️⃣ IDEMPOTENCY
+     * Header Idempotency-Key dos POST que criam registros
+     * PK: <routeKey>#<sub>#<chave>
+     * Reserva (IN_PROGRESS) e resposta gravada (COMPLETED); TTL: expiresAt
+     */
+    this.idempotencyTable = new dynamodb.Table(this, `IdempotencyTable-${envName}`, {
+      tableName: `Idempotency-${envName}`,
+      partitionKey: {
+        name: 'PK',
+        type: dynamodb.AttributeType.STRING,
+      },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      timeToLiveAttribute: 'expiresAt',
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+
+
     /**
      * Outputs (opcional, mas ajuda MUITO)
      */
@@ -138,12 +214,16 @@ export class DynamoStack extends cdk.Stack {
     });
 
     new cdk.CfnOutput(this, `RemindersQueueTableName-${envName}`, {
-      value: remindersQueueTable.tableName,
+      value: this.remindersQueueTable.tableName,
     });
 
 
     new cdk.CfnOutput(this, `StripeEventsTableName-${envName}`, {
       value: this.stripeEventsTable.tableName,
     });
+
+    new cdk.CfnOutput(this, `IdempotencyTableName-${envName}`, {
+      value: this.idempotencyTable.tableName,
+    });
   }
 }
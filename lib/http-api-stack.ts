@@ -25,7 +25,7 @@ export class HttpApiStack extends cdk.Stack {
           apigwv2.CorsHttpMethod.PUT,
           apigwv2.CorsHttpMethod.DELETE,
         ],
-        allowHeaders: ['Content-Type', 'Authorization'],
+        allowHeaders: ['Content-Type', 'Authorization', 'Idempotency-Key'],
       },
     });
   }
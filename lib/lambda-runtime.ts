@@ -0,0 +1,57 @@
+import { Construct } from 'constructs';
+import * as lambda from 'aws-cdk-lib/aws-lambda';
+import * as path from 'path';
+
+
+/**
+ * Layer com o pacote petvida_runtime (layers/petvida_runtime/python):
+ * response/parse de request, JSON com Decimal, clientes AWS preguiçosos
+ * e o decorator que mede as fases de cada handler.
+ */
+export function runtimeLayer(scope: Construct, envName: string): lambda.LayerVersion {
+  return new lambda.LayerVersion(scope, `PetvidaRuntimeLayer-${envName}`, {
+    code: lambda.Code.fromAsset(path.join(__dirname, '../layers/petvida_runtime')),
+    compatibleRuntimes: [lambda.Runtime.PYTHON_3_13],
+    description: 'petvida_runtime - código compartilhado dos handlers',
+  });
+}
+
+
+/**
+ * Empacota só os arquivos informados de um diretório de lambda/, em vez do
+ * diretório inteiro: cada função leva apenas o próprio handler.
+ */
+export function handlerCode(dir: string, ...files: string[]): lambda.Code {
+  return lambda.Code.fromAsset(path.join(__dirname, '../lambda', dir), {
+    exclude: ['*', ...files.map((file) => `!${file}`)],
+  });
+}
+
+
+/**
+ * Variável do .env (ou do ambiente) obrigatória para o synth: ausente ou
+ * vazia interrompe o `cdk synth`/`cdk deploy`, em vez de subir a função com
+ * o valor vazio.
+ */
+export function requiredEnv(name: string): string {
+  const value = process.env[name];
+  if (!value) {
+    throw new Error(`${name} não definida: configure no .env antes do deploy (ver README)`);
+  }
+  return value;
+}
+
+
+const HEALTH_LAYOUTS = ['user', 'dual', 'pet'];
+
+/**
+ * HEALTH_LAYOUT das funções que leem/gravam a HealthRecords (padrão user).
+ * Valor fora de user/dual/pet interrompe o synth.
+ */
+export function healthLayout(): string {
+  const layout = process.env.HEALTH_LAYOUT || 'user';
+  if (!HEALTH_LAYOUTS.includes(layout)) {
+    throw new Error(`HEALTH_LAYOUT inválido: ${layout} (use ${HEALTH_LAYOUTS.join(', ')})`);
+  }
+  return layout;
+}
@@ -0,0 +1,89 @@
+import * as cdk from 'aws-cdk-lib';
+import { Construct } from 'constructs';
+import * as lambda from 'aws-cdk-lib/aws-lambda';
+import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
+import * as sqs from 'aws-cdk-lib/aws-sqs';
+import * as events from 'aws-cdk-lib/aws-events';
+import * as targets from 'aws-cdk-lib/aws-events-targets';
+import { Duration } from 'aws-cdk-lib';
+import * as logs from 'aws-cdk-lib/aws-logs';
+import { handlerCode, healthLayout, runtimeLayer } from './lambda-runtime';
+
+
+interface RemindersStackProps extends cdk.StackProps {
+  envName: string;
+  usersTable: dynamodb.Table;
+  healthTable: dynamodb.Table;
+  remindersQueueTable: dynamodb.Table;
+}
+
+export class RemindersStack extends cdk.Stack {
+
+  public readonly remindersDispatchQueue: sqs.Queue;
+
+  constructor(scope: Construct, id: string, props: RemindersStackProps) {
+    super(scope, id, props);
+
+    const { usersTable, healthTable, remindersQueueTable } = props;
+    const { envName } = props;
+
+    const petvidaRuntime = runtimeLayer(this, envName);
+
+    /**
+     * Fila de envio
+     * O sweeper publica aqui os lembretes do dia (um por mensagem); o envio
+     * em si (email hoje, WhatsApp amanhã) consome esta fila.
+     */
+    const remindersDispatchDlq = new sqs.Queue(this, `RemindersDispatchDLQ-${envName}`, {
+      queueName: `RemindersDispatch-DLQ-${envName}`,
+      retentionPeriod: Duration.days(14),
+    });
+
+    this.remindersDispatchQueue = new sqs.Queue(this, `RemindersDispatchQueue-${envName}`, {
+      queueName: `RemindersDispatch-${envName}`,
+      retentionPeriod: Duration.days(4),
+      deadLetterQueue: {
+        queue: remindersDispatchDlq,
+        maxReceiveCount: 5,
+      },
+    });
+
+    /**
+     * Sweeper diário
+     * Lê só as partições REMINDER#<dia>#<shard> da RemindersQueue (hoje e os
+     * dias anteriores ainda pendentes), confere remindersEnabled e o SUMMARY
+     * do pet (lembrete de registro já substituído não sai) e envia em lotes
+     * para a fila de envio.
+     */
+    const sweepRemindersLambda = new lambda.Function(this, `SweepReminders-${envName}`, {
+      description: `Criado em ${new Date().toISOString()}`,
+      functionName: `SweepReminders-${envName}`,
+      runtime: lambda.Runtime.PYTHON_3_13,
+      handler: 'sweep_reminders.lambda_handler',
+      code: handlerCode('reminders', 'sweep_reminders.py'),
+      timeout: Duration.minutes(5),
+      logRetention: logs.RetentionDays.ONE_WEEK,
+      layers: [petvidaRuntime],
+      environment: {
+        REMINDERS_TABLE: remindersQueueTable.tableName,
+        USERS_TABLE_NAME: usersTable.tableName,
+        HEALTH_RECORDS_TABLE: healthTable.tableName,
+        HEALTH_LAYOUT: healthLayout(),
+        REMINDERS_DISPATCH_QUEUE_URL: this.remindersDispatchQueue.queueUrl,
+      },
+    });
+
+    remindersQueueTable.grantReadWriteData(sweepRemindersLambda);
+    usersTable.grantReadData(sweepRemindersLambda);
+    healthTable.grantReadData(sweepRemindersLambda); // SUMMARY dos pets
+    this.remindersDispatchQueue.grantSendMessages(sweepRemindersLambda);
+
+    // 12:00 UTC = 09:00 em Brasília
+    new events.Rule(this, `SweepRemindersSchedule-${envName}`, {
+      schedule: events.Schedule.cron({ minute: '0', hour: '12' }),
+      targets: [new targets.LambdaFunction(sweepRemindersLambda)],
+    });
+
+
+  } // fim do construtor
+}// fim da classe
@@ -1,4 +1,4 @@
-import { Stack, StackProps, RemovalPolicy } from 'aws-cdk-lib';
+import { Stack, StackProps, RemovalPolicy, Duration } from 'aws-cdk-lib';
 import { Construct } from 'constructs';
 import * as s3 from 'aws-cdk-lib/aws-s3';
 import * as cloudfront from 'aws-cdk-lib/aws-cloudfront';
@@ -6,6 +6,11 @@ import { S3StaticWebsiteOrigin } from 'aws-cdk-lib/aws-cloudfront-origins';
 import * as cdk from 'aws-cdk-lib';
 import * as origins from 'aws-cdk-lib/aws-cloudfront-origins';
 import * as iam from 'aws-cdk-lib/aws-iam';
+import * as lambda from 'aws-cdk-lib/aws-lambda';
+import * as logs from 'aws-cdk-lib/aws-logs';
+import * as s3n from 'aws-cdk-lib/aws-s3-notifications';
+import * as path from 'path';
+import { handlerCode, runtimeLayer } from './lambda-runtime';
 
 
 interface SiteStackProps extends StackProps {
@@ -67,6 +72,7 @@ export class SiteStack extends Stack {
         {
           allowedMethods: [
             s3.HttpMethods.PUT,
+            s3.HttpMethods.POST, // upload via formulário assinado (limite de tamanho)
             s3.HttpMethods.GET,
             s3.HttpMethods.HEAD,
           ],
@@ -81,10 +87,25 @@ export class SiteStack extends Stack {
 
 
 
+    // Keys de foto são versionadas (nunca sobrescritas): cache de um ano.
+    // Objetos sem Cache-Control (originais antigos) ficam um dia.
+    const immutableImagesPolicy = new cloudfront.CachePolicy(this, `ImmutableImages-${envName}`, {
+        comment: 'Fotos com key versionada - cache de um ano',
+        defaultTtl: Duration.days(1),
+        minTtl: Duration.seconds(0),
+        maxTtl: Duration.days(365),
+        queryStringBehavior: cloudfront.CacheQueryStringBehavior.none(),
+        headerBehavior: cloudfront.CacheHeaderBehavior.none(),
+        cookieBehavior: cloudfront.CacheCookieBehavior.none(),
+        enableAcceptEncodingGzip: false, // imagens já são comprimidas
+        enableAcceptEncodingBrotli: false,
+    });
+
     this.distributionFoto = new cloudfront.Distribution(this, `ImagesCDN-${envName}`, {
         defaultBehavior: {
             origin: new origins.S3Origin(this.bucketFoto), // 👈 OAC automático
             viewerProtocolPolicy: cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+            cachePolicy: immutableImagesPolicy,
         },
         });
 
@@ -103,6 +124,46 @@ export class SiteStack extends Stack {
         );
 
 
+    /*
+    * Derivados das fotos (thumb/card/full em WebP e JPEG)
+    */
+    // Pillow tem binários nativos: instalado na imagem de build do Lambda,
+    // para bater com a arquitetura do runtime
+    const pillowLayer = new lambda.LayerVersion(this, `PillowLayer-${envName}`, {
+        code: lambda.Code.fromAsset(path.join(__dirname, '../layers/pillow'), {
+            bundling: {
+                image: lambda.Runtime.PYTHON_3_13.bundlingImage,
+                command: [
+                    'bash', '-c',
+                    'pip install -r requirements.txt -t /asset-output/python --no-cache-dir',
+                ],
+            },
+        }),
+        compatibleRuntimes: [lambda.Runtime.PYTHON_3_13],
+        description: 'Pillow - redimensionamento das fotos',
+    });
+
+    const processPhotoLambda = new lambda.Function(this, `ProcessPetPhoto-${envName}`, {
+        description: `Atualizado em ${new Date().toISOString()}`,
+        functionName: `process-pet-photo-${envName}`,
+        runtime: lambda.Runtime.PYTHON_3_13,
+        handler: 'process_photo.lambda_handler',
+        code: handlerCode('pets', 'process_photo.py'),
+        timeout: Duration.seconds(30),
+        memorySize: 1024, // CPU proporcional: decodificar 12 MP
+        logRetention: logs.RetentionDays.ONE_WEEK,
+        layers: [pillowLayer, runtimeLayer(this, envName)],
+    });
+
+    this.bucketFoto.grantRead(processPhotoLambda, 'users/*');
+    this.bucketFoto.grantPut(processPhotoLambda, 'derived/*');
+
+    // só os originais: os derivados (derived/) não disparam de novo
+    this.bucketFoto.addEventNotification(
+        s3.EventType.OBJECT_CREATED,
+        new s3n.LambdaDestination(processPhotoLambda),
+        { prefix: 'users/' },
+    );
    
     }   
 
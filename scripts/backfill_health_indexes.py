@@ -0,0 +1,94 @@
+"""
+Backfill dos GSI1/GSI2 da tabela HealthRecords-<env>.
+
+Registros criados antes dos índices não têm GSI1PK/GSI1SK/GSI2PK/GSI2SK e
+por isso não aparecem nas listagens por usuário e por pet. Este script varre
+a tabela uma vez e grava as chaves dos índices nos registros que ainda não
+as têm. Só mexe no layout por usuário (PK USER#...): as cópias por pet já
+nascem com as chaves certas (ver health_keys). Pode ser executado de novo
+sem efeito colateral.
+
+Uso:
+    python scripts/backfill_health_indexes.py --env dev [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "layers", "petvida_runtime", "python")
+)
+
+from petvida_runtime.health_keys import EVENT_DATE_FIELD, index_keys, pet_id_from_sk  # noqa: E402
+
+
+def user_id_from_pk(pk: str) -> str:
+    return pk.split("#", 1)[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--env", required=True, help="dev, prod, ...")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    table = boto3.resource("dynamodb").Table(f"HealthRecords-{args.env}")
+
+    scan_kwargs = {
+        "FilterExpression":
+            Attr("PK").begins_with("USER#") &
+            Attr("type").is_in(list(EVENT_DATE_FIELD)) &
+            (Attr("GSI1PK").not_exists() | Attr("GSI2PK").not_exists()),
+    }
+
+    scanned = updated = 0
+
+    while True:
+        page = table.scan(**scan_kwargs)
+        scanned += page.get("ScannedCount", 0)
+
+        for item in page.get("Items", []):
+            keys = index_keys(
+                user_id_from_pk(item["PK"]), pet_id_from_sk(item["SK"]), item
+            )
+
+            if args.dry_run:
+                print(f"[dry-run] {item['PK']} {item['SK']} -> {keys['GSI1PK']} {keys['GSI2PK']} {keys['GSI2SK']}")
+                updated += 1
+                continue
+
+            try:
+                table.update_item(
+                    Key={"PK": item["PK"], "SK": item["SK"]},
+                    UpdateExpression=(
+                        "SET GSI1PK = :gsi1pk, GSI1SK = :gsi1sk, "
+                        "GSI2PK = :gsi2pk, GSI2SK = :gsi2sk"
+                    ),
+                    ConditionExpression="attribute_exists(PK)",
+                    ExpressionAttributeValues={
+                        ":gsi1pk": keys["GSI1PK"],
+                        ":gsi1sk": keys["GSI1SK"],
+                        ":gsi2pk": keys["GSI2PK"],
+                        ":gsi2sk": keys["GSI2SK"],
+                    },
+                )
+                updated += 1
+            except ClientError as e:
+                # apagado no meio do caminho
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+
+        last_key = page.get("LastEvaluatedKey")
+        if not last_key:
+            break
+        scan_kwargs["ExclusiveStartKey"] = last_key
+
+    print(f"✅ Backfill concluído | lidos={scanned} atualizados={updated}")
+
+
+if __name__ == "__main__":
+    main()
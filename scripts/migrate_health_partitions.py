@@ -0,0 +1,138 @@
+"""
+Migra a tabela HealthRecords-<env> do layout por usuário para o por pet.
+
+Ordem (sem downtime, ver health_keys):
+  1. deploy das lambdas com HEALTH_LAYOUT=dual (escritas novas vão para os
+     dois layouts, leituras continuam no por usuário)
+  2. --phase copy: cria a cópia por pet de cada registro/resumo legado que
+     ainda não tem (sem GSI1, condicional: não sobrescreve o que o dual já
+     gravou)
+  3. deploy com HEALTH_LAYOUT=pet (leituras e escritas no layout por pet)
+  4. --phase finalize: para cada registro legado, grava a cópia por pet com
+     as chaves do GSI1 e apaga o legado na mesma transação (o registro nunca
+     some nem aparece duas vezes na listagem do dono); resumos legados são
+     apagados, mantendo o por pet
+Só rode o finalize com as lambdas já em HEALTH_LAYOUT=pet. As duas fases
+podem ser executadas de novo sem efeito colateral.
+
+Uso:
+    python scripts/migrate_health_partitions.py --env dev --phase copy|finalize
+        [--segments 4] [--dry-run]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "layers", "petvida_runtime", "python")
+)
+
+from petvida_runtime.health_keys import EVENT_DATE_FIELD, SUMMARY_SK, pet_keyed_copy  # noqa: E402
+
+
+def legacy_items(table, segment, segments):
+    kwargs = {
+        "Segment": segment,
+        "TotalSegments": segments,
+        "FilterExpression":
+            Attr("PK").begins_with("USER#") &
+            Attr("type").is_in([*EVENT_DATE_FIELD, SUMMARY_SK]),
+    }
+
+    while True:
+        page = table.scan(**kwargs)
+        yield from page.get("Items", [])
+
+        last_key = page.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def put_if_missing(table, item) -> bool:
+    try:
+        table.put_item(Item=item, ConditionExpression="attribute_not_exists(PK)")
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+
+
+def copy_item(table, item) -> str:
+    return "copiados" if put_if_missing(table, pet_keyed_copy(item)) else "já existiam"
+
+
+def finalize_item(table, item) -> str:
+    legacy_key = {"PK": item["PK"], "SK": item["SK"]}
+
+    if item["type"] == SUMMARY_SK:
+        # o resumo por pet é o mantido pelas lambdas: só cria se faltar
+        put_if_missing(table, pet_keyed_copy(item))
+        table.delete_item(Key=legacy_key)
+        return "resumos"
+
+    try:
+        table.meta.client.transact_write_items(TransactItems=[
+            {"Put": {
+                "TableName": table.name,
+                "Item": pet_keyed_copy(item, owner_index=True),
+            }},
+            {"Delete": {
+                "TableName": table.name,
+                "Key": legacy_key,
+                "ConditionExpression": "attribute_exists(PK)",
+            }},
+        ])
+        return "registros"
+    except ClientError as e:
+        # legado já apagado por outra execução
+        if e.response["Error"]["Code"] != "TransactionCanceledException":
+            raise
+        return "já migrados"
+
+
+def run_segment(table_name, phase, segment, segments, dry_run) -> dict:
+    # resource por thread: os do boto3 não são thread-safe
+    table = boto3.session.Session().resource("dynamodb").Table(table_name)
+    migrate = copy_item if phase == "copy" else finalize_item
+
+    counts = {}
+    for item in legacy_items(table, segment, segments):
+        outcome = "[dry-run] encontrados" if dry_run else migrate(table, item)
+        counts[outcome] = counts.get(outcome, 0) + 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--env", required=True, help="dev, prod, ...")
+    parser.add_argument("--phase", required=True, choices=("copy", "finalize"))
+    parser.add_argument("--segments", type=int, default=4, help="scan paralelo (TotalSegments)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    table_name = f"HealthRecords-{args.env}"
+
+    with ThreadPoolExecutor(max_workers=args.segments) as pool:
+        results = pool.map(
+            lambda segment: run_segment(table_name, args.phase, segment, args.segments, args.dry_run),
+            range(args.segments),
+        )
+
+        totals = {}
+        for counts in results:
+            for outcome, count in counts.items():
+                totals[outcome] = totals.get(outcome, 0) + count
+
+    summary = " ".join(f"{outcome}={count}" for outcome, count in sorted(totals.items())) or "nada a migrar"
+    print(f"✅ {args.phase} concluído | {summary}")
+
+
+if __name__ == "__main__":
+    main()
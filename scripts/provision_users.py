@@ -0,0 +1,298 @@
+"""
+Cria em lote usuários no Cognito e os perfis USER#<sub>/PROFILE na tabela Users-<env>.
+
+Para migrar uma base de clientes ou reprocessar checkouts do Stripe
+acumulados, sem passar pelo stripe_worker um a um.
+
+Entrada: CSV com cabeçalho (colunas email e name) ou JSONL
+({"email": ..., "name": ...} por linha), pela extensão do arquivo.
+
+Como funciona:
+  - a entrada é processada em lotes de --chunk linhas
+  - as chamadas ao Cognito rodam em --concurrency threads, limitadas por um
+    token bucket de --rate chamadas/s: AdminCreateUser e, para e-mails já
+    cadastrados, o AdminGetUser que busca o sub. As cotas do Cognito são da
+    conta e divididas com o stripe_worker, então deixe folga
+  - TooManyRequestsException volta a tentar (só a chamada recusada) com
+    backoff exponencial (com jitter), até MAX_THROTTLE_ATTEMPTS vezes
+  - os perfis do lote são gravados com batch_writer. Só são gravados os
+    que ainda não existem (BatchGetItem antes), para não sobrescrever
+    preferências já salvas pelo save_config
+  - depois que o lote termina, o checkpoint (--checkpoint) guarda a próxima
+    linha. Rodar de novo continua dali. Um e-mail já criado antes de uma
+    interrupção volta como UsernameExists, que devolve o sub existente sem
+    duplicar (ver petvida_runtime.users)
+  - linhas inválidas e erros do Cognito vão para <checkpoint>.errors.jsonl e
+    não param o lote. Esse arquivo é uma entrada JSONL válida para uma nova
+    rodada
+
+Uso:
+    python scripts/provision_users.py --env dev --input clientes.csv
+        [--user-pool-id sa-east-1_xxx] [--rate 10] [--concurrency 4]
+        [--chunk 100] [--checkpoint clientes.csv.checkpoint.json] [--dry-run]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "layers", "petvida_runtime", "python")
+)
+
+from petvida_runtime.profiles import profile_key  # noqa: E402
+from petvida_runtime.users import create_cognito_user, profile_item  # noqa: E402
+
+MAX_THROTTLE_ATTEMPTS = 8
+BASE_DELAY = 0.5
+MAX_DELAY = 20.0
+BATCH_GET_LIMIT = 100
+
+
+class TokenBucket:
+    """`rate` fichas por segundo, acumulando até `burst`. acquire() espera uma ficha."""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = 1.0  # sem rajada na largada
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# =========================
+# Entrada e checkpoint
+# =========================
+def read_rows(path: str):
+    """(número da linha de dados, dict) a partir de 0, em CSV ou JSONL."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for number, line in enumerate(f):
+                line = line.strip()
+                try:
+                    row = json.loads(line) if line else {}
+                except ValueError:
+                    row = None
+                yield number, row if isinstance(row, dict) else {"_raw": line}
+        else:
+            yield from enumerate(csv.DictReader(f))
+
+
+def customer(row: dict):
+    """(email, name) normalizados, ou None se a linha não serve."""
+    email = (row.get("email") or "").strip()
+    name = (row.get("name") or "").strip()
+    if "@" not in email or not name:
+        return None
+    return email, name
+
+
+def load_checkpoint(path: str, input_path: str) -> dict:
+    if not os.path.exists(path):
+        return {"input": input_path, "next_row": 0, "totals": {}}
+
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+
+    if checkpoint["input"] != input_path:
+        sys.exit(f"❌ checkpoint {path} é de outra entrada ({checkpoint['input']})")
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    # troca atômica: uma interrupção no meio não corrompe o checkpoint
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+# =========================
+# Cognito
+# =========================
+def resolve_user_pool(cognito, env: str) -> str:
+    name = f"PetApp-Users-{env}"
+    for page in cognito.get_paginator("list_user_pools").paginate(MaxResults=60):
+        for pool in page["UserPools"]:
+            if pool["Name"] == name:
+                return pool["Id"]
+    sys.exit(f"❌ user pool {name} não encontrado (use --user-pool-id)")
+
+
+def call_with_backoff(bucket, operation, **kwargs):
+    for attempt in range(MAX_THROTTLE_ATTEMPTS):
+        bucket.acquire()
+        try:
+            return operation(**kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "TooManyRequestsException" or attempt == MAX_THROTTLE_ATTEMPTS - 1:
+                raise
+        # metade fixa + metade aleatória: as threads não voltam juntas
+        delay = min(MAX_DELAY, BASE_DELAY * 2 ** attempt)
+        time.sleep(delay / 2 + random.uniform(0, delay / 2))
+
+
+def create_with_backoff(cognito, bucket, user_pool_id, email, name) -> tuple:
+    # AdminCreateUser e AdminGetUser (e-mail existente) passam pelo bucket
+    return create_cognito_user(
+        user_pool_id, email, name, cognito=cognito,
+        call=lambda operation, **kwargs: call_with_backoff(bucket, operation, **kwargs),
+    )
+
+
+# =========================
+# DynamoDB
+# =========================
+def existing_profiles(dynamodb, table_name: str, user_ids: list) -> set:
+    found = set()
+    keys = [profile_key(user_id) for user_id in dict.fromkeys(user_ids)]
+
+    for start in range(0, len(keys), BATCH_GET_LIMIT):
+        request = {table_name: {"Keys": keys[start:start + BATCH_GET_LIMIT], "ProjectionExpression": "PK"}}
+        while request:
+            page = dynamodb.batch_get_item(RequestItems=request)
+            found.update(item["PK"] for item in page["Responses"].get(table_name, []))
+            request = page.get("UnprocessedKeys") or {}
+            if request:
+                time.sleep(random.uniform(0, BASE_DELAY))
+
+    return {pk.split("#", 1)[1] for pk in found}
+
+
+# =========================
+# Lote
+# =========================
+def reject(errors, number: int, row: dict, error: str):
+    errors.write(json.dumps({**row, "_row": number, "_error": error}, ensure_ascii=False) + "\n")
+
+
+def provision_chunk(rows, cognito, dynamodb, table, bucket, user_pool_id, concurrency, errors) -> dict:
+    counts = {}
+    valid = []
+    for number, row in rows:
+        parsed = customer(row)
+        if parsed is None:
+            reject(errors, number, row, "email/name inválidos")
+            counts["inválidos"] = counts.get("inválidos", 0) + 1
+        else:
+            valid.append((number, row, *parsed))
+
+    def create(entry):
+        number, row, email, name = entry
+        try:
+            return entry, create_with_backoff(cognito, bucket, user_pool_id, email, name), None
+        except ClientError as e:
+            return entry, None, e.response["Error"]["Code"]
+
+    created = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for (number, row, email, name), result, error in pool.map(create, valid):
+            if error:
+                reject(errors, number, row, error)
+                counts["falhas"] = counts.get("falhas", 0) + 1
+                continue
+
+            user_id, is_new = result
+            outcome = "cognito criados" if is_new else "cognito existentes"
+            counts[outcome] = counts.get(outcome, 0) + 1
+            created.append((user_id, name, email))
+
+    existing = existing_profiles(dynamodb, table.name, [user_id for user_id, _, _ in created])
+    missing = [entry for entry in created if entry[0] not in existing]
+
+    # o batch_writer reenvia UnprocessedItems e grava o resto ao sair do with
+    with table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as batch:
+        for user_id, name, email in missing:
+            batch.put_item(Item=profile_item(user_id, name, email))
+
+    counts["perfis gravados"] = counts.get("perfis gravados", 0) + len({entry[0] for entry in missing})
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--env", required=True, help="dev, prod, ...")
+    parser.add_argument("--input", required=True, help="CSV (email,name) ou JSONL")
+    parser.add_argument("--user-pool-id", help="padrão: o pool PetApp-Users-<env>")
+    parser.add_argument("--rate", type=float, default=10, help="chamadas ao Cognito por segundo")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--chunk", type=int, default=100, help="linhas por lote (e por checkpoint)")
+    parser.add_argument("--checkpoint", help="padrão: <input>.checkpoint.json")
+    parser.add_argument("--dry-run", action="store_true", help="só valida a entrada")
+    args = parser.parse_args()
+
+    input_path = os.path.abspath(args.input)
+    checkpoint_path = args.checkpoint or f"{input_path}.checkpoint.json"
+    checkpoint = load_checkpoint(checkpoint_path, input_path)
+    start = checkpoint["next_row"]
+
+    if args.dry_run:
+        rows = list(islice(read_rows(input_path), start, None))
+        invalid = sum(1 for _, row in rows if customer(row) is None)
+        print(f"[dry-run] a partir da linha {start} | linhas={len(rows)} inválidas={invalid}")
+        return
+
+    # retries do botocore desligados (total_max_attempts conta a primeira
+    # tentativa; max_attempts não): o throttling é tratado aqui, com o bucket
+    cognito = boto3.client("cognito-idp", config=Config(
+        retries={"mode": "standard", "total_max_attempts": 1},
+        max_pool_connections=max(10, args.concurrency),
+    ))
+    resource = boto3.resource("dynamodb")
+    table = resource.Table(f"Users-{args.env}")
+    user_pool_id = args.user_pool_id or resolve_user_pool(cognito, args.env)
+    bucket = TokenBucket(args.rate)
+
+    if start:
+        print(f"↩️ retomando da linha {start}")
+
+    rows = islice(read_rows(input_path), start, None)
+    totals = checkpoint["totals"]
+
+    with open(f"{checkpoint_path}.errors.jsonl", "a", encoding="utf-8") as errors:
+        while True:
+            chunk = list(islice(rows, args.chunk))
+            if not chunk:
+                break
+
+            counts = provision_chunk(
+                chunk, cognito, resource.meta.client, table, bucket, user_pool_id, args.concurrency, errors,
+            )
+            errors.flush()
+
+            for outcome, count in counts.items():
+                totals[outcome] = totals.get(outcome, 0) + count
+            checkpoint["next_row"] = chunk[-1][0] + 1
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            print(f"📦 linhas até {checkpoint['next_row']} | "
+                  + " ".join(f"{outcome}={count}" for outcome, count in sorted(counts.items())))
+
+    summary = " ".join(f"{outcome}={count}" for outcome, count in sorted(totals.items())) or "nada a provisionar"
+    print(f"✅ provisionamento concluído | {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Recalcula os itens PET#<id>#SUMMARY da tabela HealthRecords-<env>.
+
+O resumo é mantido na escrita (post_vaccine/post_care), mas precisa ser
+criado para registros antigos e corrigido se uma importação em lote não
+conseguiu atualizá-lo. Para cada pet com registros, lê todas as vacinas e
+cuidados (partição do pet ou GSI2), recalcula o resumo do zero e grava com
+condição na version: se um POST mudar o resumo no meio, o pet é recalculado
+de novo. Com --layout dual grava também a cópia por pet do resumo.
+Pode ser executado de novo sem efeito colateral.
+
+Uso:
+    python scripts/rebuild_health_summaries.py --env dev [--user <userId>]
+        [--layout user|dual|pet] [--dry-run]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "layers", "petvida_runtime", "python")
+)
+
+from petvida_runtime.health_keys import (  # noqa: E402
+    EVENT_DATE_FIELD,
+    LAYOUT,
+    LAYOUTS,
+    OWNER_INDEX,
+    dual_write,
+    owner_and_pet,
+    owner_index_pk,
+    pet_keyed_copy,
+    pet_records_query,
+    summary_key,
+)
+from petvida_runtime.health_summary import MAX_ATTEMPTS, apply_records, empty_summary  # noqa: E402
+
+
+def pages(method, **kwargs):
+    while True:
+        page = method(**kwargs)
+        yield page
+        if "LastEvaluatedKey" not in page:
+            return
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+
+def find_pets(table, user_id=None) -> set:
+    # registros dos dois layouts; os antigos não têm userId/petId
+    projection = {"ProjectionExpression": "PK, SK, userId, petId"}
+
+    if user_id:
+        # GSI1 (índice do dono) tem cada registro uma vez em qualquer layout
+        queries = [
+            (table.query, {
+                **projection,
+                "IndexName": OWNER_INDEX,
+                "KeyConditionExpression": Key("GSI1PK").eq(owner_index_pk(user_id, record_type)),
+            })
+            for record_type in EVENT_DATE_FIELD
+        ]
+    else:
+        queries = [(table.scan, {**projection, "FilterExpression": Attr("type").is_in(list(EVENT_DATE_FIELD))})]
+
+    pets = set()
+    for method, kwargs in queries:
+        for page in pages(method, **kwargs):
+            for item in page.get("Items", []):
+                pets.add(owner_and_pet(item))
+    return pets
+
+
+def pet_records(table, user_id, pet_id, layout) -> list:
+    records = []
+    for record_type in EVENT_DATE_FIELD:
+        query, _ = pet_records_query(user_id, pet_id, record_type, layout)
+        for page in pages(table.query, **query):
+            records.extend(page.get("Items", []))
+    return records
+
+
+def rebuild_pet(table, user_id, pet_id, layout, dry_run=False):
+    for _ in range(MAX_ATTEMPTS):
+        current = table.get_item(Key=summary_key(user_id, pet_id, layout), ConsistentRead=True).get("Item")
+        expected = current["version"] if current else None
+
+        summary = apply_records(
+            {**empty_summary(user_id, pet_id), **summary_key(user_id, pet_id, layout)},
+            pet_records(table, user_id, pet_id, layout),
+        )
+        summary["version"] = (expected or 0) + 1
+        summary["updatedAt"] = datetime.now(timezone.utc).isoformat()
+
+        if dry_run:
+            return summary
+
+        if expected is None:
+            condition = {"ConditionExpression": "attribute_not_exists(PK)"}
+        else:
+            condition = {
+                "ConditionExpression": "#version = :expected",
+                "ExpressionAttributeNames": {"#version": "version"},
+                "ExpressionAttributeValues": {":expected": expected},
+            }
+
+        try:
+            table.put_item(Item=summary, **condition)
+            if dual_write(layout):
+                table.put_item(Item=pet_keyed_copy(summary))
+            return summary
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+    raise RuntimeError(f"resumo de {user_id}/{pet_id} em conflito após {MAX_ATTEMPTS} tentativas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--env", required=True, help="dev, prod, ...")
+    parser.add_argument("--user", help="recalcula só os pets deste userId")
+    parser.add_argument("--layout", choices=LAYOUTS, default=LAYOUT, help="HEALTH_LAYOUT das lambdas")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    table = boto3.resource("dynamodb").Table(f"HealthRecords-{args.env}")
+
+    pets = sorted(find_pets(table, args.user))
+    for user_id, pet_id in pets:
+        summary = rebuild_pet(table, user_id, pet_id, args.layout, args.dry_run)
+        prefix = "[dry-run] " if args.dry_run else ""
+        print(
+            f"{prefix}{user_id} {pet_id} -> vacinas={summary['vaccineCount']} "
+            f"cuidados={summary['careCount']} próximo={summary.get('nextDueDate')}"
+        )
+
+    print(f"✅ Rebuild concluído | pets={len(pets)}")
+
+
+if __name__ == "__main__":
+    main()
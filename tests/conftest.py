@@ -0,0 +1,97 @@
+"""
+Os testes rodam os handlers em processo contra os stand-ins de
+benchmarks/ (LocalDynamoDB e LocalServices), como a suíte de carga.
+"""
+import hashlib
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from events import HANDLER_ENV, LAMBDA_PATH, use_local_paths  # noqa: E402
+from local_dynamodb import HEALTH_INDEXES, IDEMPOTENCY_KEY_SCHEMA, LocalDynamoDB  # noqa: E402
+from local_services import LocalCognito, LocalServices  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def local_aws():
+    """
+    (LocalServices, LocalDynamoDB, LocalCognito), com o ambiente dos handlers
+    apontado para eles (JWKS do tokens.py inclusive).
+    """
+    dynamodb = LocalDynamoDB(
+        indexes={HANDLER_ENV["HEALTH_RECORDS_TABLE"]: HEALTH_INDEXES},
+        key_schemas={HANDLER_ENV["IDEMPOTENCY_TABLE"]: IDEMPOTENCY_KEY_SCHEMA},
+    )
+    cognito = LocalCognito(client_id=HANDLER_ENV["CLIENT_ID"], user_pool_id=HANDLER_ENV["USER_POOL_ID"])
+
+    with LocalServices(
+        aws_handlers={**dynamodb.handlers(), **cognito.handlers()},
+        get_handlers=cognito.get_handlers(),
+    ) as services:
+        os.environ.update({
+            **HANDLER_ENV,
+            **services.env(),
+            "COGNITO_JWKS_URL": services.url + cognito.jwks_path,
+        })
+        use_local_paths()
+        yield services, dynamodb, cognito
+
+
+@pytest.fixture(scope="session")
+def dynamodb(local_aws):
+    return local_aws[1]
+
+
+@pytest.fixture(scope="session")
+def cognito(local_aws):
+    return local_aws[2]
+
+
+@pytest.fixture
+def sqs_batches(local_aws):
+    """
+    SendMessageBatch gravado em memória. Devolve (entradas enviadas,
+    recordIds a recusar): uma mensagem cujo recordId está em `reject` volta
+    em Failed, como uma falha parcial.
+    """
+    services = local_aws[0]
+    sent, reject = [], set()
+
+    def send_message_batch(request):
+        successful, failed = [], []
+        for entry in request["Entries"]:
+            if json.loads(entry["MessageBody"]).get("recordId") in reject:
+                failed.append({"Id": entry["Id"], "SenderFault": False, "Code": "InternalError"})
+                continue
+            sent.append(entry)
+            successful.append({
+                "Id": entry["Id"],
+                "MessageId": entry["Id"],
+                "MD5OfMessageBody": hashlib.md5(entry["MessageBody"].encode("utf-8")).hexdigest(),
+            })
+        return {"Successful": successful, "Failed": failed}
+
+    services.aws_handlers["AmazonSQS.SendMessageBatch"] = send_message_batch
+    yield sent, reject
+    services.aws_handlers.pop("AmazonSQS.SendMessageBatch")
+
+
+@pytest.fixture(scope="session")
+def handlers(dynamodb):
+    """Módulo de um handler pelo grupo e nome (lambda/<grupo>/<nome>.py)."""
+    loaded = {}
+
+    def load(group: str, name: str):
+        path = os.path.join(LAMBDA_PATH, group)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+        if name not in loaded:
+            loaded[name] = __import__(name)
+        return loaded[name]
+
+    return load
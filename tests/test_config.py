@@ -0,0 +1,39 @@
+import json
+
+from events import LambdaContext, api_event
+
+CLAIMS = {"sub": "user-config", "name": "Ana", "email": "ana@example.com"}
+
+
+def invoke(handlers, name, body=None, query=None):
+    event = api_event(body=body, query=query, claims=CLAIMS)
+    result = handlers("config", name).lambda_handler(event, LambdaContext())
+    return result["statusCode"], json.loads(result["body"])
+
+
+def save(handlers, advance_days):
+    status, body = invoke(handlers, "save_config", body={"remindersEnabled": True, "advanceDays": advance_days})
+    assert status == 200
+    return body["version"]
+
+
+def test_min_version_skips_a_stale_cached_profile(handlers):
+    first = save(handlers, "3")
+    assert invoke(handlers, "get_config")[1]["version"] == first  # fica no cache
+
+    second = save(handlers, "5")
+
+    # sem minVersion vale o cache (até PROFILE_CACHE_TTL_SECONDS)
+    assert invoke(handlers, "get_config")[1]["version"] == first
+
+    status, body = invoke(handlers, "get_config", query={"minVersion": str(second)})
+    assert status == 200
+    assert body["version"] == second
+    assert body["preferences"]["advanceDays"] == "5"
+
+    # o item relido passa a ser o do cache
+    assert invoke(handlers, "get_config")[1]["version"] == second
+
+
+def test_invalid_min_version(handlers):
+    assert invoke(handlers, "get_config", query={"minVersion": "abc"})[0] == 400
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from events import HANDLER_ENV, LambdaContext, api_event
+
+USER_ID = "user-batch"
+
+
+def invoke(handler, body):
+    result = handler.lambda_handler(api_event(body=body), LambdaContext())
+    return result["statusCode"], json.loads(result["body"])
+
+
+@pytest.mark.parametrize("name, records, summary_group, message", [
+    ("post_vaccines_batch",
+     [{"name": "V10", "appliedAt": "2025-01-10", "nextDose": "2026-01-10"},
+      {"name": "Raiva", "appliedAt": "2025-02-10", "petId": "pet-b2"}],
+     "vaccines", "Vacinas importadas"),
+    ("post_care_batch",
+     [{"type": "BANHO", "performedAt": "2025-01-10", "periodicity": "30"},
+      {"type": "TOSA", "performedAt": "2025-02-10", "petId": "pet-b2"}],
+     "care", "Cuidados importados"),
+])
+def test_batch_import_writes_records_and_summaries(handlers, dynamodb, name, records, summary_group, message):
+    from petvida_runtime.health_keys import summary_key
+
+    status, body = invoke(handlers("health", name), {"userId": USER_ID, "petId": "pet-b1", "records": records})
+
+    assert status == 201
+    assert body["message"] == message
+    assert (body["created"], body["failed"]) == (2, 0)
+    assert [r["status"] for r in body["results"]] == ["created", "created"]
+
+    table = dynamodb.table(HANDLER_ENV["HEALTH_RECORDS_TABLE"])
+    for pet_id, record in (("pet-b1", records[0]), ("pet-b2", records[1])):
+        key = summary_key(USER_ID, pet_id)
+        summary = table.get({"PK": {"S": key["PK"]}, "SK": {"S": key["SK"]}})
+        title = record.get("name") or record.get("type")
+        assert title in summary[summary_group]["M"]
+
+
+@pytest.mark.parametrize("name", ["post_vaccines_batch", "post_care_batch"])
+def test_batch_import_validates_everything_before_writing(handlers, name):
+    status, body = invoke(handlers("health", name), {"userId": USER_ID, "petId": "pet-b3", "records": [
+        {"name": "V10", "type": "BANHO", "appliedAt": "2025-01-10", "performedAt": "2025-01-10"},
+        {},
+        "texto",
+    ]})
+
+    assert status == 400
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+
+    assert invoke(handlers("health", name), {"userId": USER_ID, "records": []})[0] == 400
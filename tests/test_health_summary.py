@@ -0,0 +1,136 @@
+import uuid
+
+import pytest
+
+from events import HANDLER_ENV
+from local_services import ServiceError
+
+USER_ID = "user-summary"
+HEALTH_TABLE = HANDLER_ENV["HEALTH_RECORDS_TABLE"]
+TRANSACT = "DynamoDB_20120810.TransactWriteItems"
+
+
+def vaccine(pet_id, name, applied_at):
+    from petvida_runtime.health_records import vaccine_item
+
+    return vaccine_item(USER_ID, pet_id, {"name": name, "appliedAt": applied_at, "nextDose": "2099-01-10"})
+
+
+def summary_of(dynamodb, pet_id):
+    from petvida_runtime.health_keys import summary_key
+
+    key = summary_key(USER_ID, pet_id)
+    return dynamodb.table(HEALTH_TABLE).get({"PK": {"S": key["PK"]}, "SK": {"S": key["SK"]}})
+
+
+def stored_vaccines(dynamodb, pet_id):
+    return [
+        item
+        for partition in dynamodb.table(HEALTH_TABLE).partitions.values()
+        for item in partition.items.values()
+        if item.get("petId") == {"S": pet_id} and item.get("type") == {"S": "VACCINE"}
+    ]
+
+
+def attempts_for(transactions, record):
+    """Transações (tentativas nossas) que levavam `record`."""
+    return [
+        request for request in transactions
+        if any(spec["Item"].get("recordId") == {"S": record["recordId"]}
+               for entry in request["TransactItems"] for spec in entry.values())
+    ]
+
+
+@pytest.fixture
+def transactions(local_aws):
+    """
+    TransactWriteItems recebidos, na ordem. `before_next` (opcional) roda
+    uma vez, antes de a próxima transação chegar ao stand-in; `fail_next`
+    (opcional) é levantada no lugar dela.
+    """
+    services = local_aws[0]
+    original = services.aws_handlers[TRANSACT]
+    state = {"received": [], "before_next": None, "fail_next": None}
+
+    def racing(request):
+        state["received"].append(request)
+        before, state["before_next"] = state["before_next"], None
+        failure, state["fail_next"] = state["fail_next"], None
+        if before:
+            before()
+        if failure:
+            raise failure
+        return original(request)
+
+    services.aws_handlers[TRANSACT] = racing
+    yield state
+    services.aws_handlers[TRANSACT] = original
+
+
+def test_lost_race_retries_once_without_double_counting(dynamodb, transactions):
+    from petvida_runtime.health_summary import write_with_summary
+
+    pet_id = f"pet-{uuid.uuid4().hex[:8]}"
+    write_with_summary(HEALTH_TABLE, USER_ID, pet_id, [vaccine(pet_id, "V10", "2025-01-10")])
+
+    ours = vaccine(pet_id, "Raiva", "2025-03-10")
+    theirs = vaccine(pet_id, "Giardia", "2025-02-10")
+
+    # outra invocação grava entre a nossa leitura do resumo (version 1) e a
+    # nossa transação: a condição na version cancela a primeira tentativa
+    transactions["before_next"] = lambda: write_with_summary(HEALTH_TABLE, USER_ID, pet_id, [theirs])
+    summary = write_with_summary(HEALTH_TABLE, USER_ID, pet_id, [ours])
+
+    assert len(attempts_for(transactions["received"], ours)) == 2
+    assert summary["version"] == 3
+    assert summary["vaccineCount"] == 3
+
+    stored = summary_of(dynamodb, pet_id)
+    assert stored["version"] == {"N": "3"}
+    assert stored["vaccineCount"] == {"N": "3"}
+    assert set(stored["vaccines"]["M"]) == {"V10", "Raiva", "Giardia"}
+    assert len(stored_vaccines(dynamodb, pet_id)) == 3
+
+
+def test_transaction_conflict_on_summary_is_retried(dynamodb, transactions):
+    from petvida_runtime.health_summary import write_with_summary
+
+    pet_id = f"pet-{uuid.uuid4().hex[:8]}"
+    record = vaccine(pet_id, "V10", "2025-01-10")
+
+    # o DynamoDB cancela por conflito com outra transação no resumo (índice 1)
+    transactions["fail_next"] = ServiceError(
+        "TransactionCanceledException",
+        "Transaction cancelled, please refer cancellation reasons for specific reasons [None, TransactionConflict]",
+        extra={"CancellationReasons": [{"Code": "None"}, {"Code": "TransactionConflict"}]},
+    )
+    summary = write_with_summary(HEALTH_TABLE, USER_ID, pet_id, [record])
+
+    attempts = attempts_for(transactions["received"], record)
+    assert len(attempts) == 2
+    # a nova tentativa usa outro token: o DynamoDB não a trata como repetição
+    assert attempts[0]["ClientRequestToken"] != attempts[1]["ClientRequestToken"]
+
+    assert summary["vaccineCount"] == 1
+    assert summary_of(dynamodb, pet_id)["vaccineCount"] == {"N": "1"}
+    assert len(stored_vaccines(dynamodb, pet_id)) == 1
+
+
+def test_cancellation_outside_the_summary_is_not_retried(dynamodb, transactions):
+    from botocore.exceptions import ClientError
+    from petvida_runtime.health_summary import write_with_summary
+
+    pet_id = f"pet-{uuid.uuid4().hex[:8]}"
+    record = vaccine(pet_id, "V10", "2025-01-10")
+
+    # registro já existe (condição do registro, índice 0): repetir não resolve
+    transactions["fail_next"] = ServiceError(
+        "TransactionCanceledException",
+        "Transaction cancelled, please refer cancellation reasons for specific reasons [ConditionalCheckFailed, None]",
+        extra={"CancellationReasons": [{"Code": "ConditionalCheckFailed"}, {"Code": "None"}]},
+    )
+    with pytest.raises(ClientError):
+        write_with_summary(HEALTH_TABLE, USER_ID, pet_id, [record])
+
+    assert len(attempts_for(transactions["received"], record)) == 1
+    assert summary_of(dynamodb, pet_id) is None
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import time
+import uuid
+
+import pytest
+
+from events import HANDLER_ENV, LambdaContext, api_event
+
+USER_ID = "user-idem"
+HEALTH_TABLE = HANDLER_ENV["HEALTH_RECORDS_TABLE"]
+IDEMPOTENCY_TABLE = HANDLER_ENV["IDEMPOTENCY_TABLE"]
+
+
+def invoke(handler, body, key, context=None):
+    """`handler`: módulo do handler ou a própria função."""
+    event = api_event(body=body, headers={"Idempotency-Key": key}, claims={"sub": USER_ID})
+    result = getattr(handler, "lambda_handler", handler)(event, context or LambdaContext())
+    return result, json.loads(result["body"])
+
+
+def stored(dynamodb, table_name, **attributes):
+    """Itens (serializados) da tabela com os atributos string informados."""
+    return [
+        item
+        for partition in dynamodb.table(table_name).partitions.values()
+        for item in partition.items.values()
+        if all(item.get(name) == {"S": value} for name, value in attributes.items())
+    ]
+
+
+def claim_of(dynamodb, key):
+    # PK = <routeKey>#<sub>#<chave>; o api_event não tem routeKey
+    return dynamodb.table(IDEMPOTENCY_TABLE).get({"PK": {"S": f"#{USER_ID}#{key}"}})
+
+
+def vaccine_count(dynamodb, pet_id):
+    from petvida_runtime.health_keys import summary_key
+
+    key = summary_key(USER_ID, pet_id)
+    summary = dynamodb.table(HEALTH_TABLE).get({"PK": {"S": key["PK"]}, "SK": {"S": key["SK"]}})
+    return int(summary["vaccineCount"]["N"]) if summary else 0
+
+
+@pytest.fixture
+def transactions(local_aws):
+    """TransactWriteItems recebidos pelo stand-in, na ordem."""
+    services = local_aws[0]
+    name = "DynamoDB_20120810.TransactWriteItems"
+    original = services.aws_handlers[name]
+    received = []
+
+    def recording(request):
+        received.append(request)
+        return original(request)
+
+    services.aws_handlers[name] = recording
+    yield received
+    services.aws_handlers[name] = original
+
+
+def test_replay_returns_stored_response_without_writing_again(handlers, dynamodb, transactions):
+    handler = handlers("health", "post_vaccine")
+    key = str(uuid.uuid4())
+    body = {"userId": USER_ID, "petId": "pet-i1", "name": "V10", "appliedAt": "2025-03-01"}
+
+    first, created = invoke(handler, body, key)
+    assert first["statusCode"] == 201
+    assert "Idempotent-Replayed" not in first["headers"]
+
+    # resposta gravada na mesma transação que o registro e o resumo
+    (transaction,) = transactions
+    tables = [spec["TableName"] for entry in transaction["TransactItems"] for spec in entry.values()]
+    assert tables.count(IDEMPOTENCY_TABLE) == 1 and HEALTH_TABLE in tables
+    assert claim_of(dynamodb, key)["status"] == {"S": "COMPLETED"}
+
+    replay, replayed = invoke(handler, body, key)
+    assert replay["statusCode"] == 201
+    assert replay["headers"]["Idempotent-Replayed"] == "true"
+    assert replayed == created
+
+    assert len(transactions) == 1
+    assert vaccine_count(dynamodb, "pet-i1") == 1
+    assert len(stored(dynamodb, HEALTH_TABLE, petId="pet-i1", type="VACCINE")) == 1
+
+
+def test_add_pet_replay_creates_one_pet(handlers, dynamodb):
+    handler = handlers("pets", "add_pet")
+    key = str(uuid.uuid4())
+    body = {"userId": USER_ID, "name": "Mia", "species": "CAT"}
+
+    first, created = invoke(handler, body, key)
+    replay, replayed = invoke(handler, body, key)
+
+    assert (first["statusCode"], replay["statusCode"]) == (201, 201)
+    assert replay["headers"]["Idempotent-Replayed"] == "true"
+    assert replayed["petId"] == created["petId"]
+    assert len(stored(dynamodb, HANDLER_ENV["PETS_TABLE_NAME"], name="Mia")) == 1
+
+
+def test_same_key_with_other_body_is_422(handlers):
+    handler = handlers("pets", "add_pet")
+    key = str(uuid.uuid4())
+
+    invoke(handler, {"userId": USER_ID, "name": "Bob", "species": "DOG"}, key)
+    result, body = invoke(handler, {"userId": USER_ID, "name": "Bobby", "species": "DOG"}, key)
+
+    assert result["statusCode"] == 422
+    assert "outro conteúdo" in body["message"]
+
+
+def test_claim_in_progress_is_409(handlers, dynamodb):
+    handler = handlers("pets", "add_pet")
+    key = str(uuid.uuid4())
+    body = {"userId": USER_ID, "name": "Tom", "species": "CAT"}
+
+    # outra invocação reservou a chave e ainda não terminou
+    raw = json.dumps(body).encode("utf-8")
+    dynamodb.load(IDEMPOTENCY_TABLE, [{
+        "PK": {"S": f"#{USER_ID}#{key}"},
+        "fingerprint": {"S": hashlib.sha256(raw).hexdigest()},
+        "token": {"S": "outra-invocacao"},
+        "status": {"S": "IN_PROGRESS"},
+        "expiresAt": {"N": str(int(time.time()) + 60)},
+    }])
+
+    result, _ = invoke(handler, body, key)
+
+    assert result["statusCode"] == 409
+    assert result["headers"]["Retry-After"] == "1"
+    assert stored(dynamodb, HANDLER_ENV["PETS_TABLE_NAME"], name="Tom") == []
+
+
+def test_exception_releases_the_claim(handlers, dynamodb, monkeypatch):
+    handler = handlers("health", "post_vaccine")
+    key = str(uuid.uuid4())
+    body = {"userId": USER_ID, "petId": "pet-i2", "name": "Raiva", "appliedAt": "2025-03-01"}
+
+    def failing(*args, **kwargs):
+        raise RuntimeError("DynamoDB fora do ar")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(handler, "write_with_summary", failing)
+        result, _ = invoke(handler, body, key)
+
+    assert result["statusCode"] == 500
+    assert claim_of(dynamodb, key) is None
+
+    # o retry do cliente grava normalmente
+    assert invoke(handler, body, key)[0]["statusCode"] == 201
+    assert vaccine_count(dynamodb, "pet-i2") == 1
+
+
+def test_5xx_response_releases_the_claim(local_aws, dynamodb):
+    from petvida_runtime import api_handler, idempotency, response
+
+    @api_handler()
+    @idempotency.idempotent()
+    def unavailable(event, context):
+        return response(503, {"message": "indisponível"})
+
+    key = str(uuid.uuid4())
+    result, _ = invoke(unavailable, {"a": 1}, key)
+
+    assert result["statusCode"] == 503
+    assert claim_of(dynamodb, key) is None
+
+
+def test_claim_does_not_outlive_the_invocation(handlers):
+    from petvida_runtime import idempotency
+
+    handler = handlers("pets", "add_pet")
+    context = LambdaContext()
+    invoke(handler, {"userId": USER_ID, "name": "Lua", "species": "DOG"}, str(uuid.uuid4()), context)
+
+    # a reserva fica no context da invocação e é limpa ao final
+    assert idempotency.completion(context, {"statusCode": 201}) == []
+    assert idempotency.completion(LambdaContext(), {"statusCode": 201}) == []
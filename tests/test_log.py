@@ -0,0 +1,148 @@
+import io
+import json
+import logging
+import uuid
+
+import pytest
+
+from events import LambdaContext, api_event
+
+
+@pytest.fixture
+def log(local_aws, monkeypatch):
+    """petvida_runtime.log sem amostragem e sem requestId de outro teste."""
+    from petvida_runtime import log
+
+    monkeypatch.setattr(log, "SAMPLE_RATES", {})
+    monkeypatch.setattr(log, "_request_id", None)
+    return log
+
+
+@pytest.fixture
+def lines(log):
+    """Linhas JSON escritas por um logger isolado, com o formatter e o filtro do runtime."""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(log.JsonFormatter())
+    handler.addFilter(log.SamplingFilter())
+
+    logger = logging.getLogger(f"test-log-{uuid.uuid4().hex}")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    def written():
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    written.logger = logger
+    return written
+
+
+# =========================
+# Campos sensíveis
+# =========================
+def test_redacts_sensitive_keys_at_any_depth(log):
+    value = {
+        "email": "tutora@petvida.local",
+        "password": "hunter2",
+        "accessToken": "eyJ...",
+        "headers": {"Authorization": "Bearer eyJ...", "Cookie": "session=1", "x-request-id": "abc"},
+        "stripe": {"webhook": {"client_secret": "whsec_1", "id": "evt_1"}},
+        "attempts": [{"refresh_token": "r1", "ok": True}, ("Set-Cookie", "não é chave")],
+    }
+
+    assert log.redact(value) == {
+        "email": "tutora@petvida.local",
+        "password": "***",
+        "accessToken": "***",
+        "headers": {"Authorization": "***", "Cookie": "***", "x-request-id": "abc"},
+        "stripe": {"webhook": {"client_secret": "***", "id": "evt_1"}},
+        "attempts": [{"refresh_token": "***", "ok": True}, ["Set-Cookie", "não é chave"]],
+    }
+    assert value["password"] == "hunter2"  # o original não muda
+
+
+def test_redacts_every_way_fields_reach_the_line(log, lines):
+    structured = log.StructuredLogger(lines.logger.name)
+    structured.info("Login | email=%s", "a@b.c", body={"password": "x", "user": {"token": "y", "name": "Ana"}})
+    lines.logger.info("extra", extra={"secret": "x", "request": {"authorization": "y"}})
+    lines.logger.info({"message": "dict antigo", "cookie": "x", "nested": {"Password": "y"}})
+
+    fields = [line["fields"] for line in lines()]
+    assert fields == [
+        {"body": {"password": "***", "user": {"token": "***", "name": "Ana"}}},
+        {"secret": "***", "request": {"authorization": "***"}},
+        {"cookie": "***", "nested": {"Password": "***"}},
+    ]
+    assert [line["message"] for line in lines()] == ["Login | email=a@b.c", "extra", "dict antigo"]
+
+
+# =========================
+# Amostragem por requestId
+# =========================
+def test_parse_rates():
+    from petvida_runtime.log import _parse_rates
+
+    assert _parse_rates("DEBUG=0, info=0.25,bogus=1,WARNING=2,sem-igual") == {
+        logging.DEBUG: 0.0, logging.INFO: 0.25, logging.WARNING: 1.0,
+    }
+    assert _parse_rates("") == {}
+
+
+def test_sampling_is_decided_per_request_id(log, monkeypatch):
+    monkeypatch.setattr(log, "SAMPLE_RATES", {logging.INFO: 0.3, logging.DEBUG: 0.0})
+    request_ids = [f"req-{number}" for number in range(2000)]
+
+    decisions = {request_id: log.sampled(logging.INFO, request_id) for request_id in request_ids}
+
+    # mesma decisão sempre para o mesmo requestId
+    assert all(log.sampled(logging.INFO, request_id) == decisions[request_id] for request_id in request_ids)
+    assert 0.25 < sum(decisions.values()) / len(decisions) < 0.35
+
+    # 0 desliga, sem taxa (WARNING) sai sempre
+    assert not any(log.sampled(logging.DEBUG, request_id) for request_id in request_ids[:100])
+    assert all(log.sampled(logging.WARNING, request_id) for request_id in request_ids[:100])
+
+
+def test_sampled_invocation_logs_whole(log, lines, monkeypatch):
+    monkeypatch.setattr(log, "SAMPLE_RATES", {logging.INFO: 0.5})
+    structured = log.StructuredLogger(lines.logger.name)
+
+    written = {}
+    for number in range(40):
+        request_id = f"req-inteira-{number}"
+        log.set_request_id(request_id)
+        before = len(lines())
+        for step in range(5):
+            structured.info("passo %s", step)
+        lines.logger.info("logger comum")
+        structured.warning("aviso")
+        written[request_id] = lines()[before:]
+
+    for request_id, entries in written.items():
+        info = [entry for entry in entries if entry["level"] == "INFO"]
+        # as 6 linhas INFO da invocação saem juntas ou nenhuma; o WARNING sempre
+        assert len(info) in (0, 6)
+        assert bool(info) == log.sampled(logging.INFO, request_id)
+        assert [entry["message"] for entry in entries if entry["level"] == "WARNING"] == ["aviso"]
+        assert {entry["requestId"] for entry in entries} == {request_id}
+
+    assert 0 < sum(1 for entries in written.values() if len(entries) > 1) < len(written)
+
+
+def test_api_handler_tags_logs_with_the_invocation_request_id(log, lines):
+    from petvida_runtime import api_handler, response
+
+    structured = log.StructuredLogger(lines.logger.name)
+
+    @api_handler()
+    def handler(event, context):
+        structured.info("dentro do handler")
+        return response(200, {})
+
+    context = LambdaContext()
+    handler(api_event(), context)
+
+    assert [(line["message"], line["requestId"]) for line in lines()] == [
+        ("dentro do handler", context.aws_request_id),
+    ]
@@ -0,0 +1,129 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+from events import ROOT
+from local_dynamodb import HEALTH_INDEXES
+
+# tabela só deste teste: o scan da migração pegaria os itens dos outros testes
+ENV = "migracao"
+TABLE_NAME = f"HealthRecords-{ENV}"
+USER_ID = "user-migracao"
+
+
+@pytest.fixture(scope="module")
+def migration(dynamodb):
+    dynamodb.index_config[TABLE_NAME] = HEALTH_INDEXES
+    path = os.path.join(ROOT, "scripts", "migrate_health_partitions.py")
+    spec = importlib.util.spec_from_file_location("migrate_health_partitions", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(migration, phase, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", [
+        "migrate_health_partitions.py", "--env", ENV, "--phase", phase, "--segments", "3",
+    ])
+    migration.main()
+    return capsys.readouterr().out.strip()
+
+
+def snapshot(dynamodb):
+    table = dynamodb.table(TABLE_NAME)
+    return {
+        (pk, key): item
+        for pk, partition in table.partitions.items()
+        for key, item in partition.items.items()
+    }
+
+
+def owner_index(record_type):
+    """Registros do usuário no GSI1, como list_vaccines/list_care consultam."""
+    from boto3.dynamodb.conditions import Key
+    from petvida_runtime import aws
+
+    page = aws.table(TABLE_NAME).query(
+        IndexName="GSI1",
+        KeyConditionExpression=Key("GSI1PK").eq(f"USER#{USER_ID}#{record_type}"),
+    )
+    return page["Items"]
+
+
+def seed():
+    """Registros e resumos no layout por usuário, gravados como as lambdas fazem."""
+    from petvida_runtime.health_records import care_item, vaccine_item
+    from petvida_runtime.health_summary import write_with_summary
+
+    records = {
+        "pet-m1": [
+            vaccine_item(USER_ID, "pet-m1", {"name": "V10", "appliedAt": "2025-01-10", "nextDose": "2026-01-10"}),
+            care_item(USER_ID, "pet-m1", {"type": "BANHO", "performedAt": "2025-02-10"}),
+        ],
+        "pet-m2": [
+            vaccine_item(USER_ID, "pet-m2", {"name": "Raiva", "appliedAt": "2025-03-10"}),
+        ],
+    }
+    for pet_id, items in records.items():
+        write_with_summary(TABLE_NAME, USER_ID, pet_id, items)
+    return [item for items in records.values() for item in items]
+
+
+def test_copy_then_finalize_moves_to_pet_layout(migration, dynamodb, monkeypatch, capsys):
+    from petvida_runtime import aws
+    from petvida_runtime.health_keys import pet_keyed_copy
+
+    records = seed()
+    by_id = {record["recordId"]: record for record in records}
+
+    # o modo dual já tinha gravado a cópia por pet de um dos registros
+    aws.table(TABLE_NAME).put_item(Item=pet_keyed_copy(records[0]))
+
+    assert run(migration, "copy", monkeypatch, capsys) == "✅ copy concluído | copiados=4 já existiam=1"
+
+    items = snapshot(dynamodb)
+    legacy = [item for item in items.values() if item["PK"]["S"].startswith("USER#")]
+    pet_keyed = [item for item in items.values() if item["PK"]["S"].startswith("PET#")]
+    assert len(legacy) == len(pet_keyed) == 5  # 3 registros + 2 resumos
+    # a cópia fica fora do GSI1 até o finalize: cada registro aparece uma vez
+    assert all("GSI1PK" not in item and "GSI2PK" not in item for item in pet_keyed)
+    assert len(owner_index("VACCINE")) == 2 and len(owner_index("CARE")) == 1
+
+    # copy de novo: nada sobrescrito
+    assert run(migration, "copy", monkeypatch, capsys) == "✅ copy concluído | já existiam=5"
+    assert snapshot(dynamodb) == items
+
+    assert run(migration, "finalize", monkeypatch, capsys) == "✅ finalize concluído | registros=3 resumos=2"
+
+    items = snapshot(dynamodb)
+    assert all(pk.startswith("PET#pet-m") and pk.endswith(f"#USER#{USER_ID}") for pk, _ in items)
+    assert len(items) == 5
+
+    for record_id, record in by_id.items():
+        (item,) = [item for item in items.values() if item.get("recordId") == {"S": record_id}]
+        event_date = record.get("appliedAt") or record["performedAt"]
+        assert item["PK"] == {"S": f"PET#{record['petId']}#USER#{USER_ID}"}
+        assert item["SK"] == {"S": f"{record['type']}#{event_date}#{record_id}"}
+        assert item["GSI1PK"] == {"S": f"USER#{USER_ID}#{record['type']}"}
+        assert item["GSI1SK"] == {"S": f"{event_date}#{record_id}"}
+        assert "GSI2PK" not in item and "GSI2SK" not in item
+
+    for pet_id, counts in (("pet-m1", ("1", "1")), ("pet-m2", ("1", "0"))):
+        summary = items[(f"PET#{pet_id}#USER#{USER_ID}", ("SUMMARY",))]
+        assert (summary["vaccineCount"]["N"], summary["careCount"]["N"]) == counts
+
+    # o índice do dono continua com cada registro uma vez, agora nas chaves por pet
+    vaccines = owner_index("VACCINE")
+    assert sorted(v["recordId"] for v in vaccines) == sorted(
+        r["recordId"] for r in records if r["type"] == "VACCINE"
+    )
+    assert all(v["PK"].startswith("PET#") for v in vaccines + owner_index("CARE"))
+    # o GSI2 é só do layout por usuário
+    assert all(not partition.items for partition in dynamodb.table(TABLE_NAME).index_partitions["GSI2"].values())
+
+    # rodar de novo não muda nada
+    for phase in ("copy", "finalize"):
+        assert run(migration, phase, monkeypatch, capsys) == f"✅ {phase} concluído | nada a migrar"
+    assert snapshot(dynamodb) == items
@@ -0,0 +1,203 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from events import HANDLER_ENV, LambdaContext, api_event
+
+USER_ID = "user-pages"
+PET_ID = "pet-pages"
+OTHER_PET_ID = "pet-other"
+RECORDS = 3000  # metade vacinas, metade cuidados
+
+
+def typed(item):
+    from petvida_runtime import aws
+
+    return aws.serialize(item)
+
+
+@pytest.fixture(scope="module")
+def records(dynamodb):
+    """Registros do pet (com as chaves que os builders dos handlers geram); tipo -> itens."""
+    from petvida_runtime.health_records import care_item, vaccine_item
+
+    started = datetime(2024, 1, 1, 10, 0, 0)
+    by_type = {"VACCINE": [], "CARE": []}
+
+    for pet_id, count in ((PET_ID, RECORDS), (OTHER_PET_ID, 50)):
+        for n in range(count):
+            created_at = started + timedelta(seconds=n)
+            # datas repetidas: a ordem entre elas vem do recordId no SK
+            event_date = (started - timedelta(days=n % 400)).date().isoformat()
+            if n % 2:
+                item = care_item(USER_ID, pet_id, {
+                    "type": f"BANHO{n % 3}", "performedAt": event_date, "periodicity": "30",
+                }, created_at=created_at)
+            else:
+                item = vaccine_item(USER_ID, pet_id, {"name": f"V{n % 4}", "appliedAt": event_date},
+                                    created_at=created_at)
+            if pet_id == PET_ID:
+                by_type[item["type"]].append(item)
+            dynamodb.load(HANDLER_ENV["HEALTH_RECORDS_TABLE"], [typed(item)])
+
+    return by_type
+
+
+def newest_first(items, index_sort_key):
+    return [item["recordId"] for item in sorted(items, key=lambda i: i[index_sort_key], reverse=True)]
+
+
+def invoke(handler, **query):
+    result = handler.lambda_handler(api_event(query={"userId": USER_ID, **query}), LambdaContext())
+    return result["statusCode"], json.loads(result["body"])
+
+
+def walk(handler, **query):
+    """Todas as páginas do handler, seguindo nextCursor; devolve os recordIds."""
+    seen, pages, cursor = [], 0, None
+    while True:
+        params = dict(query, **({"cursor": cursor} if cursor else {}))
+        status, body = invoke(handler, **params)
+        assert status == 200, body
+        assert len(body["items"]) <= int(query.get("limit", 50))
+        seen.extend(item["recordId"] for item in body["items"])
+        pages += 1
+        cursor = body["nextCursor"]
+        if not cursor:
+            return seen, pages
+
+
+# =========================
+# iter_pages / first_page
+# =========================
+def pet_query(record_type, **extra):
+    from petvida_runtime.health_keys import pet_records_query
+
+    query, key_attrs = pet_records_query(USER_ID, PET_ID, record_type)
+    query["ScanIndexForward"] = False
+    query.update(extra)
+    return query, key_attrs
+
+
+@pytest.mark.parametrize("page_size", [1, 7, 50, 200])
+def test_iter_pages_returns_every_record_once_in_order(records, page_size):
+    from petvida_runtime import aws
+    from petvida_runtime.pagination import iter_pages
+
+    query, key_attrs = pet_query("VACCINE")
+    table = aws.table(HANDLER_ENV["HEALTH_RECORDS_TABLE"])
+
+    seen = []
+    pages = list(iter_pages(table, page_size, None, key_attrs, **query))
+    for number, (items, next_key) in enumerate(pages):
+        assert len(items) <= page_size
+        assert (next_key is None) == (number == len(pages) - 1)
+        seen.extend(item["recordId"] for item in items)
+
+    assert seen == newest_first(records["VACCINE"], "GSI2SK")
+
+
+def test_iter_pages_with_filter_fills_pages_and_keeps_order(records):
+    from boto3.dynamodb.conditions import Attr
+
+    from petvida_runtime import aws
+    from petvida_runtime.pagination import first_page, iter_pages
+
+    query, key_attrs = pet_query("CARE", FilterExpression=Attr("careType").eq("BANHO1"))
+    table = aws.table(HANDLER_ENV["HEALTH_RECORDS_TABLE"])
+    expected = newest_first([r for r in records["CARE"] if r["careType"] == "BANHO1"], "GSI2SK")
+    assert len(expected) > 100
+
+    pages = list(iter_pages(table, 25, None, key_attrs, **query))
+    assert all(len(items) == 25 for items, _ in pages[:-1])
+    assert [item["recordId"] for items, _ in pages for item in items] == expected
+
+    # first_page retomado de cada next_key reproduz a mesma sequência
+    seen, start_key = [], None
+    while True:
+        items, start_key = first_page(table, 25, start_key, key_attrs, **query)
+        seen.extend(item["recordId"] for item in items)
+        if start_key is None:
+            break
+    assert seen == expected
+
+
+def test_first_page_on_empty_partition(dynamodb):
+    from petvida_runtime import aws
+    from petvida_runtime.health_keys import pet_records_query
+    from petvida_runtime.pagination import first_page
+
+    query, key_attrs = pet_records_query(USER_ID, "pet-sem-registros", "VACCINE")
+    assert first_page(aws.table(HANDLER_ENV["HEALTH_RECORDS_TABLE"]), 10, None, key_attrs, **query) == ([], None)
+
+
+# =========================
+# Handlers
+# =========================
+@pytest.mark.parametrize("name, record_type, limit", [
+    ("list_vaccines", "VACCINE", "20"),
+    ("list_vaccines", "VACCINE", "200"),
+    ("get_care", "CARE", "33"),
+])
+def test_handler_pages_cover_pet_history_once_in_order(handlers, records, name, record_type, limit):
+    seen, pages = walk(handlers("health", name), petId=PET_ID, limit=limit)
+
+    assert seen == newest_first(records[record_type], "GSI2SK")
+    assert pages == -(-len(seen) // int(limit))
+
+
+@pytest.mark.parametrize("name, record_type", [("list_vaccines", "VACCINE"), ("get_care", "CARE")])
+def test_handler_pages_by_owner_index_include_every_pet(handlers, records, name, record_type):
+    seen, _ = walk(handlers("health", name), limit="100")
+
+    assert len(seen) == len(set(seen))
+    assert set(newest_first(records[record_type], "GSI1SK")) <= set(seen)
+    assert len(seen) == len(records[record_type]) + 25  # + os do outro pet
+
+
+@pytest.mark.parametrize("name", ["list_vaccines", "get_care"])
+def test_limit_bounds(handlers, records, name):
+    handler = handlers("health", name)
+
+    status, body = invoke(handler, petId=PET_ID, limit="1000")
+    assert status == 200 and len(body["items"]) == 200  # MAX_LIMIT
+
+    status, body = invoke(handler, petId=PET_ID, cursor="")
+    assert status == 200 and len(body["items"]) == 50  # DEFAULT_LIMIT
+
+    for invalid in ("0", "-5", "abc", "1.5"):
+        status, body = invoke(handler, petId=PET_ID, limit=invalid)
+        assert status == 400, invalid
+
+
+@pytest.mark.parametrize("name", ["list_vaccines", "get_care"])
+def test_tampered_or_foreign_cursor_is_rejected(handlers, records, name):
+    import base64
+
+    handler = handlers("health", name)
+    _, body = invoke(handler, petId=PET_ID, limit="10")
+    cursor = body["nextCursor"]
+    payload, signature = cursor.split(".")
+
+    decoded = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    decoded["PK"] = decoded["PK"].replace(USER_ID, "outro-usuario")
+    forged = base64.urlsafe_b64encode(json.dumps(decoded).encode()).rstrip(b"=").decode()
+
+    for bad in (f"{forged}.{signature}", f"{payload}.{signature[:-2]}AA", "sem-ponto", "a.b"):
+        status, _ = invoke(handler, petId=PET_ID, limit="10", cursor=bad)
+        assert status == 400, bad
+
+    # cursor válido, mas de outra consulta (outro pet, tutor inteiro, outro handler)
+    assert invoke(handler, petId=OTHER_PET_ID, limit="10", cursor=cursor)[0] == 400
+    assert invoke(handler, limit="10", cursor=cursor)[0] == 400
+    other = handlers("health", "get_care" if name == "list_vaccines" else "list_vaccines")
+    assert invoke(other, petId=PET_ID, limit="10", cursor=cursor)[0] == 400
+
+
+def test_missing_cursor_secret_never_signs_with_an_empty_key(handlers, records, monkeypatch):
+    handler = handlers("health", "list_vaccines")
+    monkeypatch.setenv("CURSOR_SECRET", "")
+
+    # sem chave não há cursor (nem emitido, nem aceito): 500, não um cursor forjável
+    assert invoke(handler, petId=PET_ID, limit="10")[0] == 500
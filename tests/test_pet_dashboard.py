@@ -0,0 +1,66 @@
+import json
+
+from events import HANDLER_ENV, LambdaContext, api_event
+
+USER_ID = "user-dashboard"
+
+
+def load_pet(dynamodb, pet_id):
+    dynamodb.load(HANDLER_ENV["PETS_TABLE_NAME"], [{
+        "PK": {"S": f"USER#{USER_ID}"}, "SK": {"S": f"PET#{pet_id}"},
+        "petId": {"S": pet_id}, "name": {"S": "Rex"}, "species": {"S": "DOG"},
+        "gender": {"S": "MALE"}, "createdAt": {"S": "2024-01-01T10:00:00+00:00"},
+    }])
+
+
+def dashboard(handlers, pet_id, limit):
+    event = api_event(query={"userId": USER_ID, "limit": str(limit)}, path={"petId": pet_id})
+    result = handlers("pets", "get_pet_dashboard").lambda_handler(event, LambdaContext())
+    assert result["statusCode"] == 200
+    return json.loads(result["body"])
+
+
+def test_next_due_comes_from_summary_beyond_limit(handlers, dynamodb):
+    load_pet(dynamodb, "pet-d1")
+
+    # a Raiva é a vacina mais antiga: fica fora das `limit` mais recentes
+    records = [{"name": "Raiva", "appliedAt": "2020-01-10", "nextDose": "2099-01-10"}] + [
+        {"name": "V10", "appliedAt": f"2025-{month:02d}-10", "nextDose": f"2099-{month:02d}-20"}
+        for month in range(1, 6)
+    ]
+    handler = handlers("health", "post_vaccines_batch")
+    body = {"userId": USER_ID, "petId": "pet-d1", "records": records}
+    assert handler.lambda_handler(api_event(body=body), LambdaContext())["statusCode"] == 201
+
+    body = dashboard(handlers, "pet-d1", limit=2)
+
+    assert [v["name"] for v in body["vaccines"]] == ["V10", "V10"]
+    assert [(d["title"], d["nextDueDate"]) for d in body["nextDue"]] == [
+        ("Raiva", "2099-01-10"),
+        ("V10", "2099-05-20"),
+    ]
+    assert body["pet"]["sex"] == "male"
+
+
+def test_pet_without_summary_uses_latest_records(handlers, dynamodb):
+    load_pet(dynamodb, "pet-d2")
+
+    body = dashboard(handlers, "pet-d2", limit=2)
+
+    assert body["vaccines"] == body["care"] == body["nextDue"] == []
+    assert body["pet"]["id"] == "pet-d2"
+
+
+def test_parallel_reads_report_wall_clock_latency(handlers, dynamodb):
+    load_pet(dynamodb, "pet-d3")
+
+    event = api_event(query={"userId": USER_ID}, path={"petId": "pet-d3"})
+    result = handlers("pets", "get_pet_dashboard").lambda_handler(event, LambdaContext())
+
+    timings = {
+        name: float(duration.split("=")[1])
+        for name, duration in (entry.split(";") for entry in result["headers"]["Server-Timing"].split(", "))
+    }
+    # quatro chamadas nas threads do pool: a soma delas vai para dynamodb.calls
+    assert timings["dynamodb"] <= timings["total"]
+    assert timings["dynamodb.calls"] > 0
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from events import HANDLER_ENV, LambdaContext, api_event
+
+USER_ID = "user-pets"
+HEALTH_TABLE = HANDLER_ENV["HEALTH_RECORDS_TABLE"]
+
+
+def load_pets(dynamodb, *pet_ids):
+    dynamodb.load(HANDLER_ENV["PETS_TABLE_NAME"], [{
+        "PK": {"S": f"USER#{USER_ID}"}, "SK": {"S": f"PET#{pet_id}"},
+        "petId": {"S": pet_id}, "name": {"S": pet_id}, "species": {"S": "DOG"},
+        "createdAt": {"S": "2024-01-01T10:00:00+00:00"},
+    } for pet_id in pet_ids])
+
+
+def health_records(pet_id):
+    from petvida_runtime.health_records import care_item, vaccine_item
+
+    return [
+        vaccine_item(USER_ID, pet_id, {"name": "V10", "appliedAt": "2025-01-10", "nextDose": "2099-01-10"}),
+        care_item(USER_ID, pet_id, {"type": "BANHO", "performedAt": "2020-01-01"}),  # vencido
+    ]
+
+
+def get_pets(handlers, **query):
+    event = api_event(query={"userId": USER_ID, **query})
+    result = handlers("pets", "get_pet").lambda_handler(event, LambdaContext())
+    return result["statusCode"], json.loads(result["body"])
+
+
+@pytest.fixture(scope="module")
+def pets(dynamodb):
+    """pet-s1 com o item SUMMARY, pet-s2 só com registros (antes do rebuild), pet-s3 sem nada."""
+    from petvida_runtime.health_records import put_records
+    from petvida_runtime.health_summary import write_with_summary
+
+    load_pets(dynamodb, "pet-s1", "pet-s2", "pet-s3")
+    write_with_summary(HEALTH_TABLE, USER_ID, "pet-s1", health_records("pet-s1"))
+    put_records(HEALTH_TABLE, health_records("pet-s2"))
+    return ["pet-s1", "pet-s2", "pet-s3"]
+
+
+def test_include_health_summary_attaches_summary(handlers, pets):
+    status, body = get_pets(handlers, include="health_summary")
+
+    assert status == 200
+    summaries = {pet["id"]: pet["healthSummary"] for pet in body}
+    assert set(summaries) == set(pets)
+
+    # do item SUMMARY e, sem ele, das consultas por pet: mesmo resultado
+    for pet_id in ("pet-s1", "pet-s2"):
+        summary = summaries[pet_id]
+        assert (summary["vaccineCount"], summary["careCount"], summary["overdueCount"]) == (1, 1, 1)
+        assert (summary["nextDue"]["title"], summary["nextDue"]["nextDueDate"]) == ("V10", "2099-01-10")
+
+    assert summaries["pet-s3"] == {"nextDue": None, "overdueCount": 0, "vaccineCount": 0, "careCount": 0}
+
+
+def test_default_response_has_no_summary(handlers, pets):
+    status, body = get_pets(handlers)
+
+    assert status == 200
+    assert {pet["id"] for pet in body} == set(pets)
+    assert all("healthSummary" not in pet for pet in body)
+
+
+@pytest.mark.parametrize("include", ["health", "health_summary,vaccines", "HEALTH_SUMMARY"])
+def test_unknown_include_is_400(handlers, pets, include):
+    status, body = get_pets(handlers, include=include)
+
+    assert status == 400
+    assert body["message"].startswith("include inválido")
+    assert "health_summary" in body["message"]
+
+
+def test_include_ignores_blanks(handlers, pets):
+    status, body = get_pets(handlers, include=" health_summary, ")
+
+    assert status == 200
+    assert all("healthSummary" in pet for pet in body)
@@ -0,0 +1,178 @@
+import importlib.util
+import json
+import os
+import sys
+import uuid
+
+import pytest
+
+from events import HANDLER_ENV, ROOT
+from local_services import ServiceError
+
+PREFIX = "AWSCognitoIdentityProviderService."
+CREATE_USER = f"{PREFIX}AdminCreateUser"
+GET_USER = f"{PREFIX}AdminGetUser"
+
+
+@pytest.fixture(scope="module")
+def provision(local_aws):
+    path = os.path.join(ROOT, "scripts", "provision_users.py")
+    spec = importlib.util.spec_from_file_location("provision_users", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def cognito_handlers(local_aws):
+    """Troca handlers do LocalCognito durante o teste: {operação: handler(request, original)}."""
+    services = local_aws[0]
+    originals = {}
+
+    def swap(name, handler):
+        original = originals.setdefault(name, services.aws_handlers[name])
+        services.aws_handlers[name] = lambda request: handler(request, original)
+
+    yield swap
+    services.aws_handlers.update(originals)
+
+
+def emails(count):
+    return [f"{uuid.uuid4().hex}@petvida.local" for _ in range(count)]
+
+
+def write_csv(tmp_path, rows):
+    path = tmp_path / "clientes.csv"
+    path.write_text("email,name\n" + "".join(f"{email},{name}\n" for email, name in rows), encoding="utf-8")
+    return str(path)
+
+
+def run(provision, input_path, monkeypatch, capsys, chunk=2):
+    monkeypatch.setattr(sys, "argv", [
+        "provision_users.py", "--env", "local", "--input", input_path,
+        "--user-pool-id", HANDLER_ENV["USER_POOL_ID"], "--rate", "1000", "--chunk", str(chunk),
+    ])
+    provision.main()
+    return capsys.readouterr().out.strip().splitlines()
+
+
+def profile_of(cognito, email):
+    from petvida_runtime import aws
+    from petvida_runtime.profiles import profile_key
+
+    sub = cognito.users[email]["sub"]
+    return aws.table(HANDLER_ENV["USERS_TABLE_NAME"]).get_item(Key=profile_key(sub)).get("Item")
+
+
+def test_existing_email_lookup_goes_through_the_bucket(provision, cognito, local_aws, tmp_path,
+                                                       monkeypatch, capsys, cognito_handlers):
+    services = local_aws[0]
+    new_email, existing_email = emails(2)
+    existing_sub = cognito.add_user(existing_email, name="Já Cliente")
+
+    acquired = []
+    monkeypatch.setattr(provision.TokenBucket, "acquire", lambda self: acquired.append(1))
+    monkeypatch.setattr(provision, "BASE_DELAY", 0.0)
+
+    # AdminGetUser recusado uma vez: só ele é repetido, passando pelo bucket de novo
+    throttled = []
+
+    def get_user(request, original):
+        if not throttled:
+            throttled.append(request["Username"])
+            raise ServiceError("TooManyRequestsException", "Rate exceeded")
+        return original(request)
+
+    cognito_handlers(GET_USER, get_user)
+    before = dict(services.calls)
+
+    lines = run(provision, write_csv(tmp_path, [(new_email, "Nova"), (existing_email, "Já Cliente")]),
+                monkeypatch, capsys)
+
+    calls = {name: services.calls.get(name, 0) - before.get(name, 0) for name in (CREATE_USER, GET_USER)}
+    assert calls == {CREATE_USER: 2, GET_USER: 2}
+    assert len(acquired) == sum(calls.values())
+    assert throttled == [existing_email]
+
+    assert lines[-1] == "✅ provisionamento concluído | cognito criados=1 cognito existentes=1 perfis gravados=2"
+    assert profile_of(cognito, existing_email)["id"] == existing_sub
+    assert profile_of(cognito, new_email)["name"] == "Nova"
+
+
+def test_resumes_from_checkpoint(provision, cognito, local_aws, tmp_path, monkeypatch, capsys):
+    services = local_aws[0]
+    rows = [(email, f"Cliente {number}") for number, email in enumerate(emails(5))]
+    input_path = write_csv(tmp_path, rows)
+    checkpoint_path = f"{input_path}.checkpoint.json"
+
+    # interrompido no segundo lote: o primeiro já está no checkpoint
+    original = provision.provision_chunk
+    chunks = []
+
+    def interrupted(chunk, *args):
+        chunks.append(chunk)
+        if len(chunks) == 2:
+            raise KeyboardInterrupt
+        return original(chunk, *args)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(provision, "provision_chunk", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            run(provision, input_path, monkeypatch, capsys)
+    capsys.readouterr()
+
+    with open(checkpoint_path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    assert checkpoint["next_row"] == 2
+    assert checkpoint["totals"] == {"cognito criados": 2, "perfis gravados": 2}
+    assert not os.path.exists(f"{checkpoint_path}.tmp")
+
+    before = services.calls.get(CREATE_USER, 0)
+    lines = run(provision, input_path, monkeypatch, capsys)
+
+    assert lines[0] == "↩️ retomando da linha 2"
+    assert services.calls.get(CREATE_USER, 0) - before == 3  # só as linhas 2, 3 e 4
+    assert lines[-1] == "✅ provisionamento concluído | cognito criados=5 perfis gravados=5"
+    assert all(profile_of(cognito, email)["name"] == name for email, name in rows)
+
+    # terminado: rodar de novo não chama o Cognito
+    before = services.calls.get(CREATE_USER, 0)
+    lines = run(provision, input_path, monkeypatch, capsys)
+    assert services.calls.get(CREATE_USER, 0) == before
+    assert lines == ["↩️ retomando da linha 5",
+                     "✅ provisionamento concluído | cognito criados=5 perfis gravados=5"]
+
+
+def test_errors_file_lists_rejected_rows_and_is_a_valid_input(provision, cognito, tmp_path,
+                                                               monkeypatch, capsys, cognito_handlers):
+    ok_email, rejected_email = emails(2)
+    input_path = write_csv(tmp_path, [(ok_email, "Ok"), ("sem-arroba", "Inválido"),
+                                      (rejected_email, "Recusado")])
+
+    def create_user(request, original):
+        if request["Username"] == rejected_email:
+            raise ServiceError("InvalidParameterException", "Invalid email address format.")
+        return original(request)
+
+    cognito_handlers(CREATE_USER, create_user)
+    lines = run(provision, input_path, monkeypatch, capsys, chunk=10)
+
+    assert lines[-1] == "✅ provisionamento concluído | cognito criados=1 falhas=1 inválidos=1 perfis gravados=1"
+
+    errors_path = f"{input_path}.checkpoint.json.errors.jsonl"
+    with open(errors_path, encoding="utf-8") as f:
+        errors = [json.loads(line) for line in f]
+    assert errors == [
+        {"email": "sem-arroba", "name": "Inválido", "_row": 1, "_error": "email/name inválidos"},
+        {"email": rejected_email, "name": "Recusado", "_row": 2, "_error": "InvalidParameterException"},
+    ]
+    assert rejected_email not in cognito.users
+
+    # corrigido o problema, o próprio errors.jsonl é a entrada da nova rodada
+    cognito_handlers(CREATE_USER, lambda request, original: original(request))
+    retry_path = str(tmp_path / "retry.jsonl")
+    os.replace(errors_path, retry_path)
+    lines = run(provision, retry_path, monkeypatch, capsys)
+
+    assert lines[-1] == "✅ provisionamento concluído | cognito criados=1 inválidos=1 perfis gravados=1"
+    assert profile_of(cognito, rejected_email)["name"] == "Recusado"
@@ -0,0 +1,131 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from events import HANDLER_ENV, LambdaContext
+
+TODAY = datetime.now(timezone.utc).date()
+
+
+def days_ago(n: int) -> str:
+    return (TODAY - timedelta(days=n)).isoformat()
+
+
+@pytest.fixture
+def sweep(handlers):
+    return handlers("reminders", "sweep_reminders").lambda_handler
+
+
+def load(dynamodb, table_name, items):
+    from petvida_runtime import aws
+
+    dynamodb.load(table_name, [aws.serialize(item) for item in items])
+
+
+def profile(user_id, enabled=True):
+    from petvida_runtime.profiles import profile_key
+
+    return {
+        **profile_key(user_id), "email": f"{user_id}@example.com", "name": user_id,
+        "preferences": {"remindersEnabled": enabled, "advanceDays": "7"},
+    }
+
+
+def vaccine(user_id, pet_id, name, applied_at):
+    from petvida_runtime.health_records import vaccine_item
+
+    next_dose = (date.fromisoformat(applied_at) + timedelta(days=365)).isoformat()
+    return vaccine_item(user_id, pet_id, {"name": name, "appliedAt": applied_at, "nextDose": next_dose})
+
+
+def reminder(user_id, pet_id, record, remind_on):
+    from petvida_runtime.reminders import reminder_item
+
+    return reminder_item(user_id, pet_id, record, remind_on)
+
+
+def queued(dynamodb, items):
+    table = dynamodb.table(HANDLER_ENV["REMINDERS_TABLE"])
+    return {item["SK"] for item in items if table.get({"PK": {"S": item["PK"]}, "SK": {"S": item["SK"]}})}
+
+
+def sent_records(sent):
+    return {json.loads(entry["MessageBody"])["recordId"] for entry in sent}
+
+
+def test_sweep_catches_up_late_and_failed_reminders(dynamodb, sqs_batches, sweep):
+    from petvida_runtime.reminders import CATCHUP_DAYS
+
+    sent, reject = sqs_batches
+    user = "user-late"
+    load(dynamodb, HANDLER_ENV["USERS_TABLE_NAME"], [profile(user)])
+
+    records = [vaccine(user, f"pet-{n}", "V10", "2026-01-10") for n in range(4)]
+    late = reminder(user, "pet-0", records[0], days_ago(1))              # gravado depois do sweep de ontem
+    older = reminder(user, "pet-1", records[1], days_ago(CATCHUP_DAYS))  # último dia da janela
+    expired = reminder(user, "pet-2", records[2], days_ago(CATCHUP_DAYS + 1))
+    failing = reminder(user, "pet-3", records[3], days_ago(0))
+    load(dynamodb, HANDLER_ENV["REMINDERS_TABLE"], [late, older, expired, failing])
+
+    reject.add(failing["SK"])
+    stats = sweep({}, LambdaContext())
+
+    assert sent_records(sent) == {late["SK"], older["SK"]}
+    assert stats["failed"] == 1
+    assert queued(dynamodb, [late, older, expired, failing]) == {expired["SK"], failing["SK"]}
+
+    # no dia seguinte a falha é reenviada (o sweep lê os dias anteriores)
+    reject.clear()
+    sweep({}, LambdaContext())
+    assert failing["SK"] in sent_records(sent)
+    assert queued(dynamodb, [failing]) == set()
+
+
+def test_sweep_drops_reminders_superseded_by_a_newer_record(dynamodb, sqs_batches, sweep):
+    from petvida_runtime.health_summary import apply_records, empty_summary
+
+    sent, _ = sqs_batches
+    user, pet = "user-dose", "pet-dose"
+    load(dynamodb, HANDLER_ENV["USERS_TABLE_NAME"], [profile(user), profile("user-off", enabled=False)])
+
+    old_dose = vaccine(user, pet, "V10", "2025-01-10")
+    new_dose = vaccine(user, pet, "V10", "2025-03-01")   # mesma vacina, aplicada de novo
+    rabies = vaccine(user, pet, "Raiva", "2025-01-10")
+    backfilled = vaccine(user, pet, "Raiva", "2024-01-10")  # histórico antigo importado depois
+    summary = apply_records(empty_summary(user, pet), [old_dose, new_dose, rabies, backfilled])
+    load(dynamodb, HANDLER_ENV["HEALTH_RECORDS_TABLE"], [summary])
+
+    no_summary = vaccine(user, "pet-sem-resumo", "V8", "2025-01-10")
+    disabled = vaccine("user-off", "pet-off", "V10", "2025-01-10")
+    reminders = [
+        reminder(user, pet, old_dose, days_ago(2)),
+        reminder(user, pet, new_dose, days_ago(0)),
+        reminder(user, pet, rabies, days_ago(1)),
+        reminder(user, pet, backfilled, days_ago(0)),
+        reminder(user, "pet-sem-resumo", no_summary, days_ago(0)),
+        reminder("user-off", "pet-off", disabled, days_ago(0)),
+    ]
+    load(dynamodb, HANDLER_ENV["REMINDERS_TABLE"], reminders)
+
+    stats = sweep({}, LambdaContext())
+
+    assert sent_records(sent) == {new_dose["recordId"], rabies["recordId"], no_summary["recordId"]}
+    assert stats["superseded"] == 2 and stats["skipped"] == 1
+    assert queued(dynamodb, reminders) == set()
+
+
+def test_manual_run_reads_only_the_given_date(dynamodb, sqs_batches, sweep):
+    sent, _ = sqs_batches
+    user = "user-manual"
+    load(dynamodb, HANDLER_ENV["USERS_TABLE_NAME"], [profile(user)])
+
+    records = [vaccine(user, "pet-m", f"V{n}", "2026-01-10") for n in range(2)]
+    target = reminder(user, "pet-m", records[0], days_ago(20))
+    other = reminder(user, "pet-m", records[1], days_ago(21))
+    load(dynamodb, HANDLER_ENV["REMINDERS_TABLE"], [target, other])
+
+    sweep({"date": days_ago(20)}, LambdaContext())
+
+    assert sent_records(sent) == {target["SK"]}
+    assert queued(dynamodb, [target, other]) == {other["SK"]}
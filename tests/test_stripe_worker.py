@@ -0,0 +1,120 @@
+import copy
+import json
+import os
+import uuid
+
+import pytest
+
+from events import HANDLER_ENV, ROOT, LambdaContext
+from local_services import ServiceError
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "stripe")
+CREATE_USER = "AWSCognitoIdentityProviderService.AdminCreateUser"
+
+
+def fixture(file_name: str, **metadata) -> dict:
+    """Evento do Stripe com id novo (e, no checkout, e-mail novo) por teste."""
+    with open(os.path.join(FIXTURES, f"{file_name}.json"), encoding="utf-8") as f:
+        event = copy.deepcopy(json.load(f))
+    event["id"] = f"evt_{uuid.uuid4().hex}"
+    if metadata:
+        event["data"]["object"]["metadata"] = metadata
+    return event
+
+
+def sqs_event(*stripe_events) -> dict:
+    return {"Records": [
+        {"messageId": f"msg-{event['id']}", "body": json.dumps(event)} for event in stripe_events
+    ]}
+
+
+@pytest.fixture
+def worker(handlers):
+    return handlers("auth", "stripe_worker")
+
+
+def status_of(worker, stripe_event):
+    from petvida_runtime import aws
+    from stripe_events import event_key
+
+    item = aws.table(HANDLER_ENV["STRIPE_EVENTS_TABLE"]).get_item(Key=event_key(stripe_event)).get("Item")
+    return item and item["status"]
+
+
+def receive(stripe_event):
+    """Grava o evento como o webhook faz (RECEIVED) antes de ir para a fila."""
+    from petvida_runtime import aws
+    from stripe_events import STATUS_RECEIVED, event_item
+
+    aws.table(HANDLER_ENV["STRIPE_EVENTS_TABLE"]).put_item(
+        Item=event_item(stripe_event, json.dumps(stripe_event), STATUS_RECEIVED),
+    )
+
+
+def profile_of(cognito, email):
+    from petvida_runtime import aws
+    from petvida_runtime.profiles import profile_key
+
+    sub = cognito.users[email]["sub"]
+    return aws.table(HANDLER_ENV["USERS_TABLE"]).get_item(Key=profile_key(sub)).get("Item")
+
+
+def test_batch_reports_only_failed_records(worker, cognito, local_aws):
+    services = local_aws[0]
+    email = f"{uuid.uuid4().hex}@petvida.local"
+    flaky_email = f"{uuid.uuid4().hex}@petvida.local"
+
+    valid = fixture("checkout.session.completed", email=email, name="Ana")
+    no_metadata = fixture("checkout.session.completed.no_metadata")
+    paid = fixture("invoice.paid")
+    flaky = fixture("checkout.session.completed", email=flaky_email, name="Bia")
+    for stripe_event in (valid, no_metadata, paid, flaky):
+        receive(stripe_event)
+
+    original = services.aws_handlers[CREATE_USER]
+
+    def create_user(request):
+        if request["Username"] == flaky_email:
+            raise ServiceError("TooManyRequestsException", "Rate exceeded")
+        return original(request)
+
+    services.aws_handlers[CREATE_USER] = create_user
+    try:
+        result = worker.handler(sqs_event(valid, no_metadata, paid, flaky), LambdaContext())
+    finally:
+        services.aws_handlers[CREATE_USER] = original
+
+    # só a mensagem com erro transitório volta para a fila
+    assert result == {"batchItemFailures": [{"itemIdentifier": f"msg-{flaky['id']}"}]}
+
+    assert status_of(worker, valid) == "PROCESSED"
+    assert status_of(worker, paid) == "PROCESSED"
+    assert status_of(worker, no_metadata) == "FAILED"  # sem retry: não adianta
+    assert status_of(worker, flaky) == "RECEIVED"
+
+    assert profile_of(cognito, email)["name"] == "Ana"
+    assert flaky_email not in cognito.users
+
+    # na reentrega o Cognito já responde: processa normalmente
+    assert worker.handler(sqs_event(flaky), LambdaContext()) == {"batchItemFailures": []}
+    assert status_of(worker, flaky) == "PROCESSED"
+    assert profile_of(cognito, flaky_email)["name"] == "Bia"
+
+
+def test_duplicate_delivery_is_not_processed_twice(worker, cognito, local_aws):
+    services = local_aws[0]
+    email = f"{uuid.uuid4().hex}@petvida.local"
+    stripe_event = fixture("checkout.session.completed", email=email, name="Caio")
+    receive(stripe_event)
+
+    assert worker.handler(sqs_event(stripe_event), LambdaContext()) == {"batchItemFailures": []}
+    calls = dict(services.calls)
+
+    # a mesma mensagem de novo (entrega pelo menos uma vez do SQS)
+    assert worker.handler(sqs_event(stripe_event), LambdaContext()) == {"batchItemFailures": []}
+
+    assert services.calls.get(CREATE_USER) == calls.get(CREATE_USER)
+    assert services.calls.get("DynamoDB_20120810.PutItem") == calls.get("DynamoDB_20120810.PutItem")
+    assert services.calls.get("DynamoDB_20120810.UpdateItem") == calls.get("DynamoDB_20120810.UpdateItem")
+    assert status_of(worker, stripe_event) == "PROCESSED"
+    assert profile_of(cognito, email)["name"] == "Caio"
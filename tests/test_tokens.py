@@ -0,0 +1,171 @@
+import base64
+import json
+import time
+
+import pytest
+
+from events import HANDLER_ENV, LambdaContext, api_event
+
+# =========================
+# Vetor fixo gerado com o OpenSSL (não com o LocalCognito)
+# =========================
+# openssl genpkey -algorithm RSA -pkeyopt rsa_keygen_bits:2048 -out key.pem
+# openssl dgst -sha256 -sign key.pem <header.payload>
+# O LocalCognito assina com o mesmo PKCS#1 v1.5 escrito à mão que o
+# verificador confere; este vetor pega um erro que estivesse dos dois lados.
+OPENSSL_N = (
+    "oWDgvkQJNRSAomr4LnchYXrDHH9xYegnr8bt_tSS9SVfdORzPr6PtvJmAEjG3W3ThbD0FvD-Ds1xsZOrjpcrU3-X5SlDx3rLZWqt"
+    "RAJqTwilmb1IwzSH7yxC47AzOilIioyVpxXOaA5V9A4wqDVbut5hvxALYtEWPJiJa9m48WibjXqJKiVApfJUv2j9doKS6tHQvsI4"
+    "T6uHo3kbu5xEkYdlBKSp8jsNZv9GN8rHBAsn0hr73LNahhyRgXep_93_NvRcoR0_A3S9m3nThgGAOdqU06Nm9zr6o7BeYXnbUnQl"
+    "3uP0bawtJkJyJ4xInsGGK5F9bg3i0Vx4jQ5PTi6vbQ"
+)
+OPENSSL_E = 65537
+# id token do user pool local: iat 2023-11-14, exp 2100-01-01, kid "openssl-vector"
+OPENSSL_TOKEN = (
+    "eyJraWQiOiJvcGVuc3NsLXZlY3RvciIsImFsZyI6IlJTMjU2In0."
+    "eyJzdWIiOiJ1c2VyLXZlY3RvciIsImlzcyI6Imh0dHBzOi8vY29nbml0by1pZHAuc2EtZWFzdC0xLmFtYXpvbmF3cy5jb20vc2Et"
+    "ZWFzdC0xX2xvY2FsIiwidG9rZW5fdXNlIjoiaWQiLCJhdWQiOiJsb2NhbC1jbGllbnQiLCJpYXQiOjE3MDAwMDAwMDAsImV4cCI6"
+    "NDEwMjQ0NDgwMH0."
+    "YHrktsKSDmIjsZwVLSdvzFa9A5iTooaoCnl3OHADUxGv5HxlmnjcdYpyLtN4nFe-w1XraUDDN4SnXVOD2yVMr1e-6NhfUimYpK7P"
+    "BayR2IboNUywIXi8RGW5MGakcIq2ilzZQO97Z6WCEMT28_vY9FsJjDSEytFwL_8ZuEcsm6biBHe-YwDd78xYqaFP0x5PyXNXNirU"
+    "5r1Z1XMig2bK7jR9JgnDdycUOVsjbZ7fvJyPxCJl4Hu6U5j-HvxdDPAdILE04Ww-IBCRzB1Nc-c9-umLbgOqSzzpxsMpcP7GiarC"
+    "lKSkvsb5UYaEbLO0AYk7BVkDXrNSQF2912ILpWRxpA"
+)
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+@pytest.fixture
+def tokens(local_aws, monkeypatch):
+    """petvida_runtime.tokens com o cache de chaves zerado a cada teste."""
+    from petvida_runtime import tokens
+
+    monkeypatch.setattr(tokens, "_keys", {})
+    monkeypatch.setattr(tokens, "_expires_at", 0.0)
+    monkeypatch.setattr(tokens, "_fetched_at", 0.0)
+    return tokens
+
+
+@pytest.fixture
+def jwks_fetches(local_aws, cognito):
+    """Quantas vezes o JWKS do LocalCognito foi buscado até agora."""
+    services = local_aws[0]
+    return lambda: services.calls.get(f"GET {cognito.jwks_path}", 0)
+
+
+def claims(cognito, token_use="id", **overrides):
+    now = int(time.time())
+    base = {
+        "sub": "user-token", "iss": cognito.issuer, "token_use": token_use,
+        "iat": now, "exp": now + 3600,
+    }
+    if token_use == "id":
+        base["aud"] = cognito.client_id
+    else:
+        base["client_id"] = cognito.client_id
+    return {**base, **overrides}
+
+
+def test_openssl_vector(tokens, monkeypatch):
+    n = int.from_bytes(base64.urlsafe_b64decode(OPENSSL_N + "=="), "big")
+    header, payload, signature = OPENSSL_TOKEN.split(".")
+    signing_input = f"{header}.{payload}".encode("ascii")
+    raw = base64.urlsafe_b64decode(signature + "==")
+
+    assert tokens._rs256_valid(signing_input, raw, n, OPENSSL_E)
+    assert not tokens._rs256_valid(signing_input, raw[:-1] + bytes([raw[-1] ^ 1]), n, OPENSSL_E)
+    assert not tokens._rs256_valid(signing_input + b"x", raw, n, OPENSSL_E)
+
+    monkeypatch.setattr(tokens, "_keys", {"openssl-vector": (n, OPENSSL_E)})
+    monkeypatch.setattr(tokens, "_expires_at", float("inf"))
+    assert tokens.verify(OPENSSL_TOKEN, "id")["sub"] == "user-vector"
+
+
+@pytest.mark.parametrize("token_use", ["id", "access"])
+def test_valid_tokens(tokens, cognito, token_use):
+    verified = tokens.verify(cognito.sign(claims(cognito, token_use)), token_use)
+
+    assert verified["sub"] == "user-token"
+    assert verified["token_use"] == token_use
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"exp": int(time.time()) - 60}, "Token expirado"),
+    ({"iat": int(time.time()) + 3600}, "Token emitido no futuro"),
+    ({"iss": "https://cognito-idp.sa-east-1.amazonaws.com/sa-east-1_outro"}, "Emissor inválido"),
+    ({"aud": "outro-client"}, "Token de outro client"),
+    ({"token_use": "refresh"}, "Tipo de token inválido"),
+    ({"exp": "2099-01-01"}, "exp inválido"),
+    ({"iat": None}, "iat inválido"),
+])
+def test_invalid_claims(tokens, cognito, overrides, message):
+    with pytest.raises(tokens.InvalidToken, match=message):
+        tokens.verify(cognito.sign(claims(cognito, **overrides)))
+
+
+def test_access_token_checks_client_id(tokens, cognito):
+    with pytest.raises(tokens.InvalidToken, match="Token de outro client"):
+        tokens.verify(cognito.sign(claims(cognito, "access", client_id="outro-client")))
+
+    # access token no lugar de um id token
+    with pytest.raises(tokens.InvalidToken, match="Tipo de token inválido"):
+        tokens.verify(cognito.sign(claims(cognito, "access")), "id")
+
+
+def test_unknown_kid_refetches_once_then_is_rate_limited(tokens, cognito, jwks_fetches):
+    tokens.verify(cognito.sign(claims(cognito)))  # primeira busca
+    fetched = jwks_fetches()
+    rotated = cognito.sign(claims(cognito), kid="chave-rotacionada")
+
+    # dentro do intervalo mínimo: kid desconhecido não busca de novo
+    with pytest.raises(tokens.InvalidToken, match="Chave do token desconhecida"):
+        tokens.verify(rotated)
+    assert jwks_fetches() == fetched
+
+    # depois dele, uma busca; a seguinte já cai no limite
+    tokens._fetched_at -= tokens.JWKS_MIN_REFRESH_SECONDS
+    for _ in range(3):
+        with pytest.raises(tokens.InvalidToken, match="Chave do token desconhecida"):
+            tokens.verify(rotated)
+    assert jwks_fetches() == fetched + 1
+
+
+def test_tampered_payload_or_signature(tokens, cognito):
+    header, payload, signature = cognito.sign(claims(cognito)).split(".")
+    other_payload = cognito.sign(claims(cognito, sub="outro-usuario")).split(".")[1]
+    raw = base64.urlsafe_b64decode(signature + "==")
+    flipped = b64url(raw[:-1] + bytes([raw[-1] ^ 1]))
+
+    for token in (f"{header}.{other_payload}.{signature}", f"{header}.{payload}.{flipped}"):
+        with pytest.raises(tokens.InvalidToken, match="Assinatura inválida"):
+            tokens.verify(token)
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "a.b",
+    "a.b.c.d",
+    "!!!.@@@.###",
+    f"{b64url(b'[]')}.{b64url(b'{}')}.{b64url(b'sig')}",
+    f"{b64url(b'nao-json')}.{b64url(b'{}')}.{b64url(b'sig')}",
+])
+def test_malformed_tokens(tokens, token):
+    with pytest.raises(tokens.InvalidToken, match="Token malformado"):
+        tokens.verify(token)
+
+
+def test_non_numeric_exp_is_401_not_500(tokens, cognito, handlers):
+    token = cognito.sign(claims(cognito, exp="amanhã"))
+    event = api_event(headers={"authorization": f"Bearer {token}"})
+
+    result = handlers("config", "get_config").lambda_handler(event, LambdaContext())
+
+    assert result["statusCode"] == 401
+    assert json.loads(result["body"])["message"] == "exp inválido"
+
+
+def test_issuer_matches_local_user_pool(tokens, cognito):
+    assert tokens.ISSUER == cognito.issuer
+    assert tokens.CLIENT_ID == HANDLER_ENV["CLIENT_ID"]
@@ -0,0 +1,40 @@
+import base64
+import hashlib
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from events import LambdaContext, api_event
+
+PHOTO = b"\xff\xd8\xff\xe0 foto do rex"
+SHA256 = hashlib.sha256(PHOTO).hexdigest()
+CHECKSUM = base64.b64encode(hashlib.sha256(PHOTO).digest()).decode("ascii")
+
+
+def presign(handlers, **body):
+    event = api_event(body={"userId": "user-upload", "petId": "pet-u1", "contentType": "image/jpeg", **body})
+    result = handlers("pets", "get_upload_url").lambda_handler(event, LambdaContext())
+    assert result["statusCode"] == 200
+    return json.loads(result["body"])
+
+
+def test_put_signs_the_client_checksum(handlers):
+    upload = presign(handlers, contentSha256=SHA256)
+
+    assert upload["photoKey"].endswith(f"/{SHA256[:32]}.jpg")
+    assert upload["headers"]["x-amz-checksum-sha256"] == CHECKSUM
+    assert parse_qs(urlsplit(upload["uploadUrl"]).query)["x-amz-checksum-sha256"] == [CHECKSUM]
+
+
+def test_post_policy_requires_the_client_checksum(handlers):
+    upload = presign(handlers, contentSha256=SHA256, method="POST")
+
+    policy = json.loads(base64.b64decode(upload["fields"]["policy"]))
+    assert upload["fields"]["x-amz-checksum-sha256"] == CHECKSUM
+    assert {"x-amz-checksum-sha256": CHECKSUM} in policy["conditions"]
+
+
+def test_without_checksum_key_is_random(handlers):
+    first, second = presign(handlers), presign(handlers)
+
+    assert first["photoKey"] != second["photoKey"]
+    assert "x-amz-checksum-sha256" not in first["headers"]